@@ -0,0 +1,66 @@
+"""Compara a serie de saldos diarios com NumPy e um loop Python sobre os modelos das transações.
+
+Uso: python -m benchmarks.balance_series_benchmark --rows 200000
+"""
+import os
+import argparse
+import tempfile
+from decimal import Decimal
+from collections import defaultdict
+
+from infra import TransactionRepository, DatabaseSettings, EngineRegistry
+from src.financial.enums import SeriesFrequencies, TransactionTypes
+from src.financial.database_adapter import TransactionDatabaseAdapter
+from benchmarks.utils import remove_database, create_schema, generate_transaction_rows, bulk_load_transactions, timed, print_table
+
+
+def python_daily_balances(transactions) -> dict:
+    # Caminho antigo: monta todos os modelos e acumula dia a dia em dicionarios
+    deltas = defaultdict(lambda: defaultdict(Decimal))
+    for transaction in transactions:
+        if not transaction.paid or transaction.ignore:
+            continue
+        day = transaction.date.date()
+        if transaction.transaction_type is TransactionTypes.EXPENSE:
+            deltas[transaction.account_id_destination][day] -= transaction.amount
+        else:
+            deltas[transaction.account_id_destination][day] += transaction.amount
+        if transaction.transaction_type is TransactionTypes.TRANSFER and transaction.account_id_origin is not None:
+            deltas[transaction.account_id_origin][day] -= transaction.amount
+    balances = dict()
+    for account_id, days in deltas.items():
+        running = Decimal("0.00")
+        balances[account_id] = []
+        for day in sorted(days):
+            running += days[day]
+            balances[account_id].append((day, running))
+    return balances
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    
+    path = os.path.join(args.directory, "balance_series.db")
+    remove_database(path)
+    connection_string = f"sqlite:///{path}"
+    engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=connection_string))
+    create_schema(engine)
+    bulk_load_transactions(engine, generate_transaction_rows(args.rows))
+    TransactionDatabaseAdapter._db = TransactionRepository(connection_string=connection_string)
+    
+    results = []
+    for frequency in SeriesFrequencies:
+        seconds, series = timed(lambda: TransactionDatabaseAdapter.balance_series(frequency=frequency))
+        results.append([f"numpy ({frequency.name.lower()})", f"{seconds:.2f}s", f"{series.balances.nbytes / 1024:.0f} KiB"])
+    seconds, balances = timed(lambda: python_daily_balances(TransactionDatabaseAdapter.iter_all(batch_size=5_000)))
+    results.append(["python loop over models (day)", f"{seconds:.2f}s", f"{sum(len(points) for points in balances.values()):,} tuples"])
+    print_table(f"Running balance series ({args.rows:,} transactions)", ["method", "time", "result size"], results)
+    EngineRegistry.dispose_all()
+    remove_database(path)
+
+
+if __name__ == "__main__":
+    main()
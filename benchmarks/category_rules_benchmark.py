@@ -0,0 +1,84 @@
+"""Compara a classificação com as regras compiladas contra testar regra por regra em cada descrição.
+
+Uso: python -m benchmarks.category_rules_benchmark --rows 100000 --rules 500
+"""
+import re
+import uuid
+import random
+import argparse
+from decimal import Decimal
+from datetime import datetime
+
+from src.financial.enums import TransactionTypes
+from src.financial.models import TransactionModel, CategoryRuleModel
+from src.financial.utils import CategoryRuleEngine, normalize_text
+from benchmarks.utils import WORDS, timed, print_table, rate
+
+
+def make_rules(count: int, user_id: uuid.UUID, rng: random.Random) -> list:
+    # Uma parte das regras usa expressões regulares, o resto usa trechos das palavras do gerador com sufixos numericos
+    rules = []
+    for index in range(count):
+        word = rng.choice(WORDS)
+        if index % 10 == 0:
+            rules.append(CategoryRuleModel(user_id=user_id, category_id=uuid.uuid4(), pattern=rf"^{word} \w+ {index}\b"))
+        else:
+            rules.append(CategoryRuleModel(user_id=user_id, category_id=uuid.uuid4(), keywords=[f"{word} {rng.choice(WORDS)}", f"{word} {index}"], max_amount=Decimal(rng.randrange(100, 5000))))
+    return rules
+
+
+def naive_classify(rules: list, transactions: list) -> list:
+    # Cada transação passa por todas as regras até achar uma que case
+    ordered = sorted(enumerate(rules), key=lambda item: (-item[1].priority, item[0]))
+    compiled = [(rule, [normalize_text(keyword) for keyword in rule.keywords], re.compile(rule.pattern, re.IGNORECASE) if rule.pattern else None) for _, rule in ordered]
+    result = []
+    for transaction in transactions:
+        text = normalize_text(transaction.description)
+        category_id = None
+        for rule, keywords, pattern in compiled:
+            if not (any(keyword in text for keyword in keywords) or (pattern is not None and pattern.search(transaction.description))):
+                continue
+            if rule.max_amount is not None and transaction.amount > rule.max_amount:
+                continue
+            category_id = rule.category_id
+            break
+        result.append(category_id)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rules", type=int, default=500)
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    user_id, account_id, category_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    rules = make_rules(args.rules, user_id, rng)
+    transactions = [
+        TransactionModel(
+            date=datetime(2024, 1, 1),
+            description=f"{rng.choice(WORDS).upper()} {rng.choice(WORDS)} {rng.randrange(args.rules)}",
+            amount=Decimal(rng.randrange(100, 500_000)) / 100,
+            transaction_type=TransactionTypes.EXPENSE,
+            category_id=category_id,
+            account_id_destination=account_id,
+            user_id=user_id,
+        )
+        for _ in range(args.rows)
+    ]
+    
+    compile_seconds, engine = timed(lambda: CategoryRuleEngine(rules))
+    engine_seconds, classified = timed(lambda: engine.classify(transactions))
+    naive_seconds, expected = timed(lambda: naive_classify(rules, transactions))
+    assert classified == expected
+    matched = sum(category is not None for category in classified)
+    print_table(f"Category rules ({args.rows:,} transactions, {args.rules:,} rules, {matched:,} matched)", ["method", "time", "rows"], [
+        ["compile", f"{compile_seconds:.3f}s", "-"],
+        ["compiled engine", f"{engine_seconds:.2f}s", rate(args.rows, engine_seconds)],
+        ["rule by rule", f"{naive_seconds:.2f}s", rate(args.rows, naive_seconds)],
+    ])
+
+
+if __name__ == "__main__":
+    main()
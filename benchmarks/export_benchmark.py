@@ -0,0 +1,67 @@
+"""Compara a exportação em streaming (CSV, JSON Lines e .npz) com serializar a lista inteira de 'get_all'.
+
+Uso: python -m benchmarks.export_benchmark --rows 200000
+"""
+import os
+import json
+import argparse
+import tempfile
+import tracemalloc
+
+from infra import TransactionRepository, DatabaseSettings, EngineRegistry
+from src.financial.enums import ExportFormats
+from src.financial.handlers import TransactionExportHandler
+from src.financial.database_adapter import TransactionDatabaseAdapter
+from benchmarks.utils import remove_database, create_schema, generate_transaction_rows, bulk_load_transactions, timed, print_table, rate
+
+
+def traced(func):
+    # Tempo e pico de memória alocada pelo Python durante a chamada
+    tracemalloc.start()
+    try:
+        seconds, result = timed(func)
+        return seconds, result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def export_from_list(path: str) -> int:
+    # Caminho antigo: todos os modelos em uma lista e depois o arquivo inteiro
+    transactions = TransactionDatabaseAdapter.get_all()
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(json.dumps(transaction.model_dump(mode="json")) for transaction in transactions))
+    return len(transactions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    
+    path = os.path.join(args.directory, "export.db")
+    remove_database(path)
+    connection_string = f"sqlite:///{path}"
+    engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=connection_string))
+    create_schema(engine)
+    bulk_load_transactions(engine, generate_transaction_rows(args.rows))
+    TransactionDatabaseAdapter._db = TransactionRepository(connection_string=connection_string)
+    handler = TransactionExportHandler(database=TransactionDatabaseAdapter)
+    
+    results = []
+    for export_format in ExportFormats:
+        target = os.path.join(args.directory, f"export.{export_format.value}")
+        seconds, report, peak = traced(lambda: handler.export(target, export_format))
+        results.append([f"streaming {export_format.value}", f"{seconds:.2f}s", rate(report.rows, seconds), f"{peak / 2**20:.1f} MiB", f"{os.path.getsize(target) / 2**20:.1f} MiB"])
+        os.remove(target)
+    target = os.path.join(args.directory, "export_list.jsonl")
+    seconds, rows, peak = traced(lambda: export_from_list(target))
+    results.append(["get_all + json list", f"{seconds:.2f}s", rate(rows, seconds), f"{peak / 2**20:.1f} MiB", f"{os.path.getsize(target) / 2**20:.1f} MiB"])
+    os.remove(target)
+    print_table(f"Transaction export ({args.rows:,} transactions)", ["method", "time", "rows", "peak memory", "file size"], results)
+    EngineRegistry.dispose_all()
+    remove_database(path)
+
+
+if __name__ == "__main__":
+    main()
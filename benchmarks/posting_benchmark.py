@@ -0,0 +1,88 @@
+"""Mede o lançamento de um lote de transações nos saldos das contas.
+
+Uso: python -m benchmarks.posting_benchmark --transactions 100000
+"""
+import os
+import uuid
+import random
+import argparse
+import tempfile
+from decimal import Decimal
+from datetime import datetime
+
+from infra import AccountRepository, DatabaseSettings, EngineRegistry
+from src.financial.enums import TransactionTypes
+from src.financial.models import TransactionModel
+from src.financial.handlers import AccountHandler, PostingHandler
+from src.financial.database_adapter import AccountDatabaseAdapter
+from benchmarks.utils import remove_database, create_schema, timed, print_table, rate
+
+
+def generate_transactions(count: int, account_ids: list, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    types = list(TransactionTypes)
+    user_id = uuid.uuid4()
+    category_id = uuid.uuid4()
+    transactions = []
+    for _ in range(count):
+        transaction_type = rng.choice(types)
+        transactions.append(TransactionModel(
+            transaction_type=transaction_type,
+            amount=Decimal(rng.randrange(100, 500_000)).scaleb(-2),
+            paid=rng.random() > 0.1,
+            ignore=rng.random() < 0.02,
+            account_id_origin=rng.choice(account_ids) if transaction_type is TransactionTypes.TRANSFER else None,
+            account_id_destination=rng.choice(account_ids),
+            category_id=category_id,
+            user_id=user_id,
+        ))
+    return transactions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--single-posts", type=int, default=2_000)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    
+    path = os.path.join(args.directory, "posting.db")
+    remove_database(path)
+    connection_string = f"sqlite:///{path}"
+    create_schema(EngineRegistry.get_engine(DatabaseSettings(connection_string=connection_string)))
+    repository = AccountRepository(connection_string=connection_string)
+    account_ids = [uuid.uuid4() for _ in range(args.accounts)]
+    repository.insert_many([
+        {"id": id.hex, "name": "conta", "description": None, "tag_id": None, "balance": 0, "created_at": datetime.now(), "user_id": uuid.uuid4().hex}
+        for id in account_ids
+    ])
+    AccountDatabaseAdapter._db = repository
+    posting_handler = PostingHandler(account_handler=AccountHandler(database=AccountDatabaseAdapter))
+    
+    build_seconds, transactions = timed(lambda: generate_transactions(args.transactions, account_ids))
+    deltas_seconds, deltas = timed(lambda: PostingHandler.compute_deltas(transactions))
+    post_seconds, balances = timed(lambda: posting_handler.post_transactions(transactions))
+    
+    # Caminho antigo: uma escrita (e um commit) por transação
+    sample = transactions[:args.single_posts]
+    def single_posts():
+        for transaction in sample:
+            for id, delta in PostingHandler.compute_deltas([transaction]).items():
+                posting_handler.account_handler.added_balance(id=id, amount=delta)
+    single_seconds, _ = timed(single_posts)
+    
+    rows = [
+        ["build models (not posted)", f"{build_seconds:.2f}s", "-"],
+        ["compute deltas", f"{deltas_seconds:.3f}s", rate(len(transactions), deltas_seconds)],
+        ["post batch (deltas + write)", f"{post_seconds:.3f}s", rate(len(transactions), post_seconds)],
+        [f"one write per transaction ({len(sample):,})", f"{single_seconds:.2f}s", rate(len(sample), single_seconds)],
+        ["accounts written", f"{len(balances):,}", "-"],
+    ]
+    print_table(f"Posting engine ({args.transactions:,} transactions, {args.accounts:,} accounts)", ["step", "time", "throughput"], rows)
+    EngineRegistry.dispose_all()
+    remove_database(path)
+
+
+if __name__ == "__main__":
+    main()
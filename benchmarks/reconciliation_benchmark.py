@@ -0,0 +1,63 @@
+"""Mede a conciliação completa de saldos com diferentes numeros de processos e a conciliação incremental.
+
+Uso: python -m benchmarks.reconciliation_benchmark --rows 1000000 --workers 1 2 4
+"""
+import os
+import argparse
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import select
+
+from infra import Transaction, AccountRepository, TransactionRepository, DatabaseSettings, EngineRegistry
+from src.financial.database_adapter import AccountDatabaseAdapter
+from benchmarks.utils import remove_database, create_schema, generate_transaction_rows, bulk_load_transactions, timed, print_table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--touched", type=int, default=100)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    
+    path = os.path.join(args.directory, "reconciliation.db")
+    remove_database(path)
+    connection_string = f"sqlite:///{path}"
+    engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=connection_string))
+    create_schema(engine)
+    bulk_load_transactions(engine, generate_transaction_rows(args.rows, users=200))
+    
+    # Contas com saldo zero, todas divergentes do historico
+    with engine.connect() as connection:
+        account_ids = set(connection.scalars(select(Transaction.account_id_destination).distinct()))
+    repository = AccountRepository(connection_string=connection_string)
+    repository.insert_many([
+        {"id": id, "name": "conta", "description": None, "tag_id": None, "balance": 0, "created_at": datetime.now(), "user_id": id}
+        for id in account_ids
+    ])
+    AccountDatabaseAdapter._db = repository
+    
+    rows = []
+    for workers in args.workers:
+        seconds, report = timed(lambda: AccountDatabaseAdapter.reconcile_balances(workers=workers))
+        rows.append([f"full ({workers} workers)", f"{seconds:.2f}s", f"{report.checked:,}", f"{len(report.mismatches):,}"])
+    seconds, report = timed(lambda: AccountDatabaseAdapter.reconcile_balances(fix=True, workers=max(args.workers)))
+    rows.append([f"full + fix ({max(args.workers)} workers)", f"{seconds:.2f}s", f"{report.checked:,}", f"{len(report.mismatches):,}"])
+    
+    # Limpa as marcações da carga e toca algumas transações antes da incremental
+    AccountDatabaseAdapter.reconcile_balances(incremental=True, workers=max(args.workers))
+    transactions = TransactionRepository(connection_string=connection_string)
+    for transaction in transactions.select_page(limit=args.touched):
+        transactions.update(id=transaction.id, amount=transaction.amount + 1)
+    seconds, report = timed(lambda: AccountDatabaseAdapter.reconcile_balances(incremental=True, workers=1))
+    rows.append([f"incremental ({args.touched} transactions touched)", f"{seconds:.2f}s", f"{report.checked:,}", f"{len(report.mismatches):,}"])
+    
+    print_table(f"Balance reconciliation ({args.rows:,} transactions, {len(account_ids):,} accounts, {os.cpu_count()} cpus)", ["run", "time", "checked", "mismatches"], rows)
+    EngineRegistry.dispose_all()
+    remove_database(path)
+
+
+if __name__ == "__main__":
+    main()
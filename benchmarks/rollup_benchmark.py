@@ -0,0 +1,44 @@
+"""Compara as somas por conta e categoria lidas do rollup mensal com a soma direta nas transações.
+
+Uso: python -m benchmarks.rollup_benchmark --rows 200000
+"""
+import os
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from infra import TransactionRepository, DatabaseSettings, EngineRegistry
+from benchmarks.utils import remove_database, create_schema, generate_transaction_rows, bulk_load_transactions, timed, print_table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    
+    path = os.path.join(args.directory, "rollup.db")
+    remove_database(path)
+    connection_string = f"sqlite:///{path}"
+    engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=connection_string))
+    create_schema(engine)
+    # Os triggers do rollup já rodam durante a carga
+    load_seconds, _ = timed(lambda: bulk_load_transactions(engine, generate_transaction_rows(args.rows)))
+    repository = TransactionRepository(connection_string=connection_string)
+    rebuild_seconds, groups = timed(repository.rebuild_rollups)
+    
+    # Um ano inteiro: com limites no inicio do mês a soma vem do rollup, um microssegundo antes força a leitura das transações
+    start_date, end_date = datetime(2020, 1, 1), datetime(2021, 1, 1)
+    results = [["bulk load with triggers", f"{load_seconds:.2f}s", f"{args.rows:,} rows"], ["rebuild", f"{rebuild_seconds:.2f}s", f"{groups:,} groups"]]
+    for name, method in (("account", repository.sum_by_account), ("category", repository.sum_by_category)):
+        for source, end in (("rollup", end_date), ("transactions", end_date - timedelta(microseconds=1))):
+            seconds, totals = timed(lambda: [method(start_date=start_date, end_date=end) for _ in range(args.repeat)])
+            results.append([f"sum by {name} ({source})", f"{seconds / args.repeat * 1000:.1f}ms", f"{len(totals[0]):,} keys"])
+    print_table(f"Dashboard sums ({args.rows:,} transactions)", ["method", "time", "result size"], results)
+    EngineRegistry.dispose_all()
+    remove_database(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compara a busca nas descrições pelo indice FTS5 com ler todas as transações e procurar o texto em Python.
+
+Uso: python -m benchmarks.search_benchmark --rows 1000000
+"""
+import os
+import uuid
+import random
+import argparse
+import tempfile
+
+from infra import TransactionRepository, DatabaseSettings, EngineRegistry
+from src.financial.database_adapter import TransactionDatabaseAdapter
+from src.financial.utils import normalize_text
+from benchmarks.utils import WORDS, remove_database, create_schema, generate_transaction_rows, bulk_load_transactions, timed, print_table
+
+
+def python_scan(repository: TransactionRepository, user_id: str, query: str, limit: int) -> list:
+    # Caminho sem indice: todas as linhas passam pelo Python e a descrição é comparada com cada palavra da busca
+    words = normalize_text(query).split()
+    found = []
+    for transaction in repository.iter_all(batch_size=10_000):
+        if transaction.user_id != user_id:
+            continue
+        description = normalize_text(transaction.description)
+        if all(word in description for word in words):
+            found.append(transaction)
+    return found[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--scan-queries", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    
+    path = os.path.join(args.directory, "search.db")
+    remove_database(path)
+    connection_string = f"sqlite:///{path}"
+    engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=connection_string))
+    create_schema(engine)
+    # Os triggers do indice FTS5 já rodam durante a carga
+    load_seconds, _ = timed(lambda: bulk_load_transactions(engine, generate_transaction_rows(args.rows)))
+    repository = TransactionRepository(connection_string=connection_string)
+    TransactionDatabaseAdapter._db = repository
+    rebuild_seconds, _ = timed(repository.rebuild_search_index)
+    with engine.connect() as connection:
+        user_id = connection.exec_driver_sql("SELECT user_id FROM transactions LIMIT 1").scalar()
+    
+    rng = random.Random(42)
+    queries = [f"{rng.choice(WORDS)} {rng.choice(WORDS)[:4]}" for _ in range(args.queries)]
+    seconds, pages = timed(lambda: [TransactionDatabaseAdapter.search(uuid.UUID(user_id), query, args.limit) for query in queries])
+    fts_ms = seconds / len(queries) * 1000
+    scan_seconds, scans = timed(lambda: [python_scan(repository, user_id, query, args.limit) for query in queries[:args.scan_queries]])
+    scan_ms = scan_seconds / args.scan_queries * 1000
+    print_table(f"Description search ({args.rows:,} transactions, first page of {args.limit})", ["method", "time", "details"], [
+        ["bulk load with triggers", f"{load_seconds:.2f}s", f"{args.rows:,} rows"],
+        ["rebuild index", f"{rebuild_seconds:.2f}s", "-"],
+        ["fts5 search", f"{fts_ms:.1f}ms/query", f"{sum(len(page.transactions) for page in pages) / len(pages):.0f} rows/page"],
+        ["python scan", f"{scan_ms:.1f}ms/query", f"{sum(map(len, scans)) / len(scans):.0f} rows/page"],
+        ["speedup", f"{scan_ms / fts_ms:,.0f}x", "-"],
+    ])
+    EngineRegistry.dispose_all()
+    remove_database(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compara os perfis SQLite 'default' e 'performance' em um banco de transações.
+
+Uso: python -m benchmarks.sqlite_profile_benchmark --rows 1000000
+"""
+import os
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, func
+
+from infra import Transaction, DatabaseSettings, EngineRegistry
+from benchmarks.utils import (
+    remove_database, create_schema, generate_transaction_rows, bulk_load_transactions,
+    timed, print_table, rate, format_results
+)
+
+
+def run_profile(profile: str, directory: str, rows: int, single_inserts: int, lookups: int) -> dict:
+    path = os.path.join(directory, f"profile_{profile}.db")
+    remove_database(path)
+    engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=f"sqlite:///{path}", sqlite_profile=profile))
+    create_schema(engine)
+
+    # Carga inicial em lotes (uma transação por lote)
+    load_seconds, _ = timed(lambda: bulk_load_transactions(engine, generate_transaction_rows(rows)))
+
+    # Inserções individuais com um commit por linha, como o caminho atual dos repositórios
+    def single_insert():
+        for row in generate_transaction_rows(single_inserts, seed=7):
+            with engine.begin() as connection:
+                connection.execute(insert(Transaction), row)
+    single_seconds, _ = timed(single_insert)
+
+    with engine.connect() as connection:
+        ids = [row[0] for row in connection.execute(select(Transaction.id).limit(lookups * 10))]
+    sample = random.Random(1).sample(ids, min(lookups, len(ids)))
+
+    def lookup():
+        with engine.connect() as connection:
+            for id in sample:
+                connection.execute(select(Transaction).where(Transaction.id == id)).one()
+    lookup_seconds, _ = timed(lookup)
+
+    def range_scan():
+        start = datetime(2020, 1, 1)
+        with engine.connect() as connection:
+            for month in range(12):
+                connection.execute(
+                    select(func.count(), func.sum(Transaction.amount))
+                    .where(Transaction.date >= start + timedelta(days=30 * month))
+                    .where(Transaction.date < start + timedelta(days=30 * (month + 1)))
+                ).one()
+    scan_seconds, _ = timed(range_scan)
+
+    engine.dispose()
+    size = os.path.getsize(path)
+    return {
+        "bulk load": f"{rate(rows, load_seconds)} ({load_seconds:.2f}s)",
+        "single-row commit": f"{rate(single_inserts, single_seconds)} ({single_seconds:.2f}s)",
+        "lookup by id": f"{rate(len(sample), lookup_seconds)} ({lookup_seconds:.2f}s)",
+        "12 monthly scans": f"{scan_seconds:.2f}s",
+        "file size": f"{size / 1024 / 1024:.1f} MiB",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--single-inserts", type=int, default=2_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    results = {
+        profile: run_profile(profile, args.directory, args.rows, args.single_inserts, args.lookups)
+        for profile in ("default", "performance")
+    }
+    metrics = ["bulk load", "single-row commit", "lookup by id", "12 monthly scans", "file size"]
+    print_table(f"SQLite profiles ({args.rows:,} transactions)", ["metric", *results], format_results(results, metrics))
+
+
+if __name__ == "__main__":
+    main()
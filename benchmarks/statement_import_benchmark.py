@@ -0,0 +1,60 @@
+"""Mede a importação de um extrato CSV grande em lotes com deduplicação.
+
+Uso: python -m benchmarks.statement_import_benchmark --rows 200000
+"""
+import os
+import uuid
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from infra import TransactionRepository, DatabaseSettings, EngineRegistry
+from src.financial.enums import StatementFormats
+from src.financial.handlers import TransactionHandler, StatementImportHandler
+from src.financial.database_adapter import TransactionDatabaseAdapter
+from benchmarks.utils import WORDS, remove_database, create_schema, timed, print_table, rate
+
+
+def write_statement(path: str, rows: int, seed: int = 42) -> None:
+    # Escrito linha a linha para o proprio gerador não carregar o arquivo em memória
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("date,amount,description\n")
+        for index in range(rows):
+            date = start + timedelta(days=rng.randrange(0, 3650))
+            amount = rng.randrange(-500_000, 500_000) or 1
+            file.write(f"{date:%Y-%m-%d},{amount / 100:.2f},{rng.choice(WORDS)} {rng.choice(WORDS)} {index}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    
+    path = os.path.join(args.directory, "statement_import.db")
+    statement = os.path.join(args.directory, "statement_import.csv")
+    remove_database(path)
+    write_statement(statement, args.rows)
+    connection_string = f"sqlite:///{path}"
+    engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=connection_string))
+    create_schema(engine)
+    TransactionDatabaseAdapter._db = TransactionRepository(connection_string=connection_string)
+    handler = StatementImportHandler(transaction_handler=TransactionHandler(database=TransactionDatabaseAdapter))
+    ids = {"account_id": uuid.uuid4(), "user_id": uuid.uuid4(), "category_id": uuid.uuid4(), "tag_id": uuid.uuid4()}
+    
+    results = []
+    for name in ("first import", "reimport (all duplicates)"):
+        seconds, report = timed(lambda: handler.import_file(statement, StatementFormats.CSV, batch_size=args.batch_size, **ids))
+        results.append([name, f"{seconds:.2f}s", rate(report.lines, seconds), f"{report.inserted:,}", f"{report.duplicates:,}"])
+    print_table(f"Statement import ({args.rows:,} CSV lines, batches of {args.batch_size:,})", ["run", "time", "rows", "inserted", "duplicates"], results)
+    EngineRegistry.dispose_all()
+    remove_database(path)
+    os.remove(statement)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import time
+import random
+from uuid import uuid4
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from infra import Base, Transaction, Migrator
+
+
+TRANSACTION_TYPES = ["despesa", "renda", "transferência", "ajuste"]
+WORDS = ["mercado", "padaria", "salario", "aluguel", "farmacia", "uber", "restaurante", "cinema", "luz", "agua", "internet", "posto"]
+
+
+def remove_database(path: str) -> None:
+    # Remove o banco e os arquivos auxiliares do WAL
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def create_schema(engine: Engine) -> None:
+    Base.metadata.create_all(engine)
+    Migrator(engine).upgrade()
+
+
+def generate_transaction_rows(
+        count: int,
+        users: int = 10,
+        accounts_per_user: int = 5,
+        categories_per_user: int = 10,
+        seed: int = 42) -> Iterator[dict]:
+    # Gera linhas sinteticas no formato das colunas da tabela 'transactions'
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1)
+    owners = []
+    for _ in range(users):
+        user_id = uuid4().hex
+        accounts = [uuid4().hex for _ in range(accounts_per_user)]
+        categories = [uuid4().hex for _ in range(categories_per_user)]
+        tag = uuid4().hex
+        owners.append((user_id, accounts, categories, tag))
+    for _ in range(count):
+        user_id, accounts, categories, tag = owners[rng.randrange(users)]
+        transaction_type = rng.choice(TRANSACTION_TYPES)
+        date = start + timedelta(seconds=rng.randrange(0, 10 * 365 * 24 * 3600))
+        yield {
+            "id": uuid4().hex,
+            "date": date,
+            "description": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randrange(1000)}",
+            "amount": rng.randrange(100, 500_000),
+            "transaction_type": transaction_type,
+            "paid": rng.random() > 0.1,
+            "ignore": rng.random() < 0.02,
+            "visible": True,
+            "category_id": rng.choice(categories),
+            "tag_id": tag,
+            "account_id_origin": rng.choice(accounts) if transaction_type == "transferência" else None,
+            "account_id_destination": rng.choice(accounts),
+            "created_at": date,
+            "user_id": user_id,
+        }
+
+
+def chunks(iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bulk_load_transactions(engine: Engine, rows: Iterator[dict], batch_size: int = 10_000) -> int:
+    total = 0
+    with engine.begin() as connection:
+        for chunk in chunks(rows, batch_size):
+            connection.execute(insert(Transaction), chunk)
+            total += len(chunk)
+    return total
+
+
+def timed(func: Callable[[], object]) -> Tuple[float, object]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def print_table(title: str, header: List[str], rows: List[List[object]]) -> None:
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    print(f"\n{title}")
+    print("  ".join(str(value).ljust(width) for value, width in zip(header, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:,.0f}/s" if seconds > 0 else "inf"
+
+
+def format_results(results: Dict[str, Dict[str, str]], metrics: List[str]) -> List[List[object]]:
+    return [[metric] + [results[profile][metric] for profile in results] for metric in metrics]
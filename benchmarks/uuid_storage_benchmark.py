@@ -0,0 +1,82 @@
+"""Compara chaves UUID gravadas em hex (32 caracteres) e em binario (16 bytes).
+
+Uso: python -m benchmarks.uuid_storage_benchmark --rows 1000000
+"""
+import os
+import random
+import argparse
+import tempfile
+
+from sqlalchemy import select
+
+from infra import Transaction, DatabaseSettings, EngineRegistry
+from benchmarks.utils import (
+    remove_database, create_schema, generate_transaction_rows, bulk_load_transactions,
+    timed, print_table, rate, format_results
+)
+
+
+def object_sizes(engine) -> dict:
+    # 'dbstat' soma o tamanho das paginas de cada tabela e indice
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE tbl_name = 'transactions') GROUP BY name"
+        ).fetchall()
+    return dict(rows)
+
+
+def run_storage(storage: str, directory: str, rows: int, lookups: int) -> dict:
+    path = os.path.join(directory, f"uuid_{storage}.db")
+    remove_database(path)
+    engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=f"sqlite:///{path}", uuid_storage=storage))
+    create_schema(engine)
+    
+    load_seconds, _ = timed(lambda: bulk_load_transactions(engine, generate_transaction_rows(rows)))
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    with engine.connect() as connection:
+        ids = list(connection.scalars(select(Transaction.id).limit(lookups * 10)))
+        users = list(connection.scalars(select(Transaction.user_id).distinct()))
+    sample = random.Random(1).sample(ids, min(lookups, len(ids)))
+    
+    def lookup():
+        with engine.connect() as connection:
+            for id in sample:
+                connection.execute(select(Transaction).where(Transaction.id == id)).one()
+    lookup_seconds, _ = timed(lookup)
+    
+    def user_scan():
+        with engine.connect() as connection:
+            for user_id in users:
+                connection.execute(select(Transaction.id).where(Transaction.user_id == user_id)).all()
+    scan_seconds, _ = timed(user_scan)
+    
+    sizes = object_sizes(engine)
+    table_size = sizes.pop("transactions", 0)
+    engine.dispose()
+    return {
+        "bulk load": f"{rate(rows, load_seconds)} ({load_seconds:.2f}s)",
+        "lookup by id": f"{rate(len(sample), lookup_seconds)} ({lookup_seconds:.2f}s)",
+        "ids per user": f"{scan_seconds:.2f}s",
+        "table size": f"{table_size / 1024 / 1024:.1f} MiB",
+        "index size": f"{sum(sizes.values()) / 1024 / 1024:.1f} MiB",
+        "file size": f"{os.path.getsize(path) / 1024 / 1024:.1f} MiB",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    
+    results = {storage: run_storage(storage, args.directory, args.rows, args.lookups) for storage in ("hex", "binary")}
+    metrics = ["bulk load", "lookup by id", "ids per user", "table size", "index size", "file size"]
+    print_table(f"UUID storage ({args.rows:,} transactions)", ["metric", *results], format_results(results, metrics))
+
+
+if __name__ == "__main__":
+    main()
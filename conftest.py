@@ -0,0 +1,13 @@
+import os
+import shutil
+import tempfile
+
+
+# Importar o 'infra' já cria as tabelas e aplica as migrações no banco configurado, então antes de qualquer
+# teste importar o pacote o banco padrão passa a ser um arquivo temporario no lugar do 'db/test.db' versionado
+TEST_DATABASE_DIR = tempfile.mkdtemp(prefix="sisfin-test-")
+os.environ["SISFIN_DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DATABASE_DIR, 'test.db')}"
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(TEST_DATABASE_DIR, ignore_errors=True)
@@ -1,8 +1,11 @@
-from infra.entities import User, Account, AccountTag, Transaction, TransactionTag, TransactionCategory
+from infra.entities import User, Account, AccountTag, Transaction, TransactionTag, TransactionCategory, AccountBalanceCheckpoint, AccountReconciliationMark, TransactionReportVersion, TransactionRollup
 from infra.repository import UserRepository, AccountRepository, AccountTagRepository, TransactionRepository, TransactionTagRepository, TransactionCategoryRepository
-from infra.configs import DBConnectionHandler, Base
+from infra.configs import DBConnectionHandler, DatabaseSettings, EngineRegistry, UnitOfWork, Base
+from infra.migrations import Migrator
 
 # Gambiarra que garante a tabela e o banco existir mesmo quando ainda não foi criado nada (Magica hahaha)
 with DBConnectionHandler() as db:
     engine = db.get_engine()
     Base.metadata.create_all(engine)
+    # Aplica as migrações pendentes em bancos criados por versões anteriores
+    Migrator(engine).upgrade()
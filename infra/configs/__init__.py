@@ -1,2 +1,6 @@
+from infra.configs.types import UUIDType, UUID_STORAGES
+from infra.configs.settings import DatabaseSettings
+from infra.configs.engine_registry import EngineRegistry
 from infra.configs.connection import DBConnectionHandler
+from infra.configs.unit_of_work import UnitOfWork
 from infra.configs.base import Base
\ No newline at end of file
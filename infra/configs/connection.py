@@ -1,25 +1,35 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from infra.configs.settings import DatabaseSettings
+from infra.configs.engine_registry import EngineRegistry
 
 
 class DBConnectionHandler:
-    def __init__(self) -> None:
-        self.__connection_string = 'sqlite:///db/test.db'
-        self.__engine = self.__create_database_engine()
-        self.session = None
-    
-    def __create_database_engine(self):
-        engine = create_engine(self.__connection_string)
-        return engine
-    
+    def __init__(self, connection_string: Optional[str] = None) -> None:
+        self.__settings = DatabaseSettings(connection_string=connection_string)
+        self.__connection_string = self.__settings.connection_string
+        # A engine e a fabrica de sessões são compartilhadas por todos os repositórios
+        self.__engine = EngineRegistry.get_engine(self.__settings)
+        self.__scoped_session = EngineRegistry.get_scoped_session(self.__settings)
+
     def get_engine(self):
         return self.__engine
-    
+
+    def get_connection_string(self) -> str:
+        return self.__connection_string
+
+    @property
+    def session(self) -> Session:
+        # Cada thread recebe a sua propria sessão
+        return self.__scoped_session()
+
     def __enter__(self):
-        session_make = sessionmaker(bind=self.__engine)
-        self.session = session_make()
-        # self.session.expire_all()
+        EngineRegistry.acquire(self.__connection_string)
         return self
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.session.close()
+        # Contextos aninhados compartilham a mesma sessão, só o mais externo a encerra
+        if EngineRegistry.release(self.__connection_string) == 0:
+            self.__scoped_session.remove()
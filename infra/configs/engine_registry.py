@@ -0,0 +1,136 @@
+import os
+import threading
+from typing import Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import sessionmaker, scoped_session
+
+from infra.configs.settings import DatabaseSettings
+
+
+class EngineRegistry:
+    # Uma engine (e um pool de conexões) por string de conexão para todo o processo
+    _engines: Dict[str, Engine] = dict()
+    _sessions: Dict[str, scoped_session] = dict()
+    _lock = threading.Lock()
+    _local = threading.local()
+    _pid = os.getpid()
+
+    @classmethod
+    def _check_process(cls) -> None:
+        # Depois de um fork as conexões herdadas do processo pai não podem ser reutilizadas
+        if cls._pid != os.getpid():
+            for engine in cls._engines.values():
+                engine.dispose(close=False)
+            cls._engines = dict()
+            cls._sessions = dict()
+            cls._local = threading.local()
+            cls._pid = os.getpid()
+
+    @classmethod
+    def _create_engine(cls, settings: DatabaseSettings) -> Engine:
+        url = make_url(settings.connection_string)
+        # Bancos SQLite em memória usam um pool próprio que não aceita as opções de tamanho
+        if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+            engine = create_engine(url)
+        else:
+            engine = create_engine(url, **settings.get_pool_options())
+        if url.get_backend_name() == "sqlite":
+            cls._register_sqlite_pragmas(engine, settings.get_sqlite_pragmas())
+        # Lido pelo 'UUIDType' para escolher entre hex e bytes nesta engine
+        engine.dialect.sisfin_uuid_storage = settings.uuid_storage
+        return engine
+
+    @staticmethod
+    def _register_sqlite_pragmas(engine: Engine, pragmas: dict) -> None:
+        # Os PRAGMAs valem por conexão, então são aplicados sempre que o pool abre uma nova
+        @event.listens_for(engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+    @classmethod
+    def get_engine(cls, settings: DatabaseSettings) -> Engine:
+        cls._check_process()
+        engine = cls._engines.get(settings.connection_string)
+        if engine is not None:
+            return engine
+        with cls._lock:
+            if settings.connection_string not in cls._engines:
+                cls._engines[settings.connection_string] = cls._create_engine(settings)
+            return cls._engines[settings.connection_string]
+
+    @classmethod
+    def get_scoped_session(cls, settings: DatabaseSettings) -> scoped_session:
+        cls._check_process()
+        session = cls._sessions.get(settings.connection_string)
+        if session is not None:
+            return session
+        engine = cls.get_engine(settings)
+        with cls._lock:
+            if settings.connection_string not in cls._sessions:
+                # 'expire_on_commit=False' mantem as entidades legiveis depois que a sessão é fechada
+                session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+                cls._sessions[settings.connection_string] = scoped_session(session_factory)
+            return cls._sessions[settings.connection_string]
+
+    @classmethod
+    def _get_depths(cls) -> Dict[str, int]:
+        if not hasattr(cls._local, "depths"):
+            cls._local.depths = dict()
+        return cls._local.depths
+
+    @classmethod
+    def acquire(cls, connection_string: str) -> int:
+        # Conta quantos contextos aninhados estão usando a sessão da thread atual
+        depths = cls._get_depths()
+        depths[connection_string] = depths.get(connection_string, 0) + 1
+        return depths[connection_string]
+
+    @classmethod
+    def release(cls, connection_string: str) -> int:
+        depths = cls._get_depths()
+        depths[connection_string] = max(depths.get(connection_string, 0) - 1, 0)
+        return depths[connection_string]
+
+    @classmethod
+    def _get_units_of_work(cls) -> Dict[str, object]:
+        if not hasattr(cls._local, "units_of_work"):
+            cls._local.units_of_work = dict()
+        return cls._local.units_of_work
+    
+    @classmethod
+    def get_unit_of_work(cls, connection_string: str):
+        # Unidade de trabalho ativa na thread atual para esta string de conexão
+        cls._check_process()
+        return cls._get_units_of_work().get(connection_string)
+    
+    @classmethod
+    def set_unit_of_work(cls, connection_string: str, unit_of_work) -> None:
+        units_of_work = cls._get_units_of_work()
+        if unit_of_work is None:
+            units_of_work.pop(connection_string, None)
+        else:
+            units_of_work[connection_string] = unit_of_work
+    
+    @classmethod
+    def pool_status(cls) -> Dict[str, str]:
+        return {
+            connection_string: engine.pool.status()
+            for connection_string, engine in cls._engines.items()
+        }
+
+    @classmethod
+    def dispose_all(cls) -> None:
+        with cls._lock:
+            for session in cls._sessions.values():
+                session.remove()
+            for engine in cls._engines.values():
+                engine.dispose()
+            cls._engines = dict()
+            cls._sessions = dict()
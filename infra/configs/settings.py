@@ -0,0 +1,72 @@
+import os
+from typing import Optional
+
+from infra.configs.types import UUID_STORAGES
+
+
+# Perfis de PRAGMAs aplicados em cada nova conexão SQLite
+SQLITE_PROFILES = {
+    # Mantem o comportamento padrão do SQLite (rollback journal e fsync completo em cada commit)
+    "default": {},
+    # WAL permite leitores concorrentes com um escritor e 'synchronous=NORMAL' só faz fsync nos checkpoints
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+    },
+}
+
+
+class DatabaseSettings:
+    def __init__(self,
+            connection_string: Optional[str] = None,
+            pool_size: Optional[int] = None,
+            max_overflow: Optional[int] = None,
+            pool_timeout: Optional[float] = None,
+            pool_recycle: Optional[int] = None,
+            pool_pre_ping: Optional[bool] = None,
+            sqlite_profile: Optional[str] = None,
+            sqlite_cache_size: Optional[int] = None,
+            sqlite_mmap_size: Optional[int] = None,
+            sqlite_busy_timeout: Optional[int] = None,
+            uuid_storage: Optional[str] = None) -> None:
+        # Valores explicitos têm prioridade, depois variaveis de ambiente e por fim os padrões
+        self.connection_string = connection_string or os.getenv("SISFIN_DATABASE_URL", "sqlite:///db/test.db")
+        self.pool_size = pool_size if pool_size is not None else int(os.getenv("SISFIN_DB_POOL_SIZE", "5"))
+        self.max_overflow = max_overflow if max_overflow is not None else int(os.getenv("SISFIN_DB_MAX_OVERFLOW", "10"))
+        self.pool_timeout = pool_timeout if pool_timeout is not None else float(os.getenv("SISFIN_DB_POOL_TIMEOUT", "30"))
+        self.pool_recycle = pool_recycle if pool_recycle is not None else int(os.getenv("SISFIN_DB_POOL_RECYCLE", "-1"))
+        self.pool_pre_ping = pool_pre_ping if pool_pre_ping is not None else os.getenv("SISFIN_DB_POOL_PRE_PING", "0") == "1"
+
+        self.sqlite_profile = sqlite_profile or os.getenv("SISFIN_DB_SQLITE_PROFILE", "performance")
+        if self.sqlite_profile not in SQLITE_PROFILES:
+            raise ValueError(f"Perfil SQLite desconhecido '{self.sqlite_profile}'. Perfis validos: {list(SQLITE_PROFILES)}")
+        # Tamanho do cache de paginas em KiB (convertido para o valor negativo esperado pelo PRAGMA)
+        self.sqlite_cache_size = sqlite_cache_size if sqlite_cache_size is not None else int(os.getenv("SISFIN_DB_CACHE_SIZE", "65536"))
+        # Tamanho máximo em bytes do arquivo mapeado em memória (0 desativa)
+        self.sqlite_mmap_size = sqlite_mmap_size if sqlite_mmap_size is not None else int(os.getenv("SISFIN_DB_MMAP_SIZE", "268435456"))
+        # Tempo em milisegundos que uma conexão espera por um lock antes de falhar
+        self.sqlite_busy_timeout = sqlite_busy_timeout if sqlite_busy_timeout is not None else int(os.getenv("SISFIN_DB_BUSY_TIMEOUT", "5000"))
+        
+        # Formato das chaves UUID no banco, bancos existentes são convertidos pelo 'Migrator'
+        self.uuid_storage = uuid_storage or os.getenv("SISFIN_DB_UUID_STORAGE", "hex")
+        if self.uuid_storage not in UUID_STORAGES:
+            raise ValueError(f"Formato de UUID desconhecido '{self.uuid_storage}'. Formatos validos: {list(UUID_STORAGES)}")
+
+    def get_pool_options(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+
+    def get_sqlite_pragmas(self) -> dict:
+        pragmas = {"busy_timeout": self.sqlite_busy_timeout}
+        if self.sqlite_profile == "default":
+            return pragmas
+        pragmas.update(SQLITE_PROFILES[self.sqlite_profile])
+        pragmas["cache_size"] = -abs(self.sqlite_cache_size)
+        pragmas["mmap_size"] = self.sqlite_mmap_size
+        return pragmas
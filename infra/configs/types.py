@@ -0,0 +1,37 @@
+from sqlalchemy.types import TypeDecorator, String, LargeBinary
+
+
+# Formatos de gravação das chaves UUID ('hex' são 32 caracteres, 'binary' são 16 bytes)
+UUID_STORAGES = ("hex", "binary")
+
+
+class UUIDType(TypeDecorator):
+    # Os repositórios sempre trabalham com o hex de 32 caracteres, só o formato gravado no banco muda
+    impl = String(64)
+    cache_ok = True
+    
+    @staticmethod
+    def get_storage(dialect) -> str:
+        # Cada engine tem o seu proprio dialeto, configurado pelo 'EngineRegistry'
+        return getattr(dialect, "sisfin_uuid_storage", "hex")
+    
+    def load_dialect_impl(self, dialect):
+        if self.get_storage(dialect) == "binary":
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(String(64))
+    
+    def bind_processor(self, dialect):
+        # Em hex não há conversão nenhuma, em binario a função é resolvida uma vez por dialeto e não por valor
+        if self.get_storage(dialect) == "hex":
+            return None
+        fromhex = bytes.fromhex
+        def process(value):
+            return fromhex(value) if value is not None else None
+        return process
+    
+    def result_processor(self, dialect, coltype):
+        if self.get_storage(dialect) == "hex":
+            return None
+        def process(value):
+            return value.hex() if value is not None else None
+        return process
@@ -0,0 +1,160 @@
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from infra.configs.settings import DatabaseSettings
+from infra.configs.engine_registry import EngineRegistry
+
+
+class UnitOfWork:
+    def __init__(self, connection_string: Optional[str] = None) -> None:
+        self.__settings = DatabaseSettings(connection_string=connection_string)
+        self.__connection_string = self.__settings.connection_string
+        self.__engine = EngineRegistry.get_engine(self.__settings)
+        self.__scoped_session = EngineRegistry.get_scoped_session(self.__settings)
+        self._parent: Optional["UnitOfWork"] = None
+        self._nested = None
+        self._connection = None
+        self._transaction = None
+        self._isolation_level = None
+        self._rollback_callbacks: List[Callable[[], None]] = list()
+        # Posição da lista de callbacks no inicio de cada savepoint aberto, do mais externo para o mais interno
+        self._savepoint_marks: List[int] = list()
+    
+    @classmethod
+    def current(cls, connection_string: Optional[str] = None) -> Optional["UnitOfWork"]:
+        connection_string = DatabaseSettings(connection_string=connection_string).connection_string
+        return EngineRegistry.get_unit_of_work(connection_string)
+    
+    @property
+    def session(self) -> Session:
+        return self.__scoped_session()
+    
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        # Usado por quem mantem estado fora do banco (ex.: caches dos handlers) para descartar o que não foi gravado
+        if self._parent is not None:
+            self._parent.on_rollback(callback)
+            return
+        # Handlers registram o mesmo callback a cada escrita, ele só precisa rodar uma vez por savepoint
+        start = self._savepoint_marks[-1] if self._savepoint_marks else 0
+        if callback not in self._rollback_callbacks[start:]:
+            self._rollback_callbacks.append(callback)
+    
+    def _run_rollback_callbacks(self, start: int = 0) -> None:
+        callbacks, self._rollback_callbacks = self._rollback_callbacks[start:], self._rollback_callbacks[:start]
+        for callback in dict.fromkeys(callbacks):
+            callback()
+    
+    def _end_session_transaction(self, commit: bool) -> None:
+        # Fecha o savepoint aberto pela sessão dos repositórios antes de abrir ou fechar um savepoint proprio
+        session = self.session
+        if not session.in_transaction():
+            return
+        if commit:
+            session.commit()
+        else:
+            session.rollback()
+    
+    @contextmanager
+    def savepoint(self) -> Iterator["UnitOfWork"]:
+        if self._parent is not None:
+            with self._parent.savepoint():
+                yield self
+            return
+        if self._connection is None:
+            raise RuntimeError("A unidade de trabalho não está ativa")
+        self._end_session_transaction(commit=True)
+        nested = self._connection.begin_nested()
+        self._savepoint_marks.append(len(self._rollback_callbacks))
+        try:
+            yield self
+        except BaseException:
+            # Desfaz só o que foi feito depois do savepoint, o resto da unidade de trabalho continua valido
+            start = self._savepoint_marks.pop()
+            try:
+                self._end_session_transaction(commit=False)
+                nested.rollback()
+            finally:
+                # Só os callbacks registrados dentro do savepoint rodam, os de antes esperam a unidade de trabalho
+                self._run_rollback_callbacks(start)
+            raise
+        else:
+            # Os callbacks ficam com a unidade de trabalho, que ainda pode ser desfeita inteira
+            self._savepoint_marks.pop()
+            self._end_session_transaction(commit=True)
+            nested.commit()
+    
+    def _begin(self) -> None:
+        self._connection = self.__engine.connect()
+        self._transaction = self._connection.begin()
+        if self.__engine.dialect.name == "sqlite":
+            # O driver sqlite3 só abre a transação no primeiro comando de escrita e trata o SAVEPOINT inicial
+            # como a propria transação, então ela é aberta explicitamente (IMMEDIATE já pega o lock de escrita)
+            driver_connection = self._connection.connection.driver_connection
+            self._isolation_level = driver_connection.isolation_level
+            driver_connection.isolation_level = None
+            self._connection.exec_driver_sql("BEGIN IMMEDIATE")
+        # Os repositórios usam a sessão da thread, que passa a transformar cada commit em um savepoint
+        session = Session(bind=self._connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        self.__scoped_session.registry.set(session)
+    
+    def _finish(self) -> None:
+        try:
+            self.__scoped_session.remove()
+            if self._connection is not None:
+                # A conexão volta para o pool com o comportamento padrão do driver
+                if self._isolation_level is not None:
+                    self._connection.connection.driver_connection.isolation_level = self._isolation_level
+                self._connection.close()
+        finally:
+            self._connection = None
+            self._transaction = None
+            self._isolation_level = None
+            EngineRegistry.set_unit_of_work(self.__connection_string, None)
+            EngineRegistry.release(self.__connection_string)
+    
+    def _rollback(self) -> None:
+        try:
+            self.session.rollback()
+            self._transaction.rollback()
+        finally:
+            self._run_rollback_callbacks()
+    
+    def __enter__(self) -> "UnitOfWork":
+        active = EngineRegistry.get_unit_of_work(self.__connection_string)
+        if active is not None:
+            # Unidades de trabalho aninhadas viram um savepoint da mais externa
+            self._parent = active
+            self._nested = active.savepoint()
+            self._nested.__enter__()
+            return self
+        if EngineRegistry.acquire(self.__connection_string) > 1:
+            EngineRegistry.release(self.__connection_string)
+            raise RuntimeError("A unidade de trabalho deve ser aberta fora de um contexto de conexão")
+        EngineRegistry.set_unit_of_work(self.__connection_string, self)
+        try:
+            self._begin()
+        except BaseException:
+            self._finish()
+            raise
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._parent is not None:
+            nested, self._nested, self._parent = self._nested, None, None
+            return nested.__exit__(exc_type, exc_val, exc_tb)
+        try:
+            if exc_type is not None:
+                self._rollback()
+                return False
+            try:
+                # Um unico commit (e um unico fsync) para tudo o que foi feito dentro do contexto
+                self._end_session_transaction(commit=True)
+                self._transaction.commit()
+            except BaseException:
+                self._rollback()
+                raise
+        finally:
+            self._finish()
+        return False
@@ -3,4 +3,8 @@ from infra.entities.account import Account
 from infra.entities.account_tag import AccountTag
 from infra.entities.transaction import Transaction
 from infra.entities.transaction_category import TransactionCategory
-from infra.entities.transaction_tag import TransactionTag
\ No newline at end of file
+from infra.entities.transaction_tag import TransactionTag
+from infra.entities.account_balance_checkpoint import AccountBalanceCheckpoint
+from infra.entities.account_reconciliation_mark import AccountReconciliationMark
+from infra.entities.transaction_report_version import TransactionReportVersion
+from infra.entities.transaction_rollup import TransactionRollup
\ No newline at end of file
@@ -1,19 +1,20 @@
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
 
-from infra.configs import Base
+from infra.configs import Base, UUIDType
 
 
 class Account(Base):
     __tablename__ = "accounts"
     
-    id = Column(String(64), primary_key=True, nullable=False)
+    id = Column(UUIDType(), primary_key=True, nullable=False)
     name = Column(String(64), nullable=False)
     description = Column(String(256), nullable=True)
-    tag_id = Column(String(64), ForeignKey("accounts_tags.id"), nullable=True)
-    balance = Column(Float, nullable=False)
+    tag_id = Column(UUIDType(), ForeignKey("accounts_tags.id"), nullable=True)
+    # Saldo em centavos
+    balance = Column(Integer, nullable=False)
     created_at = Column(DateTime, nullable=False)
-    user_id = Column(String(64), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUIDType(), ForeignKey("users.id"), nullable=False)
     
     # def __repr__(self):
     #     return (f"<Account(account_id='{self.account_id}', name='{self.name}', "
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, ForeignKey, Integer
+
+from infra.configs import Base, UUIDType
+
+
+class AccountBalanceCheckpoint(Base):
+    __tablename__ = "accounts_balance_checkpoints"
+    
+    # Mantida pelos triggers da migração 3 ('infra/migrations/versions.py'), nunca escrita pelos repositórios
+    account_id = Column(UUIDType(), ForeignKey("accounts.id"), primary_key=True, nullable=False)
+    # Mês no formato 'YYYY-MM'
+    month = Column(String(7), primary_key=True, nullable=False)
+    # Variação liquida do saldo no mês em centavos (só transações pagas e não ignoradas)
+    delta = Column(Integer, nullable=False)
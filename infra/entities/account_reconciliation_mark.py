@@ -0,0 +1,11 @@
+from sqlalchemy import Column
+
+from infra.configs import Base, UUIDType
+
+
+class AccountReconciliationMark(Base):
+    __tablename__ = "accounts_reconciliation_marks"
+    
+    # Contas tocadas desde a ultima conciliação, preenchida pelos triggers da migração 4 ('infra/migrations/versions.py')
+    # O rowid cresce a cada marcação ('INSERT OR REPLACE') e separa o que foi marcado antes e depois de uma leitura
+    account_id = Column(UUIDType(), primary_key=True, nullable=False)
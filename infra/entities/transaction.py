@@ -1,26 +1,39 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Boolean, Index, text
 
-from infra.configs import Base
+from infra.configs import Base, UUIDType
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
     
-    id = Column(String(64), primary_key=True, nullable=False)
+    id = Column(UUIDType(), primary_key=True, nullable=False)
     date = Column(DateTime, nullable=False)
     description = Column(String(255), nullable=False)
-    amount = Column(Float, nullable=False)
+    # Valor em centavos
+    amount = Column(Integer, nullable=False)
     transaction_type = Column(String(64), nullable=False)
     paid = Column(Boolean, nullable=False)
     ignore = Column(Boolean, nullable=False)
     visible = Column(Boolean, nullable=False)
-    category_id = Column(String(64), ForeignKey("transactions_categories.id"), nullable=False)
-    tag_id = Column(String(64), ForeignKey("transactions_tags.id"), nullable=False)
-    account_id_origin = Column(String(64), ForeignKey("accounts.id"))
-    account_id_destination = Column(String(64), ForeignKey("accounts.id"), nullable=False)
+    category_id = Column(UUIDType(), ForeignKey("transactions_categories.id"), nullable=False)
+    tag_id = Column(UUIDType(), ForeignKey("transactions_tags.id"), nullable=False)
+    account_id_origin = Column(UUIDType(), ForeignKey("accounts.id"))
+    account_id_destination = Column(UUIDType(), ForeignKey("accounts.id"), nullable=False)
     created_at = Column(DateTime, nullable=False)
-    user_id = Column(String(64), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUIDType(), ForeignKey("users.id"), nullable=False)
+    # Hash de dia, valor, descrição e conta de destino ('infra/repository/utils.py'), usado para não importar linhas repetidas
+    content_hash = Column(String(32))
+    
+    # Bancos já existentes recebem estes indices pelas migrações 1 e 7 ('infra/migrations/versions.py')
+    __table_args__ = (
+        Index("ix_transactions_user_id_date", "user_id", "date"),
+        Index("ix_transactions_account_id_destination_date", "account_id_destination", "date"),
+        Index("ix_transactions_account_id_origin_date", "account_id_origin", "date"),
+        Index("ix_transactions_category_id_date", "category_id", "date"),
+        Index("ix_transactions_unpaid_date", "date", sqlite_where=text("paid = 0")),
+        Index("ix_transactions_content_hash", "content_hash"),
+    )
     
     # def __repr__(self):
     #     return (f"<Transaction(transaction_id='{self.transaction_id}', date='{self.date}', "
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Integer
+
+from infra.configs import Base, UUIDType
+
+
+class TransactionReportVersion(Base):
+    __tablename__ = "transactions_report_versions"
+    
+    # Contador de alterações por usuario e mês, incrementado pelos triggers da migração 5 ('infra/migrations/versions.py')
+    user_id = Column(UUIDType(), primary_key=True, nullable=False)
+    # Mês no formato 'YYYY-MM', o mês vazio conta as alterações de nomes de categorias e marcações do usuario
+    month = Column(String(7), primary_key=True, nullable=False)
+    version = Column(Integer, nullable=False)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer
+
+from infra.configs import Base, UUIDType
+
+
+class TransactionRollup(Base):
+    __tablename__ = "transactions_rollups"
+    
+    # Mantida pelos triggers da migração 6 ('infra/migrations/versions.py'), nunca escrita pelos repositórios
+    user_id = Column(UUIDType(), primary_key=True, nullable=False)
+    # Conta de destino da transação
+    account_id = Column(UUIDType(), primary_key=True, nullable=False)
+    category_id = Column(UUIDType(), primary_key=True, nullable=False)
+    # Mês no formato 'YYYY-MM'
+    month = Column(String(7), primary_key=True, nullable=False)
+    transaction_type = Column(String, primary_key=True, nullable=False)
+    # Soma em centavos e quantidade das transações não ignoradas, e a parte delas que já foi paga
+    amount = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False)
+    paid_amount = Column(Integer, nullable=False)
+    paid_count = Column(Integer, nullable=False)
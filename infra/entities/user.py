@@ -1,12 +1,12 @@
 from sqlalchemy import Column, String, DateTime
 
-from infra.configs import Base
+from infra.configs import Base, UUIDType
 
 
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(String(64), primary_key=True, nullable=False)
+    id = Column(UUIDType(), primary_key=True, nullable=False)
     nickname = Column(String(255), nullable=False)
     created_at = Column(DateTime, nullable=False)
     
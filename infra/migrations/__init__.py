@@ -0,0 +1 @@
+from infra.migrations.migrator import Migration, MigrationSkipped, Migrator, table_columns, has_columns, require_columns, column_type, rebuild_table
\ No newline at end of file
@@ -0,0 +1,143 @@
+import re
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+
+from infra.configs import UUIDType
+
+
+class MigrationSkipped(Exception):
+    # Levantada pela migração quando o banco não tem o formato esperado, o 'Migrator' não grava a versão dela
+    pass
+
+
+class Migration:
+    def __init__(self, version: int, description: str, upgrade: Callable[[Connection], None]) -> None:
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+
+
+def table_columns(connection: Connection, table: str) -> Set[str]:
+    return {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def has_columns(connection: Connection, table: str, columns: List[str]) -> bool:
+    # Bancos antigos (como o 'db/test.db' versionado) podem ter tabelas com outro formato de colunas
+    return set(columns).issubset(table_columns(connection, table))
+
+
+def require_columns(connection: Connection, table: str, columns: List[str]) -> None:
+    missing = set(columns) - table_columns(connection, table)
+    if missing:
+        raise MigrationSkipped(f"Tabela '{table}' sem as colunas {sorted(missing)}")
+
+
+def column_type(connection: Connection, table: str, column: str) -> Optional[str]:
+    for row in connection.exec_driver_sql(f"PRAGMA table_info({table})"):
+        if row[1] == column:
+            return row[2].upper()
+    return None
+
+
+def rebuild_table(
+        connection: Connection,
+        table: str,
+        column_types: Dict[str, str],
+        expressions: Dict[str, str],
+        batch_size: int = 50_000) -> None:
+    # O SQLite não altera o tipo de uma coluna, então a tabela é recriada (procedimento de 12 passos da documentação)
+    create_sql = connection.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).scalar()
+    # Indices e triggers somem junto com a tabela antiga e são recriados no final
+    dependents = [row[0] for row in connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL", (table,)
+    )]
+    
+    new_table = f"{table}__rebuild"
+    create_sql = re.sub(r"^CREATE TABLE\s+\"?\w+\"?", f"CREATE TABLE {new_table}", create_sql, count=1)
+    for column, type_ in column_types.items():
+        create_sql = re.sub(rf"([(,]\s*\"?{column}\"?\s+)\w+(\([^)]*\))?", rf"\g<1>{type_}", create_sql, count=1)
+    connection.exec_driver_sql(create_sql)
+    
+    # O rowid é copiado junto para manter a ordem fisica e as referencias por rowid (ex.: tabelas FTS)
+    columns = [row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")]
+    select_list = ", ".join(expressions.get(column, column) for column in columns)
+    max_rowid = connection.exec_driver_sql(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").scalar()
+    for start in range(0, max_rowid, batch_size):
+        connection.exec_driver_sql(
+            f"INSERT INTO {new_table} (rowid, {', '.join(columns)}) "
+            f"SELECT rowid, {select_list} FROM {table} WHERE rowid > ? AND rowid <= ?",
+            (start, start + batch_size)
+        )
+    
+    connection.exec_driver_sql(f"DROP TABLE {table}")
+    # Triggers de outras tabelas que gravam nesta (ex.: checkpoints de saldo) ficariam apontando para uma tabela
+    # inexistente durante o RENAME, o modo legado renomeia sem revalidar o schema inteiro
+    legacy_alter_table = connection.exec_driver_sql("PRAGMA legacy_alter_table").scalar()
+    connection.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+    try:
+        connection.exec_driver_sql(f"ALTER TABLE {new_table} RENAME TO {table}")
+    finally:
+        connection.exec_driver_sql(f"PRAGMA legacy_alter_table = {int(legacy_alter_table)}")
+    for sql in dependents:
+        connection.exec_driver_sql(sql)
+
+
+class Migrator:
+    def __init__(self, engine: Engine, migrations: List[Migration] = None) -> None:
+        # Importado aqui para que as migrações possam usar os helpers deste modulo
+        from infra.migrations.versions import MIGRATIONS
+        self.engine = engine
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda migration: migration.version)
+        # Migração que ficou pendente na ultima chamada de 'upgrade' e o motivo
+        self.skipped: Optional[Tuple[Migration, str]] = None
+    
+    def current_version(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.exec_driver_sql("PRAGMA user_version").scalar()
+    
+    def pending(self) -> List[Migration]:
+        version = self.current_version()
+        return [migration for migration in self.migrations if migration.version > version]
+    
+    def upgrade(self) -> int:
+        # Em AUTOCOMMIT o driver não abre transações sozinho, então cada passo controla a sua com 'BEGIN IMMEDIATE'
+        self.skipped = None
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for migration in self.migrations:
+                # Leitura sem lock para não bloquear escritores quando não há nada pendente
+                if migration.version <= connection.exec_driver_sql("PRAGMA user_version").scalar():
+                    continue
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+                try:
+                    # A versão é relida com o lock de escrita para que dois processos não apliquem o mesmo passo
+                    if migration.version <= connection.exec_driver_sql("PRAGMA user_version").scalar():
+                        connection.exec_driver_sql("ROLLBACK")
+                        continue
+                    migration.upgrade(connection)
+                    connection.exec_driver_sql(f"PRAGMA user_version = {int(migration.version)}")
+                    connection.exec_driver_sql("COMMIT")
+                except MigrationSkipped as error:
+                    # O 'user_version' só avança em ordem, então as migrações seguintes também esperam esta ser aplicada
+                    connection.exec_driver_sql("ROLLBACK")
+                    self.skipped = (migration, str(error))
+                    break
+                except Exception:
+                    connection.exec_driver_sql("ROLLBACK")
+                    raise
+            self._sync_uuid_storage(connection)
+            return connection.exec_driver_sql("PRAGMA user_version").scalar()
+    
+    def _sync_uuid_storage(self, connection: Connection) -> None:
+        # Não é uma migração versionada: o formato das chaves segue a configuração da engine e pode ir e voltar
+        from infra.migrations.uuid_storage import convert_uuid_storage, pending_uuid_tables
+        storage = UUIDType.get_storage(self.engine.dialect)
+        if not pending_uuid_tables(connection, storage):
+            return
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            convert_uuid_storage(connection, storage)
+            connection.exec_driver_sql("COMMIT")
+        except Exception:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
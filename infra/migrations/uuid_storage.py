@@ -0,0 +1,57 @@
+import uuid
+from typing import Dict, List, Optional
+
+from sqlalchemy.engine import Connection
+
+from infra.configs import Base, UUIDType
+from infra.migrations.migrator import has_columns, column_type, rebuild_table
+
+
+def _to_bytes(value: Optional[str]) -> Optional[bytes]:
+    if value is None or isinstance(value, bytes):
+        return value
+    return uuid.UUID(value).bytes
+
+
+def _to_hex(value: Optional[bytes]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.hex()
+
+
+def uuid_columns() -> Dict[str, List[str]]:
+    # Todas as colunas declaradas com 'UUIDType' nas entidades, por tabela
+    return {
+        table.name: [column.name for column in table.columns if isinstance(column.type, UUIDType)]
+        for table in Base.metadata.sorted_tables
+    }
+
+
+def pending_uuid_tables(connection: Connection, storage: str) -> List[str]:
+    pending = []
+    for table, columns in uuid_columns().items():
+        # Tabelas que não existem ou estão no formato antigo de colunas ficam de fora
+        if not columns or not has_columns(connection, table, columns):
+            continue
+        if (column_type(connection, table, columns[0]) == "BLOB") != (storage == "binary"):
+            pending.append(table)
+    return pending
+
+
+def convert_uuid_storage(connection: Connection, storage: str) -> List[str]:
+    # O SQLite 3.40 ainda não tem 'unhex()', então a conversão usa funções Python registradas na conexão
+    driver_connection = connection.connection.driver_connection
+    driver_connection.create_function("sisfin_uuid_bytes", 1, _to_bytes, deterministic=True)
+    driver_connection.create_function("sisfin_uuid_hex", 1, _to_hex, deterministic=True)
+    
+    function, target_type = ("sisfin_uuid_bytes", "BLOB") if storage == "binary" else ("sisfin_uuid_hex", "VARCHAR(64)")
+    columns = uuid_columns()
+    tables = pending_uuid_tables(connection, storage)
+    for table in tables:
+        rebuild_table(
+            connection,
+            table,
+            column_types={column: target_type for column in columns[table]},
+            expressions={column: f"{function}({column})" for column in columns[table]},
+        )
+    return tables
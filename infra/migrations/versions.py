@@ -0,0 +1,314 @@
+from typing import List
+
+from sqlalchemy.engine import Connection
+
+from infra.migrations.migrator import Migration, MigrationSkipped, has_columns, require_columns, column_type, rebuild_table
+
+
+# Indices da tabela 'transactions' (os mesmos declarados em 'infra/entities/transaction.py')
+TRANSACTION_INDEXES = {
+    "ix_transactions_user_id_date": "user_id, date",
+    "ix_transactions_account_id_destination_date": "account_id_destination, date",
+    "ix_transactions_account_id_origin_date": "account_id_origin, date",
+    "ix_transactions_category_id_date": "category_id, date",
+}
+
+
+def create_transaction_indexes(connection: Connection) -> None:
+    require_columns(connection, "transactions", ["user_id", "account_id_destination", "account_id_origin", "category_id", "date", "paid"])
+    for name, columns in TRANSACTION_INDEXES.items():
+        connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON transactions ({columns})")
+    # Indice parcial só com as transações pendentes (vencimentos por data), bem menor que a tabela inteira
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_transactions_unpaid_date ON transactions (date) WHERE paid = 0")
+
+
+def convert_amounts_to_cents(connection: Connection) -> None:
+    # Valores monetarios passam de Float para inteiros em centavos
+    money_columns = {"transactions": "amount", "accounts": "balance"}
+    # As duas tabelas são conferidas antes de converter qualquer uma
+    for table, column in money_columns.items():
+        require_columns(connection, table, ["id", "user_id", column])
+    for table, column in money_columns.items():
+        if column_type(connection, table, column) == "INTEGER":
+            continue
+        rebuild_table(
+            connection,
+            table,
+            column_types={column: "INTEGER"},
+            expressions={column: f"CAST(ROUND({column} * 100) AS INTEGER)"},
+        )
+
+
+def changed(columns: List[str]) -> str:
+    # 'AFTER UPDATE OF' dispara mesmo quando o valor gravado é igual ao anterior (o adapter envia todas as colunas),
+    # a condição do 'WHEN' deixa passar só os updates que mudam de fato alguma das colunas
+    return " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in columns)
+
+
+# Colunas usadas pelos triggers dos checkpoints de saldo
+CHECKPOINT_COLUMNS = ["id", "date", "amount", "transaction_type", "paid", "ignore", "account_id_origin", "account_id_destination"]
+
+
+def checkpoint_upserts(row: str, sign: str) -> str:
+    # Efeito de uma linha ('NEW' ou 'OLD') nos checkpoints: despesa subtrai do destino, renda, ajuste e
+    # transferência somam no destino e a transferência ainda subtrai da origem (mesmas regras do 'PostingHandler')
+    month = f"substr({row}.date, 1, 7)"
+    counted = f"{row}.paid = 1 AND {row}.ignore = 0"
+    upsert = "ON CONFLICT (account_id, month) DO UPDATE SET delta = delta + excluded.delta;"
+    return (
+        f"INSERT INTO accounts_balance_checkpoints (account_id, month, delta) "
+        f"SELECT {row}.account_id_destination, {month}, "
+        f"{sign}(CASE WHEN {row}.transaction_type = 'despesa' THEN -{row}.amount ELSE {row}.amount END) "
+        f"WHERE {counted} {upsert}\n"
+        f"INSERT INTO accounts_balance_checkpoints (account_id, month, delta) "
+        f"SELECT {row}.account_id_origin, {month}, {sign}(-{row}.amount) "
+        f"WHERE {counted} AND {row}.transaction_type = 'transferência' AND {row}.account_id_origin IS NOT NULL {upsert}\n"
+    )
+
+
+CHECKPOINT_TRIGGERS = {
+    "tr_transactions_checkpoints_insert": f"AFTER INSERT ON transactions BEGIN\n{checkpoint_upserts('NEW', '+')}END",
+    "tr_transactions_checkpoints_delete": f"AFTER DELETE ON transactions BEGIN\n{checkpoint_upserts('OLD', '-')}END",
+    "tr_transactions_checkpoints_update": (
+        f"AFTER UPDATE OF {', '.join(CHECKPOINT_COLUMNS[1:])} ON transactions WHEN {changed(CHECKPOINT_COLUMNS[1:])} BEGIN\n"
+        f"{checkpoint_upserts('OLD', '-')}{checkpoint_upserts('NEW', '+')}END"
+    ),
+}
+
+
+def create_balance_checkpoints(connection: Connection) -> None:
+    # Import local para que as migrações não carreguem as entidades antes do 'infra.configs'
+    from infra.entities import AccountBalanceCheckpoint
+    require_columns(connection, "transactions", CHECKPOINT_COLUMNS)
+    AccountBalanceCheckpoint.__table__.create(connection, checkfirst=True)
+    for name, body in CHECKPOINT_TRIGGERS.items():
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        connection.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+    
+    # Carga inicial com o historico já gravado, depois disso os triggers mantem a tabela
+    connection.exec_driver_sql("DELETE FROM accounts_balance_checkpoints")
+    connection.exec_driver_sql(
+        "INSERT INTO accounts_balance_checkpoints (account_id, month, delta) "
+        "SELECT account_id, month, SUM(delta) FROM ("
+        "SELECT account_id_destination AS account_id, substr(date, 1, 7) AS month, "
+        "CASE WHEN transaction_type = 'despesa' THEN -amount ELSE amount END AS delta "
+        "FROM transactions WHERE paid = 1 AND ignore = 0 "
+        "UNION ALL "
+        "SELECT account_id_origin, substr(date, 1, 7), -amount "
+        "FROM transactions WHERE paid = 1 AND ignore = 0 AND transaction_type = 'transferência' AND account_id_origin IS NOT NULL"
+        ") GROUP BY account_id, month"
+    )
+
+
+def reconciliation_marks(row: str) -> str:
+    # Marca as duas pontas da transação, a origem só existe nas transferências
+    mark = "INSERT OR REPLACE INTO accounts_reconciliation_marks (account_id)"
+    return (
+        f"{mark} SELECT {row}.account_id_destination WHERE {row}.account_id_destination IS NOT NULL;\n"
+        f"{mark} SELECT {row}.account_id_origin WHERE {row}.account_id_origin IS NOT NULL;\n"
+    )
+
+
+RECONCILIATION_TRIGGERS = {
+    "tr_transactions_reconciliation_insert": f"AFTER INSERT ON transactions BEGIN\n{reconciliation_marks('NEW')}END",
+    "tr_transactions_reconciliation_delete": f"AFTER DELETE ON transactions BEGIN\n{reconciliation_marks('OLD')}END",
+    "tr_transactions_reconciliation_update": (
+        f"AFTER UPDATE OF {', '.join(CHECKPOINT_COLUMNS[1:])} ON transactions WHEN {changed(CHECKPOINT_COLUMNS[1:])} BEGIN\n"
+        f"{reconciliation_marks('OLD')}{reconciliation_marks('NEW')}END"
+    ),
+    # Saldos alterados sem passar por uma transação também precisam ser conferidos
+    "tr_accounts_reconciliation_insert": "AFTER INSERT ON accounts BEGIN\n"
+        "INSERT OR REPLACE INTO accounts_reconciliation_marks (account_id) VALUES (NEW.id);\nEND",
+    "tr_accounts_reconciliation_update": f"AFTER UPDATE OF balance ON accounts WHEN {changed(['balance'])} BEGIN\n"
+        "INSERT OR REPLACE INTO accounts_reconciliation_marks (account_id) VALUES (NEW.id);\nEND",
+}
+
+
+def create_reconciliation_marks(connection: Connection) -> None:
+    # Import local para que as migrações não carreguem as entidades antes do 'infra.configs'
+    from infra.entities import AccountReconciliationMark
+    require_columns(connection, "transactions", CHECKPOINT_COLUMNS)
+    require_columns(connection, "accounts", ["id", "balance"])
+    AccountReconciliationMark.__table__.create(connection, checkfirst=True)
+    for name, body in RECONCILIATION_TRIGGERS.items():
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        connection.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+    # Todas as contas existentes entram marcadas, então a primeira conciliação incremental confere tudo
+    connection.exec_driver_sql("INSERT OR REPLACE INTO accounts_reconciliation_marks (account_id) SELECT id FROM accounts")
+
+
+# Colunas que mudam o resultado dos relatorios por categoria
+REPORT_COLUMNS = ["date", "amount", "transaction_type", "paid", "ignore", "visible", "category_id", "tag_id", "user_id"]
+
+
+def report_version_bump(user_id: str, month: str) -> str:
+    return (
+        f"INSERT INTO transactions_report_versions (user_id, month, version) VALUES ({user_id}, {month}, 1) "
+        f"ON CONFLICT (user_id, month) DO UPDATE SET version = version + 1;\n"
+    )
+
+
+REPORT_TRIGGERS = {
+    "tr_transactions_report_insert": f"AFTER INSERT ON transactions BEGIN\n{report_version_bump('NEW.user_id', 'substr(NEW.date, 1, 7)')}END",
+    "tr_transactions_report_delete": f"AFTER DELETE ON transactions BEGIN\n{report_version_bump('OLD.user_id', 'substr(OLD.date, 1, 7)')}END",
+    "tr_transactions_report_update": (
+        f"AFTER UPDATE OF {', '.join(REPORT_COLUMNS)} ON transactions WHEN {changed(REPORT_COLUMNS)} BEGIN\n"
+        f"{report_version_bump('OLD.user_id', 'substr(OLD.date, 1, 7)')}{report_version_bump('NEW.user_id', 'substr(NEW.date, 1, 7)')}END"
+    ),
+}
+# Os nomes de categorias e marcações entram nos relatorios de todos os meses do usuario, a versão deles fica no mês vazio
+NAMES_MONTH = "''"
+for table in ("transactions_categories", "transactions_tags"):
+    REPORT_TRIGGERS[f"tr_{table}_report_insert"] = f"AFTER INSERT ON {table} BEGIN\n{report_version_bump('NEW.user_id', NAMES_MONTH)}END"
+    REPORT_TRIGGERS[f"tr_{table}_report_update"] = (
+        f"AFTER UPDATE OF name, user_id ON {table} WHEN {changed(['name', 'user_id'])} BEGIN\n"
+        f"{report_version_bump('OLD.user_id', NAMES_MONTH)}{report_version_bump('NEW.user_id', NAMES_MONTH)}END"
+    )
+    REPORT_TRIGGERS[f"tr_{table}_report_delete"] = f"AFTER DELETE ON {table} BEGIN\n{report_version_bump('OLD.user_id', NAMES_MONTH)}END"
+
+
+def create_report_versions(connection: Connection) -> None:
+    # Import local para que as migrações não carreguem as entidades antes do 'infra.configs'
+    from infra.entities import TransactionReportVersion
+    require_columns(connection, "transactions", REPORT_COLUMNS)
+    for table in ("transactions_categories", "transactions_tags"):
+        require_columns(connection, table, ["id", "name", "user_id"])
+    TransactionReportVersion.__table__.create(connection, checkfirst=True)
+    for name, body in REPORT_TRIGGERS.items():
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        connection.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+
+
+# Colunas que definem a linha do rollup ou entram nas somas dele
+ROLLUP_COLUMNS = ["date", "amount", "transaction_type", "paid", "ignore", "category_id", "account_id_destination", "user_id"]
+ROLLUP_KEY = "user_id, account_id, category_id, month, transaction_type"
+
+
+def rollup_upsert(row: str, sign: str) -> str:
+    # Soma (ou subtrai) uma linha ('NEW' ou 'OLD') no grupo dela, as transações ignoradas ficam de fora
+    values = (
+        f"{row}.user_id, {row}.account_id_destination, {row}.category_id, substr({row}.date, 1, 7), {row}.transaction_type, "
+        f"{sign}{row}.amount, {sign}1, {sign}(CASE WHEN {row}.paid = 1 THEN {row}.amount ELSE 0 END), {sign}{row}.paid"
+    )
+    statement = (
+        f"INSERT INTO transactions_rollups ({ROLLUP_KEY}, amount, count, paid_amount, paid_count) "
+        f"SELECT {values} WHERE {row}.ignore = 0 "
+        f"ON CONFLICT ({ROLLUP_KEY}) DO UPDATE SET amount = amount + excluded.amount, count = count + excluded.count, "
+        f"paid_amount = paid_amount + excluded.paid_amount, paid_count = paid_count + excluded.paid_count;\n"
+    )
+    if sign == "-":
+        # Grupos que ficaram sem transações são removidos para a tabela não crescer com linhas zeradas
+        statement += (
+            f"DELETE FROM transactions_rollups WHERE user_id = {row}.user_id AND account_id = {row}.account_id_destination "
+            f"AND category_id = {row}.category_id AND month = substr({row}.date, 1, 7) "
+            f"AND transaction_type = {row}.transaction_type AND count = 0;\n"
+        )
+    return statement
+
+
+ROLLUP_TRIGGERS = {
+    "tr_transactions_rollups_insert": f"AFTER INSERT ON transactions BEGIN\n{rollup_upsert('NEW', '+')}END",
+    "tr_transactions_rollups_delete": f"AFTER DELETE ON transactions BEGIN\n{rollup_upsert('OLD', '-')}END",
+    "tr_transactions_rollups_update": (
+        f"AFTER UPDATE OF {', '.join(ROLLUP_COLUMNS)} ON transactions WHEN {changed(ROLLUP_COLUMNS)} BEGIN\n"
+        f"{rollup_upsert('OLD', '-')}{rollup_upsert('NEW', '+')}END"
+    ),
+}
+
+
+# Recalculo completo do rollup, usado na carga inicial e pelo 'TransactionRepository.rebuild_rollups'
+ROLLUP_REBUILD = (
+    f"INSERT INTO transactions_rollups ({ROLLUP_KEY}, amount, count, paid_amount, paid_count) "
+    f"SELECT user_id, account_id_destination, category_id, substr(date, 1, 7), transaction_type, "
+    f"SUM(amount), COUNT(*), SUM(CASE WHEN paid = 1 THEN amount ELSE 0 END), SUM(paid) "
+    f"FROM transactions WHERE ignore = 0 "
+    f"GROUP BY user_id, account_id_destination, category_id, substr(date, 1, 7), transaction_type"
+)
+
+
+def create_transaction_rollups(connection: Connection) -> None:
+    # Import local para que as migrações não carreguem as entidades antes do 'infra.configs'
+    from infra.entities import TransactionRollup
+    require_columns(connection, "transactions", ROLLUP_COLUMNS)
+    TransactionRollup.__table__.create(connection, checkfirst=True)
+    for name, body in ROLLUP_TRIGGERS.items():
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        connection.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+    
+    # Carga inicial com o historico já gravado, depois disso os triggers mantem a tabela
+    connection.exec_driver_sql("DELETE FROM transactions_rollups")
+    connection.exec_driver_sql(ROLLUP_REBUILD)
+
+
+def add_content_hash(connection: Connection) -> None:
+    # Import local para que as migrações não carreguem os repositórios antes do 'infra.configs'
+    from infra.repository.utils import content_hash
+    require_columns(connection, "transactions", ["id", "date", "amount", "description", "account_id_destination"])
+    if not has_columns(connection, "transactions", ["content_hash"]):
+        connection.exec_driver_sql("ALTER TABLE transactions ADD COLUMN content_hash VARCHAR(32)")
+    # O SQLite não tem funções de hash, então o calculo das linhas já gravadas usa a mesma função dos repositórios
+    connection.connection.driver_connection.create_function("sisfin_content_hash", 4, content_hash, deterministic=True)
+    connection.exec_driver_sql(
+        "UPDATE transactions SET content_hash = sisfin_content_hash(date, amount, description, account_id_destination) "
+        "WHERE content_hash IS NULL"
+    )
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_transactions_content_hash ON transactions (content_hash)")
+
+
+# Indice de texto completo das descrições com o conteudo lido da propria 'transactions' (external content), ligado pelo
+# rowid. O 'remove_diacritics' faz 'pão' e 'pao' casarem. O VACUUM pode renumerar o rowid de tabelas sem INTEGER
+# PRIMARY KEY, depois dele o indice deve ser recriado com o 'TransactionRepository.rebuild_search_index'
+SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, content='transactions', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')"
+)
+SEARCH_INSERT = "INSERT INTO transactions_fts (rowid, description) VALUES (NEW.rowid, NEW.description);\n"
+SEARCH_DELETE = "INSERT INTO transactions_fts (transactions_fts, rowid, description) VALUES ('delete', OLD.rowid, OLD.description);\n"
+SEARCH_TRIGGERS = {
+    "tr_transactions_fts_insert": f"AFTER INSERT ON transactions BEGIN\n{SEARCH_INSERT}END",
+    "tr_transactions_fts_delete": f"AFTER DELETE ON transactions BEGIN\n{SEARCH_DELETE}END",
+    "tr_transactions_fts_update": f"AFTER UPDATE OF description ON transactions WHEN {changed(['description'])} BEGIN\n{SEARCH_DELETE}{SEARCH_INSERT}END",
+}
+# Recalculo completo do indice a partir da tabela 'transactions'
+SEARCH_REBUILD = "INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')"
+
+
+def has_fts5(connection: Connection) -> bool:
+    # O FTS5 é uma extensão de compilação do SQLite, quase sempre presente nas versões distribuidas com o Python
+    return any(row[0] == "ENABLE_FTS5" for row in connection.exec_driver_sql("PRAGMA compile_options"))
+
+
+def create_transaction_search(connection: Connection) -> None:
+    require_columns(connection, "transactions", ["id", "description"])
+    if not has_fts5(connection):
+        raise MigrationSkipped("SQLite compilado sem o FTS5")
+    connection.exec_driver_sql(SEARCH_TABLE)
+    for name, body in SEARCH_TRIGGERS.items():
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        connection.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+    # Carga inicial com as descrições já gravadas
+    connection.exec_driver_sql(SEARCH_REBUILD)
+
+
+def recreate_update_triggers(connection: Connection) -> None:
+    # Bancos migrados antes das condições 'WHEN' recebem os triggers de update atualizados
+    require_columns(connection, "transactions", sorted(set(CHECKPOINT_COLUMNS + REPORT_COLUMNS + ROLLUP_COLUMNS + ["description"])))
+    for triggers in (CHECKPOINT_TRIGGERS, RECONCILIATION_TRIGGERS, REPORT_TRIGGERS, ROLLUP_TRIGGERS, SEARCH_TRIGGERS):
+        for name, body in triggers.items():
+            if name.endswith("_update"):
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+                connection.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+
+
+# Lista de migrações em ordem, novas versões entram sempre no final
+MIGRATIONS = [
+    Migration(1, "Indices de usuario, contas, categoria e pendentes em 'transactions'", create_transaction_indexes),
+    Migration(2, "Valores monetarios em centavos inteiros em 'transactions' e 'accounts'", convert_amounts_to_cents),
+    Migration(3, "Checkpoints mensais de saldo por conta mantidos por triggers em 'transactions'", create_balance_checkpoints),
+    Migration(4, "Marcação das contas alteradas para a conciliação incremental de saldos", create_reconciliation_marks),
+    Migration(5, "Versões por usuario e mês para invalidar os relatorios por categoria", create_report_versions),
+    Migration(6, "Rollup mensal por usuario, conta, categoria e tipo mantido por triggers em 'transactions'", create_transaction_rollups),
+    Migration(7, "Hash do conteudo das transações para a deduplicação das importações de extratos", add_content_hash),
+    Migration(8, "Busca de texto completo (FTS5) nas descrições mantida por triggers em 'transactions'", create_transaction_search),
+    Migration(9, "Triggers de update só disparam quando as colunas usadas por eles mudam", recreate_update_triggers),
+]
@@ -1,13 +1,16 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Iterator, Tuple
+from sqlalchemy import update, case, select, insert, delete, func, union_all, literal_column
 
-from infra.entities import Account
+from infra.entities import Account, Transaction, AccountReconciliationMark
 from infra.configs import DBConnectionHandler
+from infra.repository.utils import bulk_insert, iter_entities, chunked, SQLITE_MAX_VARIABLES, select_by_ids
+from infra.repository.transaction_repository import signed_destination_amount
 
 
 class AccountRepository:
-    def __init__(self) -> None:
-        self.db = DBConnectionHandler()
+    def __init__(self, connection_string: Optional[str] = None) -> None:
+        self.db = DBConnectionHandler(connection_string=connection_string)
     
     def select(self) -> List[Account]:
         with self.db as db:
@@ -15,6 +18,9 @@ class AccountRepository:
                 .query(Account)\
                 .all()
     
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Account]:
+        return iter_entities(self.db.get_engine(), Account, batch_size=batch_size)
+    
     def select_from_id(self, id: str) -> Optional[Account]:
         with self.db as db:
             return db.session\
@@ -22,12 +28,17 @@ class AccountRepository:
                 .filter(Account.id == id)\
                 .one_or_none()
     
+    def select_from_ids(self, ids: List[str]) -> List[Account]:
+        # Ids inexistentes ficam de fora, a ordem do resultado não segue a de 'ids'
+        with self.db as db:
+            return select_by_ids(db.session, Account, ids)
+    
     def insert(self,
             id: str,
             name: str,
             description: str,
             tag_id: str,
-            balance: float,
+            balance: int,
             created_at: datetime,
             user_id: str) -> Account:
         with self.db as db:
@@ -44,36 +55,144 @@ class AccountRepository:
             db.session.commit()
             return new_account
     
+    def insert_many(self, rows: List[dict]) -> List[bool]:
+        with self.db as db:
+            outcomes = bulk_insert(db.session, Account, rows)
+            db.session.commit()
+            return outcomes
+    
     def update(self,
-            id: str = None,
+            id: str,
             name: str = None,
             description: str = None,
             tag_id: str = None,
-            balance: float = None,
+            balance: int = None,
             created_at: datetime = None,
             user_id: str = None) -> Optional[Account]:
+        fields_to_update = {
+            "name": name,
+            "description": description,
+            "tag_id": tag_id,
+            "balance": balance,
+            "created_at": created_at,
+            "user_id": user_id,
+        }
+        
+        # Só atualiza os campos que não forem None
+        values = {field: value for field, value in fields_to_update.items() if value is not None}
+        
+        if not values:
+            return self.select_from_id(id=id)
+        
         with self.db as db:
-            account = db.session.query(Account).filter(Account.id == id).one_or_none()
-            
-            if not account:
+            # Um unico 'UPDATE ... RETURNING' atualiza e devolve o registro em uma ida ao banco
+            data = db.session.scalars(
+                update(Account)
+                .where(Account.id == id)
+                .values(**values)
+                .returning(Account)
+            ).one_or_none()
+            db.session.commit()
+            return data
+    
+    def add_to_balance(self, id: str, delta: int) -> Optional[int]:
+        with self.db as db:
+            # O incremento é feito pelo banco, então escritas concorrentes não se sobrescrevem
+            balance = db.session.scalars(
+                update(Account)
+                .where(Account.id == id)
+                .values(balance=Account.balance + delta)
+                .returning(Account.balance)
+            ).one_or_none()
+            db.session.commit()
+            return balance
+    
+    def add_to_balances(self, deltas: Dict[str, int]) -> Optional[Dict[str, int]]:
+        balances = dict()
+        with self.db as db:
+            # Cada id usa três parametros (dois no CASE e um no IN), comparações explicitas passam o id pelo UUIDType
+            for ids in chunked(deltas, SQLITE_MAX_VARIABLES // 3):
+                rows = db.session.execute(
+                    update(Account)
+                    .where(Account.id.in_(ids))
+                    .values(balance=Account.balance + case(*[(Account.id == id, deltas[id]) for id in ids]))
+                    .returning(Account.id, Account.balance)
+                )
+                balances.update({id: balance for id, balance in rows})
+            # Tudo ou nada: se alguma conta não existe nenhum saldo é alterado
+            if len(balances) != len(deltas):
+                db.session.rollback()
                 return None
-            
-            fields_to_update = {
-                "name": name,
-                "description": description,
-                "tag_id": tag_id,
-                "balance": balance,
-                "created_at": created_at,
-                "user_id": user_id,
-            }
-            
-            for field, value in fields_to_update.items():
-                if value is not None:
-                    setattr(account, field, value)
-            
             db.session.commit()
+        return balances
+    
+    def select_ids(self) -> List[str]:
+        with self.db as db:
+            return list(db.session.scalars(select(Account.id).order_by(Account.id)))
+    
+    def _reconcile_statement(self, conditions):
+        # Uma unica consulta lê o saldo gravado e o recalculado, os dois vêm do mesmo snapshot do banco
+        counted = [Transaction.paid == True, Transaction.ignore == False]
+        legs = union_all(
+            select(Transaction.account_id_destination.label("account_id"), signed_destination_amount().label("delta"))
+            .where(*counted, *conditions(Transaction.account_id_destination)),
+            select(Transaction.account_id_origin, -Transaction.amount)
+            .where(*counted, Transaction.transaction_type == "transferência", *conditions(Transaction.account_id_origin)),
+        ).subquery()
+        totals = select(legs.c.account_id, func.sum(legs.c.delta).label("total")).group_by(legs.c.account_id).subquery()
+        return select(Account.id, Account.balance, func.coalesce(totals.c.total, 0))\
+            .outerjoin(totals, totals.c.account_id == Account.id)\
+            .where(*conditions(Account.id))\
+            .order_by(Account.id)
+    
+    def reconcile_balances(self,
+            first_id: Optional[str] = None,
+            last_id: Optional[str] = None,
+            ids: Optional[List[str]] = None) -> List[Tuple[str, int, int]]:
+        # Retorna (id, saldo gravado, saldo recalculado das transações) das contas no intervalo ou na lista de ids
+        with self.db as db:
+            if ids is not None:
+                result = []
+                # Cada id aparece três vezes na consulta (destino, origem e contas)
+                for chunk in chunked(ids, SQLITE_MAX_VARIABLES // 3):
+                    statement = self._reconcile_statement(lambda column: [column.in_(chunk)])
+                    result.extend(tuple(row) for row in db.session.execute(statement))
+                return result
             
-            return self.select_from_id(id=id)
+            def in_range(column):
+                # Intervalo inclusivo, as pontas em None ficam abertas
+                conditions = []
+                if first_id is not None:
+                    conditions.append(column >= first_id)
+                if last_id is not None:
+                    conditions.append(column <= last_id)
+                return conditions
+            return [tuple(row) for row in db.session.execute(self._reconcile_statement(in_range))]
+    
+    def select_marked_ids(self) -> Tuple[int, List[str]]:
+        # Retorna o maior rowid lido junto com os ids, só o que foi lido é limpo depois
+        with self.db as db:
+            rows = db.session.execute(
+                select(AccountReconciliationMark.account_id, literal_column("rowid"))
+            ).all()
+        if not rows:
+            return 0, []
+        return max(rowid for _, rowid in rows), sorted(id for id, _ in rows)
+    
+    def mark_ids(self, ids: List[str]) -> None:
+        with self.db as db:
+            for chunk in chunked(ids):
+                db.session.execute(
+                    insert(AccountReconciliationMark).prefix_with("OR REPLACE"),
+                    [{"account_id": id} for id in chunk],
+                )
+            db.session.commit()
+    
+    def clear_marks(self, up_to: int) -> None:
+        # Marcações feitas depois da leitura têm rowid maior e continuam para a proxima conciliação
+        with self.db as db:
+            db.session.execute(delete(AccountReconciliationMark).where(literal_column("rowid") <= up_to))
+            db.session.commit()
     
     def delete(self, id: str) -> None:
         with self.db as db:
@@ -1,13 +1,15 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Iterator
+from sqlalchemy import update
 
 from infra.entities import AccountTag
 from infra.configs import DBConnectionHandler
+from infra.repository.utils import bulk_insert, iter_entities, select_by_ids
 
 
 class AccountTagRepository:
-    def __init__(self) -> None:
-        self.db = DBConnectionHandler()
+    def __init__(self, connection_string: Optional[str] = None) -> None:
+        self.db = DBConnectionHandler(connection_string=connection_string)
     
     def select(self) -> List[AccountTag]:
         with self.db as db:
@@ -16,6 +18,9 @@ class AccountTagRepository:
                 .all()
         return data
     
+    def iter_all(self, batch_size: int = 1000) -> Iterator[AccountTag]:
+        return iter_entities(self.db.get_engine(), AccountTag, batch_size=batch_size)
+    
     def select_from_id(self, id: str) -> Optional[AccountTag]:
         with self.db as db:
             return db.session\
@@ -23,6 +28,11 @@ class AccountTagRepository:
                 .filter(AccountTag.id == id)\
                 .one_or_none()
     
+    def select_from_ids(self, ids: List[str]) -> List[AccountTag]:
+        # Ids inexistentes ficam de fora, a ordem do resultado não segue a de 'ids'
+        with self.db as db:
+            return select_by_ids(db.session, AccountTag, ids)
+    
     def insert(self,
             id: str,
             name: str,
@@ -39,32 +49,39 @@ class AccountTagRepository:
             db.session.commit()
             return new_account_tag
     
-    def update(self, id: str = None,
+    def insert_many(self, rows: List[dict]) -> List[bool]:
+        with self.db as db:
+            outcomes = bulk_insert(db.session, AccountTag, rows)
+            db.session.commit()
+            return outcomes
+    
+    def update(self,
+            id: str,
             name: str = None,
             created_at: datetime = None,
             user_id: str = None) -> Optional[AccountTag]:
+        fields_to_update = {
+            "name": name,
+            "created_at": created_at,
+            "user_id": user_id,
+        }
+        
+        # Só atualiza os campos que não forem None
+        values = {field: value for field, value in fields_to_update.items() if value is not None}
+        
+        if not values:
+            return self.select_from_id(id=id)
+        
         with self.db as db:
-            account_tag = db.session\
-                .query(AccountTag)\
-                .filter(AccountTag.id == id)\
-                .one_or_none()
-            
-            if not account_tag:
-                return None
-            
-            fields_to_update = {
-                "name": name,
-                "created_at": created_at,
-                "user_id": user_id,
-            }
-            
-            for field, value in fields_to_update.items():
-                if value is not None:
-                    setattr(account_tag, field, value)
-            
+            # Um unico 'UPDATE ... RETURNING' atualiza e devolve o registro em uma ida ao banco
+            data = db.session.scalars(
+                update(AccountTag)
+                .where(AccountTag.id == id)
+                .values(**values)
+                .returning(AccountTag)
+            ).one_or_none()
             db.session.commit()
-            
-            return self.select_from_id(id=id)
+            return data
     
     def delete(self, id: str) -> None:
         with self.db as db:
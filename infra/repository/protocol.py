@@ -1,4 +1,4 @@
-from typing import Optional, Any, Protocol
+from typing import Optional, Any, Iterator, Protocol
 
 
 class ProtocolRepository(Protocol):
@@ -8,12 +8,21 @@ class ProtocolRepository(Protocol):
     def select(self, *args, **kargs) -> list:
         ...
     
+    def iter_all(self, *args, **kargs) -> Iterator[Any]:
+        ...
+    
     def select_from_id(self, *args, **kargs) -> Optional[Any]:
         ...
     
+    def select_from_ids(self, *args, **kargs) -> list:
+        ...
+    
     def insert(self, *args, **kargs) -> None:
         ...
     
+    def insert_many(self, *args, **kargs) -> list:
+        ...
+    
     def update(self, *args, **kargs) -> Optional[Any]:
         ...
     
@@ -1,13 +1,31 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple, Iterator
+from sqlalchemy import update, select, delete, text, tuple_, func, case, union_all, or_, and_, Integer, table, column, literal_column
 
-from infra.entities import Transaction
+from infra.entities import Transaction, TransactionCategory, TransactionTag, AccountBalanceCheckpoint, TransactionReportVersion, TransactionRollup
 from infra.configs import DBConnectionHandler
+from infra.repository.utils import bulk_insert, iter_entities, chunked, content_hash, with_content_hash, select_by_ids
+from infra.migrations.versions import ROLLUP_REBUILD, SEARCH_REBUILD
+
+
+def signed_destination_amount():
+    # Efeito da transação na conta de destino: despesa subtrai, renda, ajuste e transferência somam
+    return case((Transaction.transaction_type == "despesa", -Transaction.amount), else_=Transaction.amount)
+
+
+# Tabela virtual FTS5 das descrições criada pela migração 8, o nome da tabela também é a coluna usada no MATCH e no bm25
+TRANSACTIONS_FTS = table("transactions_fts", column("rowid"))
+FTS_COLUMN = literal_column("transactions_fts")
+
+
+def is_month_start(date: Optional[datetime]) -> bool:
+    # Limites que cortam um mês no meio não podem ser respondidos pelo rollup, que guarda meses inteiros
+    return date is None or date == datetime(date.year, date.month, 1)
 
 
 class TransactionRepository:
-    def __init__(self) -> None:
-        self.db = DBConnectionHandler()
+    def __init__(self, connection_string: Optional[str] = None) -> None:
+        self.db = DBConnectionHandler(connection_string=connection_string)
     
     def select(self) -> List[Transaction]:
         with self.db as db:
@@ -16,6 +34,308 @@ class TransactionRepository:
             .all()
         return data
     
+    def select_page(self,
+            user_id: Optional[str] = None,
+            account_id_origin: Optional[str] = None,
+            account_id_destination: Optional[str] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            transaction_type: Optional[str] = None,
+            paid: Optional[bool] = None,
+            ignore: Optional[bool] = None,
+            visible: Optional[bool] = None,
+            category_id: Optional[str] = None,
+            tag_id: Optional[str] = None,
+            min_amount: Optional[int] = None,
+            max_amount: Optional[int] = None,
+            after: Optional[Tuple[datetime, str]] = None,
+            limit: Optional[int] = None,
+            descending: bool = True) -> List[Transaction]:
+        equals_filters = {
+            Transaction.user_id: user_id,
+            Transaction.account_id_origin: account_id_origin,
+            Transaction.account_id_destination: account_id_destination,
+            Transaction.transaction_type: transaction_type,
+            Transaction.paid: paid,
+            Transaction.ignore: ignore,
+            Transaction.visible: visible,
+            Transaction.category_id: category_id,
+            Transaction.tag_id: tag_id,
+        }
+        
+        # Todos os filtros viram clausulas WHERE, os que forem None são ignorados
+        conditions = [column == value for column, value in equals_filters.items() if value is not None]
+        if start_date is not None:
+            conditions.append(Transaction.date >= start_date)
+        if end_date is not None:
+            conditions.append(Transaction.date < end_date)
+        if min_amount is not None:
+            conditions.append(Transaction.amount >= min_amount)
+        if max_amount is not None:
+            conditions.append(Transaction.amount <= max_amount)
+        
+        # Paginação por chave (keyset) em (date, id), continua depois da ultima linha da pagina anterior
+        keyset = tuple_(Transaction.date, Transaction.id)
+        if after is not None:
+            # A tupla do cursor é convertida com os tipos das colunas (o id pode estar gravado em bytes)
+            conditions.append(keyset < tuple(after) if descending else keyset > tuple(after))
+        
+        statement = select(Transaction).where(*conditions)
+        if descending:
+            statement = statement.order_by(Transaction.date.desc(), Transaction.id.desc())
+        else:
+            statement = statement.order_by(Transaction.date.asc(), Transaction.id.asc())
+        if limit is not None:
+            statement = statement.limit(limit)
+        
+        with self.db as db:
+            return list(db.session.scalars(statement))
+    
+    def iter_all(self,
+            batch_size: int = 1000,
+            user_id: Optional[str] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None) -> Iterator[Transaction]:
+        conditions = []
+        if user_id is not None:
+            conditions.append(Transaction.user_id == user_id)
+        if start_date is not None:
+            conditions.append(Transaction.date >= start_date)
+        if end_date is not None:
+            conditions.append(Transaction.date < end_date)
+        # Sem ORDER BY: a ordem é a do indice usado pelo filtro (ou a da tabela) e o SQLite não precisa ordenar tudo em memória
+        return iter_entities(self.db.get_engine(), Transaction, batch_size=batch_size, conditions=conditions)
+    
+    def _sum_grouped(self,
+            column,
+            rollup_column,
+            user_id: Optional[str] = None,
+            transaction_type: Optional[str] = None,
+            paid: Optional[bool] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None) -> Dict[str, int]:
+        if is_month_start(start_date) and is_month_start(end_date):
+            # Periodos em meses inteiros são respondidos pelo rollup, sem ler as transações
+            return self._sum_rollups(rollup_column, user_id, transaction_type, paid, start_date, end_date)
+        
+        # Transações ignoradas nunca entram nos totais
+        conditions = [Transaction.ignore == False]
+        if user_id is not None:
+            conditions.append(Transaction.user_id == user_id)
+        if transaction_type is not None:
+            conditions.append(Transaction.transaction_type == transaction_type)
+        if paid is not None:
+            conditions.append(Transaction.paid == paid)
+        if start_date is not None:
+            conditions.append(Transaction.date >= start_date)
+        if end_date is not None:
+            conditions.append(Transaction.date < end_date)
+        
+        # Com centavos inteiros o SUM é exato e feito todo no banco
+        statement = select(column, func.sum(Transaction.amount)).where(*conditions).group_by(column)
+        with self.db as db:
+            return {key: total for key, total in db.session.execute(statement)}
+    
+    def _rollup_months(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> list:
+        conditions = []
+        if start_date is not None:
+            conditions.append(TransactionRollup.month >= start_date.strftime("%Y-%m"))
+        if end_date is not None:
+            conditions.append(TransactionRollup.month < end_date.strftime("%Y-%m"))
+        return conditions
+    
+    def _sum_rollups(self,
+            column,
+            user_id: Optional[str],
+            transaction_type: Optional[str],
+            paid: Optional[bool],
+            start_date: Optional[datetime],
+            end_date: Optional[datetime]) -> Dict[str, int]:
+        conditions = self._rollup_months(start_date, end_date)
+        if user_id is not None:
+            conditions.append(TransactionRollup.user_id == user_id)
+        if transaction_type is not None:
+            conditions.append(TransactionRollup.transaction_type == transaction_type)
+        # Pagas e pendentes saem das colunas do rollup, grupos sem nenhuma transação do filtro ficam de fora como na soma direta
+        if paid is None:
+            total, count = TransactionRollup.amount, TransactionRollup.count
+        elif paid:
+            total, count = TransactionRollup.paid_amount, TransactionRollup.paid_count
+        else:
+            total, count = TransactionRollup.amount - TransactionRollup.paid_amount, TransactionRollup.count - TransactionRollup.paid_count
+        statement = select(column, func.sum(total)).where(*conditions).group_by(column).having(func.sum(count) > 0)
+        with self.db as db:
+            return {key: total for key, total in db.session.execute(statement)}
+    
+    def sum_by_account(self, **filters) -> Dict[str, int]:
+        return self._sum_grouped(Transaction.account_id_destination, TransactionRollup.account_id, **filters)
+    
+    def sum_by_category(self, **filters) -> Dict[str, int]:
+        return self._sum_grouped(Transaction.category_id, TransactionRollup.category_id, **filters)
+    
+    def select_rollups(self,
+            user_id: str,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            account_ids: Optional[List[str]] = None,
+            category_ids: Optional[List[str]] = None) -> List[TransactionRollup]:
+        # Linhas do rollup dos meses inteiros do periodo ('end_date' exclusivo)
+        if not is_month_start(start_date) or not is_month_start(end_date):
+            raise ValueError("O periodo do rollup deve começar e terminar no inicio de um mês")
+        conditions = [TransactionRollup.user_id == user_id, *self._rollup_months(start_date, end_date)]
+        if account_ids is not None:
+            conditions.append(TransactionRollup.account_id.in_(account_ids))
+        if category_ids is not None:
+            conditions.append(TransactionRollup.category_id.in_(category_ids))
+        statement = select(TransactionRollup).where(*conditions).order_by(
+            TransactionRollup.month,
+            TransactionRollup.account_id,
+            TransactionRollup.category_id,
+            TransactionRollup.transaction_type,
+        )
+        with self.db as db:
+            return list(db.session.scalars(statement))
+    
+    def rebuild_rollups(self) -> int:
+        # Recalcula o rollup inteiro a partir das transações, na mesma transação para leitores nunca verem a tabela vazia
+        with self.db as db:
+            db.session.execute(delete(TransactionRollup))
+            db.session.execute(text(ROLLUP_REBUILD))
+            count = db.session.scalar(select(func.count()).select_from(TransactionRollup))
+            db.session.commit()
+            return count
+    
+    def search(self,
+            user_id: str,
+            match: str,
+            limit: int,
+            after: Optional[Tuple[float, str]] = None) -> List[Tuple[Transaction, float]]:
+        # Busca no indice FTS5 e só depois junta com 'transactions' pelo rowid, sem ler as outras descrições.
+        # O bm25 é negativo e menor quanto mais relevante, então a ordem crescente traz os melhores primeiro
+        matches = (
+            select(TRANSACTIONS_FTS.c.rowid, func.bm25(FTS_COLUMN).label("rank"))
+            .where(FTS_COLUMN.op("MATCH")(match))
+            .subquery("matches")
+        )
+        conditions = [Transaction.user_id == user_id]
+        if after is not None:
+            # Paginação por chave em (rank, id), continua depois da ultima linha da pagina anterior
+            conditions.append(tuple_(matches.c.rank, Transaction.id) > tuple(after))
+        statement = (
+            select(Transaction, matches.c.rank)
+            .join(matches, matches.c.rowid == literal_column("transactions.rowid"))
+            .where(*conditions)
+            .order_by(matches.c.rank, Transaction.id)
+            .limit(limit)
+        )
+        with self.db as db:
+            return [(transaction, rank) for transaction, rank in db.session.execute(statement)]
+    
+    def rebuild_search_index(self) -> None:
+        # Recria o indice de texto completo a partir da tabela (ex.: depois de um VACUUM)
+        with self.db as db:
+            db.session.execute(text(SEARCH_REBUILD))
+            db.session.commit()
+    
+    def balance_at(self, account_id: str, at: datetime) -> int:
+        # Saldo da conta considerando as transações com data anterior a 'at'
+        month_start = datetime(at.year, at.month, 1)
+        counted = [Transaction.paid == True, Transaction.ignore == False, Transaction.date >= month_start, Transaction.date < at]
+        # Meses fechados vêm dos checkpoints, só o mês de 'at' é somado transação por transação
+        checkpoints = select(func.coalesce(func.sum(AccountBalanceCheckpoint.delta), 0)).where(
+            AccountBalanceCheckpoint.account_id == account_id,
+            AccountBalanceCheckpoint.month < at.strftime("%Y-%m"),
+        )
+        destination = select(func.coalesce(func.sum(signed_destination_amount()), 0)).where(
+            Transaction.account_id_destination == account_id,
+            *counted,
+        )
+        origin = select(func.coalesce(func.sum(Transaction.amount), 0)).where(
+            Transaction.account_id_origin == account_id,
+            Transaction.transaction_type == "transferência",
+            *counted,
+        )
+        with self.db as db:
+            return db.session.scalar(select(
+                checkpoints.scalar_subquery() + destination.scalar_subquery() - origin.scalar_subquery()
+            ))
+    
+    def daily_balance_deltas(self,
+            account_ids: Optional[List[str]] = None,
+            user_id: Optional[str] = None,
+            end_date: Optional[datetime] = None) -> List[Tuple[str, int, int]]:
+        # Variação liquida por conta e por dia (dias desde 1970-01-01), ordenada por conta e dia
+        counted = [Transaction.paid == True, Transaction.ignore == False]
+        if user_id is not None:
+            counted.append(Transaction.user_id == user_id)
+        if end_date is not None:
+            counted.append(Transaction.date < end_date)
+        # 'julianday' de uma data sem horario é sempre um numero inteiro e meio, então o CAST é exato
+        day = func.cast(func.julianday(func.date(Transaction.date)) - 2440587.5, Integer)
+        
+        destination_conditions = list(counted)
+        origin_conditions = counted + [Transaction.transaction_type == "transferência", Transaction.account_id_origin.is_not(None)]
+        if account_ids is not None:
+            destination_conditions.append(Transaction.account_id_destination.in_(account_ids))
+            origin_conditions.append(Transaction.account_id_origin.in_(account_ids))
+        legs = union_all(
+            select(Transaction.account_id_destination.label("account_id"), day.label("day"), signed_destination_amount().label("delta"))
+            .where(*destination_conditions),
+            select(Transaction.account_id_origin, day, -Transaction.amount)
+            .where(*origin_conditions),
+        ).subquery()
+        
+        # A soma por dia é feita no banco, só uma linha por conta e dia chega no Python
+        statement = select(legs.c.account_id, legs.c.day, func.sum(legs.c.delta))\
+            .group_by(legs.c.account_id, legs.c.day)\
+            .order_by(legs.c.account_id, legs.c.day)
+        with self.db as db:
+            return [tuple(row) for row in db.session.execute(statement)]
+    
+    def category_report(self,
+            user_id: str,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            paid: Optional[bool] = None) -> List[Tuple[str, str, str, Optional[str], Optional[str], Optional[str], int, int]]:
+        # Totais de renda e despesa por mês, tipo, categoria e marcação: (mês, tipo, categoria, nome, marcação, nome, total, quantidade)
+        month = func.substr(Transaction.date, 1, 7)
+        conditions = [
+            Transaction.user_id == user_id,
+            Transaction.ignore == False,
+            Transaction.visible == True,
+            Transaction.transaction_type.in_(["despesa", "renda"]),
+        ]
+        if start_date is not None:
+            conditions.append(Transaction.date >= start_date)
+        if end_date is not None:
+            conditions.append(Transaction.date < end_date)
+        if paid is not None:
+            conditions.append(Transaction.paid == paid)
+        
+        group = [month, Transaction.transaction_type, Transaction.category_id, TransactionCategory.name, Transaction.tag_id, TransactionTag.name]
+        statement = select(*group, func.sum(Transaction.amount), func.count())\
+            .outerjoin(TransactionCategory, TransactionCategory.id == Transaction.category_id)\
+            .outerjoin(TransactionTag, TransactionTag.id == Transaction.tag_id)\
+            .where(*conditions)\
+            .group_by(*group)\
+            .order_by(month, Transaction.transaction_type, Transaction.category_id, Transaction.tag_id)
+        with self.db as db:
+            return [tuple(row) for row in db.session.execute(statement)]
+    
+    def report_versions(self, user_id: str, start_month: Optional[str] = None, end_month: Optional[str] = None) -> Dict[str, int]:
+        # Versões dos meses do intervalo (inclusivo) e dos nomes de categorias e marcações (mês vazio)
+        months = [TransactionReportVersion.month != ""]
+        if start_month is not None:
+            months.append(TransactionReportVersion.month >= start_month)
+        if end_month is not None:
+            months.append(TransactionReportVersion.month <= end_month)
+        statement = select(TransactionReportVersion.month, TransactionReportVersion.version).where(
+            TransactionReportVersion.user_id == user_id,
+            or_(TransactionReportVersion.month == "", and_(*months)),
+        )
+        with self.db as db:
+            return {month: version for month, version in db.session.execute(statement)}
+    
     def select_from_id(self, id: str) -> Optional[Transaction]:
         with self.db as db:
             return db.session\
@@ -23,11 +343,16 @@ class TransactionRepository:
                 .filter(Transaction.id == id)\
                 .one_or_none()
     
+    def select_from_ids(self, ids: List[str]) -> List[Transaction]:
+        # Ids inexistentes ficam de fora, a ordem do resultado não segue a de 'ids'
+        with self.db as db:
+            return select_by_ids(db.session, Transaction, ids)
+    
     def insert(self,
             id: str,
             date: datetime,
             description: str,
-            amount: float,
+            amount: int,
             transaction_type: str,
             paid: bool,
             ignore: bool,
@@ -54,16 +379,43 @@ class TransactionRepository:
                 account_id_destination=account_id_destination,
                 created_at=created_at,
                 user_id=user_id,
+                content_hash=content_hash(date, amount, description, account_id_destination),
             )
             db.session.add(new_transaction)
             db.session.commit()
             return new_transaction
     
+    def insert_many(self, rows: List[dict]) -> List[bool]:
+        with self.db as db:
+            outcomes = bulk_insert(db.session, Transaction, [with_content_hash(row) for row in rows])
+            db.session.commit()
+            return outcomes
+    
+    def insert_many_deduplicated(self, rows: List[dict]) -> List[bool]:
+        # Linhas com o mesmo conteudo de uma transação já gravada (ou de outra linha do lote) não são inseridas
+        rows = [with_content_hash(row) for row in rows]
+        with self.db as db:
+            existing = set()
+            for chunk in chunked({row["content_hash"] for row in rows}):
+                existing.update(db.session.scalars(select(Transaction.content_hash).where(Transaction.content_hash.in_(chunk))))
+            outcomes = [False] * len(rows)
+            to_insert = []
+            for index, row in enumerate(rows):
+                if row["content_hash"] in existing:
+                    continue
+                existing.add(row["content_hash"])
+                to_insert.append(index)
+            inserted = bulk_insert(db.session, Transaction, [rows[index] for index in to_insert])
+            for index, was_inserted in zip(to_insert, inserted):
+                outcomes[index] = was_inserted
+            db.session.commit()
+            return outcomes
+    
     def update(self,
             id: str,
             date: datetime = None,
             description: str = None,
-            amount: float = None,
+            amount: int = None,
             transaction_type: str = None,
             paid: bool = None,
             ignore: bool = None,
@@ -74,34 +426,54 @@ class TransactionRepository:
             account_id_destination: str = None,
             created_at: datetime = None,
             user_id: str = None) -> Optional[Transaction]:
+        fields_to_update = {
+            "date": date,
+            "description": description,
+            "amount": amount,
+            "transaction_type": transaction_type,
+            "paid": paid,
+            "ignore": ignore,
+            "visible": visible,
+            "category_id": category_id,
+            "tag_id": tag_id,
+            "account_id_origin": account_id_origin,
+            "account_id_destination": account_id_destination,
+            "created_at": created_at,
+            "user_id": user_id,
+        }
+        
+        # Só atualiza os campos que não forem None
+        values = {field: value for field, value in fields_to_update.items() if value is not None}
+        
+        if not values:
+            return self.select_from_id(id=id)
+        
+        hash_fields = values.keys() & {"date", "amount", "description", "account_id_destination"}
+        if len(hash_fields) == 4:
+            # Com todos os campos do hash em mãos (caso do adapter) o hash vai no mesmo UPDATE
+            values["content_hash"] = content_hash(date, amount, description, account_id_destination)
+        
         with self.db as db:
-            transaction = db.session.query(Transaction).filter(Transaction.id == id).one_or_none()
-            
-            if transaction:
-                return None
-            
-            fields_to_update = {
-                "date": date,
-                "description": description,
-                "amount": amount,
-                "transaction_type": transaction_type,
-                "paid": paid,
-                "ignore": ignore,
-                "visible": visible,
-                "category_id": category_id,
-                "tag_id": tag_id,
-                "account_id_origin": account_id_origin,
-                "account_id_destination": account_id_destination,
-                "created_at": created_at,
-                "user_id": user_id,
-            }
-            
-            for field, value in fields_to_update.items():
-                if value is not None:  # Só atualiza se o valor não for None
-                    setattr(transaction, field, value)
+            # Um unico 'UPDATE ... RETURNING' atualiza e devolve o registro em uma ida ao banco
+            data = db.session.scalars(
+                update(Transaction)
+                .where(Transaction.id == id)
+                .values(**values)
+                .returning(Transaction)
+            ).one_or_none()
+            # Atualizações parciais precisam dos valores gravados para recalcular o hash, que sai em um segundo UPDATE
+            if data is not None and hash_fields and "content_hash" not in values:
+                data.content_hash = content_hash(data.date, data.amount, data.description, data.account_id_destination)
+            db.session.commit()
+            return data
+    
+    def update_categories(self, changes: Dict[str, str]) -> None:
+        # Recategorização em lote: um unico UPDATE por chave primaria executado com executemany e um commit
+        if not changes:
+            return
+        with self.db as db:
+            db.session.execute(update(Transaction), [{"id": id, "category_id": category_id} for id, category_id in changes.items()])
             db.session.commit()
-            
-            return self.select_from_id(id=id)
     
     def delete(self, id: str) -> None:
         with self.db as db:
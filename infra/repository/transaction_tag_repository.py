@@ -1,13 +1,15 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Iterator
+from sqlalchemy import update
 
 from infra.entities import TransactionTag
 from infra.configs import DBConnectionHandler
+from infra.repository.utils import bulk_insert, iter_entities, select_by_ids
 
 
 class TransactionTagRepository:
-    def __init__(self) -> None:
-        self.db = DBConnectionHandler()
+    def __init__(self, connection_string: Optional[str] = None) -> None:
+        self.db = DBConnectionHandler(connection_string=connection_string)
     
     def select(self) -> List[TransactionTag]:
         with self.db as db:
@@ -16,6 +18,9 @@ class TransactionTagRepository:
                 .all()
         return data
     
+    def iter_all(self, batch_size: int = 1000) -> Iterator[TransactionTag]:
+        return iter_entities(self.db.get_engine(), TransactionTag, batch_size=batch_size)
+    
     def select_from_id(self, id: str) -> Optional[TransactionTag]:
         with self.db as db:
             return db.session\
@@ -23,6 +28,11 @@ class TransactionTagRepository:
                 .filter(TransactionTag.id == id)\
                 .one_or_none()
     
+    def select_from_ids(self, ids: List[str]) -> List[TransactionTag]:
+        # Ids inexistentes ficam de fora, a ordem do resultado não segue a de 'ids'
+        with self.db as db:
+            return select_by_ids(db.session, TransactionTag, ids)
+    
     def insert(self,
             id: str,
             name: str,
@@ -39,32 +49,39 @@ class TransactionTagRepository:
             db.session.commit()
             return new_transaction_tag
     
-    def update(self, id: str = None,
+    def insert_many(self, rows: List[dict]) -> List[bool]:
+        with self.db as db:
+            outcomes = bulk_insert(db.session, TransactionTag, rows)
+            db.session.commit()
+            return outcomes
+    
+    def update(self,
+            id: str,
             name: str = None,
             created_at: datetime = None,
             user_id: str = None) -> Optional[TransactionTag]:
+        fields_to_update = {
+            "name": name,
+            "created_at": created_at,
+            "user_id": user_id,
+        }
+        
+        # Só atualiza os campos que não forem None
+        values = {field: value for field, value in fields_to_update.items() if value is not None}
+        
+        if not values:
+            return self.select_from_id(id=id)
+        
         with self.db as db:
-            transaction_tag = db.session\
-                .query(TransactionTag)\
-                .filter(TransactionTag.id == id)\
-                .one_or_none()
-            
-            if not transaction_tag:
-                return None
-            
-            fields_to_update = {
-                "name": name,
-                "created_at": created_at,
-                "user_id": user_id,
-            }
-            
-            for field, value in fields_to_update.items():
-                if value is not None:
-                    setattr(transaction_tag, field, value)
-            
+            # Um unico 'UPDATE ... RETURNING' atualiza e devolve o registro em uma ida ao banco
+            data = db.session.scalars(
+                update(TransactionTag)
+                .where(TransactionTag.id == id)
+                .values(**values)
+                .returning(TransactionTag)
+            ).one_or_none()
             db.session.commit()
-            
-            return self.select_from_id(id=id)
+            return data
     
     def delete(self, id: str) -> None:
         with self.db as db:
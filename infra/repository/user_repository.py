@@ -1,29 +1,39 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Iterator
+from sqlalchemy import update
 
 from infra.entities import User
 from infra.configs import DBConnectionHandler
+from infra.repository.utils import bulk_insert, iter_entities, select_by_ids
 
 
 class UserRepository:
-    def __init__(self) -> None:
-        self.db = DBConnectionHandler()
+    def __init__(self, connection_string: Optional[str] = None) -> None:
+        self.db = DBConnectionHandler(connection_string=connection_string)
     
     def select(self) -> List[User]:
-        with DBConnectionHandler() as db:
+        with self.db as db:
             data = db.session\
                 .query(User)\
                 .all()
             return data
     
+    def iter_all(self, batch_size: int = 1000) -> Iterator[User]:
+        return iter_entities(self.db.get_engine(), User, batch_size=batch_size)
+    
     def select_from_id(self, id: str) -> Optional[User]:
-        with DBConnectionHandler() as db:
+        with self.db as db:
             data = db.session\
                 .query(User)\
                 .filter(User.id==id)\
                 .one_or_none()
             return data
     
+    def select_from_ids(self, ids: List[str]) -> List[User]:
+        # Ids inexistentes ficam de fora, a ordem do resultado não segue a de 'ids'
+        with self.db as db:
+            return select_by_ids(db.session, User, ids)
+    
     def insert(self, id:str, nickname: str, created_at: datetime) -> User:
         with self.db as db:
             new_user = User(
@@ -35,19 +45,39 @@ class UserRepository:
             db.session.commit()
             return new_user
     
-    def update(self, id:str, nickname:str=None, created_at:datetime=None) -> Optional[User]:
-        with DBConnectionHandler() as db:
-            user = db.session.query(User).filter(User.id == id).one_or_none()
-            if user:
-                if nickname:
-                    user.nickname = nickname
-                if created_at:
-                    user.created_at = created_at
-                db.session.commit()
-                return self.select_from_id(id=id)
-            return None
+    def insert_many(self, rows: List[dict]) -> List[bool]:
+        with self.db as db:
+            outcomes = bulk_insert(db.session, User, rows)
+            db.session.commit()
+            return outcomes
+    
+    def update(self,
+            id: str,
+            nickname: str = None,
+            created_at: datetime = None) -> Optional[User]:
+        fields_to_update = {
+            "nickname": nickname,
+            "created_at": created_at,
+        }
+        
+        # Só atualiza os campos que não forem None
+        values = {field: value for field, value in fields_to_update.items() if value is not None}
+        
+        if not values:
+            return self.select_from_id(id=id)
+        
+        with self.db as db:
+            # Um unico 'UPDATE ... RETURNING' atualiza e devolve o registro em uma ida ao banco
+            data = db.session.scalars(
+                update(User)
+                .where(User.id == id)
+                .values(**values)
+                .returning(User)
+            ).one_or_none()
+            db.session.commit()
+            return data
     
     def delete(self, id: str) -> None:
-        with DBConnectionHandler() as db:
+        with self.db as db:
             db.session.query(User).filter(User.id == id).delete()
             db.session.commit()
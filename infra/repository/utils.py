@@ -0,0 +1,92 @@
+import sqlite3
+import hashlib
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Set, Union
+
+from sqlalchemy import select, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+def _get_sqlite_max_variables() -> int:
+    # 'getlimit' só existe a partir do Python 3.11, versões antigas do SQLite aceitam no maximo 999
+    try:
+        return sqlite3.connect(":memory:").getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    except AttributeError:
+        return 999
+
+
+# Deixa uma folga para os outros parametros da mesma consulta
+SQLITE_MAX_VARIABLES = max(_get_sqlite_max_variables() - 99, 100)
+
+
+def content_hash(date: Union[datetime, str], amount: int, description: str, account_id: Union[str, bytes]) -> str:
+    # Identifica a mesma linha de extrato importada duas vezes: dia, valor em centavos, descrição e conta de destino.
+    # Aceita tanto os valores dos repositórios quanto os gravados no banco (data em texto e id em bytes)
+    day = date.strftime("%Y-%m-%d") if isinstance(date, datetime) else str(date)[:10]
+    account = account_id.hex() if isinstance(account_id, bytes) else str(account_id).replace("-", "").lower()
+    normalized = " ".join(str(description).split()).casefold()
+    return hashlib.blake2b(f"{day}|{int(amount)}|{normalized}|{account}".encode(), digest_size=16).hexdigest()
+
+
+def with_content_hash(row: dict) -> dict:
+    if row.get("content_hash") is None:
+        row = {**row, "content_hash": content_hash(row["date"], row["amount"], row["description"], row["account_id_destination"])}
+    return row
+
+
+def chunked(values: Iterable[Any], size: int = SQLITE_MAX_VARIABLES) -> Iterator[List[Any]]:
+    chunk = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def select_existing_ids(session: Session, entity: Any, ids: Iterable[str]) -> Set[str]:
+    # Uma consulta IN por bloco de ids, respeitando o limite de variaveis do SQLite
+    existing = set()
+    for chunk in chunked(set(ids)):
+        existing.update(session.scalars(select(entity.id).where(entity.id.in_(chunk))))
+    return existing
+
+
+def select_by_ids(session: Session, entity: Any, ids: Iterable[str]) -> List[Any]:
+    # Uma consulta IN por bloco de ids no lugar de uma consulta por id, ids repetidos são buscados uma vez
+    data = []
+    for chunk in chunked(dict.fromkeys(ids), SQLITE_MAX_VARIABLES):
+        data.extend(session.scalars(select(entity).where(entity.id.in_(chunk))))
+    return data
+
+
+def bulk_insert(session: Session, entity: Any, rows: List[dict]) -> List[bool]:
+    # Retorna para cada linha se ela foi inserida (False quando o id já existe no banco ou no lote)
+    if not rows:
+        return []
+    existing = select_existing_ids(session, entity, (row["id"] for row in rows))
+    outcomes = []
+    to_insert = []
+    for row in rows:
+        if row["id"] in existing:
+            outcomes.append(False)
+            continue
+        existing.add(row["id"])
+        to_insert.append(row)
+        outcomes.append(True)
+    if to_insert:
+        # Uma lista de dicionarios faz o SQLAlchemy usar executemany em um unico INSERT
+        session.execute(insert(entity), to_insert)
+    return outcomes
+
+
+def iter_entities(engine: Engine, entity: Any, batch_size: int = 1000, conditions: Iterable[Any] = ()) -> Iterator[Any]:
+    # Sessão propria para que commits de outros repositórios na mesma thread não fechem o cursor aberto
+    with Session(engine, expire_on_commit=False) as session:
+        # 'yield_per' busca as linhas do cursor em blocos em vez de carregar o resultado inteiro
+        result = session.scalars(select(entity).where(*conditions).execution_options(yield_per=batch_size))
+        # O mapa de identidade guarda referencias fracas, então os blocos já entregues podem ser coletados
+        for partition in result.partitions():
+            yield from partition
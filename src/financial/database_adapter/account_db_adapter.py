@@ -1,16 +1,57 @@
+import os
 from uuid import UUID
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
 
-from infra import AccountRepository
-from src.financial.models import AccountModel
+from infra import AccountRepository, DatabaseSettings, EngineRegistry
+from infra.configs import UUIDType
+from src.financial.models import AccountModel, BalanceMismatchModel, ReconciliationReportModel
+from src.financial.utils.money import to_cents, from_cents
 from src.financial.interfaces import DatabaseAdapterInterface
 from src.financial.exceptions.database_adapter_errors.account_db_adapter_error import AccountDBAdapterError, AccountAlreadyExistsError, AccountNotFoundError, UnexpectedArgumentTypeError
 
 
+def reconcile_partition(
+        connection_string: str,
+        uuid_storage: str,
+        first_id: Optional[str],
+        last_id: Optional[str],
+        ids: Optional[List[str]]) -> Tuple[int, List[Tuple[str, int, int]]]:
+    # Roda dentro dos processos do pool, cada um com a sua propria engine e conexão
+    EngineRegistry.get_engine(DatabaseSettings(connection_string=connection_string, uuid_storage=uuid_storage))
+    rows = AccountRepository(connection_string=connection_string).reconcile_balances(first_id=first_id, last_id=last_id, ids=ids)
+    # Só as diferenças voltam para o processo principal
+    return len(rows), [row for row in rows if row[1] != row[2]]
+
+
 class AccountDatabaseAdapter(DatabaseAdapterInterface):
     _db = AccountRepository()
     
+    @classmethod
+    def _to_row(cls, account: AccountModel) -> dict:
+        return {
+            "id": account.id.hex,
+            "name": account.name,
+            "description": account.description,
+            "tag_id": getattr(account.tag_id, 'hex', account.tag_id),
+            "balance": to_cents(account.balance),
+            "created_at": account.created_at,
+            "user_id": account.user_id.hex,
+        }
+    
+    @classmethod
+    def _to_model(cls, data) -> AccountModel:
+        return AccountModel(
+            id=UUID(data.id),
+            name=data.name,
+            description=data.description,
+            balance=from_cents(data.balance),
+            tag_id=data.tag_id,
+            created_at=data.created_at,
+            user_id=UUID(data.user_id),
+        )
+    
     @classmethod
     def insert(cls, account: AccountModel) -> None:
         # Valida o tipo do argumento 'account'
@@ -23,18 +64,17 @@ class AccountDatabaseAdapter(DatabaseAdapterInterface):
         if exist_account:
             raise AccountAlreadyExistsError()
         
-        result = cls._db.insert(
-            id=account.id.hex,
-            name=account.name,
-            description=account.description,
-            tag_id=getattr(account.tag_id, 'hex', account.tag_id),
-            balance=account.balance,
-            created_at=account.created_at,
-            user_id=account.user_id.hex,
-        )
+        result = cls._db.insert(**cls._to_row(account))
         
         return result is not None
     
+    @classmethod
+    def insert_many(cls, accounts: List[AccountModel]) -> List[bool]:
+        # Valida o lote inteiro antes de escrever qualquer linha
+        if not isinstance(accounts, (list, tuple)) or not all(isinstance(account, AccountModel) for account in accounts):
+            raise UnexpectedArgumentTypeError()
+        return cls._db.insert_many([cls._to_row(account) for account in accounts])
+    
     @classmethod
     def update(cls, id: UUID, account: AccountModel) -> None:
         # Valida o tipo do argumento 'id'
@@ -45,38 +85,99 @@ class AccountDatabaseAdapter(DatabaseAdapterInterface):
         if not isinstance(account, AccountModel):
             raise UnexpectedArgumentTypeError()
         
-        current_account = cls._db.select_from_id(id=id.hex)
-        
-        # Valida se a conta existe
-        if current_account is None:
-            raise AccountNotFoundError()
-        
         # Valida se o 'id' foi modificado
-        if account.id and account.id != UUID(current_account.id):
+        if account.id and account.id != id:
+            # Registro inexistente tem prioridade sobre a inconsistencia do id
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise AccountNotFoundError()
             raise AccountDBAdapterError("Incosistencia entre o parametro 'id' e a proprienda id do paramentro 'account'")
         
-        # Aqui cria um mapa de atualizações com o novo valor e o valor atual
-        updates_map = {
-            "name": {"new_value": account.name, "current_value": current_account.name},
-            "description": {"new_value": account.description, "current_value": current_account.description},
-            "tag_id": {"new_value": account.tag_id.hex, "current_value": current_account.tag_id},
-            "balance": {"new_value": account.balance, "current_value": current_account.balance},
-            "created_at": {"new_value": account.created_at, "current_value": current_account.created_at},
-            "user_id": {"new_value": account.user_id.hex, "current_value": current_account.user_id},
-        }
+        # Envia todos os campos em um unico 'UPDATE ... RETURNING', sem ler o registro antes
+        updates_to_apply = cls._to_row(account)
+        updates_to_apply.pop("id")
         
-        # Aqui cria um dicionário com as atualizações que serão feitas
-        updates_to_apply = {
-            key: value["new_value"]
-            if value["new_value"] != value["current_value"]
-            else None # Isso aqui é necessario pois pode haver necidade de fornecer o argumento mesmo que vazio
-            for key, value in updates_map.items()
-        }
+        result = cls._db.update(id=id.hex, **updates_to_apply)
+        if not result:
+            # A consulta extra só acontece no caminho de erro, para diferenciar registro inexistente de falha
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise AccountNotFoundError()
+            raise AccountDBAdapterError("Falha ao tentar atualizar 'Account'")
+    
+    @classmethod
+    def add_to_balance(cls, id: UUID, delta: Decimal) -> Decimal:
+        # Valida o tipo dos argumentos 'id' e 'delta'
+        if not isinstance(id, UUID) or not isinstance(delta, Decimal):
+            raise UnexpectedArgumentTypeError()
+        balance = cls._db.add_to_balance(id=id.hex, delta=to_cents(delta))
+        if balance is None:
+            raise AccountNotFoundError()
+        return from_cents(balance)
+    
+    @classmethod
+    def add_to_balances(cls, deltas: Dict[UUID, Decimal]) -> Dict[UUID, Decimal]:
+        # Valida o tipo do argumento 'deltas'
+        if not isinstance(deltas, dict) or not all(isinstance(id, UUID) and isinstance(delta, Decimal) for id, delta in deltas.items()):
+            raise UnexpectedArgumentTypeError()
+        balances = cls._db.add_to_balances({id.hex: to_cents(delta) for id, delta in deltas.items()})
+        # O repositorio não aplica nada quando alguma das contas não existe
+        if balances is None:
+            raise AccountNotFoundError()
+        return {UUID(id): from_cents(balance) for id, balance in balances.items()}
+    
+    @classmethod
+    def _reconcile_tasks(cls, ids: List[str], partitions: int, incremental: bool) -> List[tuple]:
+        size = max(-(-len(ids) // partitions), 1)
+        chunks = [ids[start:start + size] for start in range(0, len(ids), size)]
+        if incremental:
+            # Ids espalhados vão como lista, cada processo faz consultas IN
+            return [(None, None, chunk) for chunk in chunks]
+        # Na conciliação completa cada processo recebe só as pontas de um intervalo continuo de ids
+        return [(chunk[0], chunk[-1], None) for chunk in chunks]
+    
+    @classmethod
+    def reconcile_balances(cls, incremental: bool = False, fix: bool = False, workers: Optional[int] = None) -> ReconciliationReportModel:
+        # Valida o tipo dos argumentos
+        if not isinstance(incremental, bool) or not isinstance(fix, bool):
+            raise UnexpectedArgumentTypeError()
+        if workers is not None and (not isinstance(workers, int) or isinstance(workers, bool) or workers <= 0):
+            raise UnexpectedArgumentTypeError()
+        workers = workers or os.cpu_count() or 1
+        
+        if incremental:
+            marker, ids = cls._db.select_marked_ids()
+        else:
+            marker, ids = None, cls._db.select_ids()
+        # Mais partições que processos para que um intervalo com muitas transações não segure o pool inteiro
+        tasks = cls._reconcile_tasks(ids, workers * 4, incremental)
+        connection_string = cls._db.db.get_connection_string()
+        uuid_storage = UUIDType.get_storage(cls._db.db.get_engine().dialect)
+        arguments = [(connection_string, uuid_storage, *task) for task in tasks]
+        if workers == 1 or len(tasks) <= 1:
+            results = [reconcile_partition(*argument) for argument in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(reconcile_partition, *zip(*arguments)))
         
-        if updates_to_apply:
-            result = cls._db.update(id=id.hex, **updates_to_apply)
-            if not result:
-                raise AccountDBAdapterError("Falha ao tentar atualizar 'Account'")
+        checked = sum(count for count, _ in results)
+        rows = [row for _, mismatches in results for row in mismatches]
+        if fix and rows:
+            # Aplica a diferença e não o saldo esperado, lançamentos feitos durante a conciliação são mantidos
+            if cls._db.add_to_balances({id: expected - stored for id, stored, expected in rows}) is None:
+                raise AccountNotFoundError()
+        if marker is not None:
+            cls._db.clear_marks(up_to=marker)
+            # Diferenças não corrigidas continuam marcadas para aparecer na proxima conciliação incremental
+            if not fix and rows:
+                cls._db.mark_ids([id for id, _, _ in rows])
+        return ReconciliationReportModel(
+            incremental=incremental,
+            checked=checked,
+            mismatches=[
+                BalanceMismatchModel(account_id=UUID(id), stored_balance=from_cents(stored), expected_balance=from_cents(expected))
+                for id, stored, expected in rows
+            ],
+            fixed=fix and bool(rows),
+        )
     
     @classmethod
     def delete(cls, id: UUID) -> None:
@@ -94,33 +195,29 @@ class AccountDatabaseAdapter(DatabaseAdapterInterface):
         data = cls._db.select_from_id(id=id.hex)
         
         if data:
-            return AccountModel(
-                id=UUID(data.id),
-                name=data.name,
-                description=data.description,
-                tag_id=data.tag_id,
-                balance=Decimal(f"{data.balance:.2f}"),
-                created_at=data.created_at,
-                user_id=UUID(data.user_id),
-            )
+            return cls._to_model(data)
         return None
     
+    @classmethod
+    def get_many(cls, ids: List[UUID]) -> Dict[UUID, AccountModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise UnexpectedArgumentTypeError()
+        # Uma consulta para todos os ids, os que não existem ficam fora do dicionario
+        models = {model.id: model for model in map(cls._to_model, cls._db.select_from_ids(ids=[id.hex for id in ids]))}
+        return {id: models[id] for id in ids if id in models}
+    
     @classmethod
     def get_all(cls) -> List[AccountModel]:
         data = cls._db.select()
         if data:
-            result = []
-            for account in data:
-                result.append(
-                    AccountModel(
-                        id=UUID(account.id),
-                        name=account.name,
-                        description=account.description,
-                        balance=Decimal(f"{account.balance:.2f}"),
-                        tag_id=account.tag_id,
-                        created_at=account.created_at,
-                        user_id=UUID(account.user_id),
-                    )
-                )
-            return result
+            return [cls._to_model(account) for account in data]
         return []
+    
+    @classmethod
+    def iter_all(cls, batch_size: int = 1000) -> Iterator[AccountModel]:
+        # Valida o tipo do argumento 'batch_size'
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size <= 0:
+            raise UnexpectedArgumentTypeError()
+        # Converte os registros conforme chegam do banco, sem montar a lista inteira em memória
+        return (cls._to_model(data) for data in cls._db.iter_all(batch_size=batch_size))
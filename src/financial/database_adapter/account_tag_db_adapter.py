@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from infra import AccountTagRepository
 from src.financial.models import AccountTagModel
@@ -10,6 +10,24 @@ from src.financial.exceptions.database_adapter_errors import account_tag_db_adap
 class AccountTagDatabaseAdapter(DatabaseAdapterInterface):
     _db = AccountTagRepository()
     
+    @classmethod
+    def _to_row(cls, account_tag: AccountTagModel) -> dict:
+        return {
+            "id": account_tag.id.hex,
+            "name": account_tag.name,
+            "created_at": account_tag.created_at,
+            "user_id": account_tag.user_id.hex,
+        }
+    
+    @classmethod
+    def _to_model(cls, data) -> AccountTagModel:
+        return AccountTagModel(
+            id=UUID(data.id),
+            name=data.name,
+            created_at=data.created_at,
+            user_id=UUID(data.user_id),
+        )
+    
     @classmethod
     def insert(cls, account_tag: AccountTagModel) -> None:
         # Valida o tipo do argumento 'account_tag'
@@ -22,15 +40,17 @@ class AccountTagDatabaseAdapter(DatabaseAdapterInterface):
         if exist_account_tag:
             raise account_tag_db_adapter_error.AccountTagAlreadyExistsError()
         
-        result = cls._db.insert(
-            id=account_tag.id.hex,
-            name=account_tag.name,
-            created_at=account_tag.created_at,
-            user_id=account_tag.user_id.hex,
-        )
+        result = cls._db.insert(**cls._to_row(account_tag))
         
         return result is not None
     
+    @classmethod
+    def insert_many(cls, account_tags: List[AccountTagModel]) -> List[bool]:
+        # Valida o lote inteiro antes de escrever qualquer linha
+        if not isinstance(account_tags, (list, tuple)) or not all(isinstance(account_tag, AccountTagModel) for account_tag in account_tags):
+            raise account_tag_db_adapter_error.UnexpectedArgumentTypeError()
+        return cls._db.insert_many([cls._to_row(account_tag) for account_tag in account_tags])
+    
     @classmethod
     def update(cls, id: UUID, account_tag: AccountTagModel) -> None:
         # Valida o tipo do argumento 'id'
@@ -41,35 +61,23 @@ class AccountTagDatabaseAdapter(DatabaseAdapterInterface):
         if not isinstance(account_tag, AccountTagModel):
             raise account_tag_db_adapter_error.UnexpectedArgumentTypeError()
         
-        current_account_tag = cls._db.select_from_id(id=id.hex)
-        
-        # Valida se a conta existe
-        if current_account_tag is None:
-            raise account_tag_db_adapter_error.AccountTagNotFoundError()
-        
         # Valida se o 'id' foi modificado
-        if account_tag.id and account_tag.id != UUID(current_account_tag.id):
+        if account_tag.id and account_tag.id != id:
+            # Registro inexistente tem prioridade sobre a inconsistencia do id
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise account_tag_db_adapter_error.AccountTagNotFoundError()
             raise account_tag_db_adapter_error.AccountTagDBAdapterError("Incosistencia entre o parametro 'id' e a proprienda id do paramentro 'account_tag'")
         
-        # Aqui cria um mapa de atualizações com o novo valor e o valor atual
-        updates_map = {
-            "name": {"new_value": account_tag.name, "current_value": current_account_tag.name},
-            "created_at": {"new_value": account_tag.created_at, "current_value": current_account_tag.created_at},
-            "user_id": {"new_value": account_tag.user_id.hex, "current_value": current_account_tag.user_id},
-        }
+        # Envia todos os campos em um unico 'UPDATE ... RETURNING', sem ler o registro antes
+        updates_to_apply = cls._to_row(account_tag)
+        updates_to_apply.pop("id")
         
-        # Aqui cria um dicionário com as atualizações que serão feitas
-        updates_to_apply = {
-            key: value["new_value"]
-            if value["new_value"] != value["current_value"]
-            else None # Isso aqui é necessario pois pode haver necidade de fornecer o argumento mesmo que vazio
-            for key, value in updates_map.items()
-        }
-        
-        if updates_to_apply:
-            result = cls._db.update(id=id.hex, **updates_to_apply)
-            if not result:
-                raise account_tag_db_adapter_error.AccountTagDBAdapterError("Falha ao tentar atualizar 'AccountTag'")
+        result = cls._db.update(id=id.hex, **updates_to_apply)
+        if not result:
+            # A consulta extra só acontece no caminho de erro, para diferenciar registro inexistente de falha
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise account_tag_db_adapter_error.AccountTagNotFoundError()
+            raise account_tag_db_adapter_error.AccountTagDBAdapterError("Falha ao tentar atualizar 'AccountTag'")
     
     @classmethod
     def delete(cls, id: UUID) -> None:
@@ -87,27 +95,29 @@ class AccountTagDatabaseAdapter(DatabaseAdapterInterface):
         data = cls._db.select_from_id(id=id.hex)
         
         if data:
-            return AccountTagModel(
-                id=UUID(data.id),
-                name=data.name,
-                created_at=data.created_at,
-                user_id=UUID(data.user_id),
-            )
+            return cls._to_model(data)
         return None
     
+    @classmethod
+    def get_many(cls, ids: List[UUID]) -> Dict[UUID, AccountTagModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise account_tag_db_adapter_error.UnexpectedArgumentTypeError()
+        # Uma consulta para todos os ids, os que não existem ficam fora do dicionario
+        models = {model.id: model for model in map(cls._to_model, cls._db.select_from_ids(ids=[id.hex for id in ids]))}
+        return {id: models[id] for id in ids if id in models}
+    
     @classmethod
     def get_all(cls) -> List[AccountTagModel]:
         data = cls._db.select()
         if data:
-            result = []
-            for account_tag in data:
-                result.append(
-                    AccountTagModel(
-                        id=UUID(account_tag.id),
-                        name=account_tag.name,
-                        created_at=account_tag.created_at,
-                        user_id=UUID(account_tag.user_id),
-                    )
-                )
-            return result
+            return [cls._to_model(account_tag) for account_tag in data]
         return []
+    
+    @classmethod
+    def iter_all(cls, batch_size: int = 1000) -> Iterator[AccountTagModel]:
+        # Valida o tipo do argumento 'batch_size'
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size <= 0:
+            raise account_tag_db_adapter_error.UnexpectedArgumentTypeError()
+        # Converte os registros conforme chegam do banco, sem montar a lista inteira em memória
+        return (cls._to_model(data) for data in cls._db.iter_all(batch_size=batch_size))
@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from infra import TransactionCategoryRepository
 from src.financial.models import TransactionCategoryModel
@@ -10,6 +10,24 @@ from src.financial.exceptions.database_adapter_errors import transaction_categor
 class TransactionCategoryDatabaseAdapter(DatabaseAdapterInterface):
     _db = TransactionCategoryRepository()
     
+    @classmethod
+    def _to_row(cls, transaction_category: TransactionCategoryModel) -> dict:
+        return {
+            "id": transaction_category.id.hex,
+            "name": transaction_category.name,
+            "created_at": transaction_category.created_at,
+            "user_id": transaction_category.user_id.hex,
+        }
+    
+    @classmethod
+    def _to_model(cls, data) -> TransactionCategoryModel:
+        return TransactionCategoryModel(
+            id=UUID(data.id),
+            name=data.name,
+            created_at=data.created_at,
+            user_id=UUID(data.user_id),
+        )
+    
     @classmethod
     def insert(cls, transaction_category: TransactionCategoryModel) -> None:
         # Valida o tipo do argumento 'transaction_category'
@@ -22,15 +40,17 @@ class TransactionCategoryDatabaseAdapter(DatabaseAdapterInterface):
         if exist_transaction_category:
             raise transaction_category_db_adapter_error.TransactionCategoryAlreadyExistsError()
         
-        result = cls._db.insert(
-            id=transaction_category.id.hex,
-            name=transaction_category.name,
-            created_at=transaction_category.created_at,
-            user_id=transaction_category.user_id.hex,
-        )
+        result = cls._db.insert(**cls._to_row(transaction_category))
         
         return result is not None
     
+    @classmethod
+    def insert_many(cls, transaction_categorys: List[TransactionCategoryModel]) -> List[bool]:
+        # Valida o lote inteiro antes de escrever qualquer linha
+        if not isinstance(transaction_categorys, (list, tuple)) or not all(isinstance(transaction_category, TransactionCategoryModel) for transaction_category in transaction_categorys):
+            raise transaction_category_db_adapter_error.UnexpectedArgumentTypeError()
+        return cls._db.insert_many([cls._to_row(transaction_category) for transaction_category in transaction_categorys])
+    
     @classmethod
     def update(cls, id: UUID, transaction_category: TransactionCategoryModel) -> None:
         # Valida o tipo do argumento 'id'
@@ -41,35 +61,23 @@ class TransactionCategoryDatabaseAdapter(DatabaseAdapterInterface):
         if not isinstance(transaction_category, TransactionCategoryModel):
             raise transaction_category_db_adapter_error.UnexpectedArgumentTypeError()
         
-        current_transaction_category = cls._db.select_from_id(id=id.hex)
-        
-        # Valida se a conta existe
-        if current_transaction_category is None:
-            raise transaction_category_db_adapter_error.TransactionCategoryNotFoundError()
-        
         # Valida se o 'id' foi modificado
-        if transaction_category.id and transaction_category.id != UUID(current_transaction_category.id):
+        if transaction_category.id and transaction_category.id != id:
+            # Registro inexistente tem prioridade sobre a inconsistencia do id
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise transaction_category_db_adapter_error.TransactionCategoryNotFoundError()
             raise transaction_category_db_adapter_error.TransactionCategoryDBAdapterError("Incosistencia entre o parametro 'id' e a proprienda id do paramentro 'transaction_category'")
         
-        # Aqui cria um mapa de atualizações com o novo valor e o valor atual
-        updates_map = {
-            "name": {"new_value": transaction_category.name, "current_value": current_transaction_category.name},
-            "created_at": {"new_value": transaction_category.created_at, "current_value": current_transaction_category.created_at},
-            "user_id": {"new_value": transaction_category.user_id.hex, "current_value": current_transaction_category.user_id},
-        }
+        # Envia todos os campos em um unico 'UPDATE ... RETURNING', sem ler o registro antes
+        updates_to_apply = cls._to_row(transaction_category)
+        updates_to_apply.pop("id")
         
-        # Aqui cria um dicionário com as atualizações que serão feitas
-        updates_to_apply = {
-            key: value["new_value"]
-            if value["new_value"] != value["current_value"]
-            else None # Isso aqui é necessario pois pode haver necidade de fornecer o argumento mesmo que vazio
-            for key, value in updates_map.items()
-        }
-        
-        if updates_to_apply:
-            result = cls._db.update(id=id.hex, **updates_to_apply)
-            if not result:
-                raise transaction_category_db_adapter_error.TransactionCategoryDBAdapterError("Falha ao tentar atualizar 'TransactionCategory'")
+        result = cls._db.update(id=id.hex, **updates_to_apply)
+        if not result:
+            # A consulta extra só acontece no caminho de erro, para diferenciar registro inexistente de falha
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise transaction_category_db_adapter_error.TransactionCategoryNotFoundError()
+            raise transaction_category_db_adapter_error.TransactionCategoryDBAdapterError("Falha ao tentar atualizar 'TransactionCategory'")
     
     @classmethod
     def delete(cls, id: UUID) -> None:
@@ -87,27 +95,29 @@ class TransactionCategoryDatabaseAdapter(DatabaseAdapterInterface):
         data = cls._db.select_from_id(id=id.hex)
         
         if data:
-            return TransactionCategoryModel(
-                id=UUID(data.id),
-                name=data.name,
-                created_at=data.created_at,
-                user_id=UUID(data.user_id),
-            )
+            return cls._to_model(data)
         return None
     
+    @classmethod
+    def get_many(cls, ids: List[UUID]) -> Dict[UUID, TransactionCategoryModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise transaction_category_db_adapter_error.UnexpectedArgumentTypeError()
+        # Uma consulta para todos os ids, os que não existem ficam fora do dicionario
+        models = {model.id: model for model in map(cls._to_model, cls._db.select_from_ids(ids=[id.hex for id in ids]))}
+        return {id: models[id] for id in ids if id in models}
+    
     @classmethod
     def get_all(cls) -> List[TransactionCategoryModel]:
         data = cls._db.select()
         if data:
-            result = []
-            for transaction_category in data:
-                result.append(
-                    TransactionCategoryModel(
-                        id=UUID(transaction_category.id),
-                        name=transaction_category.name,
-                        created_at=transaction_category.created_at,
-                        user_id=UUID(transaction_category.user_id),
-                    )
-                )
-            return result
+            return [cls._to_model(transaction_category) for transaction_category in data]
         return []
+    
+    @classmethod
+    def iter_all(cls, batch_size: int = 1000) -> Iterator[TransactionCategoryModel]:
+        # Valida o tipo do argumento 'batch_size'
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size <= 0:
+            raise transaction_category_db_adapter_error.UnexpectedArgumentTypeError()
+        # Converte os registros conforme chegam do banco, sem montar a lista inteira em memória
+        return (cls._to_model(data) for data in cls._db.iter_all(batch_size=batch_size))
@@ -1,15 +1,62 @@
+import re
 from uuid import UUID
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
+from datetime import datetime, timedelta
 from decimal import Decimal
 
 from infra.repository import TransactionRepository
-from src.financial.models import TransactionModel, TransactionTypes
+from src.financial.enums import SeriesFrequencies
+from src.financial.models import TransactionModel, TransactionTypes, TransactionQueryModel, TransactionPageModel, BalanceSeriesModel, CategoryReportRowModel, CategoryReportModel, TransactionRollupModel, TransactionSearchPageModel
+from src.financial.utils.money import to_cents, from_cents
+from src.financial.utils.balance_series import running_balances
 from src.financial.interfaces import DatabaseAdapterInterface
 from src.financial.exceptions.database_adapter_errors import transaction_db_adapter_error
 
 
 class TransactionDatabaseAdapter(DatabaseAdapterInterface):
-    _db = TransactionRepository()
+    # Consultas de relatorio, saldo e rollup só existem no repositório de transações, fora do 'ProtocolRepository'
+    _db: TransactionRepository = TransactionRepository()
+    
+    @classmethod
+    def _to_row(cls, transaction: TransactionModel) -> dict:
+        # A coluna 'tag_id' não aceita NULL, a transação sem tag é recusada antes de chegar no banco
+        if transaction.tag_id is None:
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do atributo 'tag_id'")
+        return {
+            "id": transaction.id.hex,
+            "date": transaction.date,
+            "description": transaction.description,
+            "amount": to_cents(transaction.amount),
+            "transaction_type": transaction.transaction_type.value,
+            "paid": transaction.paid,
+            "ignore": transaction.ignore,
+            "visible": transaction.visible,
+            "category_id": transaction.category_id.hex,
+            "tag_id": transaction.tag_id.hex,
+            "account_id_origin": getattr(transaction.account_id_origin, "hex", None),
+            "account_id_destination": transaction.account_id_destination.hex,
+            "created_at": transaction.created_at,
+            "user_id": transaction.user_id.hex,
+        }
+    
+    @classmethod
+    def _to_model(cls, data) -> TransactionModel:
+        return TransactionModel(
+            id=UUID(data.id),
+            date=data.date,
+            description=data.description,
+            amount=from_cents(data.amount),
+            transaction_type=TransactionTypes(data.transaction_type),
+            paid=data.paid,
+            ignore=data.ignore,
+            visible=data.visible,
+            category_id=UUID(data.category_id),
+            tag_id=UUID(data.tag_id) if data.tag_id else None,
+            account_id_origin=UUID(data.account_id_origin) if data.account_id_origin else None,
+            account_id_destination=UUID(data.account_id_destination),
+            created_at=data.created_at,
+            user_id=UUID(data.user_id),
+        )
     
     @classmethod
     def insert(cls, transaction: TransactionModel) -> None:
@@ -23,25 +70,24 @@ class TransactionDatabaseAdapter(DatabaseAdapterInterface):
         if exist_trasaction:
             raise transaction_db_adapter_error.TransactionAlreadyExistsError()
         
-        result = cls._db.insert(
-            id=transaction.id.hex,
-            date=transaction.date,
-            description=transaction.description,
-            amount=transaction.amount,
-            transaction_type=transaction.transaction_type.value,
-            paid=transaction.paid,
-            ignore=transaction.ignore,
-            visible=transaction.visible,
-            category_id=transaction.category_id.hex,
-            tag_id=transaction.tag_id.hex,
-            account_id_origin=getattr(transaction.account_id_origin, "hex", None),
-            account_id_destination=transaction.account_id_destination.hex,
-            created_at=transaction.created_at,
-            user_id=transaction.user_id.hex,
-        )
+        result = cls._db.insert(**cls._to_row(transaction))
         
         return result is not None
     
+    @classmethod
+    def insert_many(cls, transactions: List[TransactionModel]) -> List[bool]:
+        # Valida o lote inteiro antes de escrever qualquer linha
+        if not isinstance(transactions, (list, tuple)) or not all(isinstance(transaction, TransactionModel) for transaction in transactions):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        return cls._db.insert_many([cls._to_row(transaction) for transaction in transactions])
+    
+    @classmethod
+    def import_many(cls, transactions: List[TransactionModel]) -> List[bool]:
+        # Como o 'insert_many', mas também descarta transações com o mesmo conteudo (dia, valor, descrição e conta) de uma já gravada
+        if not isinstance(transactions, (list, tuple)) or not all(isinstance(transaction, TransactionModel) for transaction in transactions):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        return cls._db.insert_many_deduplicated([cls._to_row(transaction) for transaction in transactions])
+    
     @classmethod
     def update(cls, id: UUID, transaction: TransactionModel) -> None:
         # Valida o tipo do argumento 'id'
@@ -52,44 +98,30 @@ class TransactionDatabaseAdapter(DatabaseAdapterInterface):
         if not isinstance(transaction, TransactionModel):
             raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
         
-        current_transaction = cls._db.select_from_id(id=id.hex)
-        
-        # Valida se existe um usuário com o id informado
-        if current_transaction is None:
-            raise transaction_db_adapter_error.TransactionNotFoundError()
-        
         # Valida se o 'id' foi modificado
-        if transaction.id and transaction.id != UUID(current_transaction.id):
+        if transaction.id and transaction.id != id:
+            # Registro inexistente tem prioridade sobre a inconsistencia do id
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise transaction_db_adapter_error.TransactionNotFoundError()
             raise transaction_db_adapter_error.TransactionDBAdapterError(error_message="Incosistencia entre o parametro 'id' e a proprienda id do paramentro 'transaction'")
         
-        updates_map = {
-            "date": {"new_value": transaction.date, "current_value": current_transaction.date},
-            "description": {"new_value": transaction.description, "current_value":current_transaction.description},
-            "amount": {"new_value": transaction.amount, "current_value":current_transaction.amount},
-            "transaction_type": {"new_value": transaction.transaction_type.value, "current_value": current_transaction.transaction_type},
-            "paid": {"new_value": transaction.paid, "current_value":current_transaction.paid},
-            "ignore": {"new_value": transaction.ignore, "current_value":current_transaction.ignore},
-            "visible": {"new_value": transaction.visible, "current_value":current_transaction.visible},
-            "category_id": {"new_value": transaction.category_id.hex, "current_value":current_transaction.category_id},
-            "tag_id": {"new_value": transaction.tag_id.hex, "current_value":current_transaction.tag_id},
-            "account_id_origin": {"new_value": getattr(transaction.account_id_origin, "hex", None), "current_value":current_transaction.account_id_origin},
-            "account_id_destination": {"new_value": transaction.account_id_destination.hex, "current_value":current_transaction.account_id_destination},
-            "created_at": {"new_value": transaction.created_at, "current_value":current_transaction.created_at},
-            "user_id": {"new_value": transaction.user_id.hex, "current_value":current_transaction.user_id},
-        }
+        # Envia todos os campos em um unico 'UPDATE ... RETURNING', sem ler o registro antes
+        updates_to_apply = cls._to_row(transaction)
+        updates_to_apply.pop("id")
         
-        # Aqui cria um dicionário com as atualizações que serão feitas
-        updates_to_apply = {
-            key: value["new_value"]
-            if value["new_value"] != value["current_value"]
-            else None # Isso aqui é necessario pois pode haver necidade de fornecer o argumento mesmo que vazio
-            for key, value in updates_map.items()
-        }
-        
-        if updates_to_apply:
-            result = cls._db.update(id=id.hex, **updates_to_apply)
-            if not result:
-                raise transaction_db_adapter_error.TransactionDBAdapterError("Falha ao tentar atualizar 'Transaction'")
+        result = cls._db.update(id=id.hex, **updates_to_apply)
+        if not result:
+            # A consulta extra só acontece no caminho de erro, para diferenciar registro inexistente de falha
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise transaction_db_adapter_error.TransactionNotFoundError()
+            raise transaction_db_adapter_error.TransactionDBAdapterError("Falha ao tentar atualizar 'Transaction'")
+    
+    @classmethod
+    def update_categories(cls, changes: Dict[UUID, UUID]) -> None:
+        # Valida o tipo do argumento 'changes' (id da transação -> nova categoria)
+        if not isinstance(changes, dict) or not all(isinstance(id, UUID) and isinstance(category_id, UUID) for id, category_id in changes.items()):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        cls._db.update_categories({id.hex: category_id.hex for id, category_id in changes.items()})
     
     @classmethod
     def delete(cls, id: UUID) -> None:
@@ -106,47 +138,273 @@ class TransactionDatabaseAdapter(DatabaseAdapterInterface):
         data = cls._db.select_from_id(id=id.hex)
         if not data:
             return None
-        return TransactionModel(
-            id=UUID(data.id),
-            date=data.date,
-            description=data.description,
-            amount=Decimal(data.amount),
-            transaction_type=TransactionTypes(data.transaction_type),
-            paid=data.paid,
-            ignore=data.ignore,
-            visible=data.visible,
-            category_id=UUID(data.category_id),
-            tag_id=UUID(data.tag_id),
-            account_id_origin=UUID(data.account_id_origin),
-            account_id_destination=UUID(data.account_id_destination),
-            created_at=data.created_at,
-            user_id=UUID(data.user_id),
-        )
+        return cls._to_model(data)
+    
+    @classmethod
+    def get_many(cls, ids: List[UUID]) -> Dict[UUID, TransactionModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        # Uma consulta para todos os ids, os que não existem ficam fora do dicionario
+        models = {model.id: model for model in map(cls._to_model, cls._db.select_from_ids(ids=[id.hex for id in ids]))}
+        return {id: models[id] for id in ids if id in models}
     
     @classmethod
     def get_all(cls) -> List[TransactionModel]:
         data = cls._db.select()
         if data:
-            result = []
-            for transaction in data:
-                result.append(
-                    TransactionModel(
-                        id=UUID(transaction.id),
-                        date=transaction.date,
-                        description=transaction.description,
-                        amount=Decimal(f"{transaction.amount:.2f}"),
-                        transaction_type=TransactionTypes(transaction.transaction_type),
-                        paid=transaction.paid,
-                        ignore=transaction.ignore,
-                        visible=transaction.visible,
-                        category_id=UUID(transaction.category_id),
-                        tag_id=UUID(transaction.tag_id),
-                        account_id_origin=UUID(transaction.account_id_origin) if transaction.account_id_origin else None,
-                        account_id_destination=UUID(transaction.account_id_destination),
-                        created_at=transaction.created_at,
-                        user_id=UUID(transaction.user_id),
-                    )
-                )
-            return result
+            return [cls._to_model(transaction) for transaction in data]
         return []
+    
+    @classmethod
+    def query(cls, query: TransactionQueryModel) -> TransactionPageModel:
+        # Valida o tipo do argumento 'query'
+        if not isinstance(query, TransactionQueryModel):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        
+        # Busca uma linha a mais para saber se existe uma proxima pagina
+        data = cls._db.select_page(
+            user_id=getattr(query.user_id, "hex", None),
+            account_id_origin=getattr(query.account_id_origin, "hex", None),
+            account_id_destination=getattr(query.account_id_destination, "hex", None),
+            start_date=query.start_date,
+            end_date=query.end_date,
+            transaction_type=getattr(query.transaction_type, "value", None),
+            paid=query.paid,
+            ignore=query.ignore,
+            visible=query.visible,
+            category_id=getattr(query.category_id, "hex", None),
+            tag_id=getattr(query.tag_id, "hex", None),
+            min_amount=to_cents(query.min_amount) if query.min_amount is not None else None,
+            max_amount=to_cents(query.max_amount) if query.max_amount is not None else None,
+            after=(query.after_date, query.after_id.hex) if query.have_cursor() else None,
+            limit=query.limit + 1,
+            descending=query.descending,
+        )
+        
+        transactions = [cls._to_model(transaction) for transaction in data[:query.limit]]
+        if len(data) > query.limit:
+            last = transactions[-1]
+            return TransactionPageModel(transactions=transactions, next_after_date=last.date, next_after_id=last.id)
+        return TransactionPageModel(transactions=transactions)
+    
+    @classmethod
+    def _match_expression(cls, text: str) -> Optional[str]:
+        # Só as palavras do texto entram na consulta, entre aspas para que nada seja lido como operador do FTS5,
+        # e cada uma como prefixo ('merc' acha 'mercado'). Todas as palavras precisam aparecer na descrição
+        words = re.findall(r"\w+", text)
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+    
+    @classmethod
+    def _decode_search_cursor(cls, cursor: str) -> tuple:
+        # O cursor guarda a relevancia (em hexadecimal, sem perder precisão) e o id da ultima trasação da pagina
+        try:
+            rank, id = cursor.split(":")
+            return float.fromhex(rank), UUID(hex=id).hex
+        except ValueError:
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError(error_message="Cursor de busca invalido")
+    
+    @classmethod
+    def search(cls, user_id: UUID, text: str, limit: int = 50, cursor: Optional[str] = None) -> TransactionSearchPageModel:
+        # Valida o tipo dos argumentos 'user_id', 'text', 'limit' e 'cursor'
+        if not isinstance(user_id, UUID) or not isinstance(text, str) or not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        if cursor is not None and not isinstance(cursor, str):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        after = cls._decode_search_cursor(cursor) if cursor is not None else None
+        match = cls._match_expression(text)
+        if match is None:
+            return TransactionSearchPageModel()
+        
+        # Busca uma linha a mais para saber se existe uma proxima pagina
+        data = cls._db.search(user_id=user_id.hex, match=match, limit=limit + 1, after=after)
+        transactions = [cls._to_model(transaction) for transaction, _ in data[:limit]]
+        ranks = [rank for _, rank in data[:limit]]
+        if len(data) > limit:
+            return TransactionSearchPageModel(transactions=transactions, ranks=ranks, next_cursor=f"{ranks[-1].hex()}:{transactions[-1].id.hex}")
+        return TransactionSearchPageModel(transactions=transactions, ranks=ranks)
+    
+    @classmethod
+    def rebuild_search_index(cls) -> None:
+        cls._db.rebuild_search_index()
+    
+    @classmethod
+    def iter_all(cls,
+            batch_size: int = 1000,
+            user_id: Optional[UUID] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None) -> Iterator[TransactionModel]:
+        # Valida o tipo do argumento 'batch_size'
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size <= 0:
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        # Valida o tipo dos filtros
+        if user_id is not None and not isinstance(user_id, UUID):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        if any(date is not None and not isinstance(date, datetime) for date in (start_date, end_date)):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        # Converte os registros conforme chegam do banco, sem montar a lista inteira em memória
+        data = cls._db.iter_all(batch_size=batch_size, user_id=getattr(user_id, "hex", None), start_date=start_date, end_date=end_date)
+        return (cls._to_model(transaction) for transaction in data)
+    
+    @classmethod
+    def _sum_filters(cls,
+            user_id: Optional[UUID],
+            transaction_type: Optional[TransactionTypes],
+            paid: Optional[bool],
+            start_date: Optional[datetime],
+            end_date: Optional[datetime]) -> dict:
+        # Valida o tipo dos filtros
+        if user_id is not None and not isinstance(user_id, UUID):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        if transaction_type is not None and not isinstance(transaction_type, TransactionTypes):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        return {
+            "user_id": getattr(user_id, "hex", None),
+            "transaction_type": getattr(transaction_type, "value", None),
+            "paid": paid,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+    
+    @classmethod
+    def sum_by_account(cls,
+            user_id: Optional[UUID] = None,
+            transaction_type: Optional[TransactionTypes] = None,
+            paid: Optional[bool] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None) -> Dict[UUID, Decimal]:
+        data = cls._db.sum_by_account(**cls._sum_filters(user_id, transaction_type, paid, start_date, end_date))
+        return {UUID(account_id): from_cents(total) for account_id, total in data.items()}
+    
+    @classmethod
+    def sum_by_category(cls,
+            user_id: Optional[UUID] = None,
+            transaction_type: Optional[TransactionTypes] = None,
+            paid: Optional[bool] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None) -> Dict[UUID, Decimal]:
+        data = cls._db.sum_by_category(**cls._sum_filters(user_id, transaction_type, paid, start_date, end_date))
+        return {UUID(category_id): from_cents(total) for category_id, total in data.items()}
+    
+    @classmethod
+    def rollups(cls,
+            user_id: UUID,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            account_ids: Optional[List[UUID]] = None,
+            category_ids: Optional[List[UUID]] = None) -> List[TransactionRollupModel]:
+        # Valida o tipo dos argumentos
+        cls._validate_report_filters(user_id, start_date, end_date)
+        for ids in (account_ids, category_ids):
+            if ids is not None and (isinstance(ids, (str, bytes)) or not all(isinstance(id, UUID) for id in ids)):
+                raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        data = cls._db.select_rollups(
+            user_id=user_id.hex,
+            start_date=start_date,
+            end_date=end_date,
+            account_ids=[id.hex for id in account_ids] if account_ids is not None else None,
+            category_ids=[id.hex for id in category_ids] if category_ids is not None else None,
+        )
+        return [
+            TransactionRollupModel(
+                user_id=UUID(row.user_id),
+                account_id=UUID(row.account_id),
+                category_id=UUID(row.category_id),
+                month=row.month,
+                transaction_type=TransactionTypes(row.transaction_type),
+                amount=from_cents(row.amount),
+                count=row.count,
+                paid_amount=from_cents(row.paid_amount),
+                paid_count=row.paid_count,
+            )
+            for row in data
+        ]
+    
+    @classmethod
+    def rebuild_rollups(cls) -> int:
+        return cls._db.rebuild_rollups()
+    
+    @classmethod
+    def balance_at(cls, account_id: UUID, at: datetime) -> Decimal:
+        # Valida o tipo dos argumentos 'account_id' e 'at'
+        if not isinstance(account_id, UUID) or not isinstance(at, datetime):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        return from_cents(cls._db.balance_at(account_id=account_id.hex, at=at))
+    
+    @classmethod
+    def balance_series(cls,
+            frequency: SeriesFrequencies = SeriesFrequencies.DAY,
+            account_ids: Optional[List[UUID]] = None,
+            user_id: Optional[UUID] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None) -> BalanceSeriesModel:
+        # Valida o tipo dos argumentos
+        if not isinstance(frequency, SeriesFrequencies):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        if account_ids is not None and (isinstance(account_ids, (str, bytes)) or not all(isinstance(account_id, UUID) for account_id in account_ids)):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        if user_id is not None and not isinstance(user_id, UUID):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        if any(date is not None and not isinstance(date, datetime) for date in (start_date, end_date)):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        
+        hex_ids = [account_id.hex for account_id in account_ids] if account_ids is not None else None
+        # O historico anterior a 'start_date' também é lido (já somado por dia) para compor o saldo de abertura
+        rows = cls._db.daily_balance_deltas(account_ids=hex_ids, user_id=getattr(user_id, "hex", None), end_date=end_date)
+        ids, periods, balances = running_balances(rows, frequency, start_date=start_date, end_date=end_date, account_ids=hex_ids)
+        return BalanceSeriesModel(
+            frequency=frequency,
+            account_ids=[UUID(account_id) for account_id in ids],
+            periods=periods,
+            balances=balances,
+        )
+    
+    @classmethod
+    def _validate_report_filters(cls, user_id: UUID, start_date: Optional[datetime], end_date: Optional[datetime]) -> None:
+        if not isinstance(user_id, UUID):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        if any(date is not None and not isinstance(date, datetime) for date in (start_date, end_date)):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+    
+    @classmethod
+    def category_report(cls,
+            user_id: UUID,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            paid: Optional[bool] = None) -> CategoryReportModel:
+        # Valida o tipo dos argumentos
+        cls._validate_report_filters(user_id, start_date, end_date)
+        if paid is not None and not isinstance(paid, bool):
+            raise transaction_db_adapter_error.UnexpectedArgumentTypeError()
+        rows = cls._db.category_report(user_id=user_id.hex, start_date=start_date, end_date=end_date, paid=paid)
+        return CategoryReportModel(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            paid=paid,
+            rows=[
+                CategoryReportRowModel(
+                    month=month,
+                    transaction_type=TransactionTypes(transaction_type),
+                    category_id=UUID(category_id),
+                    category_name=category_name,
+                    tag_id=UUID(tag_id) if tag_id is not None else None,
+                    tag_name=tag_name,
+                    total=from_cents(total),
+                    count=count,
+                )
+                for month, transaction_type, category_id, category_name, tag_id, tag_name, total, count in rows
+            ],
+        )
+    
+    @classmethod
+    def report_versions(cls, user_id: UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict[str, int]:
+        # Valida o tipo dos argumentos
+        cls._validate_report_filters(user_id, start_date, end_date)
+        # 'end_date' é exclusivo, o ultimo mês é o do instante anterior a ele
+        start_month = start_date.strftime("%Y-%m") if start_date is not None else None
+        end_month = (end_date - timedelta(microseconds=1)).strftime("%Y-%m") if end_date is not None else None
+        return cls._db.report_versions(user_id=user_id.hex, start_month=start_month, end_month=end_month)
 
@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from infra import UserRepository
 from src.financial.models import UserModel
@@ -10,6 +10,22 @@ from src.financial.exceptions.database_adapter_errors import user_db_adapter_err
 class UserDatabaseAdapter(DatabaseAdapterInterface):
     _db = UserRepository()
     
+    @classmethod
+    def _to_row(cls, user: UserModel) -> dict:
+        return {
+            "id": user.id.hex,
+            "nickname": user.nickname,
+            "created_at": user.created_at,
+        }
+    
+    @classmethod
+    def _to_model(cls, data) -> UserModel:
+        return UserModel(
+            id=UUID(data.id),
+            nickname=data.nickname,
+            created_at=data.created_at,
+        )
+    
     @classmethod
     def insert(cls, user: UserModel) -> None:
         if not isinstance(user, UserModel):
@@ -20,14 +36,17 @@ class UserDatabaseAdapter(DatabaseAdapterInterface):
         if exist_user:
             raise user_db_adapter_error.UserAlreadyExistsError()
         
-        result = cls._db.insert(
-            id=user.id.hex,
-            nickname=user.nickname,
-            created_at=user.created_at,
-        )
+        result = cls._db.insert(**cls._to_row(user))
         
         return result is not None
     
+    @classmethod
+    def insert_many(cls, users: List[UserModel]) -> List[bool]:
+        # Valida o lote inteiro antes de escrever qualquer linha
+        if not isinstance(users, (list, tuple)) or not all(isinstance(user, UserModel) for user in users):
+            raise user_db_adapter_error.UnexpectedArgumentTypeError()
+        return cls._db.insert_many([cls._to_row(user) for user in users])
+    
     @classmethod
     def update(cls, id: UUID, user: UserModel) -> None:
         # Valida o tipo do argumento 'user'
@@ -38,34 +57,23 @@ class UserDatabaseAdapter(DatabaseAdapterInterface):
         if not isinstance(id, UUID):
             raise user_db_adapter_error.UnexpectedArgumentTypeError()
         
-        current_user = cls._db.select_from_id(id=id.hex)
-        
-        # Valida se existe um usuário com o id informado
-        if current_user is None:
-            raise user_db_adapter_error.UserNotFoundError()
-        
         # Valida se o 'id' foi modificado
-        if user.id and user.id != UUID(current_user.id):
+        if user.id and user.id != id:
+            # Registro inexistente tem prioridade sobre a inconsistencia do id
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise user_db_adapter_error.UserNotFoundError()
             raise user_db_adapter_error.UserDBAdapterError(error_message="Incosistencia entre o parametro 'id' e a proprienda id do paramentro 'user'")
         
-        # Aqui cria um mapa de atualizações com o novo valor e o valor atual
-        updates_map = {
-            "nickname": {"new_value": user.nickname, "current_value": current_user.nickname},
-            "created_at": {"new_value": user.created_at, "current_value": current_user.created_at},
-        }
+        # Envia todos os campos em um unico 'UPDATE ... RETURNING', sem ler o registro antes
+        updates_to_apply = cls._to_row(user)
+        updates_to_apply.pop("id")
         
-        # Aqui cria um dicionário com as atualizações que serão feitas
-        updates_to_apply = {
-            key: value["new_value"]
-            if value["new_value"] != value["current_value"]
-            else None # Isso aqui é necessario pois pode haver necidade de fornecer o argumento mesmo que vazio
-            for key, value in updates_map.items()
-        }
-        
-        if updates_to_apply:
-            result = cls._db.update(id=id.hex, **updates_to_apply)
-            if not result:
-                raise user_db_adapter_error.UserDBAdapterError("Falha ao tentar atualizar 'User'")
+        result = cls._db.update(id=id.hex, **updates_to_apply)
+        if not result:
+            # A consulta extra só acontece no caminho de erro, para diferenciar registro inexistente de falha
+            if cls._db.select_from_id(id=id.hex) is None:
+                raise user_db_adapter_error.UserNotFoundError()
+            raise user_db_adapter_error.UserDBAdapterError("Falha ao tentar atualizar 'User'")
     
     @classmethod
     def delete(cls, id: UUID) -> None:
@@ -79,25 +87,29 @@ class UserDatabaseAdapter(DatabaseAdapterInterface):
             raise user_db_adapter_error.UnexpectedArgumentTypeError()
         data = cls._db.select_from_id(id.hex)
         if data:
-            return UserModel(
-                id=UUID(data.id),
-                nickname=data.nickname,
-                created_at=data.created_at,
-            )
+            return cls._to_model(data)
         return None
     
+    @classmethod
+    def get_many(cls, ids: List[UUID]) -> Dict[UUID, UserModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise user_db_adapter_error.UnexpectedArgumentTypeError()
+        # Uma consulta para todos os ids, os que não existem ficam fora do dicionario
+        models = {model.id: model for model in map(cls._to_model, cls._db.select_from_ids(ids=[id.hex for id in ids]))}
+        return {id: models[id] for id in ids if id in models}
+    
     @classmethod
     def get_all(cls) -> List[UserModel]:
         data = cls._db.select()
         if data:
-            result = []
-            for user in data:
-                result.append(
-                    UserModel(
-                        id=UUID(user.id),
-                        nickname=user.nickname,
-                        created_at=user.created_at,
-                    )
-                )
-            return result
+            return [cls._to_model(user) for user in data]
         return []
+    
+    @classmethod
+    def iter_all(cls, batch_size: int = 1000) -> Iterator[UserModel]:
+        # Valida o tipo do argumento 'batch_size'
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size <= 0:
+            raise user_db_adapter_error.UnexpectedArgumentTypeError()
+        # Converte os registros conforme chegam do banco, sem montar a lista inteira em memória
+        return (cls._to_model(data) for data in cls._db.iter_all(batch_size=batch_size))
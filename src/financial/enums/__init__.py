@@ -1,2 +1,5 @@
 from src.financial.enums.databases import Databases
-from src.financial.enums.transactions_types import TransactionTypes
\ No newline at end of file
+from src.financial.enums.transactions_types import TransactionTypes
+from src.financial.enums.series_frequencies import SeriesFrequencies
+from src.financial.enums.statement_formats import StatementFormats
+from src.financial.enums.export_formats import ExportFormats
\ No newline at end of file
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class ExportFormats(Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+    NPZ = "npz"
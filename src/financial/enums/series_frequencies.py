@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SeriesFrequencies(Enum):
+    DAY = "dia"
+    WEEK = "semana"
+    MONTH = "mes"
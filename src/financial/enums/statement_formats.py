@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class StatementFormats(Enum):
+    CSV = "csv"
+    OFX = "ofx"
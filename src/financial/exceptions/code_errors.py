@@ -14,6 +14,11 @@ class FinacialErrorGroup(Enum):
     TRANSACTION_CATEGORY = "transaction_category"
     ACCOUNT = "account"
     ACCOUNT_TAG = "account_tag"
+    POSTING = "posting"
+    STATEMENT_IMPORT = "statement_import"
+    TRANSACTION_EXPORT = "transaction_export"
+    CATEGORY_RULE = "category_rule"
+    DATA_LOADER = "data_loader"
 
 
 class FinacialErrorType(Enum):
@@ -0,0 +1,50 @@
+from src.financial.exceptions.handler_errors.handler_error import HandlerError
+from src.financial.exceptions.code_errors import FinacialErrorGroup, FinacialErrorTag, FinacialErrorType
+
+
+class CategoryRuleHandlerError(HandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.CATEGORY_RULE,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Error generico em 'CategoryRuleHandler'",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
+
+
+class UnexpectedArgumentTypeError(CategoryRuleHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.CATEGORY_RULE,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Tipo de argumento inesperado",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
+
+
+class InvalidCategoryRuleError(CategoryRuleHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.CATEGORY_RULE,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Regra de categorização invalida",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
@@ -0,0 +1,50 @@
+from src.financial.exceptions.handler_errors.handler_error import HandlerError
+from src.financial.exceptions.code_errors import FinacialErrorGroup, FinacialErrorTag, FinacialErrorType
+
+
+class DataLoaderHandlerError(HandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.DATA_LOADER,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Error generico em 'DataLoaderHandler'",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
+
+
+class UnexpectedArgumentTypeError(DataLoaderHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.DATA_LOADER,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Tipo de argumento inesperado",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
+
+
+class MissingHandlerError(DataLoaderHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.DATA_LOADER,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Handler não informado",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
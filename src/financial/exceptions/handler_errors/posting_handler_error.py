@@ -0,0 +1,82 @@
+from src.financial.exceptions.handler_errors.handler_error import HandlerError
+from src.financial.exceptions.code_errors import FinacialErrorGroup, FinacialErrorTag, FinacialErrorType
+
+
+class PostingHandlerError(HandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.POSTING,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Error generico em 'PostingHandler'",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
+
+
+class UnexpectedArgumentTypeError(PostingHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.POSTING,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Tipo de argumento inesperado",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
+
+
+class TransferWithoutOriginError(PostingHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.POSTING,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Transferência sem conta de origem",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
+
+
+class MissingTransactionHandlerError(PostingHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.POSTING,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "Nenhum 'TransactionHandler' informado",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
+
+
+class DatabaseMismatchError(PostingHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.POSTING,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "'TransactionHandler' e 'AccountHandler' usam bancos diferentes",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
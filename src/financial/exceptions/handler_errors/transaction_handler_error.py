@@ -48,3 +48,19 @@ class UnexpectedDatabaseTypeError(UnexpectedArgumentTypeError):
             error_message=error_message,
             **kwargs
         )
+
+
+class InvalidRollupPeriodError(TransactionHandlerError):
+    def __init__(self,
+                error_tag:FinacialErrorTag=FinacialErrorTag.HANDLER,
+                error_group:FinacialErrorGroup=FinacialErrorGroup.TRANSACTION,
+                error_type: FinacialErrorType = FinacialErrorType.INVALID_INPUT,
+                error_message: str = "O periodo do rollup deve começar e terminar no inicio de um mês",
+                **kwargs):
+        super().__init__(
+            error_tag=error_tag,
+            error_group=error_group,
+            error_type=error_type,
+            error_message=error_message,
+            **kwargs
+        )
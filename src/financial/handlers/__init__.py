@@ -4,3 +4,9 @@ from src.financial.handlers.account_tag_handler import AccountTagHandler
 from src.financial.handlers.transaction_handler import TransactionHandler
 from src.financial.handlers.transaction_tag_handler import TransactionTagHandler
 from src.financial.handlers.transaction_category_handler import TransactionCategoryHandler
+from src.financial.handlers.posting_handler import PostingHandler
+
+from src.financial.handlers.statement_import_handler import StatementImportHandler
+from src.financial.handlers.transaction_export_handler import TransactionExportHandler
+from src.financial.handlers.category_rule_handler import CategoryRuleHandler
+from src.financial.handlers.data_loader_handler import DataLoaderHandler
\ No newline at end of file
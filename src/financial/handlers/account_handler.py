@@ -1,9 +1,9 @@
 from uuid import UUID
-from typing import List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 from decimal import Decimal
 
-from src.financial.models import AccountModel
+from src.financial.models import AccountModel, ReconciliationReportModel
 from src.financial.interfaces import DatabaseAdapterInterface
 from src.financial.database_adapter import DatabaseHandler, Databases
 from src.financial.exceptions.handler_errors import account_handler_error
@@ -31,29 +31,59 @@ class AccountHandler:
         self._database = value
     
     def _refresh_cache(self) -> None:
-        if not hasattr(self, "_cache"):
-            self._cache = list()
-        self._cache.extend(self._database.get_all())
+        # O cache é um dicionario indexado pelo id, carregado uma vez e depois atualizado a cada escrita
+        self._cache = {account.id: account for account in self._database.get_all()}
+        self._stale = False
+    
+    def invalidate_cache(self) -> None:
+        # Descarta o cache, ele volta a ser carregado do banco na proxima leitura que depende dele inteiro
+        self._cache = dict()
+        self._stale = True
+    
+    def _ensure_cache(self) -> None:
+        if self._stale:
+            self._refresh_cache()
+    
+    def _track_rollback(self) -> None:
+        # Dentro de uma unidade de trabalho a escrita só vale no commit, num rollback o cache volta a ser lido do banco
+        self._database.on_rollback(self.invalidate_cache)
     
     def _get_cache_by_id(self, id: UUID) -> Optional[AccountModel]:
         # Valida se o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
-        return next((account for account in self._cache if account.id == id), None)
+        return self._cache.get(id)
     
     def create_account(self, account: AccountModel) -> None:
         # Valida se o tipo do argumento 'account'
         if not isinstance(account, AccountModel):
             raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'account'")
+        self._track_rollback()
         self._database.insert(account)
-        self._refresh_cache()
+        self._cache[account.id] = account
+    
+    def reconcile_balances(self, incremental: bool = False, fix: bool = False, workers: Optional[int] = None) -> ReconciliationReportModel:
+        # Valida o tipo dos argumentos 'incremental' e 'fix'
+        if not isinstance(incremental, bool) or not isinstance(fix, bool):
+            raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'incremental' ou 'fix'")
+        # Valida o tipo do argumento 'workers'
+        if workers is not None and (not isinstance(workers, int) or isinstance(workers, bool) or workers <= 0):
+            raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'workers'")
+        self._track_rollback()
+        report = self._database.reconcile_balances(incremental=incremental, fix=fix, workers=workers)
+        # Contas corrigidas saem do cache e são relidas do banco na proxima consulta
+        if report.fixed:
+            for mismatch in report.mismatches:
+                self._cache.pop(mismatch.account_id, None)
+        return report
     
     def delete_account(self, id: UUID) -> None:
         # Valida se o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
+        self._track_rollback()
         self._database.delete(id)
-        self._refresh_cache()
+        self._cache.pop(id, None)
     
     def update_account(self, id: UUID, account: AccountModel) -> None:
         # Valida se o tipo do argumento 'id'
@@ -62,8 +92,9 @@ class AccountHandler:
         # Valida se o tipo do argumento 'account'
         if not isinstance(account, AccountModel):
             raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'account'")
+        self._track_rollback()
         self._database.update(id, account)
-        self._refresh_cache()
+        self._cache[id] = account
     
     def get_account(self, id: UUID) -> Optional[AccountModel]:
         # Valida se o tipo do argumento 'id'
@@ -71,11 +102,28 @@ class AccountHandler:
             raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
         if cached_account:=self._get_cache_by_id(id=id):
             return cached_account
-        return self._database.get(id)
+        # Registros criados fora deste handler entram no cache na primeira leitura
+        if account:=self._database.get(id):
+            self._cache[id] = account
+        return account
+    
+    def get_accounts(self, ids: List[UUID]) -> Dict[UUID, AccountModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'ids'")
+        # O cache responde primeiro e só os ids que faltam vão para o banco, todos em uma unica chamada
+        found = {id: self._cache[id] for id in ids if id in self._cache}
+        missing = [id for id in dict.fromkeys(ids) if id not in found]
+        if missing:
+            fetched = self._database.get_many(missing)
+            self._cache.update(fetched)
+            found.update(fetched)
+        return {id: found[id] for id in ids if id in found}
     
     def get_all_accounts(self) -> List[AccountModel]:
+        self._ensure_cache()
         if cache:=self._cache:
-            return cache
+            return list(cache.values())
         return self._database.get_all()
     
     def _change_attribute(self, id: UUID, name: str, value: Any) -> None:
@@ -96,7 +144,7 @@ class AccountHandler:
         else:
             trasaction = self.get_account(id=id)
             trasaction.__setattr__(name, value)
-            self.update_trasaction(
+            self.update_account(
                 id=id,
                 account=trasaction
             )
@@ -108,9 +156,11 @@ class AccountHandler:
         # Valida se o tipo do argumento 'amount'
         if not isinstance(amount, Decimal):
             raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'amount'")
-        account = self._get_cache_by_id(id=id) or self.get_account(id=id)
-        account.added_balance(amount=amount)
-        self.update_account(id=id, account=account)
+        self._track_rollback()
+        # Um unico 'UPDATE ... RETURNING' no banco, o cache recebe o saldo devolvido
+        balance = self._database.add_to_balance(id, amount)
+        if cached_account:=self._get_cache_by_id(id=id):
+            cached_account.balance = balance
     
     def subtract_balance(self, id: UUID, amount: Decimal) -> None:
         # Valida se o tipo do argumento 'id'
@@ -119,9 +169,23 @@ class AccountHandler:
         # Valida se o tipo do argumento 'amount'
         if not isinstance(amount, Decimal):
             raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'amount'")
-        account = self._get_cache_by_id(id=id) or self.get_account(id=id)
-        account.subtract_balance(amount=amount)
-        self.update_account(id=id, account=account)
+        self._track_rollback()
+        # Um unico 'UPDATE ... RETURNING' no banco, o cache recebe o saldo devolvido
+        balance = self._database.add_to_balance(id, -amount)
+        if cached_account:=self._get_cache_by_id(id=id):
+            cached_account.balance = balance
+    
+    def apply_balance_deltas(self, deltas: Dict[UUID, Decimal]) -> Dict[UUID, Decimal]:
+        # Valida o tipo do argumento 'deltas'
+        if not isinstance(deltas, dict) or not all(isinstance(id, UUID) and isinstance(delta, Decimal) for id, delta in deltas.items()):
+            raise account_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'deltas'")
+        self._track_rollback()
+        # Todas as contas são atualizadas em um unico UPDATE com CASE
+        balances = self._database.add_to_balances(deltas)
+        for id, balance in balances.items():
+            if cached_account:=self._get_cache_by_id(id=id):
+                cached_account.balance = balance
+        return balances
     
     def change_name(self, id: UUID, name: str) -> None:
         # Valida se o tipo do argumento 'id'
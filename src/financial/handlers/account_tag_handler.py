@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 
 from src.financial.models import AccountTagModel
@@ -30,29 +30,28 @@ class AccountTagHandler:
         self._database = value
     
     def _refresh_cache(self) -> None:
-        if not hasattr(self, "_cache"):
-            self._cache = list()
-        self._cache.extend(self._database.get_all())
+        # O cache é um dicionario indexado pelo id, carregado uma vez e depois atualizado a cada escrita
+        self._cache = {account_tag.id: account_tag for account_tag in self._database.get_all()}
     
     def _get_cache_by_id(self, id: UUID) -> Optional[AccountTagModel]:
         # Valida se o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise account_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
-        return next((account_tag for account_tag in self._cache if account_tag.id == id), None)
+        return self._cache.get(id)
     
     def create_account_tag(self, account_tag: AccountTagModel) -> None:
         # Valida se o tipo do argumento 'account_tag'
         if not isinstance(account_tag, AccountTagModel):
             raise account_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'account_tag'")
         self._database.insert(account_tag)
-        self._refresh_cache()
+        self._cache[account_tag.id] = account_tag
     
     def delete_account_tag(self, id: UUID) -> None:
         # Valida se o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise account_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
         self._database.delete(id)
-        self._refresh_cache()
+        self._cache.pop(id, None)
     
     def update_account_tag(self, id: UUID, account_tag: AccountTagModel) -> None:
         # Valida se o tipo do argumento 'id'
@@ -62,7 +61,7 @@ class AccountTagHandler:
         if not isinstance(account_tag, AccountTagModel):
             raise account_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'account_tag'")
         self._database.update(id, account_tag)
-        self._refresh_cache()
+        self._cache[id] = account_tag
     
     def get_account_tag(self, id: UUID) -> Optional[AccountTagModel]:
         # Valida se o tipo do argumento 'id'
@@ -70,11 +69,27 @@ class AccountTagHandler:
             raise account_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
         if cached_account_tag:=self._get_cache_by_id(id=id):
             return cached_account_tag
-        return self._database.get(id)
+        # Registros criados fora deste handler entram no cache na primeira leitura
+        if account_tag:=self._database.get(id):
+            self._cache[id] = account_tag
+        return account_tag
+    
+    def get_account_tags(self, ids: List[UUID]) -> Dict[UUID, AccountTagModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise account_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'ids'")
+        # O cache responde primeiro e só os ids que faltam vão para o banco, todos em uma unica chamada
+        found = {id: self._cache[id] for id in ids if id in self._cache}
+        missing = [id for id in dict.fromkeys(ids) if id not in found]
+        if missing:
+            fetched = self._database.get_many(missing)
+            self._cache.update(fetched)
+            found.update(fetched)
+        return {id: found[id] for id in ids if id in found}
     
     def get_all_account_tags(self) -> List[AccountTagModel]:
         if cache:=self._cache:
-            return cache
+            return list(cache.values())
         return self._database.get_all()
     
     def _change_attribute(self, id: UUID, name: str, value: Any) -> None:
@@ -95,7 +110,7 @@ class AccountTagHandler:
         else:
             trasaction = self.get_account_tag(id=id)
             trasaction.__setattr__(name, value)
-            self.update_trasaction(
+            self.update_account_tag(
                 id=id,
                 account_tag=trasaction
             )
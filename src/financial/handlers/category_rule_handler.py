@@ -0,0 +1,87 @@
+from uuid import UUID
+from datetime import datetime
+from typing import List, Optional
+
+from src.financial.models import TransactionModel, CategoryRuleModel
+from src.financial.utils import CategoryRuleError, CategoryRuleEngine
+from src.financial.handlers.transaction_handler import TransactionHandler
+from src.financial.exceptions.handler_errors import category_rule_handler_error
+
+
+# Transações recategorizadas por lote, cada lote é um unico UPDATE e um commit
+RECATEGORIZE_BATCH_SIZE = 5_000
+
+
+class CategoryRuleHandler:
+    def __init__(self, transaction_handler: TransactionHandler, rules: List[CategoryRuleModel] = ()):
+        # Valida o tipo do argumento 'transaction_handler'
+        if not isinstance(transaction_handler, TransactionHandler):
+            raise category_rule_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transaction_handler'")
+        self._transaction_handler = transaction_handler
+        self.set_rules(rules)
+    
+    @property
+    def transaction_handler(self) -> TransactionHandler:
+        return self._transaction_handler
+    
+    @property
+    def engine(self) -> CategoryRuleEngine:
+        return self._engine
+    
+    @property
+    def rules(self) -> List[CategoryRuleModel]:
+        return self._engine.rules
+    
+    def set_rules(self, rules: List[CategoryRuleModel]) -> None:
+        # Valida o tipo do argumento 'rules'
+        if not isinstance(rules, (list, tuple)) or not all(isinstance(rule, CategoryRuleModel) for rule in rules):
+            raise category_rule_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'rules'")
+        # As regras são compiladas uma vez aqui, a classificação só usa o resultado compilado
+        try:
+            self._engine = CategoryRuleEngine(rules)
+        except CategoryRuleError as error:
+            raise category_rule_handler_error.InvalidCategoryRuleError(error_message=str(error))
+    
+    def classify(self, transactions: List[TransactionModel]) -> List[Optional[UUID]]:
+        # Valida o tipo do argumento 'transactions'
+        if not isinstance(transactions, (list, tuple)) or not all(isinstance(transaction, TransactionModel) for transaction in transactions):
+            raise category_rule_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transactions'")
+        return self._engine.classify(transactions)
+    
+    def categorize(self, transactions: List[TransactionModel]) -> int:
+        # Aplica as regras nos modelos antes de gravar (ex.: linhas de extrato), retorna quantos mudaram de categoria
+        changed = 0
+        for transaction, category_id in zip(transactions, self.classify(transactions)):
+            if category_id is not None and category_id != transaction.category_id:
+                transaction.category_id = category_id
+                changed += 1
+        return changed
+    
+    def recategorize(self,
+            user_id: UUID,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            batch_size: int = RECATEGORIZE_BATCH_SIZE) -> int:
+        # Valida o tipo do argumento 'user_id'
+        if not isinstance(user_id, UUID):
+            raise category_rule_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'user_id'")
+        # Valida o argumento 'batch_size'
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size < 1:
+            raise category_rule_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'batch_size'")
+        # O historico vem do cache do handler de transações (que valida as datas), só as transações
+        # que mudam de categoria vão para o banco, em lotes
+        transactions = self._transaction_handler.get_transactions_by_user(user_id, start_date, end_date)
+        changes = dict()
+        total = 0
+        for transaction, category_id in zip(transactions, self._engine.classify(transactions)):
+            if category_id is None or category_id == transaction.category_id:
+                continue
+            changes[transaction.id] = category_id
+            if len(changes) >= batch_size:
+                self._transaction_handler.change_categories(changes)
+                total += len(changes)
+                changes = dict()
+        if changes:
+            self._transaction_handler.change_categories(changes)
+            total += len(changes)
+        return total
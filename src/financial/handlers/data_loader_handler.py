@@ -0,0 +1,132 @@
+from uuid import UUID
+from typing import Iterable, List, Optional
+
+from src.financial.models import (
+    UserModel,
+    AccountModel,
+    AccountTagModel,
+    TransactionModel,
+    TransactionTagModel,
+    TransactionCategoryModel,
+    TransactionListingModel
+)
+from src.financial.utils import DataLoader
+from src.financial.handlers.user_handler import UserHandler
+from src.financial.handlers.account_handler import AccountHandler
+from src.financial.handlers.account_tag_handler import AccountTagHandler
+from src.financial.handlers.transaction_handler import TransactionHandler
+from src.financial.handlers.transaction_tag_handler import TransactionTagHandler
+from src.financial.handlers.transaction_category_handler import TransactionCategoryHandler
+from src.financial.exceptions.handler_errors import data_loader_handler_error
+
+
+class DataLoaderHandler:
+    # Uma instancia por requisição: as buscas por id feitas durante a requisição são agrupadas
+    # em uma unica chamada 'get_*' por tipo de entidade e o resultado fica memorizado até 'clear'
+    def __init__(self,
+            user_handler: Optional[UserHandler] = None,
+            account_handler: Optional[AccountHandler] = None,
+            account_tag_handler: Optional[AccountTagHandler] = None,
+            transaction_handler: Optional[TransactionHandler] = None,
+            transaction_category_handler: Optional[TransactionCategoryHandler] = None,
+            transaction_tag_handler: Optional[TransactionTagHandler] = None,
+            max_batch_size: Optional[int] = None):
+        handlers = (
+            ("user_handler", user_handler, UserHandler),
+            ("account_handler", account_handler, AccountHandler),
+            ("account_tag_handler", account_tag_handler, AccountTagHandler),
+            ("transaction_handler", transaction_handler, TransactionHandler),
+            ("transaction_category_handler", transaction_category_handler, TransactionCategoryHandler),
+            ("transaction_tag_handler", transaction_tag_handler, TransactionTagHandler),
+        )
+        # Valida o tipo dos handlers informados
+        for name, handler, handler_type in handlers:
+            if handler is not None and not isinstance(handler, handler_type):
+                raise data_loader_handler_error.UnexpectedArgumentTypeError(error_message=f"Tipo inesperado do argumento '{name}'")
+        # Valida o tipo do argumento 'max_batch_size'
+        if max_batch_size is not None and (not isinstance(max_batch_size, int) or max_batch_size < 1):
+            raise data_loader_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'max_batch_size'")
+        self._user_handler = user_handler
+        self._account_handler = account_handler
+        self._account_tag_handler = account_tag_handler
+        self._transaction_handler = transaction_handler
+        self._transaction_category_handler = transaction_category_handler
+        self._transaction_tag_handler = transaction_tag_handler
+        self._max_batch_size = max_batch_size
+        self._loaders = dict()
+    
+    def _loader(self, name: str, handler: object, batch_load: str) -> DataLoader:
+        if handler is None:
+            raise data_loader_handler_error.MissingHandlerError(error_message=f"Nenhum handler informado para carregar '{name}'")
+        # Os loaders são criados no primeiro uso e vivem até o fim da requisição
+        if (loader:=self._loaders.get(name)) is None:
+            loader = self._loaders[name] = DataLoader(getattr(handler, batch_load), max_batch_size=self._max_batch_size)
+        return loader
+    
+    @property
+    def users(self) -> DataLoader[UUID, UserModel]:
+        return self._loader("users", self._user_handler, "get_users")
+    
+    @property
+    def accounts(self) -> DataLoader[UUID, AccountModel]:
+        return self._loader("accounts", self._account_handler, "get_accounts")
+    
+    @property
+    def account_tags(self) -> DataLoader[UUID, AccountTagModel]:
+        return self._loader("account_tags", self._account_tag_handler, "get_account_tags")
+    
+    @property
+    def transactions(self) -> DataLoader[UUID, TransactionModel]:
+        return self._loader("transactions", self._transaction_handler, "get_transactions")
+    
+    @property
+    def transaction_categories(self) -> DataLoader[UUID, TransactionCategoryModel]:
+        return self._loader("transaction_categories", self._transaction_category_handler, "get_transaction_categories")
+    
+    @property
+    def transaction_tags(self) -> DataLoader[UUID, TransactionTagModel]:
+        return self._loader("transaction_tags", self._transaction_tag_handler, "get_transaction_tags")
+    
+    def dispatch(self) -> None:
+        # Resolve de uma vez o que estiver pendente em todos os loaders
+        for loader in list(self._loaders.values()):
+            loader.dispatch()
+    
+    def clear(self) -> None:
+        # Descarta o memo, usado ao reaproveitar a instancia em uma nova requisição
+        self._loaders.clear()
+    
+    def list_transactions(self, transactions: Iterable[TransactionModel]) -> List[TransactionListingModel]:
+        transactions = list(transactions)
+        # Valida o tipo do argumento 'transactions'
+        if not all(isinstance(transaction, TransactionModel) for transaction in transactions):
+            raise data_loader_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transactions'")
+        categories = self.transaction_categories
+        tags = self.transaction_tags
+        accounts = self.accounts
+        # Primeira passada só enfileira os ids, a segunda resolve com uma busca por tipo de entidade
+        pending = [
+            (
+                transaction,
+                categories.load(transaction.category_id),
+                tags.load(transaction.tag_id) if transaction.tag_id is not None else None,
+                accounts.load(transaction.account_id_destination),
+                accounts.load(transaction.account_id_origin) if transaction.account_id_origin is not None else None,
+            )
+            for transaction in transactions
+        ]
+        self.dispatch()
+        listing = []
+        for transaction, category, tag, destination, origin in pending:
+            category = category.get()
+            tag = tag.get() if tag is not None else None
+            destination = destination.get()
+            origin = origin.get() if origin is not None else None
+            listing.append(TransactionListingModel(
+                transaction=transaction,
+                category_name=category.name if category is not None else None,
+                tag_name=tag.name if tag is not None else None,
+                account_destination_name=destination.name if destination is not None else None,
+                account_origin_name=origin.name if origin is not None else None
+            ))
+        return listing
@@ -0,0 +1,81 @@
+from uuid import UUID
+from decimal import Decimal
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from src.financial.enums import TransactionTypes
+from src.financial.models import TransactionModel
+from src.financial.handlers.account_handler import AccountHandler
+from src.financial.handlers.transaction_handler import TransactionHandler
+from src.financial.exceptions.handler_errors import posting_handler_error
+
+
+class PostingHandler:
+    def __init__(self, account_handler: AccountHandler, transaction_handler: Optional[TransactionHandler] = None):
+        # Valida se o tipo do argumento 'account_handler'
+        if not isinstance(account_handler, AccountHandler):
+            raise posting_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'account_handler'")
+        # Valida se o tipo do argumento 'transaction_handler'
+        if transaction_handler is not None and not isinstance(transaction_handler, TransactionHandler):
+            raise posting_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transaction_handler'")
+        self._account_handler = account_handler
+        self._transaction_handler = transaction_handler
+    
+    @property
+    def account_handler(self) -> AccountHandler:
+        return self._account_handler
+    
+    @property
+    def transaction_handler(self) -> Optional[TransactionHandler]:
+        return self._transaction_handler
+    
+    @staticmethod
+    def compute_deltas(transactions: Iterable[TransactionModel]) -> Dict[UUID, Decimal]:
+        # Uma unica passada somando o efeito liquido de cada transação por conta
+        deltas = defaultdict(Decimal)
+        for transaction in transactions:
+            # Valida se o tipo de cada transação
+            if not isinstance(transaction, TransactionModel):
+                raise posting_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transactions'")
+            # Transações pendentes ou ignoradas não mexem no saldo
+            if not transaction.paid or transaction.ignore:
+                continue
+            transaction_type = transaction.transaction_type
+            if transaction_type is TransactionTypes.EXPENSE:
+                deltas[transaction.account_id_destination] -= transaction.amount
+            elif transaction_type is TransactionTypes.TRANSFER:
+                if transaction.account_id_origin is None:
+                    raise posting_handler_error.TransferWithoutOriginError()
+                deltas[transaction.account_id_origin] -= transaction.amount
+                deltas[transaction.account_id_destination] += transaction.amount
+            else:
+                # Renda e ajuste somam na conta de destino
+                deltas[transaction.account_id_destination] += transaction.amount
+        # Contas que se anulam no lote não precisam ser escritas
+        return {id: delta for id, delta in deltas.items() if delta}
+    
+    def post_transactions(self, transactions: Iterable[TransactionModel]) -> Dict[UUID, Decimal]:
+        # Valida se o tipo do argumento 'transactions'
+        if isinstance(transactions, (str, bytes, dict)) or not isinstance(transactions, Iterable):
+            raise posting_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transactions'")
+        deltas = self.compute_deltas(transactions)
+        if not deltas:
+            return dict()
+        # Todos os saldos mudam em uma unica escrita atomica, retorna o novo saldo de cada conta afetada
+        return self._account_handler.apply_balance_deltas(deltas)
+    
+    def record_transactions(self, transactions: Iterable[TransactionModel]) -> Dict[UUID, Decimal]:
+        if self._transaction_handler is None:
+            raise posting_handler_error.MissingTransactionHandlerError()
+        # Valida se o tipo do argumento 'transactions'
+        if isinstance(transactions, (str, bytes, dict)) or not isinstance(transactions, Iterable):
+            raise posting_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transactions'")
+        # As duas escritas só são atomicas se os dois handlers gravam no mesmo banco
+        if self._transaction_handler.database.get_connection_string() != self._account_handler.database.get_connection_string():
+            raise posting_handler_error.DatabaseMismatchError()
+        transactions = list(transactions)
+        # Inserção e saldos na mesma unidade de trabalho: se uma parte falhar nada é gravado e os caches
+        # dos dois handlers são descartados. Só as transações realmente inseridas mexem no saldo
+        with self._transaction_handler.database.unit_of_work():
+            outcomes = self._transaction_handler.create_transactions(transactions)
+            return self.post_transactions([transaction for transaction, inserted in zip(transactions, outcomes) if inserted])
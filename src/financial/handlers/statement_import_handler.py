@@ -0,0 +1,120 @@
+import os
+import time
+from uuid import UUID
+from typing import Callable, Iterator, List, Optional, TextIO, Union
+
+from src.financial.enums import TransactionTypes, StatementFormats
+from src.financial.models import TransactionModel, StatementCsvLayoutModel, StatementImportReportModel
+from src.financial.utils import StatementParseError, StatementLine, ParsedLine, parse_csv, parse_ofx
+from src.financial.handlers.transaction_handler import TransactionHandler
+from src.financial.handlers.category_rule_handler import CategoryRuleHandler
+from src.financial.exceptions.handler_errors import statement_import_handler_error
+
+
+# Transações gravadas por commit, cada lote é uma unica transação no banco
+IMPORT_BATCH_SIZE = 10_000
+# Tamanho máximo da coluna 'description' da tabela 'transactions'
+DESCRIPTION_MAX_LENGTH = 255
+
+
+class StatementImportHandler:
+    def __init__(self, transaction_handler: TransactionHandler):
+        # Valida o tipo do argumento 'transaction_handler'
+        if not isinstance(transaction_handler, TransactionHandler):
+            raise statement_import_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transaction_handler'")
+        self._transaction_handler = transaction_handler
+    
+    @property
+    def transaction_handler(self) -> TransactionHandler:
+        return self._transaction_handler
+    
+    def _iter_lines(self, lines: Iterator[ParsedLine]) -> Iterator[ParsedLine]:
+        # Erros do arquivo inteiro só aparecem quando a leitura começa, dentro do laço de importação
+        try:
+            yield from lines
+        except StatementParseError as error:
+            raise statement_import_handler_error.InvalidStatementFormatError(error_message=str(error))
+    
+    def _write_batch(self, batch: List[TransactionModel], report: StatementImportReportModel, category_rules: Optional[CategoryRuleHandler]) -> None:
+        # As regras trocam a categoria padrão das linhas que casam com alguma delas
+        if category_rules is not None:
+            category_rules.categorize(batch)
+        # O lote vai direto para o banco sem passar pelo cache do handler, que cresceria com o tamanho do arquivo
+        outcomes = self._transaction_handler.database.import_many(batch)
+        inserted = sum(outcomes)
+        if inserted:
+            self._transaction_handler.invalidate_cache()
+        report.inserted += inserted
+        report.duplicates += len(outcomes) - inserted
+    
+    def import_file(self,
+            source: Union[str, os.PathLike, TextIO],
+            statement_format: StatementFormats,
+            account_id: UUID,
+            user_id: UUID,
+            category_id: UUID,
+            tag_id: UUID,
+            paid: bool = True,
+            csv_layout: StatementCsvLayoutModel = StatementCsvLayoutModel(),
+            batch_size: int = IMPORT_BATCH_SIZE,
+            encoding: str = "utf-8",
+            on_progress: Optional[Callable[[StatementImportReportModel], None]] = None,
+            category_rules: Optional[CategoryRuleHandler] = None) -> StatementImportReportModel:
+        # Valida o tipo do argumento 'statement_format'
+        if not isinstance(statement_format, StatementFormats):
+            raise statement_import_handler_error.InvalidStatementFormatError()
+        # Valida o tipo dos argumentos 'account_id', 'user_id', 'category_id' e 'tag_id'
+        for name, value in (("account_id", account_id), ("user_id", user_id), ("category_id", category_id), ("tag_id", tag_id)):
+            if not isinstance(value, UUID):
+                raise statement_import_handler_error.UnexpectedArgumentTypeError(error_message=f"Tipo inesperado do argumento '{name}'")
+        # Valida o tipo do argumento 'csv_layout'
+        if not isinstance(csv_layout, StatementCsvLayoutModel):
+            raise statement_import_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'csv_layout'")
+        # Valida o argumento 'batch_size'
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size < 1:
+            raise statement_import_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'batch_size'")
+        # Valida o tipo do argumento 'category_rules'
+        if category_rules is not None and not isinstance(category_rules, CategoryRuleHandler):
+            raise statement_import_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'category_rules'")
+        
+        if isinstance(source, (str, os.PathLike)):
+            # 'newline=""' é o que o modulo 'csv' espera para tratar quebras de linha dentro de campos
+            with open(source, encoding=encoding, newline="") as file:
+                return self.import_file(file, statement_format, account_id, user_id, category_id, tag_id, paid, csv_layout, batch_size, encoding, on_progress, category_rules)
+        
+        if statement_format is StatementFormats.CSV:
+            lines = parse_csv(source, layout=csv_layout)
+        else:
+            lines = parse_ofx(source)
+        
+        # Só um lote de modelos fica em memória por vez, o arquivo é lido conforme os lotes são gravados
+        report = StatementImportReportModel()
+        start = time.perf_counter()
+        batch = []
+        for line in self._iter_lines(lines):
+            report.lines += 1
+            if not isinstance(line, StatementLine) or line.amount == 0:
+                report.invalid += 1
+                continue
+            batch.append(TransactionModel(
+                date=line.date,
+                description=line.description[:DESCRIPTION_MAX_LENGTH],
+                # O extrato traz o valor com sinal, a transação guarda o valor absoluto e o tipo
+                amount=abs(line.amount),
+                transaction_type=TransactionTypes.EXPENSE if line.amount < 0 else TransactionTypes.INCOME,
+                paid=paid,
+                category_id=category_id,
+                tag_id=tag_id,
+                account_id_destination=account_id,
+                user_id=user_id,
+            ))
+            if len(batch) >= batch_size:
+                self._write_batch(batch, report, category_rules)
+                batch = []
+                report.seconds = time.perf_counter() - start
+                if on_progress is not None:
+                    on_progress(report)
+        if batch:
+            self._write_batch(batch, report, category_rules)
+        report.seconds = time.perf_counter() - start
+        return report
@@ -0,0 +1,68 @@
+import os
+import time
+from uuid import UUID
+from datetime import datetime
+from typing import BinaryIO, Iterable, Optional, TextIO, Union
+
+from src.financial.enums import ExportFormats
+from src.financial.models import TransactionModel, TransactionExportReportModel
+from src.financial.utils import write_csv, write_jsonl, write_npz
+from src.financial.interfaces import DatabaseAdapterInterface
+from src.financial.database_adapter import DatabaseHandler, Databases
+from src.financial.exceptions.handler_errors import transaction_export_handler_error
+
+
+# Transações lidas do cursor do banco por vez
+EXPORT_BATCH_SIZE = 10_000
+
+
+class TransactionExportHandler:
+    def __init__(self, database: Union[DatabaseAdapterInterface, DatabaseHandler] = DatabaseHandler(database=Databases.TRANSACTIONS)):
+        # Valida o tipo do argumento 'database'
+        if not (isinstance(database, (DatabaseAdapterInterface, DatabaseHandler)) or 
+                (isinstance(database, type) and issubclass(database, (DatabaseAdapterInterface, DatabaseHandler)))):
+            raise transaction_export_handler_error.UnexpectedDatabaseTypeError(error_message="Tipo inesperado do argumento 'databese'")
+        # Diferente do 'TransactionHandler' não existe cache: a exportação lê direto do cursor do banco
+        self._database = database
+    
+    @property
+    def database(self) -> Union[DatabaseAdapterInterface, DatabaseHandler]:
+        return self._database
+    
+    def export(self,
+            destination: Union[str, os.PathLike, TextIO, BinaryIO],
+            export_format: ExportFormats,
+            user_id: Optional[UUID] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            batch_size: int = EXPORT_BATCH_SIZE) -> TransactionExportReportModel:
+        # Valida o tipo do argumento 'export_format'
+        if not isinstance(export_format, ExportFormats):
+            raise transaction_export_handler_error.InvalidExportFormatError()
+        # Valida o tipo do argumento 'user_id'
+        if user_id is not None and not isinstance(user_id, UUID):
+            raise transaction_export_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'user_id'")
+        # Valida o tipo dos argumentos 'start_date' e 'end_date'
+        for name, date in (("start_date", start_date), ("end_date", end_date)):
+            if date is not None and not isinstance(date, datetime):
+                raise transaction_export_handler_error.UnexpectedArgumentTypeError(error_message=f"Tipo inesperado do argumento '{name}'")
+        # Valida o argumento 'batch_size'
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size < 1:
+            raise transaction_export_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'batch_size'")
+        
+        start = time.perf_counter()
+        transactions = self._database.iter_all(batch_size=batch_size, user_id=user_id, start_date=start_date, end_date=end_date)
+        if export_format is ExportFormats.NPZ:
+            rows = write_npz(transactions, destination, batch_size=batch_size)
+        elif isinstance(destination, (str, os.PathLike)):
+            # 'newline=""' evita linhas em branco extras do modulo 'csv' no Windows
+            with open(destination, "w", encoding="utf-8", newline="") as file:
+                rows = self._write_text(transactions, file, export_format)
+        else:
+            rows = self._write_text(transactions, destination, export_format)
+        return TransactionExportReportModel(export_format=export_format, rows=rows, seconds=time.perf_counter() - start)
+    
+    def _write_text(self, transactions: Iterable[TransactionModel], file: TextIO, export_format: ExportFormats) -> int:
+        if export_format is ExportFormats.CSV:
+            return write_csv(transactions, file)
+        return write_jsonl(transactions, file)
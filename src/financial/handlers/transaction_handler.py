@@ -1,14 +1,24 @@
 from uuid import UUID
-from typing import List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 from decimal import Decimal
+from heapq import merge
+from collections import OrderedDict
 
-from src.financial.models import TransactionModel, TransactionTypes
+from src.financial.utils import TransactionIndex
+from src.financial.enums import SeriesFrequencies
+from src.financial.models import TransactionModel, TransactionTypes, TransactionQueryModel, TransactionPageModel, BalanceSeriesModel, CategoryReportModel, TransactionRollupModel, TransactionSearchPageModel
 from src.financial.interfaces import DatabaseAdapterInterface
 from src.financial.database_adapter import DatabaseHandler, Databases
 from src.financial.exceptions.handler_errors import transaction_handler_error
 
 
+# Quantidade máxima de relatorios por categoria guardados em memória
+REPORT_CACHE_SIZE = 256
+# Quantidade máxima de trasações por pagina da busca, o mesmo limite das paginas do 'query_transactions'
+SEARCH_MAX_LIMIT = 1000
+
+
 class TransactionHandler:
     def __init__(self, database: Union[DatabaseAdapterInterface, DatabaseHandler] = DatabaseHandler(database=Databases.TRANSACTIONS)):
         # Valida o tipo do argumento 'database'
@@ -31,29 +41,98 @@ class TransactionHandler:
         self._database = value
     
     def _refresh_cache(self) -> None:
-        if not hasattr(self, "_cache"):
-            self._cache = list()
-        self._cache.extend(self._database.get_all())
+        # O cache é um dicionario indexado pelo id, carregado uma vez e depois atualizado a cada escrita
+        self._cache = {transaction.id: transaction for transaction in self._database.get_all()}
+        self._index = TransactionIndex()
+        self._index.extend(self._cache.values())
+        self._report_cache = OrderedDict()
+        self._stale = False
+    
+    def invalidate_cache(self) -> None:
+        # Para escritas feitas sem passar pelo cache (ex.: importação de extratos): a memória é liberada na hora e o
+        # cache volta a ser carregado do banco na proxima leitura que depende dele inteiro
+        self._cache = dict()
+        self._index = TransactionIndex()
+        self._report_cache = OrderedDict()
+        self._stale = True
+    
+    def _ensure_cache(self) -> None:
+        if self._stale:
+            self._refresh_cache()
+    
+    def _track_rollback(self) -> None:
+        # Dentro de uma unidade de trabalho a escrita só vale no commit, num rollback o cache volta a ser lido do banco
+        self._database.on_rollback(self.invalidate_cache)
+    
+    def _cache_put(self, transaction: TransactionModel) -> None:
+        # Mantem o cache e os indices secundarios sempre juntos
+        self._cache[transaction.id] = transaction
+        self._index.add(transaction)
+    
+    def _cache_put_many(self, transactions: List[TransactionModel]) -> None:
+        # Lotes entram nos indices com uma unica ordenação por lista
+        for transaction in transactions:
+            self._cache[transaction.id] = transaction
+        self._index.extend(transactions)
+    
+    def _cache_pop(self, id: UUID) -> None:
+        self._cache.pop(id, None)
+        self._index.remove(id)
     
     def _get_cache_by_id(self, id: UUID) -> Optional[TransactionModel]:
         # Valida o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
-        return next((transaction for transaction in self._cache if transaction.id == id), None)
+        return self._cache.get(id)
     
     def create_transaction(self, transaction: TransactionModel) -> None:
         # Valida o tipo do argumento 'transaction'
         if not isinstance(transaction, TransactionModel):
             raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transaction'")
+        self._track_rollback()
         self._database.insert(transaction)
-        self._refresh_cache()
+        self._cache_put(transaction)
+    
+    def create_transactions(self, transactions: List[TransactionModel]) -> List[bool]:
+        # Valida o tipo do argumento 'transactions'
+        if not isinstance(transactions, (list, tuple)) or not all(isinstance(transaction, TransactionModel) for transaction in transactions):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transactions'")
+        self._track_rollback()
+        outcomes = self._database.insert_many(transactions)
+        self._cache_put_many([transaction for transaction, inserted in zip(transactions, outcomes) if inserted])
+        return outcomes
+    
+    def import_transactions(self, transactions: List[TransactionModel]) -> List[bool]:
+        # Valida o tipo do argumento 'transactions'
+        if not isinstance(transactions, (list, tuple)) or not all(isinstance(transaction, TransactionModel) for transaction in transactions):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transactions'")
+        self._track_rollback()
+        # Linhas de extrato já importadas (mesmo dia, valor, descrição e conta) são descartadas pelo banco
+        outcomes = self._database.import_many(transactions)
+        self._cache_put_many([transaction for transaction, inserted in zip(transactions, outcomes) if inserted])
+        return outcomes
+    
+    def change_categories(self, changes: Dict[UUID, UUID]) -> None:
+        # Valida o tipo do argumento 'changes' (id da transação -> nova categoria)
+        if not isinstance(changes, dict) or not all(isinstance(id, UUID) and isinstance(category_id, UUID) for id, category_id in changes.items()):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'changes'")
+        self._track_rollback()
+        # Todas as alterações vão para o banco em um lote antes de mexer no cache
+        self._database.update_categories(changes)
+        changed = []
+        for id, category_id in changes.items():
+            if (cached_transaction:=self._cache.get(id)) is not None:
+                cached_transaction.category_id = category_id
+                changed.append(cached_transaction)
+        self._cache_put_many(changed)
     
     def delete_transaction(self, id: UUID) -> None:
         # Valida o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
+        self._track_rollback()
         self._database.delete(id)
-        self._refresh_cache()
+        self._cache_pop(id)
     
     def update_transaction(self, id: UUID, transaction: TransactionModel) -> None:
         # Valida o tipo do argumento 'id'
@@ -62,8 +141,9 @@ class TransactionHandler:
         # Valida o tipo do argumento 'transaction'
         if not isinstance(transaction, TransactionModel):
             raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transaction'")
+        self._track_rollback()
         self._database.update(id, transaction)
-        self._refresh_cache()
+        self._cache_put(transaction)
     
     def get_transaction(self, id: UUID) -> Optional[TransactionModel]:
         # Valida o tipo do argumento 'id'
@@ -71,13 +151,177 @@ class TransactionHandler:
             raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
         if cached_transaction:=self._get_cache_by_id(id=id):
             return cached_transaction
-        return self._database.get(id)
+        # Registros criados fora deste handler entram no cache na primeira leitura
+        if transaction:=self._database.get(id):
+            self._cache_put(transaction)
+        return transaction
+    
+    def get_transactions(self, ids: List[UUID]) -> Dict[UUID, TransactionModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'ids'")
+        # O cache responde primeiro e só os ids que faltam vão para o banco, todos em uma unica chamada
+        found = {id: self._cache[id] for id in ids if id in self._cache}
+        missing = [id for id in dict.fromkeys(ids) if id not in found]
+        if missing:
+            fetched = self._database.get_many(missing)
+            self._cache_put_many(list(fetched.values()))
+            found.update(fetched)
+        return {id: found[id] for id in ids if id in found}
     
     def get_all_transactions(self) -> List[TransactionModel]:
+        self._ensure_cache()
         if cache:=self._cache:
-            return cache
+            return list(cache.values())
         return self._database.get_all()
     
+    def _validate_range(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> None:
+        # Valida o tipo dos argumentos 'start_date' e 'end_date'
+        if start_date is not None and not isinstance(start_date, datetime):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'start_date'")
+        if end_date is not None and not isinstance(end_date, datetime):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'end_date'")
+    
+    def _get_cached_by(self, field: str, value: UUID, start_date: Optional[datetime], end_date: Optional[datetime]) -> List[TransactionModel]:
+        # Valida o tipo do argumento 'value'
+        if not isinstance(value, UUID):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message=f"Tipo inesperado do argumento '{field}'")
+        self._validate_range(start_date=start_date, end_date=end_date)
+        self._ensure_cache()
+        return [self._cache[id] for id in self._index.ids_by(field, value, start_date, end_date)]
+    
+    def get_transactions_by_user(self, user_id: UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[TransactionModel]:
+        return self._get_cached_by("user_id", user_id, start_date, end_date)
+    
+    def get_transactions_by_account_destination(self, account_id: UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[TransactionModel]:
+        return self._get_cached_by("account_id_destination", account_id, start_date, end_date)
+    
+    def get_transactions_by_account_origin(self, account_id: UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[TransactionModel]:
+        return self._get_cached_by("account_id_origin", account_id, start_date, end_date)
+    
+    def get_transactions_by_account(self, account_id: UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[TransactionModel]:
+        # Junta origem e destino mantendo a ordem por data (uma transferencia da conta para ela mesma aparece uma vez)
+        destination = self.get_transactions_by_account_destination(account_id, start_date, end_date)
+        origin = [transaction for transaction in self.get_transactions_by_account_origin(account_id, start_date, end_date) if transaction.account_id_destination != account_id]
+        return list(merge(destination, origin, key=lambda transaction: (transaction.date, transaction.id)))
+    
+    def get_transactions_by_category(self, category_id: UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[TransactionModel]:
+        return self._get_cached_by("category_id", category_id, start_date, end_date)
+    
+    def get_transactions_by_tag(self, tag_id: UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[TransactionModel]:
+        return self._get_cached_by("tag_id", tag_id, start_date, end_date)
+    
+    def get_transactions_by_date(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[TransactionModel]:
+        self._validate_range(start_date=start_date, end_date=end_date)
+        self._ensure_cache()
+        return [self._cache[id] for id in self._index.ids_by_date(start_date, end_date)]
+    
+    def balance_at(self, account_id: UUID, at: datetime) -> Decimal:
+        # Valida o tipo do argumento 'account_id'
+        if not isinstance(account_id, UUID):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'account_id'")
+        # Valida o tipo do argumento 'at'
+        if not isinstance(at, datetime):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'at'")
+        # Resolvido no banco a partir dos checkpoints mensais, o cache não guarda o historico de saldos
+        return self._database.balance_at(account_id, at)
+    
+    def get_balance_series(self,
+            frequency: SeriesFrequencies = SeriesFrequencies.DAY,
+            account_ids: Optional[List[UUID]] = None,
+            user_id: Optional[UUID] = None,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None) -> BalanceSeriesModel:
+        # Valida o tipo do argumento 'frequency'
+        if not isinstance(frequency, SeriesFrequencies):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'frequency'")
+        # Valida o tipo do argumento 'account_ids'
+        if account_ids is not None and (not isinstance(account_ids, list) or not all(isinstance(account_id, UUID) for account_id in account_ids)):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'account_ids'")
+        # Valida o tipo do argumento 'user_id'
+        if user_id is not None and not isinstance(user_id, UUID):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'user_id'")
+        self._validate_range(start_date=start_date, end_date=end_date)
+        # Calculado com arrays do NumPy a partir das somas diarias do banco, sem montar os modelos das transações
+        return self._database.balance_series(frequency, account_ids, user_id, start_date, end_date)
+    
+    def get_category_report(self,
+            user_id: UUID,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            paid: Optional[bool] = None) -> CategoryReportModel:
+        # Valida o tipo do argumento 'user_id'
+        if not isinstance(user_id, UUID):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'user_id'")
+        # Valida o tipo do argumento 'paid'
+        if paid is not None and not isinstance(paid, bool):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'paid'")
+        self._validate_range(start_date=start_date, end_date=end_date)
+        # As versões dos meses do periodo são incrementadas por triggers a cada alteração,
+        # então o relatorio guardado só é reutilizado se nenhuma delas mudou
+        key = (user_id, start_date, end_date, paid)
+        versions = self._database.report_versions(user_id, start_date, end_date)
+        if (cached:=self._report_cache.get(key)) is not None and cached[0] == versions:
+            self._report_cache.move_to_end(key)
+            return cached[1]
+        report = self._database.category_report(user_id, start_date, end_date, paid)
+        self._report_cache[key] = (versions, report)
+        self._report_cache.move_to_end(key)
+        if len(self._report_cache) > REPORT_CACHE_SIZE:
+            self._report_cache.popitem(last=False)
+        return report
+    
+    def get_rollups(self,
+            user_id: UUID,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            account_ids: Optional[List[UUID]] = None,
+            category_ids: Optional[List[UUID]] = None) -> List[TransactionRollupModel]:
+        # Valida o tipo do argumento 'user_id'
+        if not isinstance(user_id, UUID):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'user_id'")
+        # Valida o tipo dos argumentos 'account_ids' e 'category_ids'
+        for name, ids in (("account_ids", account_ids), ("category_ids", category_ids)):
+            if ids is not None and (not isinstance(ids, list) or not all(isinstance(id, UUID) for id in ids)):
+                raise transaction_handler_error.UnexpectedArgumentTypeError(error_message=f"Tipo inesperado do argumento '{name}'")
+        self._validate_range(start_date=start_date, end_date=end_date)
+        # O rollup guarda meses inteiros, então o periodo tem que começar e terminar no inicio de um mês
+        for date in (start_date, end_date):
+            if date is not None and date != datetime(date.year, date.month, 1):
+                raise transaction_handler_error.InvalidRollupPeriodError()
+        # Lido da tabela de rollup, mantida pelos triggers a cada criação, alteração e remoção de transação
+        return self._database.rollups(user_id, start_date, end_date, account_ids, category_ids)
+    
+    def rebuild_rollups(self) -> int:
+        # Recalcula a tabela de rollup do zero, retorna a quantidade de grupos
+        return self._database.rebuild_rollups()
+    
+    def query_transactions(self, query: TransactionQueryModel) -> TransactionPageModel:
+        # Valida o tipo do argumento 'query'
+        if not isinstance(query, TransactionQueryModel):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'query'")
+        # Os filtros e a paginação são resolvidos no banco, sem passar pelo cache
+        return self._database.query(query)
+    
+    def search_transactions(self, user_id: UUID, query: str, limit: int = 50, cursor: Optional[str] = None) -> TransactionSearchPageModel:
+        # Valida o tipo do argumento 'user_id'
+        if not isinstance(user_id, UUID):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'user_id'")
+        # Valida o tipo do argumento 'query'
+        if not isinstance(query, str):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'query'")
+        # Valida o argumento 'limit'
+        if not isinstance(limit, int) or isinstance(limit, bool) or not 0 < limit <= SEARCH_MAX_LIMIT:
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'limit'")
+        # Valida o tipo do argumento 'cursor'
+        if cursor is not None and not isinstance(cursor, str):
+            raise transaction_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'cursor'")
+        # Resolvido pelo indice de texto completo do banco, mantido por triggers, sem percorrer as descrições do cache
+        return self._database.search(user_id, query, limit, cursor)
+    
+    def rebuild_search_index(self) -> None:
+        self._database.rebuild_search_index()
+    
     def _change_attribute(self, id: UUID, name: str, value: Any) -> None:
         # Valida o tipo do argumento 'id'
         if not isinstance(id, UUID):
@@ -96,7 +340,7 @@ class TransactionHandler:
         else:
             trasaction = self.get_transaction(id=id)
             trasaction.__setattr__(name, value)
-            self.update_trasaction(
+            self.update_transaction(
                 id=id,
                 transaction=trasaction
             )
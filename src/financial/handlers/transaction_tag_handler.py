@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 
 from src.financial.models import TransactionTagModel
@@ -30,29 +30,28 @@ class TransactionTagHandler:
         self._database = value
     
     def _refresh_cache(self) -> None:
-        if not hasattr(self, "_cache"):
-            self._cache = list()
-        self._cache.extend(self._database.get_all())
+        # O cache é um dicionario indexado pelo id, carregado uma vez e depois atualizado a cada escrita
+        self._cache = {transaction_tag.id: transaction_tag for transaction_tag in self._database.get_all()}
     
     def _get_cache_by_id(self, id: UUID) -> Optional[TransactionTagModel]:
         # Valida se o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise transaction_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
-        return next((transaction_tag for transaction_tag in self._cache if transaction_tag.id == id), None)
+        return self._cache.get(id)
     
     def create_transaction_tag(self, transaction_tag: TransactionTagModel) -> None:
         # Valida se o tipo do argumento 'transaction_tag'
         if not isinstance(transaction_tag, TransactionTagModel):
             raise transaction_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transaction_tag'")
         self._database.insert(transaction_tag)
-        self._refresh_cache()
+        self._cache[transaction_tag.id] = transaction_tag
     
     def delete_transaction_tag(self, id: UUID) -> None:
         # Valida se o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise transaction_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
         self._database.delete(id)
-        self._refresh_cache()
+        self._cache.pop(id, None)
     
     def update_transaction_tag(self, id: UUID, transaction_tag: TransactionTagModel) -> None:
         # Valida se o tipo do argumento 'id'
@@ -62,7 +61,7 @@ class TransactionTagHandler:
         if not isinstance(transaction_tag, TransactionTagModel):
             raise transaction_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'transaction_tag'")
         self._database.update(id, transaction_tag)
-        self._refresh_cache()
+        self._cache[id] = transaction_tag
     
     def get_transaction_tag(self, id: UUID) -> Optional[TransactionTagModel]:
         # Valida se o tipo do argumento 'id'
@@ -70,11 +69,27 @@ class TransactionTagHandler:
             raise transaction_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
         if cached_transaction_tag:=self._get_cache_by_id(id=id):
             return cached_transaction_tag
-        return self._database.get(id)
+        # Registros criados fora deste handler entram no cache na primeira leitura
+        if transaction_tag:=self._database.get(id):
+            self._cache[id] = transaction_tag
+        return transaction_tag
+    
+    def get_transaction_tags(self, ids: List[UUID]) -> Dict[UUID, TransactionTagModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise transaction_tag_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'ids'")
+        # O cache responde primeiro e só os ids que faltam vão para o banco, todos em uma unica chamada
+        found = {id: self._cache[id] for id in ids if id in self._cache}
+        missing = [id for id in dict.fromkeys(ids) if id not in found]
+        if missing:
+            fetched = self._database.get_many(missing)
+            self._cache.update(fetched)
+            found.update(fetched)
+        return {id: found[id] for id in ids if id in found}
     
     def get_all_transaction_tags(self) -> List[TransactionTagModel]:
         if cache:=self._cache:
-            return cache
+            return list(cache.values())
         return self._database.get_all()
     
     def _change_attribute(self, id: UUID, name: str, value: Any) -> None:
@@ -95,7 +110,7 @@ class TransactionTagHandler:
         else:
             trasaction = self.get_transaction_tag(id=id)
             trasaction.__setattr__(name, value)
-            self.update_trasaction(
+            self.update_transaction_tag(
                 id=id,
                 transaction_tag=trasaction
             )
@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 
 from src.financial.models import UserModel
@@ -30,29 +30,28 @@ class UserHandler:
         self._database = value
     
     def _refresh_cache(self) -> None:
-        if not hasattr(self, "_cache"):
-            self._cache = list()
-        self._cache.extend(self._database.get_all())
+        # O cache é um dicionario indexado pelo id, carregado uma vez e depois atualizado a cada escrita
+        self._cache = {user.id: user for user in self._database.get_all()}
     
     def _get_cache_by_id(self, id: UUID) -> Optional[UserModel]:
         # Valida se o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise user_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
-        return next((user for user in self._cache if user.id == id), None)
+        return self._cache.get(id)
     
     def create_user(self, user: UserModel) -> None:
         # Valida se o tipo do argumento 'user'
         if not isinstance(user, UserModel):
             raise user_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'user'")
         self._database.insert(user)
-        self._refresh_cache()
+        self._cache[user.id] = user
     
     def delete_user(self, id: UUID) -> None:
         # Valida se o tipo do argumento 'id'
         if not isinstance(id, UUID):
             raise user_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
         self._database.delete(id)
-        self._refresh_cache()
+        self._cache.pop(id, None)
     
     def update_user(self, id: UUID, user: UserModel) -> None:
         # Valida se o tipo do argumento 'id'
@@ -62,7 +61,7 @@ class UserHandler:
         if not isinstance(user, UserModel):
             raise user_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'user'")
         self._database.update(id, user)
-        self._refresh_cache()
+        self._cache[id] = user
     
     def get_user(self, id: UUID) -> Optional[UserModel]:
         # Valida se o tipo do argumento 'id'
@@ -70,11 +69,27 @@ class UserHandler:
             raise user_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'id'")
         if cached_user:=self._get_cache_by_id(id=id):
             return cached_user
-        return self._database.get(id)
+        # Registros criados fora deste handler entram no cache na primeira leitura
+        if user:=self._database.get(id):
+            self._cache[id] = user
+        return user
+    
+    def get_users(self, ids: List[UUID]) -> Dict[UUID, UserModel]:
+        # Valida o tipo do argumento 'ids'
+        if not isinstance(ids, (list, tuple, set)) or not all(isinstance(id, UUID) for id in ids):
+            raise user_handler_error.UnexpectedArgumentTypeError(error_message="Tipo inesperado do argumento 'ids'")
+        # O cache responde primeiro e só os ids que faltam vão para o banco, todos em uma unica chamada
+        found = {id: self._cache[id] for id in ids if id in self._cache}
+        missing = [id for id in dict.fromkeys(ids) if id not in found]
+        if missing:
+            fetched = self._database.get_many(missing)
+            self._cache.update(fetched)
+            found.update(fetched)
+        return {id: found[id] for id in ids if id in found}
     
     def get_all_users(self) -> List[UserModel]:
         if cache:=self._cache:
-            return cache
+            return list(cache.values())
         return self._database.get_all()
     
     def _change_attribute(self, id: UUID, name: str, value: Any) -> None:
@@ -95,7 +110,7 @@ class UserHandler:
         else:
             trasaction = self.get_user(id=id)
             trasaction.__setattr__(name, value)
-            self.update_trasaction(
+            self.update_user(
                 id=id,
                 user=trasaction
             )
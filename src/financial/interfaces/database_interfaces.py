@@ -1,7 +1,9 @@
 from uuid import UUID
-from typing import List, Protocol
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, List, Optional, Protocol
 from abc import ABC, abstractmethod
 
+from infra.configs import UnitOfWork
 from infra.repository.protocol import ProtocolRepository
 
 
@@ -20,6 +22,11 @@ class DatabaseAdapterInterface(ABC):
     def insert(cls, data: DataInterface) -> None:
         raise NotImplementedError()
     
+    @classmethod
+    @abstractmethod
+    def insert_many(cls, data: List[DataInterface]) -> List[bool]:
+        raise NotImplementedError()
+    
     @classmethod
     @abstractmethod
     def update(cls, id: UUID, data: DataInterface) -> DataInterface:
@@ -35,7 +42,33 @@ class DatabaseAdapterInterface(ABC):
     def get(cls, id: UUID) -> DataInterface:
         raise NotImplementedError()
     
+    @classmethod
+    @abstractmethod
+    def get_many(cls, ids: List[UUID]) -> Dict[UUID, DataInterface]:
+        raise NotImplementedError()
+    
     @classmethod
     @abstractmethod
     def get_all(cls) -> List[DataInterface]:
         raise NotImplementedError()
+    
+    @classmethod
+    def get_connection_string(cls) -> Optional[str]:
+        # Adapters sem repositório (ex.: os mocks dos testes) não participam de unidades de trabalho
+        connection = getattr(getattr(cls, "_db", None), "db", None)
+        return connection.get_connection_string() if connection is not None else None
+    
+    @classmethod
+    def unit_of_work(cls) -> ContextManager:
+        # Unidade de trabalho no banco do adapter, dentro de outra ela vira um savepoint
+        if (connection_string:=cls.get_connection_string()) is None:
+            return nullcontext()
+        return UnitOfWork(connection_string=connection_string)
+    
+    @classmethod
+    def on_rollback(cls, callback: Callable[[], None]) -> None:
+        # Fora de uma unidade de trabalho cada escrita já é confirmada na hora e não há o que desfazer
+        if (connection_string:=cls.get_connection_string()) is None:
+            return
+        if (unit_of_work:=UnitOfWork.current(connection_string=connection_string)) is not None:
+            unit_of_work.on_rollback(callback)
@@ -3,4 +3,14 @@ from src.financial.models.account_model import AccountModel
 from src.financial.models.account_tag_model import AccountTagModel
 from src.financial.models.transaction_model import TransactionModel, TransactionTypes
 from src.financial.models.transaction_tag_model import TransactionTagModel
-from src.financial.models.transaction_category_model import TransactionCategoryModel
\ No newline at end of file
+from src.financial.models.transaction_category_model import TransactionCategoryModel
+from src.financial.models.transaction_query_model import TransactionQueryModel, TransactionPageModel
+from src.financial.models.balance_series_model import BalanceSeriesModel
+from src.financial.models.reconciliation_report_model import BalanceMismatchModel, ReconciliationReportModel
+from src.financial.models.category_report_model import CategoryReportRowModel, CategoryReportModel
+from src.financial.models.transaction_rollup_model import TransactionRollupModel
+from src.financial.models.statement_import_model import StatementCsvLayoutModel, StatementImportReportModel
+from src.financial.models.transaction_export_model import TransactionExportReportModel
+from src.financial.models.category_rule_model import CategoryRuleModel
+from src.financial.models.transaction_search_model import TransactionSearchPageModel
+from src.financial.models.transaction_listing_model import TransactionListingModel
\ No newline at end of file
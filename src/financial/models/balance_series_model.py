@@ -0,0 +1,44 @@
+import numpy as np
+
+from uuid import UUID
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import Field, BaseModel, ConfigDict
+
+from src.financial.enums import SeriesFrequencies
+from src.financial.utils.money import from_cents
+
+
+class BalanceSeriesModel(BaseModel):
+    # Os arrays do NumPy não são validados pelo pydantic
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    # Intervalo de cada ponto da serie
+    frequency: SeriesFrequencies
+    
+    # Contas na mesma ordem das linhas de 'balances'
+    account_ids: List[UUID] = Field(default_factory=list)
+    
+    # Inicio de cada periodo ('datetime64[D]')
+    periods: np.ndarray
+    
+    # Saldo no fim de cada periodo em centavos ('int64' com uma linha por conta e uma coluna por periodo)
+    balances: np.ndarray
+    
+    def have_account(self, account_id: UUID) -> bool:
+        return (account_id in self.account_ids)
+    
+    def get_balances(self, account_id: UUID) -> Optional[np.ndarray]:
+        if not self.have_account(account_id):
+            return None
+        return self.balances[self.account_ids.index(account_id)]
+    
+    def get_amounts(self) -> np.ndarray:
+        # Saldos em unidades monetarias como float, para graficos
+        return self.balances / 100
+    
+    def get_balance(self, account_id: UUID, index: int) -> Optional[Decimal]:
+        balances = self.get_balances(account_id)
+        if balances is None:
+            return None
+        return from_cents(balances[index])
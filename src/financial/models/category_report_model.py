@@ -0,0 +1,57 @@
+from uuid import UUID
+from decimal import Decimal
+from datetime import datetime
+from collections import defaultdict
+from typing import Dict, List, Optional
+from pydantic import Field, BaseModel
+
+from src.financial.enums import TransactionTypes
+
+
+class CategoryReportRowModel(BaseModel):
+    # Mês no formato 'YYYY-MM'
+    month: str
+    
+    # Renda ou despesa
+    transaction_type: TransactionTypes
+    
+    # Categoria e o nome dela (None quando a categoria não existe mais)
+    category_id: UUID
+    category_name: Optional[str] = Field(default=None)
+    
+    # Marcação e o nome dela
+    tag_id: Optional[UUID] = Field(default=None)
+    tag_name: Optional[str] = Field(default=None)
+    
+    # Soma dos valores e quantidade de transações do grupo
+    total: Decimal = Field(default=Decimal("0.00"), decimal_places=2)
+    count: int = Field(default=0)
+
+
+class CategoryReportModel(BaseModel):
+    # UUID do usuario dono das trasações
+    user_id: UUID
+    
+    # Intervalo de datas, 'start_date' inclusivo e 'end_date' exclusivo
+    start_date: Optional[datetime] = Field(default=None)
+    end_date: Optional[datetime] = Field(default=None)
+    
+    # Filtro de pagas ou pendentes (None considera as duas)
+    paid: Optional[bool] = Field(default=None)
+    
+    # Linhas agrupadas por mês, tipo, categoria e marcação
+    rows: List[CategoryReportRowModel] = Field(default_factory=list)
+    
+    def totals_by_month(self, transaction_type: TransactionTypes) -> Dict[str, Decimal]:
+        totals = defaultdict(Decimal)
+        for row in self.rows:
+            if row.transaction_type is transaction_type:
+                totals[row.month] += row.total
+        return dict(totals)
+    
+    def totals_by_category(self, transaction_type: TransactionTypes) -> Dict[UUID, Decimal]:
+        totals = defaultdict(Decimal)
+        for row in self.rows:
+            if row.transaction_type is transaction_type:
+                totals[row.category_id] += row.total
+        return dict(totals)
@@ -0,0 +1,37 @@
+from uuid import UUID, uuid4
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import Field, BaseModel
+
+from src.financial.enums import TransactionTypes
+
+
+class CategoryRuleModel(BaseModel):
+    # UUID da regra
+    id: UUID = Field(default_factory=uuid4)
+    
+    # Usuario dono da regra, ela só se aplica às transações dele
+    user_id: UUID
+    
+    # Categoria atribuida às transações que passam pela regra
+    category_id: UUID
+    
+    # Trechos procurados na descrição, sem diferenciar maiusculas e acentos (basta um deles aparecer)
+    keywords: List[str] = Field(default_factory=list)
+    
+    # Expressão regular procurada na descrição, sem diferenciar maiusculas
+    pattern: Optional[str] = Field(default=None)
+    
+    # Faixa de valor aceita, os dois limites são inclusivos
+    min_amount: Optional[Decimal] = Field(default=None, decimal_places=2)
+    max_amount: Optional[Decimal] = Field(default=None, decimal_places=2)
+    
+    # Conta de destino e tipo da transação, quando informados
+    account_id: Optional[UUID] = Field(default=None)
+    transaction_type: Optional[TransactionTypes] = Field(default=None)
+    
+    # Entre regras que casam com a mesma transação vence a de maior prioridade (e depois a que vem antes na lista)
+    priority: int = Field(default=0)
+    
+    def has_text_condition(self) -> bool:
+        return bool(self.keywords) or self.pattern is not None
@@ -0,0 +1,35 @@
+from uuid import UUID
+from decimal import Decimal
+from typing import List
+from pydantic import Field, BaseModel
+
+
+class BalanceMismatchModel(BaseModel):
+    # UUID da conta
+    account_id: UUID
+    
+    # Saldo gravado na conta
+    stored_balance: Decimal = Field(decimal_places=2)
+    
+    # Saldo recalculado a partir das transações pagas e não ignoradas
+    expected_balance: Decimal = Field(decimal_places=2)
+    
+    def difference(self) -> Decimal:
+        return self.expected_balance - self.stored_balance
+
+
+class ReconciliationReportModel(BaseModel):
+    # Se só as contas marcadas desde a ultima conciliação foram conferidas
+    incremental: bool = Field(default=False)
+    
+    # Quantidade de contas conferidas
+    checked: int = Field(default=0)
+    
+    # Contas com saldo diferente do historico
+    mismatches: List[BalanceMismatchModel] = Field(default_factory=list)
+    
+    # Se as diferenças foram corrigidas
+    fixed: bool = Field(default=False)
+    
+    def have_mismatches(self) -> bool:
+        return (len(self.mismatches) > 0)
@@ -0,0 +1,34 @@
+from pydantic import Field, BaseModel
+
+
+class StatementCsvLayoutModel(BaseModel):
+    # Nomes das colunas do cabeçalho do arquivo
+    date_column: str = Field(default="date")
+    amount_column: str = Field(default="amount")
+    description_column: str = Field(default="description")
+    
+    # Separador de colunas e formato da data ('strptime')
+    delimiter: str = Field(default=",")
+    date_format: str = Field(default="%Y-%m-%d")
+    
+    # Separadores do valor, extratos brasileiros costumam usar '1.234,56'
+    decimal_separator: str = Field(default=".")
+    thousands_separator: str = Field(default="")
+
+
+class StatementImportReportModel(BaseModel):
+    # Linhas lidas do arquivo (validas ou não)
+    lines: int = Field(default=0)
+    
+    # Transações gravadas e linhas que já existiam no banco ou se repetiam no arquivo
+    inserted: int = Field(default=0)
+    duplicates: int = Field(default=0)
+    
+    # Linhas que não puderam ser convertidas em transação
+    invalid: int = Field(default=0)
+    
+    # Tempo total da importação em segundos
+    seconds: float = Field(default=0.0)
+    
+    def rows_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds > 0 else 0.0
@@ -0,0 +1,17 @@
+from pydantic import Field, BaseModel
+
+from src.financial.enums import ExportFormats
+
+
+class TransactionExportReportModel(BaseModel):
+    # Formato do arquivo gerado
+    export_format: ExportFormats
+    
+    # Transações escritas no arquivo
+    rows: int = Field(default=0)
+    
+    # Tempo total da exportação em segundos
+    seconds: float = Field(default=0.0)
+    
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
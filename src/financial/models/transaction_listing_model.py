@@ -0,0 +1,21 @@
+from typing import Optional
+from pydantic import Field, BaseModel
+
+from src.financial.models.transaction_model import TransactionModel
+
+
+class TransactionListingModel(BaseModel):
+    # Trasação listada
+    transaction: TransactionModel
+    
+    # Nome da categoria da trasação, None quando a categoria não foi encontrada
+    category_name: Optional[str] = Field(default=None)
+    
+    # Nome da tag da trasação, None quando a trasação não tem tag
+    tag_name: Optional[str] = Field(default=None)
+    
+    # Nome da conta de destino
+    account_destination_name: Optional[str] = Field(default=None)
+    
+    # Nome da conta de origem, só existe em transferências
+    account_origin_name: Optional[str] = Field(default=None)
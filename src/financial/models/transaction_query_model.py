@@ -0,0 +1,69 @@
+from uuid import UUID
+from decimal import Decimal
+from datetime import datetime
+from typing import List, Optional
+from pydantic import Field, BaseModel
+
+from src.financial.enums import TransactionTypes
+from src.financial.models.transaction_model import TransactionModel
+
+
+class TransactionQueryModel(BaseModel):
+    # UUID do usuario dono das trasações
+    user_id: Optional[UUID] = Field(default=None)
+    
+    # UUID da conta de origem
+    account_id_origin: Optional[UUID] = Field(default=None)
+    
+    # UUID da conta de destino
+    account_id_destination: Optional[UUID] = Field(default=None)
+    
+    # Intervalo de datas, 'start_date' inclusivo e 'end_date' exclusivo
+    start_date: Optional[datetime] = Field(default=None)
+    end_date: Optional[datetime] = Field(default=None)
+    
+    # Tipo da trasação
+    transaction_type: Optional[TransactionTypes] = Field(default=None)
+    
+    # Flags da trasação
+    paid: Optional[bool] = Field(default=None)
+    ignore: Optional[bool] = Field(default=None)
+    visible: Optional[bool] = Field(default=None)
+    
+    # Categoria e marcação da trasação
+    category_id: Optional[UUID] = Field(default=None)
+    tag_id: Optional[UUID] = Field(default=None)
+    
+    # Intervalo de valores, ambos inclusivos
+    min_amount: Optional[Decimal] = Field(default=None)
+    max_amount: Optional[Decimal] = Field(default=None)
+    
+    # Quantidade máxima de trasações por pagina
+    limit: int = Field(default=50, gt=0, le=1000)
+    
+    # Ordena da trasação mais recente para a mais antiga
+    descending: bool = Field(default=True)
+    
+    # Cursor da pagina (data e id da ultima trasação da pagina anterior)
+    after_date: Optional[datetime] = Field(default=None)
+    after_id: Optional[UUID] = Field(default=None)
+    
+    def have_cursor(self):
+        return (self.after_date is not None and self.after_id is not None)
+
+
+class TransactionPageModel(BaseModel):
+    # Trasações da pagina atual
+    transactions: List[TransactionModel] = Field(default_factory=list)
+    
+    # Cursor para a proxima pagina, None quando não há mais paginas
+    next_after_date: Optional[datetime] = Field(default=None)
+    next_after_id: Optional[UUID] = Field(default=None)
+    
+    def have_next(self):
+        return (self.next_after_id is not None)
+    
+    def next_query(self, query: TransactionQueryModel) -> Optional[TransactionQueryModel]:
+        if not self.have_next():
+            return None
+        return query.model_copy(update={"after_date": self.next_after_date, "after_id": self.next_after_id})
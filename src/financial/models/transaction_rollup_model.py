@@ -0,0 +1,25 @@
+from uuid import UUID
+from decimal import Decimal
+from pydantic import Field, BaseModel
+
+from src.financial.enums import TransactionTypes
+
+
+class TransactionRollupModel(BaseModel):
+    # Chave do grupo: usuario, conta de destino, categoria, mês ('YYYY-MM') e tipo
+    user_id: UUID
+    account_id: UUID
+    category_id: UUID
+    month: str
+    transaction_type: TransactionTypes
+    
+    # Soma e quantidade das transações não ignoradas do grupo
+    amount: Decimal = Field(default=Decimal("0.00"), decimal_places=2)
+    count: int = Field(default=0)
+    
+    # Parte das transações do grupo que já foi paga
+    paid_amount: Decimal = Field(default=Decimal("0.00"), decimal_places=2)
+    paid_count: int = Field(default=0)
+    
+    def pending_amount(self) -> Decimal:
+        return self.amount - self.paid_amount
@@ -0,0 +1,18 @@
+from typing import List, Optional
+from pydantic import Field, BaseModel
+
+from src.financial.models.transaction_model import TransactionModel
+
+
+class TransactionSearchPageModel(BaseModel):
+    # Trasações da pagina atual, da mais relevante para a menos relevante
+    transactions: List[TransactionModel] = Field(default_factory=list)
+    
+    # Relevancia (bm25) de cada trasação, menor é mais relevante
+    ranks: List[float] = Field(default_factory=list)
+    
+    # Cursor para a proxima pagina, None quando não há mais paginas
+    next_cursor: Optional[str] = Field(default=None)
+    
+    def have_next(self):
+        return (self.next_cursor is not None)
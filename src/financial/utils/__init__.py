@@ -1 +1,8 @@
-from src.financial.utils.financial import FinancialOnErrorEvent, FinancialOnErrorManager
\ No newline at end of file
+from src.financial.utils.financial import FinancialOnErrorEvent, FinancialOnErrorManager
+from src.financial.utils.money import to_cents, from_cents
+from src.financial.utils.transaction_index import TransactionIndex
+from src.financial.utils.balance_series import running_balances
+from src.financial.utils.statement_parsers import StatementParseError, StatementLine, InvalidStatementLine, ParsedLine, parse_csv, parse_ofx
+from src.financial.utils.transaction_export import write_csv, write_jsonl, write_npz
+from src.financial.utils.category_rules import CategoryRuleError, CategoryRuleEngine, normalize_text
+from src.financial.utils.data_loader import DeferredValue, DataLoader
\ No newline at end of file
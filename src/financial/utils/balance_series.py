@@ -0,0 +1,73 @@
+import numpy as np
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from src.financial.enums import SeriesFrequencies
+
+
+# 1970-01-05 foi uma segunda-feira, as semanas começam na segunda
+FIRST_MONDAY = 4
+
+
+def day_number(value: datetime) -> int:
+    # Dias desde 1970-01-01, o mesmo numero calculado pelo 'TransactionRepository.daily_balance_deltas'
+    return int(np.datetime64(value.date(), "D").astype(np.int64))
+
+
+def period_starts(days: np.ndarray, frequency: SeriesFrequencies) -> np.ndarray:
+    # Primeiro dia do periodo que contem cada dia
+    if frequency is SeriesFrequencies.DAY:
+        return days
+    if frequency is SeriesFrequencies.WEEK:
+        return days - (days - FIRST_MONDAY) % 7
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+
+def period_grid(first_day: int, last_day: int, frequency: SeriesFrequencies) -> np.ndarray:
+    first, last = period_starts(np.array([first_day, last_day], dtype=np.int64), frequency)
+    if frequency is SeriesFrequencies.DAY:
+        return np.arange(first, last + 1, dtype=np.int64)
+    if frequency is SeriesFrequencies.WEEK:
+        return np.arange(first, last + 1, 7, dtype=np.int64)
+    months = np.arange(first.astype("datetime64[D]").astype("datetime64[M]"), last.astype("datetime64[D]").astype("datetime64[M]") + 1)
+    return months.astype("datetime64[D]").astype(np.int64)
+
+
+def running_balances(
+        rows: List[Tuple[str, int, int]],
+        frequency: SeriesFrequencies,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        account_ids: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    # 'rows' são (conta, dia, variação em centavos), retorna as contas, o inicio dos periodos e a matriz de saldos
+    account_column, day_column, delta_column = zip(*rows) if rows else ((), (), ())
+    days = np.fromiter(day_column, dtype=np.int64, count=len(rows))
+    deltas = np.fromiter(delta_column, dtype=np.int64, count=len(rows))
+    if account_ids is None:
+        account_ids, account_codes = np.unique(np.array(account_column, dtype=object), return_inverse=True)
+        account_ids = list(account_ids)
+    else:
+        # A ordem pedida é mantida e contas sem movimento ficam com saldo zero
+        codes = {account_id: code for code, account_id in enumerate(account_ids)}
+        account_codes = np.fromiter((codes[account_id] for account_id in account_column), dtype=np.int64, count=len(rows))
+    
+    # Sem datas explicitas a serie vai do primeiro ao ultimo dia com movimento, 'end_date' é exclusivo
+    if start_date is not None:
+        first_day = day_number(start_date)
+    else:
+        first_day = int(days.min()) if len(days) else None
+    if end_date is not None:
+        last_day = day_number(end_date - timedelta(microseconds=1))
+    else:
+        last_day = int(days.max()) if len(days) else None
+    if first_day is None or last_day is None or last_day < first_day:
+        return account_ids, np.array([], dtype="datetime64[D]"), np.zeros((len(account_ids), 0), dtype=np.int64)
+    grid = period_grid(first_day, last_day, frequency)
+    
+    # Movimentos anteriores ao primeiro periodo entram nele como saldo de abertura
+    columns = np.clip(np.searchsorted(grid, period_starts(days, frequency), side="right") - 1, 0, None)
+    totals = np.zeros((len(account_ids), len(grid)), dtype=np.int64)
+    np.add.at(totals, (account_codes, columns), deltas)
+    # Soma acumulada por conta (linha), o saldo de cada coluna já inclui todos os periodos anteriores
+    return account_ids, grid.astype("datetime64[D]"), np.cumsum(totals, axis=1)
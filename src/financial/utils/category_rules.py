@@ -0,0 +1,162 @@
+import re
+import unicodedata
+from uuid import UUID
+from decimal import Decimal
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from src.financial.models.category_rule_model import CategoryRuleModel
+
+
+# Flags globais no inicio da expressão, como '(?i)' ou '(?x)'
+GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+class CategoryRuleError(ValueError):
+    # Regra que não pode ser compilada (expressão regular invalida, faixa de valor invertida, trecho vazio)
+    pass
+
+
+def normalize_text(value: str) -> str:
+    # Minusculas, sem acentos e com os espaços colapsados: 'FARMÁCIA  São João' -> 'farmacia sao joao'
+    if value.isascii():
+        return " ".join(value.casefold().split())
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+def trie_pattern(keywords: Iterable[str]) -> str:
+    # Monta a alternação como uma arvore de prefixos ('mercado|mercearia' -> 'merc(?:ado|earia)'), assim o 're'
+    # compara cada caractere uma vez em vez de tentar todos os trechos em cada posição da descrição.
+    # Um trecho que é prefixo de outro vira um grupo opcional guloso, então o casamento é sempre o mais longo
+    root: dict = dict()
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, dict())
+        node[""] = True
+    
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return "(?:" + body + ")?"
+        return body
+    
+    return build(root)
+
+
+class CategoryRuleEngine:
+    def __init__(self, rules: Iterable[CategoryRuleModel]) -> None:
+        # As regras ficam na ordem de precedencia, assim a regra vencedora é a de menor posição entre as que casam
+        indexed = list(enumerate(rules))
+        for _, rule in indexed:
+            if not isinstance(rule, CategoryRuleModel):
+                raise CategoryRuleError("As regras devem ser do tipo 'CategoryRuleModel'")
+        self._rules: List[CategoryRuleModel] = [rule for _, rule in sorted(indexed, key=lambda item: (-item[1].priority, item[0]))]
+        
+        keyword_rules: Dict[str, set] = dict()
+        self._pattern_rules: Dict[int, re.Pattern] = dict()
+        # Regras sem condição sobre a descrição são candidatas para qualquer transação
+        self._always: List[int] = list()
+        for position, rule in enumerate(self._rules):
+            if rule.min_amount is not None and rule.max_amount is not None and rule.min_amount > rule.max_amount:
+                raise CategoryRuleError(f"A regra '{rule.id}' tem 'min_amount' maior que 'max_amount'")
+            if not rule.has_text_condition():
+                self._always.append(position)
+            for keyword in rule.keywords:
+                normalized = normalize_text(keyword)
+                if not normalized:
+                    raise CategoryRuleError(f"A regra '{rule.id}' tem um trecho vazio")
+                keyword_rules.setdefault(normalized, set()).add(position)
+            if rule.pattern is not None:
+                try:
+                    self._pattern_rules[position] = re.compile(rule.pattern, re.IGNORECASE)
+                except re.error as error:
+                    raise CategoryRuleError(f"Expressão regular invalida na regra '{rule.id}': {error}")
+        
+        # Todos os trechos viram uma unica alternação dentro de um lookahead: o 'finditer' para em cada posição
+        # da descrição onde algum trecho começa, então uma passada acha todas as ocorrencias, inclusive sobrepostas.
+        # A alternação devolve o trecho mais longo que começa naquela posição e qualquer outro trecho que comece
+        # ali é prefixo dele, então o conjunto de regras de cada trecho já inclui as regras dos seus prefixos
+        self._keyword_rules: Dict[str, FrozenSet[int]] = dict()
+        for keyword in keyword_rules:
+            positions = set()
+            for length in range(1, len(keyword) + 1):
+                positions.update(keyword_rules.get(keyword[:length], ()))
+            self._keyword_rules[keyword] = frozenset(positions)
+        self._keywords = None
+        if keyword_rules:
+            self._keywords = re.compile(f"(?=({trie_pattern(keyword_rules)}))")
+        
+        # As expressões regulares viram uma alternação usada como filtro: a maioria das descrições não casa
+        # com nenhuma e é descartada com uma unica busca, as outras são testadas uma a uma. Só entram no filtro
+        # as expressões sem grupos (juntar as expressões renumera os grupos e quebra as referencias '\1') e sem
+        # flags globais ('(?i)' só é aceito no inicio da expressão), as demais são sempre testadas
+        self._filtered: FrozenSet[int] = frozenset(
+            position for position, pattern in self._pattern_rules.items()
+            if pattern.groups == 0 and not GLOBAL_FLAGS.match(pattern.pattern)
+        )
+        self._patterns = None
+        if self._filtered:
+            try:
+                self._patterns = re.compile("|".join(f"(?:{self._pattern_rules[position].pattern})" for position in sorted(self._filtered)), re.IGNORECASE)
+            except re.error as error:
+                raise CategoryRuleError(f"Não foi possivel combinar as expressões regulares das regras: {error}")
+    
+    def __len__(self) -> int:
+        return len(self._rules)
+    
+    @property
+    def rules(self) -> List[CategoryRuleModel]:
+        return list(self._rules)
+    
+    def _accepts(self, rule: CategoryRuleModel, transaction) -> bool:
+        if rule.user_id != transaction.user_id:
+            return False
+        if rule.account_id is not None and rule.account_id != transaction.account_id_destination:
+            return False
+        if rule.transaction_type is not None and rule.transaction_type != transaction.transaction_type:
+            return False
+        amount = Decimal(transaction.amount)
+        if rule.min_amount is not None and amount < rule.min_amount:
+            return False
+        if rule.max_amount is not None and amount > rule.max_amount:
+            return False
+        return True
+    
+    def match(self, transaction) -> Optional[CategoryRuleModel]:
+        # Aceita qualquer objeto com os campos de 'TransactionModel' usados pelas regras
+        candidates = set(self._always)
+        if self._keywords is not None:
+            for found in self._keywords.finditer(normalize_text(transaction.description)):
+                candidates.update(self._keyword_rules[found.group(1)])
+        best = None
+        for position in sorted(candidates):
+            if self._accepts(self._rules[position], transaction):
+                best = position
+                break
+        # As expressões do filtro só são testadas quando a alternação casa com a descrição
+        filtered_hit = None
+        # Só as expressões de regras que venceriam a melhor regra encontrada até aqui
+        for position, pattern in self._pattern_rules.items():
+            if best is not None and position >= best:
+                break
+            if position in self._filtered:
+                if filtered_hit is None:
+                    filtered_hit = self._patterns.search(transaction.description) is not None
+                if not filtered_hit:
+                    continue
+            if pattern.search(transaction.description) and self._accepts(self._rules[position], transaction):
+                best = position
+                break
+        return self._rules[best] if best is not None else None
+    
+    def classify(self, transactions: Iterable) -> List[Optional[UUID]]:
+        # Categoria da regra vencedora de cada transação, None quando nenhuma regra casa
+        result = []
+        for transaction in transactions:
+            rule = self.match(transaction)
+            result.append(rule.category_id if rule is not None else None)
+        return result
@@ -0,0 +1,84 @@
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DeferredValue(Generic[K, V]):
+    __slots__ = ("_loader", "_key")
+    
+    def __init__(self, loader: "DataLoader[K, V]", key: K) -> None:
+        self._loader = loader
+        self._key = key
+    
+    @property
+    def key(self) -> K:
+        return self._key
+    
+    def get(self) -> Optional[V]:
+        # O primeiro 'get' despacha em um unico lote todas as chaves pedidas até aqui, os seguintes só leem o memo
+        return self._loader.get(self._key)
+
+
+class DataLoader(Generic[K, V]):
+    def __init__(self, batch_load: Callable[[List[K]], Dict[K, V]], max_batch_size: Optional[int] = None) -> None:
+        # 'batch_load' recebe uma lista de chaves sem repetição e devolve um dicionario só com as chaves encontradas
+        if max_batch_size is not None and max_batch_size < 1:
+            raise ValueError("'max_batch_size' deve ser maior que zero")
+        self._batch_load = batch_load
+        self._max_batch_size = max_batch_size
+        # Memo da requisição: chaves já resolvidas, incluindo as que não existem (None) para não buscar de novo
+        self._memo: Dict[K, Optional[V]] = dict()
+        # Chaves pedidas e ainda não despachadas, o dicionario mantem a ordem e remove repetições
+        self._pending: Dict[K, None] = dict()
+        self._batches = 0
+    
+    @property
+    def batches(self) -> int:
+        return self._batches
+    
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+    
+    def load(self, key: K) -> DeferredValue[K, V]:
+        # Só enfileira a chave, a busca acontece no primeiro 'get' ou 'dispatch'
+        if key not in self._memo:
+            self._pending[key] = None
+        return DeferredValue(self, key)
+    
+    def load_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        keys = list(keys)
+        for key in keys:
+            self.load(key)
+        self.dispatch()
+        return {key: self._memo[key] for key in keys if self._memo[key] is not None}
+    
+    def get(self, key: K) -> Optional[V]:
+        if key not in self._memo:
+            self.load(key)
+            self.dispatch()
+        return self._memo[key]
+    
+    def dispatch(self) -> None:
+        # Esvazia a fila antes de buscar para que chaves pedidas dentro de 'batch_load' entrem no proximo lote
+        keys, self._pending = list(self._pending), dict()
+        size = self._max_batch_size or len(keys)
+        for start in range(0, len(keys), size or 1):
+            chunk = keys[start:start + size]
+            found = self._batch_load(chunk)
+            self._batches += 1
+            for key in chunk:
+                self._memo[key] = found.get(key)
+    
+    def prime(self, key: K, value: V) -> None:
+        # Valores já conhecidos (ex.: vindos de outra consulta) entram no memo sem ir para o banco
+        self._memo[key] = value
+        self._pending.pop(key, None)
+    
+    def clear(self, key: Optional[K] = None) -> None:
+        if key is None:
+            self._memo.clear()
+            return
+        self._memo.pop(key, None)
@@ -0,0 +1,14 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+
+
+CENT = Decimal("0.01")
+
+
+def to_cents(value: Decimal) -> int:
+    # Valores monetarios são guardados no banco como inteiros em centavos
+    return int(Decimal(value).quantize(CENT, rounding=ROUND_HALF_EVEN).scaleb(2))
+
+
+def from_cents(cents: int) -> Decimal:
+    # 'scaleb' só muda o expoente, o resultado já sai com duas casas sem formatar string
+    return Decimal(int(cents)).scaleb(-2)
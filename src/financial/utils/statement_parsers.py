@@ -0,0 +1,113 @@
+import re
+import csv
+import html
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Iterator, NamedTuple, TextIO, Tuple, Union
+
+from src.financial.models.statement_import_model import StatementCsvLayoutModel
+
+
+class StatementParseError(ValueError):
+    # Erro no arquivo inteiro (ex.: cabeçalho sem as colunas esperadas), linhas invalidas viram 'InvalidStatementLine'
+    pass
+
+
+class StatementLine(NamedTuple):
+    # Numero da linha no CSV ou posição da transação no OFX
+    line: int
+    date: datetime
+    # Valor com sinal: negativo sai da conta, positivo entra
+    amount: Decimal
+    description: str
+
+
+class InvalidStatementLine(NamedTuple):
+    line: int
+    reason: str
+
+
+ParsedLine = Union[StatementLine, InvalidStatementLine]
+
+
+def parse_amount(value: str, decimal_separator: str = ".", thousands_separator: str = "") -> Decimal:
+    value = value.strip().replace(" ", "")
+    if thousands_separator:
+        value = value.replace(thousands_separator, "")
+    if decimal_separator != ".":
+        value = value.replace(decimal_separator, ".")
+    return Decimal(value)
+
+
+def parse_csv(file: TextIO, layout: StatementCsvLayoutModel = StatementCsvLayoutModel()) -> Iterator[ParsedLine]:
+    # O 'csv.DictReader' lê uma linha por vez, o arquivo nunca é carregado inteiro
+    reader = csv.DictReader(file, delimiter=layout.delimiter)
+    missing = {layout.date_column, layout.amount_column, layout.description_column} - set(reader.fieldnames or [])
+    if missing:
+        raise StatementParseError(f"Colunas ausentes no cabeçalho do CSV: {sorted(missing)}")
+    for row in reader:
+        try:
+            yield StatementLine(
+                line=reader.line_num,
+                date=datetime.strptime(row[layout.date_column].strip(), layout.date_format),
+                amount=parse_amount(row[layout.amount_column], layout.decimal_separator, layout.thousands_separator),
+                description=(row[layout.description_column] or "").strip(),
+            )
+        except (ValueError, InvalidOperation, AttributeError) as error:
+            yield InvalidStatementLine(line=reader.line_num, reason=str(error) or type(error).__name__)
+
+
+# Tags SGML (OFX 1.x, sem fechamento nos campos) e XML (OFX 2.x) têm o mesmo formato '<NOME>valor'
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def iter_ofx_tags(file: TextIO, chunk_size: int = 1 << 16) -> Iterator[Tuple[bool, str, str]]:
+    # Lê em blocos e só processa até o ultimo '<' de cada bloco, a tag cortada fica para o proximo
+    buffer = ""
+    while chunk:=file.read(chunk_size):
+        buffer += chunk
+        cut = buffer.rfind("<")
+        if cut <= 0:
+            continue
+        for match in OFX_TAG.finditer(buffer, 0, cut):
+            yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[cut:]
+    for match in OFX_TAG.finditer(buffer):
+        yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+
+
+def parse_ofx_date(value: str) -> datetime:
+    # 'AAAAMMDD[HHMMSS[.XXX]][[-3:BRT]]', o fuso é descartado como nas datas do resto do sistema
+    digits = re.match(r"\d+", value)
+    if digits is None or len(digits.group()) < 8:
+        raise ValueError(f"Data OFX invalida '{value}'")
+    digits = digits.group()
+    if len(digits) >= 14:
+        return datetime.strptime(digits[:14], "%Y%m%d%H%M%S")
+    return datetime.strptime(digits[:8], "%Y%m%d")
+
+
+def parse_ofx(file: TextIO, chunk_size: int = 1 << 16) -> Iterator[ParsedLine]:
+    position = 0
+    fields = None
+    for closing, name, value in iter_ofx_tags(file, chunk_size=chunk_size):
+        if name == "STMTTRN":
+            if not closing:
+                fields = dict()
+                continue
+            if fields is None:
+                continue
+            position += 1
+            try:
+                description = fields.get("MEMO") or fields.get("NAME") or ""
+                yield StatementLine(
+                    line=position,
+                    date=parse_ofx_date(fields["DTPOSTED"]),
+                    amount=parse_amount(fields["TRNAMT"], decimal_separator="," if "," in fields["TRNAMT"] else "."),
+                    description=html.unescape(description),
+                )
+            except (KeyError, ValueError, InvalidOperation) as error:
+                yield InvalidStatementLine(line=position, reason=str(error) or type(error).__name__)
+            fields = None
+        elif fields is not None and not closing and value:
+            fields[name] = value
@@ -0,0 +1,113 @@
+import os
+import csv
+import shutil
+import zipfile
+import tempfile
+import numpy as np
+
+from typing import BinaryIO, Dict, Iterable, List, TextIO, Union
+
+from src.financial.models.transaction_model import TransactionModel
+from src.financial.utils.money import to_cents
+
+
+# Ordem das colunas no CSV (a mesma dos campos do 'TransactionModel')
+EXPORT_FIELDS = list(TransactionModel.model_fields)
+
+# Colunas de tamanho fixo do arquivo '.npz': ids em hex ASCII (vazio quando None), datas em microssegundos e valores em centavos
+NPZ_COLUMNS = {
+    "id": np.dtype("S32"),
+    "date": np.dtype("datetime64[us]"),
+    "amount": np.dtype(np.int64),
+    "transaction_type": np.dtype("U16"),
+    "paid": np.dtype(np.bool_),
+    "ignore": np.dtype(np.bool_),
+    "visible": np.dtype(np.bool_),
+    "category_id": np.dtype("S32"),
+    "tag_id": np.dtype("S32"),
+    "account_id_origin": np.dtype("S32"),
+    "account_id_destination": np.dtype("S32"),
+    "created_at": np.dtype("datetime64[us]"),
+    "user_id": np.dtype("S32"),
+}
+
+
+def write_csv(transactions: Iterable[TransactionModel], file: TextIO) -> int:
+    # Cada transação é escrita assim que chega, o arquivo cresce sem acumular linhas em memória
+    writer = csv.DictWriter(file, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    count = 0
+    for transaction in transactions:
+        writer.writerow(transaction.model_dump(mode="json"))
+        count += 1
+    return count
+
+
+def write_jsonl(transactions: Iterable[TransactionModel], file: TextIO) -> int:
+    count = 0
+    for transaction in transactions:
+        file.write(transaction.model_dump_json())
+        file.write("\n")
+        count += 1
+    return count
+
+
+def _npz_column(transactions: List[TransactionModel], name: str) -> list:
+    values = [getattr(transaction, name) for transaction in transactions]
+    if name == "amount":
+        return [to_cents(value) for value in values]
+    if name == "transaction_type":
+        return [value.value for value in values]
+    if NPZ_COLUMNS[name].kind == "S":
+        return [value.hex if value is not None else "" for value in values]
+    return values
+
+
+def _write_npz_batch(transactions: List[TransactionModel], columns: Dict[str, BinaryIO], descriptions: BinaryIO, offsets: BinaryIO, position: int) -> int:
+    for name, dtype in NPZ_COLUMNS.items():
+        np.array(_npz_column(transactions, name), dtype=dtype).tofile(columns[name])
+    # Descrições têm tamanho variavel: os bytes UTF-8 ficam concatenados e um vetor de offsets marca o fim de cada uma (como no Arrow)
+    encoded = [transaction.description.encode("utf-8") for transaction in transactions]
+    descriptions.write(b"".join(encoded))
+    ends = np.cumsum([len(value) for value in encoded], dtype=np.int64) + position
+    ends.tofile(offsets)
+    return int(ends[-1])
+
+
+def _add_npy(archive: zipfile.ZipFile, name: str, raw_path: str, dtype: np.dtype, length: int) -> None:
+    # Cabeçalho '.npy' escrito à mão para copiar os dados brutos do arquivo temporario sem carregar a coluna
+    with archive.open(f"{name}.npy", "w", force_zip64=True) as entry, open(raw_path, "rb") as raw:
+        np.lib.format.write_array_header_2_0(entry, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (length,)})
+        shutil.copyfileobj(raw, entry, length=1 << 20)
+
+
+def write_npz(transactions: Iterable[TransactionModel], target: Union[str, os.PathLike, BinaryIO], batch_size: int = 10_000) -> int:
+    # Cada coluna vai para um arquivo temporario durante uma unica leitura das transações e no final
+    # os arquivos viram as entradas do '.npz', a memória usada é a de um lote independente do total
+    directory = os.path.dirname(os.path.abspath(target)) if isinstance(target, (str, os.PathLike)) else None
+    with tempfile.TemporaryDirectory(dir=directory) as temporary:
+        raw_paths = {name: os.path.join(temporary, name) for name in [*NPZ_COLUMNS, "description_bytes", "description_offsets"]}
+        files = {name: open(raw_path, "wb") for name, raw_path in raw_paths.items()}
+        try:
+            count = 0
+            position = 0
+            batch = []
+            for transaction in transactions:
+                batch.append(transaction)
+                if len(batch) >= batch_size:
+                    position = _write_npz_batch(batch, files, files["description_bytes"], files["description_offsets"], position)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                position = _write_npz_batch(batch, files, files["description_bytes"], files["description_offsets"], position)
+                count += len(batch)
+        finally:
+            for file in files.values():
+                file.close()
+        
+        with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            for name, dtype in NPZ_COLUMNS.items():
+                _add_npy(archive, name, raw_paths[name], dtype, count)
+            _add_npy(archive, "description_bytes", raw_paths["description_bytes"], np.dtype(np.uint8), position)
+            _add_npy(archive, "description_offsets", raw_paths["description_offsets"], np.dtype(np.int64), count)
+    return count
@@ -0,0 +1,99 @@
+from uuid import UUID
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Campos da transação que recebem um indice secundario
+INDEXED_FIELDS = ("user_id", "account_id_destination", "account_id_origin", "category_id", "tag_id")
+
+
+class TransactionIndex:
+    def __init__(self) -> None:
+        # Para cada campo, cada valor aponta para uma lista de (date, id) ordenada por data
+        self._groups: Dict[str, Dict[UUID, List[Tuple[datetime, UUID]]]] = {field: dict() for field in INDEXED_FIELDS}
+        # Indice global por data
+        self._dates: List[Tuple[datetime, UUID]] = list()
+        # Copia das chaves usadas em cada id, pois os modelos do cache podem ser alterados no lugar antes do update
+        self._keys: Dict[UUID, Tuple[datetime, Tuple[Optional[UUID], ...]]] = dict()
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def add(self, transaction) -> None:
+        if transaction.id in self._keys:
+            self.remove(transaction.id)
+        entry = (transaction.date, transaction.id)
+        values = tuple(getattr(transaction, field) for field in INDEXED_FIELDS)
+        self._keys[transaction.id] = (transaction.date, values)
+        insort(self._dates, entry)
+        for field, value in zip(INDEXED_FIELDS, values):
+            if value is not None:
+                insort(self._groups[field].setdefault(value, list()), entry)
+    
+    def extend(self, transactions: Iterable) -> None:
+        # Carga em lote: anexa todas as entradas e ordena cada lista alterada uma unica vez no lugar de um 'insort'
+        # por linha, que move a lista inteira a cada inserção (O(n²) na carga do cache)
+        latest = {transaction.id: transaction for transaction in transactions}
+        # Entradas antigas saem antes, enquanto as listas ainda estão ordenadas para a busca binaria do 'remove'
+        for id in latest:
+            if id in self._keys:
+                self.remove(id)
+        touched = dict()
+        for transaction in latest.values():
+            entry = (transaction.date, transaction.id)
+            values = tuple(getattr(transaction, field) for field in INDEXED_FIELDS)
+            self._keys[transaction.id] = (transaction.date, values)
+            self._dates.append(entry)
+            for field, value in zip(INDEXED_FIELDS, values):
+                if value is not None:
+                    group = self._groups[field].setdefault(value, list())
+                    group.append(entry)
+                    touched[(field, value)] = group
+        # O timsort aproveita o trecho que já estava ordenado, o custo fica perto de O(n + k log k)
+        self._dates.sort()
+        for group in touched.values():
+            group.sort()
+    
+    def rebuild(self, transactions: Iterable) -> None:
+        self.clear()
+        self.extend(transactions)
+    
+    def remove(self, id: UUID) -> None:
+        keys = self._keys.pop(id, None)
+        if keys is None:
+            return
+        date, values = keys
+        entry = (date, id)
+        self._discard(self._dates, entry)
+        for field, value in zip(INDEXED_FIELDS, values):
+            if value is None:
+                continue
+            group = self._groups[field].get(value)
+            self._discard(group, entry)
+            if not group:
+                self._groups[field].pop(value, None)
+    
+    def clear(self) -> None:
+        self.__init__()
+    
+    @staticmethod
+    def _discard(entries: List[Tuple[datetime, UUID]], entry: Tuple[datetime, UUID]) -> None:
+        index = bisect_left(entries, entry)
+        if index < len(entries) and entries[index] == entry:
+            entries.pop(index)
+    
+    @staticmethod
+    def _range(entries: List[Tuple[datetime, UUID]], start_date: Optional[datetime], end_date: Optional[datetime]) -> List[UUID]:
+        # Duas buscas binarias delimitam o intervalo [start_date, end_date), o custo é O(log n + k)
+        lower = bisect_left(entries, (start_date,)) if start_date is not None else 0
+        upper = bisect_left(entries, (end_date,)) if end_date is not None else len(entries)
+        return [id for _, id in entries[lower:upper]]
+    
+    def ids_by(self, field: str, value: UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[UUID]:
+        if field not in self._groups:
+            raise KeyError(f"O campo '{field}' não é indexado")
+        return self._range(self._groups[field].get(value, []), start_date, end_date)
+    
+    def ids_by_date(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[UUID]:
+        return self._range(self._dates, start_date, end_date)
@@ -7,6 +7,7 @@ from typing import Optional, List
 
 from infra.entities import Account
 from src.financial.models import AccountModel
+from src.financial.utils.money import to_cents, from_cents
 from src.financial.database_adapter import AccountDatabaseAdapter
 from src.financial.exceptions.database_adapter_errors.account_db_adapter_error import AccountAlreadyExistsError, AccountDBAdapterError, AccountNotFoundError, UnexpectedArgumentTypeError
 
@@ -32,12 +33,15 @@ class MockUserRepository:
     def select_from_id(self, id: str) -> Optional[Account]:
         return next((account for account in self.register if account.id == id), None)
     
+    def select_from_ids(self, ids: List[str]) -> List[Account]:
+        return [account for account in self.register if account.id in ids]
+    
     def insert(self,
             id: str,
             name: str,
             description: str,
             tag_id: str,
-            balance: float,
+            balance: int,
             created_at: datetime,
             user_id: str) -> Account:
         new_account = Account(
@@ -57,14 +61,14 @@ class MockUserRepository:
             name: str = None,
             description: str = None,
             tag_id: str = None,
-            balance: float = None,
+            balance: int = None,
             created_at: datetime.datetime = None,
             user_id: str = None) -> Optional[Account]:
         account = next((account for account in self.register if account.id == id), None)
-        idx = self.register.index(account)
         
         if not account:
             return None
+        idx = self.register.index(account)
         
         fields_to_update = {
                 "name": name,
@@ -74,7 +78,7 @@ class MockUserRepository:
                 "created_at": created_at,
                 "user_id": user_id,
             }
-            
+        
         for field, value in fields_to_update.items():
             if value is not None:
                 setattr(account, field, value)
@@ -112,7 +116,7 @@ def test_account_db_adapter_method_insert(account_db_adapter: AccountDatabaseAda
     assert REGISTER[0].name == account_model.name
     assert REGISTER[0].description == account_model.description
     assert REGISTER[0].tag_id == account_model.tag_id.hex
-    assert REGISTER[0].balance == account_model.balance
+    assert REGISTER[0].balance == to_cents(account_model.balance)
     assert REGISTER[0].created_at == account_model.created_at
     assert REGISTER[0].user_id == account_model.user_id.hex
 
@@ -129,7 +133,7 @@ def test_account_db_adapter_method_update01(account_db_adapter: AccountDatabaseA
     assert REGISTER[0].name == new_name
     assert REGISTER[0].description == new_description
     assert REGISTER[0].tag_id == new_tag_id.hex
-    assert REGISTER[0].balance == account_model.balance
+    assert REGISTER[0].balance == to_cents(account_model.balance)
     assert REGISTER[0].created_at == account_model.created_at
     assert REGISTER[0].user_id == account_model.user_id.hex
 
@@ -146,7 +150,7 @@ def test_account_db_adapter_method_update02(account_db_adapter: AccountDatabaseA
     assert REGISTER[0].name == account_model.name
     assert REGISTER[0].description == account_model.description
     assert REGISTER[0].tag_id == account_model.tag_id.hex
-    assert REGISTER[0].balance == new_balance
+    assert REGISTER[0].balance == to_cents(new_balance)
     assert REGISTER[0].created_at == new_created_at
     assert REGISTER[0].user_id == new_user_id.hex
 
@@ -158,7 +162,7 @@ def test_account_db_adapter_method_get_all(account_db_adapter: AccountDatabaseAd
     assert result[0].name == REGISTER[0].name
     assert result[0].description == REGISTER[0].description
     assert result[0].tag_id.hex == REGISTER[0].tag_id
-    assert result[0].balance == REGISTER[0].balance
+    assert result[0].balance == from_cents(REGISTER[0].balance)
     assert result[0].created_at == REGISTER[0].created_at
     assert result[0].user_id.hex == REGISTER[0].user_id
 
@@ -169,11 +173,19 @@ def test_account_db_adapter_method_get(account_db_adapter: AccountDatabaseAdapte
     assert result.name == REGISTER[0].name
     assert result.description == REGISTER[0].description
     assert result.tag_id.hex == REGISTER[0].tag_id
-    assert result.balance == REGISTER[0].balance
+    assert result.balance == from_cents(REGISTER[0].balance)
     assert result.created_at == REGISTER[0].created_at
     assert result.user_id.hex == REGISTER[0].user_id
 
 
+def test_account_db_adapter_method_get_many(account_db_adapter: AccountDatabaseAdapter, account_model: AccountModel):
+    missing = uuid.uuid4()
+    result = account_db_adapter.get_many(ids=[missing, account_model.id])
+    assert list(result) == [account_model.id]
+    assert result[account_model.id].id.hex == REGISTER[0].id
+    assert account_db_adapter.get_many(ids=[]) == {}
+
+
 def test_account_db_adapter_method_delete(account_db_adapter: AccountDatabaseAdapter, account_model: AccountModel):
     assert len(REGISTER) == 1
     account_db_adapter.delete(id=account_model.id)
@@ -198,7 +210,7 @@ def test_account_db_adapter_error_generic_method_update_01(account_db_adapter: A
         name="TESTER NAME",
         description="TESTER DESCRIPTION",
         tag_id=uuid.uuid4().hex,
-        balance=2.0,
+        balance=200,
         created_at=datetime.datetime.now(),
         user_id=uuid.uuid4().hex,
     )
@@ -233,6 +245,11 @@ def test_account_db_adapter_error_unexpected_argument_type_method_get(account_db
         account_db_adapter.get(id="TESTER_ERROR")
 
 
+def test_account_db_adapter_error_unexpected_argument_type_method_get_many(account_db_adapter: AccountDatabaseAdapter):
+    with pytest.raises(UnexpectedArgumentTypeError):
+        account_db_adapter.get_many(ids=["TESTER_ERROR"])
+
+
 def test_account_db_adapter_error_unexpected_argument_type_method_delete(account_db_adapter: AccountDatabaseAdapter):
     with pytest.raises(UnexpectedArgumentTypeError):
         account_db_adapter.delete(id="TESTER_ERROR")
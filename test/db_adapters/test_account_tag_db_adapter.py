@@ -28,6 +28,9 @@ class MockUserRepository:
     def select_from_id(self, id: str) -> Optional[AccountTag]:
         return next((account_tag for account_tag in self.register if account_tag.id == id), None)
     
+    def select_from_ids(self, ids: List[str]) -> List[AccountTag]:
+        return [account_tag for account_tag in self.register if account_tag.id in ids]
+    
     def insert(self,
             id: str,
             name: str,
@@ -48,17 +51,17 @@ class MockUserRepository:
             created_at: datetime.datetime = None,
             user_id: str = None) -> Optional[AccountTag]:
         account_tag = next((account_tag for account_tag in self.register if account_tag.id == id), None)
-        idx = self.register.index(account_tag)
         
         if not account_tag:
             return None
+        idx = self.register.index(account_tag)
         
         fields_to_update = {
                 "name": name,
                 "created_at": created_at,
                 "user_id": user_id,
             }
-            
+        
         for field, value in fields_to_update.items():
             if value is not None:
                 setattr(account_tag, field, value)
@@ -134,6 +137,14 @@ def test_account_tag_db_adapter_method_get(account_tag_db_adapter: AccountTagDat
     assert result.user_id.hex == REGISTER[0].user_id
 
 
+def test_account_tag_db_adapter_method_get_many(account_tag_db_adapter: AccountTagDatabaseAdapter, account_tag_model: AccountTagModel):
+    missing = uuid.uuid4()
+    result = account_tag_db_adapter.get_many(ids=[missing, account_tag_model.id])
+    assert list(result) == [account_tag_model.id]
+    assert result[account_tag_model.id].id.hex == REGISTER[0].id
+    assert account_tag_db_adapter.get_many(ids=[]) == {}
+
+
 def test_account_tag_db_adapter_method_delete(account_tag_db_adapter: AccountTagDatabaseAdapter, account_tag_model: AccountTagModel):
     assert len(REGISTER) == 1
     account_tag_db_adapter.delete(id=account_tag_model.id)
@@ -190,6 +201,11 @@ def test_account_tag_db_adapter_error_unexpected_argument_type_method_get(accoun
         account_tag_db_adapter.get(id="TESTER_ERROR")
 
 
+def test_account_tag_db_adapter_error_unexpected_argument_type_method_get_many(account_tag_db_adapter: AccountTagDatabaseAdapter):
+    with pytest.raises(UnexpectedArgumentTypeError):
+        account_tag_db_adapter.get_many(ids=["TESTER_ERROR"])
+
+
 def test_account_tag_db_adapter_error_unexpected_argument_type_method_delete(account_tag_db_adapter: AccountTagDatabaseAdapter):
     with pytest.raises(UnexpectedArgumentTypeError):
         account_tag_db_adapter.delete(id="TESTER_ERROR")
@@ -28,6 +28,9 @@ class MockUserRepository:
     def select_from_id(self, id: str) -> Optional[TransactionCategory]:
         return next((transaction_category for transaction_category in self.register if transaction_category.id == id), None)
     
+    def select_from_ids(self, ids: List[str]) -> List[TransactionCategory]:
+        return [transaction_category for transaction_category in self.register if transaction_category.id in ids]
+    
     def insert(self,
             id: str,
             name: str,
@@ -48,17 +51,17 @@ class MockUserRepository:
             created_at: datetime.datetime = None,
             user_id: str = None) -> Optional[TransactionCategory]:
         transaction_category = next((transaction_category for transaction_category in self.register if transaction_category.id == id), None)
-        idx = self.register.index(transaction_category)
         
         if not transaction_category:
             return None
+        idx = self.register.index(transaction_category)
         
         fields_to_update = {
                 "name": name,
                 "created_at": created_at,
                 "user_id": user_id,
             }
-            
+        
         for field, value in fields_to_update.items():
             if value is not None:
                 setattr(transaction_category, field, value)
@@ -134,6 +137,14 @@ def test_transaction_category_db_adapter_method_get(transaction_category_db_adap
     assert result.user_id.hex == REGISTER[0].user_id
 
 
+def test_transaction_category_db_adapter_method_get_many(transaction_category_db_adapter: TransactionCategoryDatabaseAdapter, transaction_category_model: TransactionCategoryModel):
+    missing = uuid.uuid4()
+    result = transaction_category_db_adapter.get_many(ids=[missing, transaction_category_model.id])
+    assert list(result) == [transaction_category_model.id]
+    assert result[transaction_category_model.id].id.hex == REGISTER[0].id
+    assert transaction_category_db_adapter.get_many(ids=[]) == {}
+
+
 def test_transaction_category_db_adapter_method_delete(transaction_category_db_adapter: TransactionCategoryDatabaseAdapter, transaction_category_model: TransactionCategoryModel):
     assert len(REGISTER) == 1
     transaction_category_db_adapter.delete(id=transaction_category_model.id)
@@ -190,6 +201,11 @@ def test_transaction_category_db_adapter_error_unexpected_argument_type_method_g
         transaction_category_db_adapter.get(id="TESTER_ERROR")
 
 
+def test_transaction_category_db_adapter_error_unexpected_argument_type_method_get_many(transaction_category_db_adapter: TransactionCategoryDatabaseAdapter):
+    with pytest.raises(UnexpectedArgumentTypeError):
+        transaction_category_db_adapter.get_many(ids=["TESTER_ERROR"])
+
+
 def test_transaction_category_db_adapter_error_unexpected_argument_type_method_delete(transaction_category_db_adapter: TransactionCategoryDatabaseAdapter):
     with pytest.raises(UnexpectedArgumentTypeError):
         transaction_category_db_adapter.delete(id="TESTER_ERROR")
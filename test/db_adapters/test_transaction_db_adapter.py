@@ -6,6 +6,7 @@ from decimal import Decimal
 from typing import Optional, List
 
 from infra.entities import Transaction
+from src.financial.utils.money import to_cents, from_cents
 from src.financial.database_adapter import TransactionDatabaseAdapter
 from src.financial.models import TransactionModel, TransactionTypes
 from src.financial.exceptions.database_adapter_errors.transaction_db_adapter_error import TransactionAlreadyExistsError, TransactionDBAdapterError, TransactionNotFoundError, UnexpectedArgumentTypeError
@@ -39,11 +40,14 @@ class MockUserRepository:
     def select_from_id(self, id: str) -> Optional[Transaction]:
         return next((transaction for transaction in self.register if transaction.id == id), None)
     
+    def select_from_ids(self, ids: List[str]) -> List[Transaction]:
+        return [transaction for transaction in self.register if transaction.id in ids]
+    
     def insert(self,
             id: str,
             date: datetime.datetime,
             description: str,
-            amount: float,
+            amount: int,
             transaction_type: str,
             paid: bool,
             ignore: bool,
@@ -77,7 +81,7 @@ class MockUserRepository:
             id: str,
             date: datetime.datetime,
             description: str,
-            amount: float,
+            amount: int,
             transaction_type: str,
             paid: bool,
             ignore: bool,
@@ -89,10 +93,10 @@ class MockUserRepository:
             created_at: datetime,
             user_id: str,) -> Optional[Transaction]:
         transaction = next((transaction for transaction in self.register if transaction.id == id), None)
-        idx = self.register.index(transaction)
         
         if not transaction:
             return None
+        idx = self.register.index(transaction)
         
         fields_to_update = {
             "id" : id,
@@ -154,7 +158,7 @@ def test_transaction_db_adapter_method_insert(transaction_db_adapter: Transactio
     assert REGISTER[0].id == transaction_model.id.hex
     assert REGISTER[0].date == transaction_model.date
     assert REGISTER[0].description == transaction_model.description
-    assert REGISTER[0].amount == transaction_model.amount
+    assert REGISTER[0].amount == to_cents(transaction_model.amount)
     assert REGISTER[0].transaction_type == transaction_model.transaction_type.value
     assert REGISTER[0].paid == transaction_model.paid
     assert REGISTER[0].ignore == transaction_model.ignore
@@ -189,7 +193,7 @@ def test_transaction_db_adapter_method_update01(transaction_db_adapter: Transact
     assert REGISTER[0].id == transaction_model.id.hex
     assert REGISTER[0].date == new_date
     assert REGISTER[0].description == new_description
-    assert REGISTER[0].amount == new_amount
+    assert REGISTER[0].amount == to_cents(new_amount)
     assert REGISTER[0].transaction_type == new_type.value
     assert REGISTER[0].paid == new_paid
     assert REGISTER[0].ignore == new_ignore
@@ -222,7 +226,7 @@ def test_transaction_db_adapter_method_update02(transaction_db_adapter: Transact
     assert REGISTER[0].id == transaction_model.id.hex
     assert REGISTER[0].date == transaction_model.date
     assert REGISTER[0].description == transaction_model.description
-    assert REGISTER[0].amount == transaction_model.amount
+    assert REGISTER[0].amount == to_cents(transaction_model.amount)
     assert REGISTER[0].transaction_type == transaction_model.transaction_type.value
     assert REGISTER[0].paid == transaction_model.paid
     assert REGISTER[0].ignore == transaction_model.ignore
@@ -242,7 +246,7 @@ def test_transaction_db_adapter_method_get_all(transaction_db_adapter: Transacti
     assert result[0].id.hex == REGISTER[0].id
     assert result[0].date == REGISTER[0].date
     assert result[0].description == REGISTER[0].description
-    assert result[0].amount == REGISTER[0].amount
+    assert result[0].amount == from_cents(REGISTER[0].amount)
     assert result[0].transaction_type.value == REGISTER[0].transaction_type
     assert result[0].paid == REGISTER[0].paid
     assert result[0].ignore == REGISTER[0].ignore
@@ -260,7 +264,7 @@ def test_transaction_db_adapter_method_get(transaction_db_adapter: TransactionDa
     assert result.id.hex == REGISTER[0].id
     assert result.date == REGISTER[0].date
     assert result.description == REGISTER[0].description
-    assert result.amount == REGISTER[0].amount
+    assert result.amount == from_cents(REGISTER[0].amount)
     assert result.transaction_type.value == REGISTER[0].transaction_type
     assert result.paid == REGISTER[0].paid
     assert result.ignore == REGISTER[0].ignore
@@ -273,6 +277,14 @@ def test_transaction_db_adapter_method_get(transaction_db_adapter: TransactionDa
     assert result.user_id.hex == REGISTER[0].user_id
 
 
+def test_transaction_db_adapter_method_get_many(transaction_db_adapter: TransactionDatabaseAdapter, transaction_model: TransactionModel):
+    missing = uuid.uuid4()
+    result = transaction_db_adapter.get_many(ids=[missing, transaction_model.id])
+    assert list(result) == [transaction_model.id]
+    assert result[transaction_model.id].id.hex == REGISTER[0].id
+    assert transaction_db_adapter.get_many(ids=[]) == {}
+
+
 def test_transaction_db_adapter_method_delete(transaction_db_adapter: TransactionDatabaseAdapter, transaction_model: TransactionModel):
     assert len(REGISTER) == 1
     transaction_db_adapter.delete(id=transaction_model.id)
@@ -296,7 +308,7 @@ def test_transaction_db_adapter_error_generic_method_update_01(transaction_db_ad
         id=uuid.uuid4().hex,
         date = datetime.datetime.now(),
         description = "TESTE_DESCRIPTION",
-        amount = 2.0,
+        amount = 200,
         transaction_type = "despesa",
         paid = False,
         ignore = True,
@@ -339,6 +351,11 @@ def test_transaction_db_adapter_error_unexpected_argument_type_method_get(transa
         transaction_db_adapter.get(id="TESTER_ERROR")
 
 
+def test_transaction_db_adapter_error_unexpected_argument_type_method_get_many(transaction_db_adapter: TransactionDatabaseAdapter):
+    with pytest.raises(UnexpectedArgumentTypeError):
+        transaction_db_adapter.get_many(ids=["TESTER_ERROR"])
+
+
 def test_transaction_db_adapter_error_unexpected_argument_type_method_delete(transaction_db_adapter: TransactionDatabaseAdapter):
     with pytest.raises(UnexpectedArgumentTypeError):
         transaction_db_adapter.delete(id="TESTER_ERROR")
@@ -28,6 +28,9 @@ class MockUserRepository:
     def select_from_id(self, id: str) -> Optional[TransactionTag]:
         return next((transaction_tag for transaction_tag in self.register if transaction_tag.id == id), None)
     
+    def select_from_ids(self, ids: List[str]) -> List[TransactionTag]:
+        return [transaction_tag for transaction_tag in self.register if transaction_tag.id in ids]
+    
     def insert(self,
             id: str,
             name: str,
@@ -48,17 +51,17 @@ class MockUserRepository:
             created_at: datetime.datetime = None,
             user_id: str = None) -> Optional[TransactionTag]:
         transaction_tag = next((transaction_tag for transaction_tag in self.register if transaction_tag.id == id), None)
-        idx = self.register.index(transaction_tag)
         
         if not transaction_tag:
             return None
+        idx = self.register.index(transaction_tag)
         
         fields_to_update = {
                 "name": name,
                 "created_at": created_at,
                 "user_id": user_id,
             }
-            
+        
         for field, value in fields_to_update.items():
             if value is not None:
                 setattr(transaction_tag, field, value)
@@ -134,6 +137,14 @@ def test_transaction_tag_db_adapter_method_get(transaction_tag_db_adapter: Trans
     assert result.user_id.hex == REGISTER[0].user_id
 
 
+def test_transaction_tag_db_adapter_method_get_many(transaction_tag_db_adapter: TransactionTagDatabaseAdapter, transaction_tag_model: TransactionTagModel):
+    missing = uuid.uuid4()
+    result = transaction_tag_db_adapter.get_many(ids=[missing, transaction_tag_model.id])
+    assert list(result) == [transaction_tag_model.id]
+    assert result[transaction_tag_model.id].id.hex == REGISTER[0].id
+    assert transaction_tag_db_adapter.get_many(ids=[]) == {}
+
+
 def test_transaction_tag_db_adapter_method_delete(transaction_tag_db_adapter: TransactionTagDatabaseAdapter, transaction_tag_model: TransactionTagModel):
     assert len(REGISTER) == 1
     transaction_tag_db_adapter.delete(id=transaction_tag_model.id)
@@ -190,6 +201,11 @@ def test_transaction_tag_db_adapter_error_unexpected_argument_type_method_get(tr
         transaction_tag_db_adapter.get(id="TESTER_ERROR")
 
 
+def test_transaction_tag_db_adapter_error_unexpected_argument_type_method_get_many(transaction_tag_db_adapter: TransactionTagDatabaseAdapter):
+    with pytest.raises(UnexpectedArgumentTypeError):
+        transaction_tag_db_adapter.get_many(ids=["TESTER_ERROR"])
+
+
 def test_transaction_tag_db_adapter_error_unexpected_argument_type_method_delete(transaction_tag_db_adapter: TransactionTagDatabaseAdapter):
     with pytest.raises(UnexpectedArgumentTypeError):
         transaction_tag_db_adapter.delete(id="TESTER_ERROR")
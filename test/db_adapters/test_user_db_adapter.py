@@ -26,6 +26,9 @@ class MockUserRepository:
     def select_from_id(self, id: str) -> Optional[User]:
         return next((user for user in self.register if user.id == id), None)
     
+    def select_from_ids(self, ids: List[str]) -> List[User]:
+        return [user for user in self.register if user.id in ids]
+    
     def insert(self, id:str, nickname: str, created_at: datetime) -> User:
         new_user = User(
             id = id,
@@ -37,8 +40,8 @@ class MockUserRepository:
     
     def update(self, id:str, nickname:str=None, created_at:datetime=None) -> Optional[User]:
         user = next((user for user in self.register if user.id == id), None)
-        idx = self.register.index(user)
         if user:
+            idx = self.register.index(user)
             if nickname:
                 user.nickname = nickname
             if created_at:
@@ -97,6 +100,14 @@ def test_user_db_adapter_method_get(user_db_adapter: UserDatabaseAdapter, user_m
     assert result.created_at == REGISTER[0].created_at
 
 
+def test_user_db_adapter_method_get_many(user_db_adapter: UserDatabaseAdapter, user_model: UserModel):
+    missing = uuid.uuid4()
+    result = user_db_adapter.get_many(ids=[missing, user_model.id])
+    assert list(result) == [user_model.id]
+    assert result[user_model.id].id.hex == REGISTER[0].id
+    assert user_db_adapter.get_many(ids=[]) == {}
+
+
 def test_user_db_adapter_method_delete(user_db_adapter: UserDatabaseAdapter, user_model: UserModel):
     assert len(REGISTER) == 1
     user_db_adapter.delete(id=user_model.id)
@@ -148,6 +159,11 @@ def test_user_db_adapter_error_unexpected_argument_type_method_get(user_db_adapt
         user_db_adapter.get(id="TESTER_ERROR")
 
 
+def test_user_db_adapter_error_unexpected_argument_type_method_get_many(user_db_adapter: UserDatabaseAdapter):
+    with pytest.raises(UnexpectedArgumentTypeError):
+        user_db_adapter.get_many(ids=["TESTER_ERROR"])
+
+
 def test_user_db_adapter_error_unexpected_argument_type_method_delete(user_db_adapter: UserDatabaseAdapter):
     with pytest.raises(UnexpectedArgumentTypeError):
         user_db_adapter.delete(id="TESTER_ERROR")
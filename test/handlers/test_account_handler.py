@@ -5,13 +5,14 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List
 
-from src.financial.models import AccountModel
+from src.financial.models import AccountModel, BalanceMismatchModel, ReconciliationReportModel
 from src.financial.handlers import AccountHandler
 from src.financial.interfaces import DatabaseAdapterInterface
 from src.financial.exceptions.handler_errors import account_handler_error
 
 
 REGISTER = []
+GET_MANY_CALLS = []
 
 
 class MockAccountDatabaseAdapter(DatabaseAdapterInterface):
@@ -38,9 +39,29 @@ class MockAccountDatabaseAdapter(DatabaseAdapterInterface):
     def get(cls, id) -> Optional[AccountModel]:
         return next((account for account in REGISTER if account.id == id), None)
     
+    @classmethod
+    def get_many(cls, ids) -> dict:
+        GET_MANY_CALLS.append(list(ids))
+        return {account.id: account for account in REGISTER if account.id in ids}
+    
     @classmethod
     def get_all(cls) -> List[AccountModel]:
         return REGISTER
+    
+    @classmethod
+    def add_to_balance(cls, id, delta) -> Decimal:
+        account = next((account for account in REGISTER if account.id == id), None)
+        account.balance += delta
+        return account.balance
+    
+    @classmethod
+    def add_to_balances(cls, deltas) -> dict:
+        return {id: cls.add_to_balance(id, delta) for id, delta in deltas.items()}
+    
+    @classmethod
+    def reconcile_balances(cls, incremental, fix, workers) -> ReconciliationReportModel:
+        mismatches = [BalanceMismatchModel(account_id=account.id, stored_balance=account.balance, expected_balance=Decimal("0.00")) for account in REGISTER if account.balance]
+        return ReconciliationReportModel(incremental=incremental, checked=len(REGISTER), mismatches=mismatches, fixed=fix and bool(mismatches))
 
 
 @pytest.fixture
@@ -148,12 +169,78 @@ def test_account_handler_subtract_balance(account_handler: AccountHandler):
     assert REGISTER[0].balance == new_balance
 
 
+# Teste de lançamento de varios saldos de uma vez
+def test_account_handler_apply_balance_deltas(account_handler: AccountHandler):
+    old_balance = REGISTER[0].balance
+    balances = account_handler.apply_balance_deltas(deltas={REGISTER[0].id: Decimal("10.50")})
+    assert balances == {REGISTER[0].id: old_balance + Decimal("10.50")}
+    assert account_handler.get_account(id=REGISTER[0].id).balance == old_balance + Decimal("10.50")
+
+
+# Testa o erro de tipo ao lançar varios saldos
+def test_account_handler_unexpected_type_error_apply_balance_deltas(account_handler: AccountHandler):
+    with pytest.raises(account_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'deltas'"):
+        account_handler.apply_balance_deltas(deltas={REGISTER[0].id: 10.5})
+
+
+# Teste da conciliação de saldos, contas corrigidas saem do cache
+def test_account_handler_reconcile_balances(account_handler: AccountHandler):
+    account_handler.apply_balance_deltas(deltas={REGISTER[0].id: Decimal("1.00")})
+    report = account_handler.reconcile_balances()
+    assert report.have_mismatches() == True and report.fixed == False
+    assert REGISTER[0].id in account_handler._cache
+    report = account_handler.reconcile_balances(incremental=True, fix=True, workers=2)
+    assert report.fixed == True and report.incremental == True
+    assert REGISTER[0].id not in account_handler._cache
+
+
+# Testa o erro de tipo na conciliação de saldos
+def test_account_handler_unexpected_type_error_reconcile_balances(account_handler: AccountHandler):
+    with pytest.raises(account_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'workers'"):
+        account_handler.reconcile_balances(workers=0)
+    with pytest.raises(account_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'incremental' ou 'fix'"):
+        account_handler.reconcile_balances(fix="TESTE STRING TYPE")
+
+
 # Testa se o delete ta funcionando
 def test_account_handler_delete_account(account_handler: AccountHandler):
     account_handler.delete_account(id=REGISTER[0].id)
     assert len(REGISTER) == 0
 
 
+# Testa se o cache continua com um item por registro depois de varias escritas
+def test_account_handler_cache_size(account_handler: AccountHandler, account_model: AccountModel):
+    initial = len(REGISTER)
+    created = [account_model.model_copy(update={"id": uuid.uuid4()}) for _ in range(20)]
+    for account in created:
+        account_handler.create_account(account=account)
+    for account in created[:10]:
+        account_handler.update_account(id=account.id, account=account)
+    assert len(account_handler._cache) == len(REGISTER) == initial + 20
+    assert len(account_handler.get_all_accounts()) == initial + 20
+    for account in created:
+        account_handler.delete_account(id=account.id)
+    assert len(account_handler._cache) == len(REGISTER) == initial
+
+
+# Testa a busca em lote: o que está no cache não vai para o banco e os ids que faltam vão em uma unica chamada
+def test_account_handler_get_accounts(account_handler: AccountHandler, account_model: AccountModel):
+    account_handler.create_account(account=account_model)
+    outside = account_model.model_copy(update={"id": uuid.uuid4()})
+    REGISTER.append(outside)
+    missing = uuid.uuid4()
+    GET_MANY_CALLS.clear()
+    found = account_handler.get_accounts(ids=[outside.id, account_model.id, missing, outside.id])
+    assert list(found) == [outside.id, account_model.id]
+    assert GET_MANY_CALLS == [[outside.id, missing]]
+    # Os registros buscados entram no cache
+    assert account_handler.get_accounts(ids=[outside.id]) == {outside.id: outside}
+    assert len(GET_MANY_CALLS) == 1
+    assert account_handler.get_accounts(ids=[]) == {}
+    with pytest.raises(account_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'ids'"):
+        account_handler.get_accounts(ids=["TESTE STRING TYPE"])
+
+
 # Testa o erro de tipo do database em propriedade
 def test_account_handler_database_type_error_01(account_handler: AccountHandler):
     with pytest.raises(account_handler_error.UnexpectedDatabaseTypeError, match="Tipo inesperado do argumento 'value'"):
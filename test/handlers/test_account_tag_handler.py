@@ -11,6 +11,7 @@ from src.financial.exceptions.handler_errors import account_tag_handler_error
 
 
 REGISTER = []
+GET_MANY_CALLS = []
 
 
 class MockAccountTagDatabaseAdapter(DatabaseAdapterInterface):
@@ -37,6 +38,11 @@ class MockAccountTagDatabaseAdapter(DatabaseAdapterInterface):
     def get(cls, id) -> Optional[AccountTagModel]:
         return next((account_tag for account_tag in REGISTER if account_tag.id == id), None)
     
+    @classmethod
+    def get_many(cls, ids) -> dict:
+        GET_MANY_CALLS.append(list(ids))
+        return {account_tag.id: account_tag for account_tag in REGISTER if account_tag.id in ids}
+    
     @classmethod
     def get_all(cls) -> List[AccountTagModel]:
         return REGISTER
@@ -119,6 +125,39 @@ def test_account_tag_handler_delete_account_tag(account_tag_handler: AccountTagH
     assert len(REGISTER) == 0
 
 
+# Testa se o cache continua com um item por registro depois de varias escritas
+def test_account_tag_handler_cache_size(account_tag_handler: AccountTagHandler, account_tag_model: AccountTagModel):
+    initial = len(REGISTER)
+    created = [account_tag_model.model_copy(update={"id": uuid.uuid4()}) for _ in range(20)]
+    for account_tag in created:
+        account_tag_handler.create_account_tag(account_tag=account_tag)
+    for account_tag in created[:10]:
+        account_tag_handler.update_account_tag(id=account_tag.id, account_tag=account_tag)
+    assert len(account_tag_handler._cache) == len(REGISTER) == initial + 20
+    assert len(account_tag_handler.get_all_account_tags()) == initial + 20
+    for account_tag in created:
+        account_tag_handler.delete_account_tag(id=account_tag.id)
+    assert len(account_tag_handler._cache) == len(REGISTER) == initial
+
+
+# Testa a busca em lote: o que está no cache não vai para o banco e os ids que faltam vão em uma unica chamada
+def test_account_tag_handler_get_account_tags(account_tag_handler: AccountTagHandler, account_tag_model: AccountTagModel):
+    account_tag_handler.create_account_tag(account_tag=account_tag_model)
+    outside = account_tag_model.model_copy(update={"id": uuid.uuid4()})
+    REGISTER.append(outside)
+    missing = uuid.uuid4()
+    GET_MANY_CALLS.clear()
+    found = account_tag_handler.get_account_tags(ids=[outside.id, account_tag_model.id, missing, outside.id])
+    assert list(found) == [outside.id, account_tag_model.id]
+    assert GET_MANY_CALLS == [[outside.id, missing]]
+    # Os registros buscados entram no cache
+    assert account_tag_handler.get_account_tags(ids=[outside.id]) == {outside.id: outside}
+    assert len(GET_MANY_CALLS) == 1
+    assert account_tag_handler.get_account_tags(ids=[]) == {}
+    with pytest.raises(account_tag_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'ids'"):
+        account_tag_handler.get_account_tags(ids=["TESTE STRING TYPE"])
+
+
 # Testa o erro de tipo do database em propriedade
 def test_account_tag_handler_database_type_error_01(account_tag_handler: AccountTagHandler):
     with pytest.raises(account_tag_handler_error.UnexpectedDatabaseTypeError, match="Tipo inesperado do argumento 'value'"):
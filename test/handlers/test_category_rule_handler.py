@@ -0,0 +1,172 @@
+import io
+import pytest
+import uuid
+
+from decimal import Decimal
+from datetime import datetime
+from typing import Dict, List
+
+from src.financial.enums import TransactionTypes, StatementFormats
+from src.financial.models import TransactionModel, CategoryRuleModel
+from src.financial.handlers import TransactionHandler, CategoryRuleHandler, StatementImportHandler
+from src.financial.interfaces import DatabaseAdapterInterface
+from src.financial.exceptions.handler_errors import category_rule_handler_error
+
+
+REGISTER = []
+UPDATES = []
+
+
+class MockTransactionDatabaseAdapter(DatabaseAdapterInterface):
+    _db = None
+    @classmethod
+    def get_all(cls) -> List[TransactionModel]:
+        return REGISTER
+    
+    @classmethod
+    def update_categories(cls, changes: Dict[uuid.UUID, uuid.UUID]) -> None:
+        UPDATES.append(dict(changes))
+    
+    @classmethod
+    def import_many(cls, transactions) -> List[bool]:
+        REGISTER.extend(transactions)
+        return [True] * len(transactions)
+
+
+USER_ID = uuid.uuid4()
+ACCOUNT_ID = uuid.uuid4()
+DEFAULT_CATEGORY = uuid.uuid4()
+FOOD = uuid.uuid4()
+TRANSPORT = uuid.uuid4()
+HEALTH = uuid.uuid4()
+SALARY = uuid.uuid4()
+
+
+def make_transaction(description: str, amount: str = "10.00", **kwargs) -> TransactionModel:
+    data = {
+        "date": datetime(2024, 1, 1),
+        "description": description,
+        "amount": Decimal(amount),
+        "transaction_type": TransactionTypes.EXPENSE,
+        "category_id": DEFAULT_CATEGORY,
+        "account_id_destination": ACCOUNT_ID,
+        "user_id": USER_ID,
+    }
+    data.update(kwargs)
+    return TransactionModel(**data)
+
+
+RULES = [
+    CategoryRuleModel(user_id=USER_ID, category_id=FOOD, keywords=["padaria", "mercado", "ifood"]),
+    CategoryRuleModel(user_id=USER_ID, category_id=TRANSPORT, keywords=["uber", "posto"]),
+    # Trecho que é prefixo de outro, com prioridade maior
+    CategoryRuleModel(user_id=USER_ID, category_id=FOOD, keywords=["uber eats"], priority=5),
+    CategoryRuleModel(user_id=USER_ID, category_id=HEALTH, keywords=["farmácia"], max_amount=Decimal("500.00")),
+    CategoryRuleModel(user_id=USER_ID, category_id=SALARY, pattern=r"^sal[aá]rio\b", transaction_type=TransactionTypes.INCOME),
+]
+
+
+@pytest.fixture
+def rule_handler():
+    REGISTER.clear()
+    UPDATES.clear()
+    return CategoryRuleHandler(transaction_handler=TransactionHandler(database=MockTransactionDatabaseAdapter), rules=RULES)
+
+
+# Testa a classificação pelos trechos, expressões regulares e condições de valor, tipo e usuario
+def test_category_rule_handler_classify(rule_handler: CategoryRuleHandler):
+    transactions = [
+        make_transaction("PADARIA DO ZE"),
+        make_transaction("Uber   *trip"),
+        make_transaction("UBER EATS pedido"),
+        make_transaction("FARMACIA SAO JOAO"),
+        make_transaction("Farmácia São João", amount="900.00"),
+        make_transaction("SALÁRIO EMPRESA", transaction_type=TransactionTypes.INCOME),
+        make_transaction("SALARIO EMPRESA"),
+        make_transaction("cinema"),
+        make_transaction("mercado", user_id=uuid.uuid4()),
+    ]
+    assert rule_handler.classify(transactions) == [FOOD, TRANSPORT, FOOD, HEALTH, None, SALARY, None, None, None]
+
+
+# Testa se a regra de maior prioridade vence e, no empate, a que vem antes
+def test_category_rule_handler_priority(rule_handler: CategoryRuleHandler):
+    other = uuid.uuid4()
+    rule_handler.set_rules([
+        CategoryRuleModel(user_id=USER_ID, category_id=TRANSPORT, keywords=["posto"]),
+        CategoryRuleModel(user_id=USER_ID, category_id=other, keywords=["posto"]),
+        CategoryRuleModel(user_id=USER_ID, category_id=FOOD, pattern="conveniencia", priority=1),
+        CategoryRuleModel(user_id=USER_ID, category_id=HEALTH, account_id=ACCOUNT_ID, min_amount=Decimal("1000.00")),
+    ])
+    assert rule_handler.classify([
+        make_transaction("POSTO SHELL"),
+        make_transaction("POSTO SHELL CONVENIENCIA"),
+        make_transaction("qualquer coisa", amount="1000.00"),
+        make_transaction("POSTO SHELL", amount="1000.00", account_id_destination=uuid.uuid4()),
+    ]) == [TRANSPORT, FOOD, HEALTH, TRANSPORT]
+    assert [rule.category_id for rule in rule_handler.rules] == [FOOD, TRANSPORT, other, HEALTH]
+
+
+# Testa expressões que compilam sozinhas mas não podem ser combinadas no filtro (flags globais e referencias a grupos)
+def test_category_rule_handler_uncombinable_patterns(rule_handler: CategoryRuleHandler):
+    repeated_x, repeated_y = uuid.uuid4(), uuid.uuid4()
+    rule_handler.set_rules([
+        CategoryRuleModel(user_id=USER_ID, category_id=FOOD, pattern="(?i)mercado"),
+        CategoryRuleModel(user_id=USER_ID, category_id=repeated_x, pattern=r"(x)\1"),
+        CategoryRuleModel(user_id=USER_ID, category_id=repeated_y, pattern=r"(y)\1"),
+        CategoryRuleModel(user_id=USER_ID, category_id=TRANSPORT, pattern=r"\bposto\b"),
+    ])
+    assert rule_handler.classify([
+        make_transaction("MERCADO CENTRAL"),
+        make_transaction("xx"),
+        make_transaction("yy"),
+        make_transaction("POSTO SHELL"),
+        make_transaction("cinema"),
+    ]) == [FOOD, repeated_x, repeated_y, TRANSPORT, None]
+
+
+# Testa a recategorização do historico em lotes, atualizando o banco e o cache
+def test_category_rule_handler_recategorize(rule_handler: CategoryRuleHandler):
+    transactions = [make_transaction(f"mercado {index}") for index in range(5)] + [make_transaction("cinema"), make_transaction("uber", category_id=TRANSPORT)]
+    REGISTER.extend(transactions)
+    rule_handler.transaction_handler._refresh_cache()
+    assert rule_handler.recategorize(USER_ID, batch_size=2) == 5
+    assert [len(batch) for batch in UPDATES] == [2, 2, 1]
+    assert set().union(*UPDATES) == {transaction.id for transaction in transactions[:5]}
+    assert {transaction.id for transaction in rule_handler.transaction_handler.get_transactions_by_category(FOOD)} == {transaction.id for transaction in transactions[:5]}
+    assert rule_handler.transaction_handler.get_transaction(transactions[5].id).category_id == DEFAULT_CATEGORY
+    # Nada muda na segunda vez
+    UPDATES.clear()
+    assert rule_handler.recategorize(USER_ID) == 0
+    assert UPDATES == []
+
+
+# Testa a aplicação das regras durante a importação de um extrato
+def test_category_rule_handler_statement_import(rule_handler: CategoryRuleHandler):
+    import_handler = StatementImportHandler(transaction_handler=rule_handler.transaction_handler)
+    source = io.StringIO("date,amount,description\n2024-01-05,-12.50,PADARIA\n2024-01-06,-30.00,CINEMA\n")
+    report = import_handler.import_file(source, StatementFormats.CSV, ACCOUNT_ID, USER_ID, DEFAULT_CATEGORY, uuid.uuid4(), category_rules=rule_handler)
+    assert report.inserted == 2
+    assert [transaction.category_id for transaction in REGISTER] == [FOOD, DEFAULT_CATEGORY]
+
+
+# Testa os erros de argumentos e de regras invalidas
+def test_category_rule_handler_errors(rule_handler: CategoryRuleHandler):
+    with pytest.raises(category_rule_handler_error.UnexpectedArgumentTypeError):
+        CategoryRuleHandler(transaction_handler=None)
+    with pytest.raises(category_rule_handler_error.UnexpectedArgumentTypeError):
+        rule_handler.set_rules(["mercado"])
+    with pytest.raises(category_rule_handler_error.InvalidCategoryRuleError):
+        rule_handler.set_rules([CategoryRuleModel(user_id=USER_ID, category_id=FOOD, pattern="(")])
+    with pytest.raises(category_rule_handler_error.InvalidCategoryRuleError):
+        rule_handler.set_rules([CategoryRuleModel(user_id=USER_ID, category_id=FOOD, min_amount=Decimal("10"), max_amount=Decimal("1"))])
+    with pytest.raises(category_rule_handler_error.InvalidCategoryRuleError):
+        rule_handler.set_rules([CategoryRuleModel(user_id=USER_ID, category_id=FOOD, keywords=["  "])])
+    with pytest.raises(category_rule_handler_error.UnexpectedArgumentTypeError):
+        rule_handler.classify([None])
+    with pytest.raises(category_rule_handler_error.UnexpectedArgumentTypeError):
+        rule_handler.recategorize(USER_ID.hex)
+    with pytest.raises(category_rule_handler_error.UnexpectedArgumentTypeError):
+        rule_handler.recategorize(USER_ID, batch_size=0)
+    # As regras anteriores continuam valendo depois de um erro
+    assert len(rule_handler.engine) == len(RULES)
@@ -0,0 +1,130 @@
+import pytest
+import uuid
+
+from decimal import Decimal
+from datetime import datetime
+from typing import Dict, List
+
+from src.financial.enums import TransactionTypes
+from src.financial.models import AccountModel, TransactionModel, TransactionTagModel, TransactionCategoryModel
+from src.financial.handlers import AccountHandler, TransactionTagHandler, TransactionCategoryHandler, DataLoaderHandler
+from src.financial.interfaces import DatabaseAdapterInterface
+from src.financial.utils import DataLoader
+from src.financial.exceptions.handler_errors import data_loader_handler_error
+
+
+USER_ID = uuid.uuid4()
+ACCOUNTS = {account.id: account for account in [AccountModel(name=f"CONTA {index}", user_id=USER_ID) for index in range(3)]}
+CATEGORIES = {category.id: category for category in [TransactionCategoryModel(name=f"CATEGORIA {index}", user_id=USER_ID) for index in range(4)]}
+TAGS = {tag.id: tag for tag in [TransactionTagModel(name=f"TAG {index}", user_id=USER_ID) for index in range(2)]}
+GET_MANY_CALLS = []
+
+
+def make_adapter(name: str, register: dict):
+    class MockDatabaseAdapter(DatabaseAdapterInterface):
+        _db = None
+        # Banco vazio na carga do cache, assim toda busca por id chega no 'get_many'
+        @classmethod
+        def get_all(cls) -> List:
+            return []
+
+        @classmethod
+        def get_many(cls, ids: List[uuid.UUID]) -> Dict:
+            GET_MANY_CALLS.append((name, list(ids)))
+            return {id: register[id] for id in ids if id in register}
+    return MockDatabaseAdapter
+
+
+def make_transaction(**kwargs) -> TransactionModel:
+    data = {
+        "date": datetime(2024, 1, 1),
+        "description": "TESTER",
+        "amount": Decimal("10.00"),
+        "transaction_type": TransactionTypes.EXPENSE,
+        "category_id": list(CATEGORIES)[0],
+        "account_id_destination": list(ACCOUNTS)[0],
+        "user_id": USER_ID,
+    }
+    data.update(kwargs)
+    return TransactionModel(**data)
+
+
+@pytest.fixture
+def loader_handler():
+    GET_MANY_CALLS.clear()
+    return DataLoaderHandler(
+        account_handler=AccountHandler(database=make_adapter("accounts", ACCOUNTS)),
+        transaction_category_handler=TransactionCategoryHandler(database=make_adapter("categories", CATEGORIES)),
+        transaction_tag_handler=TransactionTagHandler(database=make_adapter("tags", TAGS))
+    )
+
+
+# Testa se as buscas feitas antes do primeiro 'get' viram um unico lote e se o memo evita novas buscas
+def test_data_loader_coalescing():
+    calls = []
+    def batch_load(keys: List[int]) -> Dict[int, str]:
+        calls.append(keys)
+        return {key: str(key) for key in keys if key % 2 == 0}
+    loader = DataLoader(batch_load)
+    deferred = [loader.load(key) for key in [2, 1, 2, 4]]
+    assert calls == [] and loader.pending == 3
+    assert [value.get() for value in deferred] == ["2", None, "2", "4"]
+    assert calls == [[2, 1, 4]]
+    # Chaves já resolvidas, inclusive as inexistentes, não voltam para o banco
+    assert loader.get(1) is None and loader.load_many([4, 6]) == {4: "4", 6: "6"}
+    assert calls == [[2, 1, 4], [6]] and loader.batches == 2
+    loader.prime(8, "oito")
+    assert loader.get(8) == "oito" and loader.batches == 2
+    loader.clear(4)
+    assert loader.get(4) == "4" and calls[-1] == [4]
+    # Lotes maiores que 'max_batch_size' são divididos
+    calls.clear()
+    loader = DataLoader(batch_load, max_batch_size=2)
+    assert loader.load_many(range(5)) == {0: "0", 2: "2", 4: "4"}
+    assert calls == [[0, 1], [2, 3], [4]]
+    with pytest.raises(ValueError):
+        DataLoader(batch_load, max_batch_size=0)
+
+
+# Testa a listagem com os nomes resolvidos usando uma busca por tipo de entidade
+def test_data_loader_handler_list_transactions(loader_handler: DataLoaderHandler):
+    accounts, categories, tags = list(ACCOUNTS), list(CATEGORIES), list(TAGS)
+    transactions = [
+        make_transaction(category_id=categories[index % 4], account_id_destination=accounts[index % 3],
+                         tag_id=tags[index % 2] if index % 3 else None)
+        for index in range(30)
+    ]
+    transactions.append(make_transaction(transaction_type=TransactionTypes.TRANSFER,
+                                         account_id_origin=accounts[1], account_id_destination=accounts[2]))
+    missing = make_transaction(category_id=uuid.uuid4())
+    transactions.append(missing)
+    listing = loader_handler.list_transactions(transactions)
+    assert len(listing) == len(transactions)
+    assert sorted(name for name, _ in GET_MANY_CALLS) == ["accounts", "categories", "tags"]
+    for item, transaction in zip(listing, transactions):
+        assert item.transaction is transaction
+        assert item.account_destination_name == ACCOUNTS[transaction.account_id_destination].name
+        assert item.tag_name == (TAGS[transaction.tag_id].name if transaction.tag_id else None)
+    assert listing[-2].account_origin_name == ACCOUNTS[accounts[1]].name
+    assert listing[0].category_name == "CATEGORIA 0"
+    assert listing[-1].category_name is None
+    # O memo da requisição responde a segunda listagem sem novas buscas
+    GET_MANY_CALLS.clear()
+    loader_handler.list_transactions(transactions)
+    assert GET_MANY_CALLS == []
+    # Depois de 'clear' só o id inexistente volta a ser buscado, os outros já estão no cache dos handlers
+    loader_handler.clear()
+    loader_handler.list_transactions(transactions)
+    assert GET_MANY_CALLS == [("categories", [missing.category_id])]
+
+
+# Testa os erros de tipo e de handler não informado
+def test_data_loader_handler_errors(loader_handler: DataLoaderHandler):
+    with pytest.raises(data_loader_handler_error.UnexpectedArgumentTypeError):
+        DataLoaderHandler(account_handler=object())
+    with pytest.raises(data_loader_handler_error.UnexpectedArgumentTypeError):
+        DataLoaderHandler(max_batch_size=0)
+    with pytest.raises(data_loader_handler_error.UnexpectedArgumentTypeError):
+        loader_handler.list_transactions([object()])
+    with pytest.raises(data_loader_handler_error.MissingHandlerError):
+        loader_handler.users
@@ -0,0 +1,156 @@
+import pytest
+import uuid
+
+from decimal import Decimal
+from typing import Optional, List
+
+from src.financial.enums import TransactionTypes
+from src.financial.models import AccountModel, TransactionModel
+from src.financial.handlers import AccountHandler, TransactionHandler, PostingHandler
+from src.financial.interfaces import DatabaseAdapterInterface
+from src.financial.exceptions.handler_errors import posting_handler_error
+
+
+REGISTER = []
+BATCHES = []
+INSERTED = []
+
+
+class MockAccountDatabaseAdapter(DatabaseAdapterInterface):
+    _db = None
+    @classmethod
+    def get(cls, id) -> Optional[AccountModel]:
+        return next((account for account in REGISTER if account.id == id), None)
+    
+    @classmethod
+    def get_all(cls) -> List[AccountModel]:
+        return REGISTER
+    
+    @classmethod
+    def add_to_balances(cls, deltas) -> dict:
+        BATCHES.append(deltas)
+        balances = dict()
+        for id, delta in deltas.items():
+            account = cls.get(id)
+            account.balance += delta
+            balances[id] = account.balance
+        return balances
+
+
+class MockTransactionDatabaseAdapter(DatabaseAdapterInterface):
+    _db = None
+    @classmethod
+    def get_all(cls) -> List[TransactionModel]:
+        return []
+    
+    @classmethod
+    def insert_many(cls, transactions) -> List[bool]:
+        # Ids repetidos não são inseridos de novo
+        outcomes = [transaction.id not in {inserted.id for inserted in INSERTED} for transaction in transactions]
+        INSERTED.extend(transaction for transaction, inserted in zip(transactions, outcomes) if inserted)
+        return outcomes
+
+
+@pytest.fixture
+def accounts():
+    REGISTER.clear()
+    BATCHES.clear()
+    INSERTED.clear()
+    user_id = uuid.uuid4()
+    REGISTER.extend(AccountModel(user_id=user_id, balance=Decimal("100.00")) for _ in range(3))
+    return REGISTER
+
+
+@pytest.fixture
+def posting_handler(accounts):
+    return PostingHandler(account_handler=AccountHandler(database=MockAccountDatabaseAdapter))
+
+
+def make_transaction(transaction_type: TransactionTypes, amount: str, destination: AccountModel, origin: Optional[AccountModel] = None, **kwargs) -> TransactionModel:
+    return TransactionModel(
+        transaction_type=transaction_type,
+        amount=Decimal(amount),
+        account_id_destination=destination.id,
+        account_id_origin=origin.id if origin is not None else None,
+        category_id=uuid.uuid4(),
+        user_id=destination.user_id,
+        **kwargs
+    )
+
+
+# Testa a instancia se ta ok
+def test_posting_handler_istance(posting_handler: PostingHandler):
+    assert isinstance(posting_handler, PostingHandler) == True
+    assert isinstance(posting_handler.account_handler, AccountHandler) == True
+
+
+# Testa o erro de tipo do 'account_handler'
+def test_posting_handler_unexpected_type_error_account_handler():
+    with pytest.raises(posting_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'account_handler'"):
+        PostingHandler(account_handler=MockAccountDatabaseAdapter)
+
+
+# Testa o efeito de cada tipo de transação e se pendentes e ignoradas ficam de fora
+def test_posting_handler_compute_deltas(accounts: List[AccountModel]):
+    first, second, third = accounts
+    transactions = [
+        make_transaction(TransactionTypes.EXPENSE, "10.25", first),
+        make_transaction(TransactionTypes.INCOME, "50.00", first),
+        make_transaction(TransactionTypes.ADJUST, "-5.00", second),
+        make_transaction(TransactionTypes.TRANSFER, "30.00", third, origin=second),
+        make_transaction(TransactionTypes.INCOME, "999.00", first, paid=False),
+        make_transaction(TransactionTypes.INCOME, "999.00", first, ignore=True),
+        # Entrada e saida iguais se anulam e a conta não é escrita
+        make_transaction(TransactionTypes.INCOME, "1.00", third),
+        make_transaction(TransactionTypes.EXPENSE, "31.00", third),
+    ]
+    assert PostingHandler.compute_deltas(transactions) == {
+        first.id: Decimal("39.75"),
+        second.id: Decimal("-35.00"),
+    }
+
+
+# Testa se o lote inteiro vira uma unica escrita e o cache recebe os saldos novos
+def test_posting_handler_post_transactions(posting_handler: PostingHandler, accounts: List[AccountModel]):
+    first, second, _ = accounts
+    balances = posting_handler.post_transactions([
+        make_transaction(TransactionTypes.EXPENSE, "10.00", first),
+        make_transaction(TransactionTypes.TRANSFER, "20.00", first, origin=second),
+    ])
+    assert balances == {first.id: Decimal("110.00"), second.id: Decimal("80.00")}
+    assert len(BATCHES) == 1
+    assert posting_handler.account_handler.get_account(id=second.id).balance == Decimal("80.00")
+    assert posting_handler.post_transactions([]) == dict()
+    assert len(BATCHES) == 1
+
+
+# Testa o erro de transferência sem conta de origem
+def test_posting_handler_transfer_without_origin_error(posting_handler: PostingHandler, accounts: List[AccountModel]):
+    with pytest.raises(posting_handler_error.TransferWithoutOriginError):
+        posting_handler.post_transactions([make_transaction(TransactionTypes.TRANSFER, "1.00", accounts[0])])
+    assert BATCHES == []
+
+
+# Testa o erro de tipo do 'transactions'
+def test_posting_handler_unexpected_type_error_transactions(posting_handler: PostingHandler, accounts: List[AccountModel]):
+    with pytest.raises(posting_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'transactions'"):
+        posting_handler.post_transactions("TESTE")
+    with pytest.raises(posting_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'transactions'"):
+        posting_handler.post_transactions([accounts[0]])
+
+
+# Testa se só as transações inseridas mexem no saldo e o erro sem 'transaction_handler'
+def test_posting_handler_record_transactions(posting_handler: PostingHandler, accounts: List[AccountModel]):
+    with pytest.raises(posting_handler_error.MissingTransactionHandlerError):
+        posting_handler.record_transactions([])
+    with pytest.raises(posting_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'transaction_handler'"):
+        PostingHandler(account_handler=posting_handler.account_handler, transaction_handler=MockTransactionDatabaseAdapter)
+    posting_handler = PostingHandler(account_handler=posting_handler.account_handler, transaction_handler=TransactionHandler(database=MockTransactionDatabaseAdapter))
+    first = accounts[0]
+    transactions = [make_transaction(TransactionTypes.INCOME, "10.00", first), make_transaction(TransactionTypes.EXPENSE, "2.50", first)]
+    assert posting_handler.record_transactions(iter(transactions)) == {first.id: Decimal("107.50")}
+    assert INSERTED == transactions
+    assert posting_handler.record_transactions(transactions + [make_transaction(TransactionTypes.INCOME, "1.00", first)]) == {first.id: Decimal("108.50")}
+    assert len(BATCHES) == 2
+    with pytest.raises(posting_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'transactions'"):
+        posting_handler.record_transactions("TESTE")
@@ -0,0 +1,137 @@
+import io
+import pytest
+import uuid
+
+from decimal import Decimal
+from datetime import datetime
+from typing import List
+
+from src.financial.enums import TransactionTypes, StatementFormats
+from src.financial.models import TransactionModel, StatementCsvLayoutModel, StatementImportReportModel
+from src.financial.handlers import TransactionHandler, StatementImportHandler
+from src.financial.interfaces import DatabaseAdapterInterface
+from src.financial.exceptions.handler_errors import statement_import_handler_error
+
+
+REGISTER = []
+BATCHES = []
+
+
+class MockTransactionDatabaseAdapter(DatabaseAdapterInterface):
+    _db = None
+    @classmethod
+    def get_all(cls) -> List[TransactionModel]:
+        return REGISTER
+    
+    @classmethod
+    def import_many(cls, transactions) -> List[bool]:
+        BATCHES.append(len(transactions))
+        keys = {(transaction.date.date(), transaction.amount, transaction.description, transaction.account_id_destination) for transaction in REGISTER}
+        outcomes = []
+        for transaction in transactions:
+            key = (transaction.date.date(), transaction.amount, transaction.description, transaction.account_id_destination)
+            outcomes.append(key not in keys)
+            if key not in keys:
+                keys.add(key)
+                REGISTER.append(transaction)
+        return outcomes
+
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240105120000[-3:BRT]
+<TRNAMT>-12.50
+<MEMO>PADARIA &amp; CIA
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240106<TRNAMT>1000,00<NAME>SALARIO</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<TRNAMT>-1.00<MEMO>SEM DATA</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+@pytest.fixture
+def import_handler():
+    REGISTER.clear()
+    BATCHES.clear()
+    return StatementImportHandler(transaction_handler=TransactionHandler(database=MockTransactionDatabaseAdapter))
+
+
+@pytest.fixture
+def ids():
+    return {"account_id": uuid.uuid4(), "user_id": uuid.uuid4(), "category_id": uuid.uuid4(), "tag_id": uuid.uuid4()}
+
+
+# Testa a importação de um CSV em lotes, com linhas invalidas e repetidas
+def test_statement_import_handler_csv(import_handler: StatementImportHandler, ids: dict):
+    lines = ["data;valor;historico"]
+    lines += [f"{day:02d}/01/2024;-1.{day:03d},50;MERCADO {day}" for day in range(1, 26)]
+    lines += ["05/01/2024;-1.005,50;MERCADO 5", "31/02/2024;10,00;DATA INVALIDA", "06/01/2024;0,00;VALOR ZERADO"]
+    layout = StatementCsvLayoutModel(delimiter=";", date_column="data", amount_column="valor", description_column="historico", date_format="%d/%m/%Y", decimal_separator=",", thousands_separator=".")
+    progress = []
+    report = import_handler.import_file(io.StringIO("\n".join(lines)), StatementFormats.CSV, csv_layout=layout, batch_size=10, on_progress=lambda report: progress.append(report.lines), **ids)
+    assert isinstance(report, StatementImportReportModel) == True
+    assert (report.lines, report.inserted, report.duplicates, report.invalid) == (28, 25, 1, 2)
+    assert BATCHES == [10, 10, 6]
+    assert progress == [10, 20]
+    assert report.rows_per_second() > 0
+    first = REGISTER[0]
+    assert first.transaction_type is TransactionTypes.EXPENSE
+    assert first.amount == Decimal("1001.50")
+    assert first.account_id_destination == ids["account_id"]
+    # As transações importadas não passam pelo cache do 'TransactionHandler', que é recarregado na proxima leitura
+    assert import_handler.transaction_handler._cache == {}
+    assert first in import_handler.transaction_handler.get_transactions_by_user(ids["user_id"])
+    
+    # Reimportar o mesmo arquivo não grava nada
+    again = import_handler.import_file(io.StringIO("\n".join(lines)), StatementFormats.CSV, csv_layout=layout, **ids)
+    assert (again.inserted, again.duplicates) == (0, 26)
+
+
+# Testa se um extrato grande é gravado sem que o cache do 'TransactionHandler' cresça com o arquivo
+def test_statement_import_handler_bounded_cache(import_handler: StatementImportHandler, ids: dict):
+    transaction_handler = import_handler.transaction_handler
+    existing = TransactionModel(transaction_type=TransactionTypes.INCOME, description="SALDO INICIAL", amount=Decimal("10.00"),
+                                account_id_destination=ids["account_id"], user_id=ids["user_id"], category_id=ids["category_id"])
+    transaction_handler.import_transactions([existing])
+    assert len(transaction_handler._cache) == 1
+    lines = ["date,amount,description"] + [f"2024-01-{index % 28 + 1:02d},-{index + 1}.00,COMPRA {index}" for index in range(20_000)]
+    cache_sizes = []
+    report = import_handler.import_file(io.StringIO("\n".join(lines)), StatementFormats.CSV, batch_size=2_000,
+                                        on_progress=lambda report: cache_sizes.append(len(transaction_handler._cache)), **ids)
+    assert report.inserted == 20_000
+    assert len(cache_sizes) == 10 and max(cache_sizes) == 0
+    assert len(transaction_handler._cache) == 0
+    # A proxima leitura recarrega o cache com o que foi gravado
+    assert len(transaction_handler.get_all_transactions()) == 20_001
+
+
+# Testa a importação de um arquivo OFX (SGML) a partir do caminho
+def test_statement_import_handler_ofx(import_handler: StatementImportHandler, ids: dict, tmp_path):
+    path = tmp_path / "extrato.ofx"
+    path.write_text(OFX_STATEMENT, encoding="latin-1")
+    report = import_handler.import_file(path, StatementFormats.OFX, encoding="latin-1", **ids)
+    assert (report.lines, report.inserted, report.invalid) == (3, 2, 1)
+    assert [(transaction.date, transaction.amount, transaction.transaction_type, transaction.description) for transaction in REGISTER] == [
+        (datetime(2024, 1, 5, 12, 0), Decimal("12.50"), TransactionTypes.EXPENSE, "PADARIA & CIA"),
+        (datetime(2024, 1, 6), Decimal("1000.00"), TransactionTypes.INCOME, "SALARIO"),
+    ]
+
+
+# Testa os erros de tipo e de formato
+def test_statement_import_handler_errors(import_handler: StatementImportHandler, ids: dict):
+    with pytest.raises(statement_import_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'transaction_handler'"):
+        StatementImportHandler(transaction_handler="TESTE STRING TYPE")
+    with pytest.raises(statement_import_handler_error.InvalidStatementFormatError):
+        import_handler.import_file(io.StringIO(""), "csv", **ids)
+    with pytest.raises(statement_import_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'account_id'"):
+        import_handler.import_file(io.StringIO(""), StatementFormats.CSV, account_id="TESTE STRING TYPE", user_id=uuid.uuid4(), category_id=uuid.uuid4(), tag_id=uuid.uuid4())
+    with pytest.raises(statement_import_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'tag_id'"):
+        import_handler.import_file(io.StringIO(""), StatementFormats.CSV, **{**ids, "tag_id": None})
+    with pytest.raises(statement_import_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'batch_size'"):
+        import_handler.import_file(io.StringIO(""), StatementFormats.CSV, batch_size=0, **ids)
+    with pytest.raises(statement_import_handler_error.InvalidStatementFormatError, match="Colunas ausentes"):
+        import_handler.import_file(io.StringIO("a,b\n1,2\n"), StatementFormats.CSV, **ids)
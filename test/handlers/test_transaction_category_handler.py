@@ -11,6 +11,7 @@ from src.financial.exceptions.handler_errors import transaction_category_handler
 
 
 REGISTER = []
+GET_MANY_CALLS = []
 
 
 class MockTransactionCategoryDatabaseAdapter(DatabaseAdapterInterface):
@@ -37,6 +38,11 @@ class MockTransactionCategoryDatabaseAdapter(DatabaseAdapterInterface):
     def get(cls, id) -> Optional[TransactionCategoryModel]:
         return next((transaction_category for transaction_category in REGISTER if transaction_category.id == id), None)
     
+    @classmethod
+    def get_many(cls, ids) -> dict:
+        GET_MANY_CALLS.append(list(ids))
+        return {transaction_category.id: transaction_category for transaction_category in REGISTER if transaction_category.id in ids}
+    
     @classmethod
     def get_all(cls) -> List[TransactionCategoryModel]:
         return REGISTER
@@ -119,6 +125,39 @@ def test_transaction_category_handler_delete_transaction_category(transaction_ca
     assert len(REGISTER) == 0
 
 
+# Testa se o cache continua com um item por registro depois de varias escritas
+def test_transaction_category_handler_cache_size(transaction_category_handler: TransactionCategoryHandler, transaction_category_model: TransactionCategoryModel):
+    initial = len(REGISTER)
+    created = [transaction_category_model.model_copy(update={"id": uuid.uuid4()}) for _ in range(20)]
+    for transaction_category in created:
+        transaction_category_handler.create_transaction_category(transaction_category=transaction_category)
+    for transaction_category in created[:10]:
+        transaction_category_handler.update_transaction_category(id=transaction_category.id, transaction_category=transaction_category)
+    assert len(transaction_category_handler._cache) == len(REGISTER) == initial + 20
+    assert len(transaction_category_handler.get_all_transaction_categories()) == initial + 20
+    for transaction_category in created:
+        transaction_category_handler.delete_transaction_category(id=transaction_category.id)
+    assert len(transaction_category_handler._cache) == len(REGISTER) == initial
+
+
+# Testa a busca em lote: o que está no cache não vai para o banco e os ids que faltam vão em uma unica chamada
+def test_transaction_category_handler_get_transaction_categories(transaction_category_handler: TransactionCategoryHandler, transaction_category_model: TransactionCategoryModel):
+    transaction_category_handler.create_transaction_category(transaction_category=transaction_category_model)
+    outside = transaction_category_model.model_copy(update={"id": uuid.uuid4()})
+    REGISTER.append(outside)
+    missing = uuid.uuid4()
+    GET_MANY_CALLS.clear()
+    found = transaction_category_handler.get_transaction_categories(ids=[outside.id, transaction_category_model.id, missing, outside.id])
+    assert list(found) == [outside.id, transaction_category_model.id]
+    assert GET_MANY_CALLS == [[outside.id, missing]]
+    # Os registros buscados entram no cache
+    assert transaction_category_handler.get_transaction_categories(ids=[outside.id]) == {outside.id: outside}
+    assert len(GET_MANY_CALLS) == 1
+    assert transaction_category_handler.get_transaction_categories(ids=[]) == {}
+    with pytest.raises(transaction_category_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'ids'"):
+        transaction_category_handler.get_transaction_categories(ids=["TESTE STRING TYPE"])
+
+
 # Testa o erro de tipo do database em propriedade
 def test_transaction_category_handler_database_type_error_01(transaction_category_handler: TransactionCategoryHandler):
     with pytest.raises(transaction_category_handler_error.UnexpectedDatabaseTypeError, match="Tipo inesperado do argumento 'value'"):
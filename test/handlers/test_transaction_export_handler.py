@@ -0,0 +1,95 @@
+import io
+import csv
+import json
+import pytest
+import uuid
+import numpy as np
+
+from decimal import Decimal
+from datetime import datetime
+from typing import Iterator
+
+from src.financial.enums import TransactionTypes, ExportFormats
+from src.financial.models import TransactionModel, TransactionExportReportModel
+from src.financial.handlers import TransactionExportHandler
+from src.financial.interfaces import DatabaseAdapterInterface
+from src.financial.exceptions.handler_errors import transaction_export_handler_error
+
+
+REGISTER = []
+CALLS = []
+
+
+class MockTransactionDatabaseAdapter(DatabaseAdapterInterface):
+    _db = None
+    @classmethod
+    def iter_all(cls, batch_size, user_id, start_date, end_date) -> Iterator[TransactionModel]:
+        CALLS.append((batch_size, user_id, start_date, end_date))
+        return (transaction for transaction in REGISTER if user_id is None or transaction.user_id == user_id)
+
+
+@pytest.fixture
+def export_handler():
+    REGISTER.clear()
+    CALLS.clear()
+    user_id = uuid.uuid4()
+    for index in range(25):
+        REGISTER.append(TransactionModel(
+            date=datetime(2024, 1, index + 1),
+            description=f"COMPRA Nº {index}" if index % 5 else "",
+            amount=Decimal(index * 100 + 1).scaleb(-2),
+            transaction_type=TransactionTypes.EXPENSE if index % 2 else TransactionTypes.TRANSFER,
+            category_id=uuid.uuid4(),
+            account_id_origin=uuid.uuid4() if index % 2 == 0 else None,
+            account_id_destination=uuid.uuid4(),
+            user_id=user_id if index < 20 else uuid.uuid4(),
+        ))
+    return TransactionExportHandler(database=MockTransactionDatabaseAdapter)
+
+
+# Testa a exportação em CSV e JSON Lines com os filtros repassados ao banco
+def test_transaction_export_handler_text(export_handler: TransactionExportHandler):
+    user_id = REGISTER[0].user_id
+    file = io.StringIO()
+    report = export_handler.export(file, ExportFormats.CSV, user_id=user_id, start_date=datetime(2024, 1, 1), batch_size=7)
+    assert isinstance(report, TransactionExportReportModel) == True
+    assert report.rows == 20
+    assert CALLS == [(7, user_id, datetime(2024, 1, 1), None)]
+    rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+    assert [Decimal(row["amount"]) for row in rows] == [transaction.amount for transaction in REGISTER[:20]]
+    assert rows[1]["description"] == "COMPRA Nº 1"
+    
+    file = io.StringIO()
+    assert export_handler.export(file, ExportFormats.JSONL).rows == 25
+    lines = file.getvalue().splitlines()
+    assert [TransactionModel.model_validate(json.loads(line)) for line in lines] == REGISTER
+
+
+# Testa se o arquivo '.npz' tem as colunas completas e as descrições recuperaveis pelos offsets
+def test_transaction_export_handler_npz(export_handler: TransactionExportHandler, tmp_path):
+    path = tmp_path / "transactions.npz"
+    report = export_handler.export(path, ExportFormats.NPZ, batch_size=4)
+    assert report.rows == 25
+    with np.load(path) as data:
+        assert data["amount"].tolist() == [index * 100 + 1 for index in range(25)]
+        assert data["date"][3] == np.datetime64("2024-01-04T00:00:00")
+        assert data["transaction_type"][0] == "transferência"
+        assert data["account_id_origin"][1] == b""
+        assert data["id"][0].decode() == REGISTER[0].id.hex
+        offsets, raw = data["description_offsets"], data["description_bytes"].tobytes()
+        starts = np.concatenate(([0], offsets[:-1]))
+        assert [raw[start:end].decode("utf-8") for start, end in zip(starts, offsets)] == [transaction.description for transaction in REGISTER]
+    # Só o arquivo final fica no diretorio, os temporarios das colunas são removidos
+    assert [file.name for file in tmp_path.iterdir()] == ["transactions.npz"]
+
+
+# Testa os erros de tipo e de formato
+def test_transaction_export_handler_errors(export_handler: TransactionExportHandler):
+    with pytest.raises(transaction_export_handler_error.UnexpectedDatabaseTypeError):
+        TransactionExportHandler(database="TESTE STRING TYPE")
+    with pytest.raises(transaction_export_handler_error.InvalidExportFormatError):
+        export_handler.export(io.StringIO(), "csv")
+    with pytest.raises(transaction_export_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'user_id'"):
+        export_handler.export(io.StringIO(), ExportFormats.CSV, user_id="TESTE STRING TYPE")
+    with pytest.raises(transaction_export_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'end_date'"):
+        export_handler.export(io.StringIO(), ExportFormats.CSV, end_date="TESTE STRING TYPE")
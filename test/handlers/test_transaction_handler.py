@@ -1,18 +1,24 @@
 import pytest
 import uuid
+import numpy as np
 
 from decimal import Decimal
 from datetime import datetime
 from typing import Optional, List
-from random import randint
+from random import randint, Random
 
-from src.financial.models import TransactionModel, TransactionTypes
+from src.financial.enums import SeriesFrequencies
+from src.financial.utils import TransactionIndex
+from src.financial.models import TransactionModel, TransactionTypes, TransactionQueryModel, TransactionPageModel, BalanceSeriesModel, CategoryReportModel, TransactionRollupModel, TransactionSearchPageModel
 from src.financial.handlers import TransactionHandler
 from src.financial.interfaces import DatabaseAdapterInterface
 from src.financial.exceptions.handler_errors import transaction_handler_error
 
 
 REGISTER = []
+GET_MANY_CALLS = []
+REPORT_VERSIONS = {}
+REPORT_CALLS = []
 
 
 class MockTransactionDatabaseAdapter(DatabaseAdapterInterface):
@@ -22,6 +28,16 @@ class MockTransactionDatabaseAdapter(DatabaseAdapterInterface):
         REGISTER.append(transaction)
         return True
     
+    @classmethod
+    def insert_many(cls, transactions) -> List[bool]:
+        outcomes = []
+        for transaction in transactions:
+            exists = any(registered.id == transaction.id for registered in REGISTER)
+            if not exists:
+                REGISTER.append(transaction)
+            outcomes.append(not exists)
+        return outcomes
+    
     @classmethod
     def update(cls, id, transaction) -> None:
         result = next((transaction for transaction in REGISTER if transaction.id == id), None)
@@ -39,9 +55,54 @@ class MockTransactionDatabaseAdapter(DatabaseAdapterInterface):
     def get(cls, id) -> Optional[TransactionModel]:
         return next((transaction for transaction in REGISTER if transaction.id == id), None)
     
+    @classmethod
+    def get_many(cls, ids) -> dict:
+        GET_MANY_CALLS.append(list(ids))
+        return {transaction.id: transaction for transaction in REGISTER if transaction.id in ids}
+    
     @classmethod
     def get_all(cls) -> List[TransactionModel]:
         return REGISTER
+    
+    @classmethod
+    def query(cls, query) -> TransactionPageModel:
+        transactions = [transaction for transaction in REGISTER if query.user_id is None or transaction.user_id == query.user_id]
+        return TransactionPageModel(transactions=transactions[:query.limit])
+    
+    @classmethod
+    def balance_series(cls, frequency, account_ids, user_id, start_date, end_date) -> BalanceSeriesModel:
+        account_ids = account_ids or []
+        return BalanceSeriesModel(frequency=frequency, account_ids=account_ids, periods=np.array([], dtype="datetime64[D]"), balances=np.zeros((len(account_ids), 0), dtype=np.int64))
+    
+    @classmethod
+    def balance_at(cls, account_id, at) -> Decimal:
+        return sum((transaction.amount for transaction in REGISTER if transaction.account_id_destination == account_id and transaction.date < at), Decimal("0.00"))
+    
+    @classmethod
+    def report_versions(cls, user_id, start_date, end_date) -> dict:
+        return dict(REPORT_VERSIONS)
+    
+    @classmethod
+    def category_report(cls, user_id, start_date, end_date, paid) -> CategoryReportModel:
+        REPORT_CALLS.append((user_id, start_date, end_date, paid))
+        return CategoryReportModel(user_id=user_id, start_date=start_date, end_date=end_date, paid=paid)
+    
+    @classmethod
+    def rollups(cls, user_id, start_date, end_date, account_ids, category_ids) -> List[TransactionRollupModel]:
+        return [
+            TransactionRollupModel(user_id=user_id, account_id=transaction.account_id_destination, category_id=transaction.category_id,
+                month=transaction.date.strftime("%Y-%m"), transaction_type=transaction.transaction_type, amount=transaction.amount, count=1)
+            for transaction in REGISTER if transaction.user_id == user_id
+        ]
+    
+    @classmethod
+    def rebuild_rollups(cls) -> int:
+        return len(REGISTER)
+    
+    @classmethod
+    def search(cls, user_id, text, limit, cursor) -> TransactionSearchPageModel:
+        found = [transaction for transaction in REGISTER if transaction.user_id == user_id and text.lower() in transaction.description.lower()]
+        return TransactionSearchPageModel(transactions=found[:limit], ranks=[-1.0] * len(found[:limit]), next_cursor="cursor" if len(found) > limit else None)
 
 
 @pytest.fixture
@@ -183,6 +244,245 @@ def test_transaction_handler_delete_transaction(transaction_handler: Transaction
     assert len(REGISTER) == 0
 
 
+# Testa se a criação em lote retorna o resultado de cada transação
+def test_transaction_handler_create_transactions(transaction_handler: TransactionHandler, transaction_model: TransactionModel):
+    other_transaction = transaction_model.model_copy(update={"id": uuid.uuid4()})
+    outcomes = transaction_handler.create_transactions(transactions=[transaction_model, other_transaction, transaction_model])
+    assert outcomes == [True, True, False]
+    assert len(REGISTER) == 2
+    REGISTER.clear()
+
+
+# Testa o erro de tipo ao criar transações em lote
+def test_transaction_handler_unexpected_type_error_create_transactions(transaction_handler: TransactionHandler, transaction_model: TransactionModel):
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'transactions'"):
+        transaction_handler.create_transactions(transactions=[transaction_model, "TESTE STRING TYPE"])
+
+
+# Testa se a consulta filtrada é delegada ao banco
+def test_transaction_handler_query_transactions(transaction_handler: TransactionHandler, transaction_model: TransactionModel):
+    other_transaction = TransactionModel(transaction_type=TransactionTypes.EXPENSE, category_id=uuid.uuid4(), account_id_destination=uuid.uuid4(), user_id=uuid.uuid4())
+    transaction_handler.create_transactions(transactions=[transaction_model, other_transaction])
+    page = transaction_handler.query_transactions(query=TransactionQueryModel(user_id=transaction_model.user_id))
+    assert [transaction.id for transaction in page.transactions] == [transaction_model.id]
+    assert page.have_next() == False
+    REGISTER.clear()
+
+
+# Testa o erro de tipo na consulta filtrada
+def test_transaction_handler_unexpected_type_error_query_transactions(transaction_handler: TransactionHandler):
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'query'"):
+        transaction_handler.query_transactions(query={"user_id": uuid.uuid4()})
+
+
+# Testa se o cache continua com um item por registro depois de varias escritas
+def test_transaction_handler_cache_size(transaction_handler: TransactionHandler, transaction_model: TransactionModel):
+    initial = len(REGISTER)
+    created = [transaction_model.model_copy(update={"id": uuid.uuid4()}) for _ in range(20)]
+    for transaction in created:
+        transaction_handler.create_transaction(transaction=transaction)
+    for transaction in created[:10]:
+        transaction_handler.update_transaction(id=transaction.id, transaction=transaction)
+    assert len(transaction_handler._cache) == len(REGISTER) == initial + 20
+    assert len(transaction_handler.get_all_transactions()) == initial + 20
+    for transaction in created:
+        transaction_handler.delete_transaction(id=transaction.id)
+    assert len(transaction_handler._cache) == len(REGISTER) == initial
+
+
+# Testa se os indices secundarios respondem por usuario, conta, categoria, tag e intervalo de datas
+def test_transaction_handler_secondary_indexes(transaction_handler: TransactionHandler):
+    user_id, account_a, account_b, category_id, tag_id = (uuid.uuid4() for _ in range(5))
+    march = [
+        TransactionModel(transaction_type=TransactionTypes.EXPENSE, date=datetime(2024, 3, day), category_id=category_id, tag_id=tag_id, account_id_destination=account_a, user_id=user_id)
+        for day in (20, 5, 12)
+    ]
+    april = TransactionModel(transaction_type=TransactionTypes.EXPENSE, date=datetime(2024, 4, 2), category_id=category_id, account_id_destination=account_a, user_id=user_id)
+    transfer = TransactionModel(transaction_type=TransactionTypes.TRANSFER, date=datetime(2024, 3, 15), category_id=uuid.uuid4(), account_id_origin=account_a, account_id_destination=account_b, user_id=user_id)
+    transaction_handler.create_transactions(transactions=[*march, april, transfer])
+    
+    in_march = transaction_handler.get_transactions_by_category(category_id, start_date=datetime(2024, 3, 1), end_date=datetime(2024, 4, 1))
+    assert [transaction.date.day for transaction in in_march] == [5, 12, 20]
+    assert len(transaction_handler.get_transactions_by_tag(tag_id)) == 3
+    assert len(transaction_handler.get_transactions_by_user(user_id)) == 5
+    assert [transaction.id for transaction in transaction_handler.get_transactions_by_account_origin(account_a)] == [transfer.id]
+    assert [transaction.date.day for transaction in transaction_handler.get_transactions_by_account(account_a)] == [5, 12, 15, 20, 2]
+    assert len(transaction_handler.get_transactions_by_date(start_date=datetime(2024, 3, 10), end_date=datetime(2024, 3, 16))) == 2
+    
+    # Mudanças feitas direto no modelo do cache movem a transação nos indices
+    transaction_handler.change_date(id=april.id, date=datetime(2024, 3, 1))
+    transaction_handler.change_category_id(id=march[0].id, category_id=uuid.uuid4())
+    in_march = transaction_handler.get_transactions_by_category(category_id, start_date=datetime(2024, 3, 1), end_date=datetime(2024, 4, 1))
+    assert [transaction.date.day for transaction in in_march] == [1, 5, 12]
+    
+    transaction_handler.delete_transaction(id=transfer.id)
+    assert transaction_handler.get_transactions_by_account_origin(account_a) == []
+    assert transaction_handler.get_transactions_by_account(account_b) == []
+    REGISTER.clear()
+
+
+# Testa se a carga em lote dos indices fica igual à inserção linha a linha, inclusive com ids repetidos e já indexados
+def test_transaction_index_extend():
+    rng = Random(11)
+    users, accounts, categories = [uuid.uuid4() for _ in range(3)], [uuid.uuid4() for _ in range(4)], [uuid.uuid4() for _ in range(5)]
+    def make(id=None):
+        return TransactionModel(
+            id=id or uuid.uuid4(), transaction_type=TransactionTypes.EXPENSE, date=datetime(2024, rng.randint(1, 12), rng.randint(1, 28)),
+            category_id=rng.choice(categories), tag_id=rng.choice([None, categories[0]]), account_id_origin=rng.choice([None, *accounts]),
+            account_id_destination=rng.choice(accounts), user_id=rng.choice(users)
+        )
+    first = [make() for _ in range(300)]
+    # Segundo lote com alterações de ids já indexados e um id repetido no proprio lote
+    second = [make(id=transaction.id) for transaction in first[:50]] + [make() for _ in range(100)]
+    second.append(make(id=second[-1].id))
+    one_by_one, bulk = TransactionIndex(), TransactionIndex()
+    for transaction in first + second:
+        one_by_one.add(transaction)
+    bulk.extend(first)
+    bulk.extend(second)
+    assert len(bulk) == len(one_by_one) == 400
+    assert bulk.ids_by_date() == one_by_one.ids_by_date()
+    for field, values in (("user_id", users), ("account_id_destination", accounts), ("account_id_origin", accounts), ("category_id", categories), ("tag_id", categories)):
+        for value in values:
+            assert bulk.ids_by(field, value) == one_by_one.ids_by(field, value)
+    bulk.rebuild(first[:10])
+    assert sorted(bulk.ids_by_date()) == sorted(transaction.id for transaction in first[:10])
+
+
+# Testa o erro de tipo nas consultas pelos indices
+def test_transaction_handler_unexpected_type_error_secondary_indexes(transaction_handler: TransactionHandler):
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'category_id'"):
+        transaction_handler.get_transactions_by_category(category_id="TESTE STRING TYPE")
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'start_date'"):
+        transaction_handler.get_transactions_by_date(start_date="TESTE STRING TYPE")
+
+
+# Testa se o saldo historico é delegado ao banco
+def test_transaction_handler_balance_at(transaction_handler: TransactionHandler, transaction_model: TransactionModel):
+    transaction_model.date = datetime(2024, 3, 10)
+    transaction_model.amount = Decimal("12.34")
+    transaction_handler.create_transaction(transaction=transaction_model)
+    assert transaction_handler.balance_at(account_id=transaction_model.account_id_destination, at=datetime(2024, 3, 11)) == Decimal("12.34")
+    assert transaction_handler.balance_at(account_id=transaction_model.account_id_destination, at=datetime(2024, 3, 10)) == Decimal("0.00")
+    REGISTER.clear()
+
+
+# Testa o erro de tipo no saldo historico
+def test_transaction_handler_unexpected_type_error_balance_at(transaction_handler: TransactionHandler):
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'account_id'"):
+        transaction_handler.balance_at(account_id="TESTE STRING TYPE", at=datetime(2024, 3, 10))
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'at'"):
+        transaction_handler.balance_at(account_id=uuid.uuid4(), at="TESTE STRING TYPE")
+
+
+# Testa se a serie de saldos é delegada ao banco
+def test_transaction_handler_get_balance_series(transaction_handler: TransactionHandler):
+    account_id = uuid.uuid4()
+    series = transaction_handler.get_balance_series(frequency=SeriesFrequencies.MONTH, account_ids=[account_id])
+    assert isinstance(series, BalanceSeriesModel) == True
+    assert series.frequency is SeriesFrequencies.MONTH
+    assert series.have_account(account_id) == True
+
+
+# Testa o erro de tipo na serie de saldos
+def test_transaction_handler_unexpected_type_error_get_balance_series(transaction_handler: TransactionHandler):
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'frequency'"):
+        transaction_handler.get_balance_series(frequency="dia")
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'account_ids'"):
+        transaction_handler.get_balance_series(account_ids=["TESTE STRING TYPE"])
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'end_date'"):
+        transaction_handler.get_balance_series(end_date="TESTE STRING TYPE")
+
+
+# Testa se o relatorio por categoria é reaproveitado até alguma versão do periodo mudar
+def test_transaction_handler_get_category_report_cache(transaction_handler: TransactionHandler):
+    REPORT_VERSIONS.clear()
+    REPORT_CALLS.clear()
+    user_id = uuid.uuid4()
+    start_date, end_date = datetime(2024, 1, 1), datetime(2024, 4, 1)
+    REPORT_VERSIONS.update({"": 1, "2024-02": 3})
+    report = transaction_handler.get_category_report(user_id=user_id, start_date=start_date, end_date=end_date)
+    assert isinstance(report, CategoryReportModel) == True
+    assert transaction_handler.get_category_report(user_id=user_id, start_date=start_date, end_date=end_date) is report
+    assert len(REPORT_CALLS) == 1
+    # Outro filtro é outra entrada do cache
+    transaction_handler.get_category_report(user_id=user_id, start_date=start_date, end_date=end_date, paid=True)
+    assert len(REPORT_CALLS) == 2
+    # Uma alteração em um mês do periodo invalida o relatorio guardado
+    REPORT_VERSIONS["2024-03"] = 1
+    assert transaction_handler.get_category_report(user_id=user_id, start_date=start_date, end_date=end_date) is not report
+    assert len(REPORT_CALLS) == 3
+    REPORT_VERSIONS.clear()
+
+
+# Testa o erro de tipo no relatorio por categoria
+def test_transaction_handler_unexpected_type_error_get_category_report(transaction_handler: TransactionHandler):
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'user_id'"):
+        transaction_handler.get_category_report(user_id="TESTE STRING TYPE")
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'paid'"):
+        transaction_handler.get_category_report(user_id=uuid.uuid4(), paid="TESTE STRING TYPE")
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'start_date'"):
+        transaction_handler.get_category_report(user_id=uuid.uuid4(), start_date="TESTE STRING TYPE")
+
+
+# Testa se o rollup é delegado ao banco
+def test_transaction_handler_get_rollups(transaction_handler: TransactionHandler, transaction_model: TransactionModel):
+    transaction_handler.create_transaction(transaction=transaction_model)
+    rollups = transaction_handler.get_rollups(user_id=transaction_model.user_id, start_date=datetime(2020, 1, 1), end_date=datetime(2100, 1, 1))
+    assert [rollup.category_id for rollup in rollups] == [transaction_model.category_id]
+    assert transaction_handler.rebuild_rollups() == len(REGISTER)
+
+
+# Testa os erros de tipo e de periodo do rollup
+def test_transaction_handler_get_rollups_errors(transaction_handler: TransactionHandler):
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'user_id'"):
+        transaction_handler.get_rollups(user_id="TESTE STRING TYPE")
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'category_ids'"):
+        transaction_handler.get_rollups(user_id=uuid.uuid4(), category_ids=["TESTE STRING TYPE"])
+    with pytest.raises(transaction_handler_error.InvalidRollupPeriodError):
+        transaction_handler.get_rollups(user_id=uuid.uuid4(), start_date=datetime(2024, 1, 15))
+
+
+# Testa a busca pela descrição, resolvida no banco
+def test_transaction_handler_search_transactions(transaction_handler: TransactionHandler, transaction_model: TransactionModel):
+    transaction_model.description = "PADARIA DO ZE"
+    transaction_handler.create_transaction(transaction=transaction_model)
+    page = transaction_handler.search_transactions(user_id=transaction_model.user_id, query="padaria", limit=1)
+    assert [transaction.id for transaction in page.transactions] == [transaction_model.id]
+    assert not page.have_next()
+    assert transaction_handler.search_transactions(user_id=uuid.uuid4(), query="padaria").transactions == []
+
+
+# Testa os erros de tipo da busca pela descrição
+def test_transaction_handler_search_transactions_errors(transaction_handler: TransactionHandler):
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'user_id'"):
+        transaction_handler.search_transactions(user_id="TESTE STRING TYPE", query="padaria")
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'query'"):
+        transaction_handler.search_transactions(user_id=uuid.uuid4(), query=None)
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'limit'"):
+        transaction_handler.search_transactions(user_id=uuid.uuid4(), query="padaria", limit=0)
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'cursor'"):
+        transaction_handler.search_transactions(user_id=uuid.uuid4(), query="padaria", cursor=1)
+
+
+# Testa a busca em lote: o que está no cache não vai para o banco e os ids que faltam vão em uma unica chamada
+def test_transaction_handler_get_transactions(transaction_handler: TransactionHandler, transaction_model: TransactionModel):
+    transaction_handler.create_transaction(transaction=transaction_model)
+    outside = transaction_model.model_copy(update={"id": uuid.uuid4()})
+    REGISTER.append(outside)
+    missing = uuid.uuid4()
+    GET_MANY_CALLS.clear()
+    found = transaction_handler.get_transactions(ids=[outside.id, transaction_model.id, missing, outside.id])
+    assert list(found) == [outside.id, transaction_model.id]
+    assert GET_MANY_CALLS == [[outside.id, missing]]
+    # Os registros buscados entram no cache
+    assert transaction_handler.get_transactions(ids=[outside.id]) == {outside.id: outside}
+    assert len(GET_MANY_CALLS) == 1
+    assert transaction_handler.get_transactions(ids=[]) == {}
+    with pytest.raises(transaction_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'ids'"):
+        transaction_handler.get_transactions(ids=["TESTE STRING TYPE"])
+
+
 # Testa o erro de tipo do database em propriedade
 def test_transaction_handler_database_type_error_01(transaction_handler: TransactionHandler):
     with pytest.raises(transaction_handler_error.UnexpectedDatabaseTypeError, match="Tipo inesperado do argumento 'value'"):
@@ -11,6 +11,7 @@ from src.financial.exceptions.handler_errors import transaction_tag_handler_erro
 
 
 REGISTER = []
+GET_MANY_CALLS = []
 
 
 class MockTransactionTagDatabaseAdapter(DatabaseAdapterInterface):
@@ -37,6 +38,11 @@ class MockTransactionTagDatabaseAdapter(DatabaseAdapterInterface):
     def get(cls, id) -> Optional[TransactionTagModel]:
         return next((transaction_tag for transaction_tag in REGISTER if transaction_tag.id == id), None)
     
+    @classmethod
+    def get_many(cls, ids) -> dict:
+        GET_MANY_CALLS.append(list(ids))
+        return {transaction_tag.id: transaction_tag for transaction_tag in REGISTER if transaction_tag.id in ids}
+    
     @classmethod
     def get_all(cls) -> List[TransactionTagModel]:
         return REGISTER
@@ -119,6 +125,39 @@ def test_transaction_tag_handler_delete_transaction_tag(transaction_tag_handler:
     assert len(REGISTER) == 0
 
 
+# Testa se o cache continua com um item por registro depois de varias escritas
+def test_transaction_tag_handler_cache_size(transaction_tag_handler: TransactionTagHandler, transaction_tag_model: TransactionTagModel):
+    initial = len(REGISTER)
+    created = [transaction_tag_model.model_copy(update={"id": uuid.uuid4()}) for _ in range(20)]
+    for transaction_tag in created:
+        transaction_tag_handler.create_transaction_tag(transaction_tag=transaction_tag)
+    for transaction_tag in created[:10]:
+        transaction_tag_handler.update_transaction_tag(id=transaction_tag.id, transaction_tag=transaction_tag)
+    assert len(transaction_tag_handler._cache) == len(REGISTER) == initial + 20
+    assert len(transaction_tag_handler.get_all_transaction_tags()) == initial + 20
+    for transaction_tag in created:
+        transaction_tag_handler.delete_transaction_tag(id=transaction_tag.id)
+    assert len(transaction_tag_handler._cache) == len(REGISTER) == initial
+
+
+# Testa a busca em lote: o que está no cache não vai para o banco e os ids que faltam vão em uma unica chamada
+def test_transaction_tag_handler_get_transaction_tags(transaction_tag_handler: TransactionTagHandler, transaction_tag_model: TransactionTagModel):
+    transaction_tag_handler.create_transaction_tag(transaction_tag=transaction_tag_model)
+    outside = transaction_tag_model.model_copy(update={"id": uuid.uuid4()})
+    REGISTER.append(outside)
+    missing = uuid.uuid4()
+    GET_MANY_CALLS.clear()
+    found = transaction_tag_handler.get_transaction_tags(ids=[outside.id, transaction_tag_model.id, missing, outside.id])
+    assert list(found) == [outside.id, transaction_tag_model.id]
+    assert GET_MANY_CALLS == [[outside.id, missing]]
+    # Os registros buscados entram no cache
+    assert transaction_tag_handler.get_transaction_tags(ids=[outside.id]) == {outside.id: outside}
+    assert len(GET_MANY_CALLS) == 1
+    assert transaction_tag_handler.get_transaction_tags(ids=[]) == {}
+    with pytest.raises(transaction_tag_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'ids'"):
+        transaction_tag_handler.get_transaction_tags(ids=["TESTE STRING TYPE"])
+
+
 # Testa o erro de tipo do database em propriedade
 def test_transaction_tag_handler_database_type_error_01(transaction_tag_handler: TransactionTagHandler):
     with pytest.raises(transaction_tag_handler_error.UnexpectedDatabaseTypeError, match="Tipo inesperado do argumento 'value'"):
@@ -11,6 +11,7 @@ from src.financial.exceptions.handler_errors import user_handler_error
 
 
 REGISTER = []
+GET_MANY_CALLS = []
 
 
 class MockUserDatabaseAdapter(DatabaseAdapterInterface):
@@ -37,6 +38,11 @@ class MockUserDatabaseAdapter(DatabaseAdapterInterface):
     def get(cls, id) -> Optional[UserModel]:
         return next((user for user in REGISTER if user.id == id), None)
     
+    @classmethod
+    def get_many(cls, ids) -> dict:
+        GET_MANY_CALLS.append(list(ids))
+        return {user.id: user for user in REGISTER if user.id in ids}
+    
     @classmethod
     def get_all(cls) -> List[UserModel]:
         return REGISTER
@@ -113,6 +119,39 @@ def test_user_handler_delete_user(user_handler: UserHandler):
     assert len(REGISTER) == 0
 
 
+# Testa se o cache continua com um item por registro depois de varias escritas
+def test_user_handler_cache_size(user_handler: UserHandler, user_model: UserModel):
+    initial = len(REGISTER)
+    created = [user_model.model_copy(update={"id": uuid.uuid4()}) for _ in range(20)]
+    for user in created:
+        user_handler.create_user(user=user)
+    for user in created[:10]:
+        user_handler.update_user(id=user.id, user=user)
+    assert len(user_handler._cache) == len(REGISTER) == initial + 20
+    assert len(user_handler.get_all_users()) == initial + 20
+    for user in created:
+        user_handler.delete_user(id=user.id)
+    assert len(user_handler._cache) == len(REGISTER) == initial
+
+
+# Testa a busca em lote: o que está no cache não vai para o banco e os ids que faltam vão em uma unica chamada
+def test_user_handler_get_users(user_handler: UserHandler, user_model: UserModel):
+    user_handler.create_user(user=user_model)
+    outside = user_model.model_copy(update={"id": uuid.uuid4()})
+    REGISTER.append(outside)
+    missing = uuid.uuid4()
+    GET_MANY_CALLS.clear()
+    found = user_handler.get_users(ids=[outside.id, user_model.id, missing, outside.id])
+    assert list(found) == [outside.id, user_model.id]
+    assert GET_MANY_CALLS == [[outside.id, missing]]
+    # Os registros buscados entram no cache
+    assert user_handler.get_users(ids=[outside.id]) == {outside.id: outside}
+    assert len(GET_MANY_CALLS) == 1
+    assert user_handler.get_users(ids=[]) == {}
+    with pytest.raises(user_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'ids'"):
+        user_handler.get_users(ids=["TESTE STRING TYPE"])
+
+
 # Testa o erro de tipo do database em propriedade
 def test_user_handler_database_type_error_01(user_handler: UserHandler):
     with pytest.raises(user_handler_error.UnexpectedDatabaseTypeError, match="Tipo inesperado do argumento 'value'"):
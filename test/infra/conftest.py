@@ -0,0 +1,23 @@
+import pytest
+
+from infra import Base, DBConnectionHandler, Migrator
+
+
+@pytest.fixture
+def connection_string(tmp_path):
+    connection_string = f"sqlite:///{tmp_path / 'test.db'}"
+    with DBConnectionHandler(connection_string=connection_string) as db:
+        Base.metadata.create_all(db.get_engine())
+        Migrator(db.get_engine()).upgrade()
+    return connection_string
+
+
+@pytest.fixture
+def binary_connection_string(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    # Banco com as chaves UUID gravadas em 16 bytes
+    monkeypatch.setenv("SISFIN_DB_UUID_STORAGE", "binary")
+    connection_string = f"sqlite:///{tmp_path / 'binary.db'}"
+    with DBConnectionHandler(connection_string=connection_string) as db:
+        Base.metadata.create_all(db.get_engine())
+        Migrator(db.get_engine()).upgrade()
+    return connection_string
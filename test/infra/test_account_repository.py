@@ -0,0 +1,152 @@
+import pytest
+import uuid
+import datetime
+
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+
+from infra import AccountRepository, TransactionRepository
+from test.infra.test_transaction_repository import make_row
+from src.financial.database_adapter import AccountDatabaseAdapter
+from src.financial.exceptions.database_adapter_errors.account_db_adapter_error import AccountNotFoundError
+
+
+def make_account_row(**kwargs) -> dict:
+    row = {
+        "id": uuid.uuid4().hex,
+        "name": "TESTER ACCOUNT",
+        "description": None,
+        "tag_id": None,
+        "balance": 0,
+        "created_at": datetime.datetime.now(),
+        "user_id": uuid.uuid4().hex,
+    }
+    row.update(kwargs)
+    return row
+
+
+@pytest.fixture
+def account_repository(connection_string: str):
+    return AccountRepository(connection_string=connection_string)
+
+
+# Testa se incrementos concorrentes não se perdem
+def test_account_repository_add_to_balance_concurrent(account_repository: AccountRepository):
+    row = make_account_row(balance=1000)
+    account_repository.insert_many([row])
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: account_repository.add_to_balance(id=row["id"], delta=5), range(200)))
+    assert account_repository.select_from_id(id=row["id"]).balance == 2000
+    assert account_repository.add_to_balance(id=uuid.uuid4().hex, delta=5) is None
+
+
+# Testa se os saldos de varias contas mudam em um unico comando e nada muda quando falta uma conta
+def test_account_repository_add_to_balances(account_repository: AccountRepository):
+    rows = [make_account_row(balance=index * 100) for index in range(5)]
+    account_repository.insert_many(rows)
+    deltas = {row["id"]: index - 2 for index, row in enumerate(rows)}
+    assert account_repository.add_to_balances(deltas) == {row["id"]: index * 100 + index - 2 for index, row in enumerate(rows)}
+    
+    assert account_repository.add_to_balances({rows[0]["id"]: 1, uuid.uuid4().hex: 1}) is None
+    assert account_repository.select_from_id(id=rows[0]["id"]).balance == -2
+
+
+# Testa o caminho do adaptador com a conversão de centavos
+def test_account_db_adapter_add_to_balance(account_repository: AccountRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(AccountDatabaseAdapter, "_db", account_repository)
+    row = make_account_row(balance=1050)
+    account_repository.insert_many([row])
+    assert AccountDatabaseAdapter.add_to_balance(id=uuid.UUID(row["id"]), delta=Decimal("-0.55")) == Decimal("9.95")
+    assert AccountDatabaseAdapter.add_to_balances({uuid.UUID(row["id"]): Decimal("0.05")}) == {uuid.UUID(row["id"]): Decimal("10.00")}
+    with pytest.raises(AccountNotFoundError):
+        AccountDatabaseAdapter.add_to_balance(id=uuid.uuid4(), delta=Decimal("1.00"))
+
+
+# Testa se as chaves do CASE passam pela conversão de UUID binario
+def test_account_repository_add_to_balances_binary(binary_connection_string: str):
+    account_repository = AccountRepository(connection_string=binary_connection_string)
+    rows = [make_account_row(balance=100) for _ in range(3)]
+    account_repository.insert_many(rows)
+    assert account_repository.add_to_balances({row["id"]: 7 for row in rows}) == {row["id"]: 107 for row in rows}
+
+
+def make_history(connection_string: str, accounts: int = 6, transactions: int = 200) -> list:
+    # Contas com o saldo igual ao historico de transações
+    account_ids = sorted(uuid.uuid4().hex for _ in range(accounts))
+    rows = []
+    for index in range(transactions):
+        transaction_type = ["despesa", "renda", "transferência", "ajuste"][index % 4]
+        rows.append(make_row(
+            amount=index + 1,
+            transaction_type=transaction_type,
+            paid=index % 7 != 0,
+            account_id_origin=account_ids[(index + 1) % accounts] if transaction_type == "transferência" else None,
+            account_id_destination=account_ids[index % accounts],
+        ))
+    TransactionRepository(connection_string=connection_string).insert_many(rows)
+    balances = {id: 0 for id in account_ids}
+    for row in rows:
+        if not row["paid"]:
+            continue
+        balances[row["account_id_destination"]] += -row["amount"] if row["transaction_type"] == "despesa" else row["amount"]
+        if row["account_id_origin"] is not None:
+            balances[row["account_id_origin"]] -= row["amount"]
+    AccountRepository(connection_string=connection_string).insert_many([make_account_row(id=id, balance=balance) for id, balance in balances.items()])
+    return account_ids
+
+
+# Testa se a conciliação completa encontra e corrige saldos divergentes, em um processo e no pool
+def test_account_db_adapter_reconcile_balances(account_repository: AccountRepository, connection_string: str, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(AccountDatabaseAdapter, "_db", account_repository)
+    account_ids = make_history(connection_string)
+    assert [row[1] == row[2] for row in account_repository.reconcile_balances()] == [True] * len(account_ids)
+    assert account_repository.reconcile_balances(first_id=account_ids[1], last_id=account_ids[2]) == [
+        (row[0], row[1], row[2]) for row in account_repository.reconcile_balances(ids=account_ids[1:3])
+    ]
+    
+    account_repository.add_to_balances({account_ids[0]: 150, account_ids[4]: -3})
+    for workers in (1, 2):
+        report = AccountDatabaseAdapter.reconcile_balances(workers=workers)
+        assert report.checked == len(account_ids)
+        assert {mismatch.account_id: mismatch.difference() for mismatch in report.mismatches} == {
+            uuid.UUID(account_ids[0]): Decimal("-1.50"),
+            uuid.UUID(account_ids[4]): Decimal("0.03"),
+        }
+        assert report.fixed == False
+    
+    assert AccountDatabaseAdapter.reconcile_balances(fix=True, workers=2).fixed == True
+    assert AccountDatabaseAdapter.reconcile_balances(workers=2).have_mismatches() == False
+
+
+# Testa se a conciliação incremental confere só as contas marcadas e mantem marcadas as diferenças não corrigidas
+def test_account_db_adapter_reconcile_balances_incremental(account_repository: AccountRepository, connection_string: str, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(AccountDatabaseAdapter, "_db", account_repository)
+    account_ids = make_history(connection_string)
+    assert AccountDatabaseAdapter.reconcile_balances(incremental=True, workers=1).checked == len(account_ids)
+    assert AccountDatabaseAdapter.reconcile_balances(incremental=True, workers=1).checked == 0
+    
+    # Uma transação nova marca as contas dela, um saldo alterado direto marca a propria conta
+    TransactionRepository(connection_string=connection_string).insert_many([
+        make_row(amount=10, transaction_type="transferência", account_id_origin=account_ids[0], account_id_destination=account_ids[1])
+    ])
+    account_repository.add_to_balance(id=account_ids[2], delta=5)
+    assert account_repository.select_marked_ids()[1] == account_ids[:3]
+    report = AccountDatabaseAdapter.reconcile_balances(incremental=True, workers=1)
+    assert report.checked == 3
+    assert {mismatch.account_id for mismatch in report.mismatches} == {uuid.UUID(id) for id in account_ids[:3]}
+    
+    assert AccountDatabaseAdapter.reconcile_balances(incremental=True, workers=1).checked == 3
+    assert AccountDatabaseAdapter.reconcile_balances(incremental=True, fix=True, workers=1).fixed == True
+    report = AccountDatabaseAdapter.reconcile_balances(incremental=True, workers=1)
+    assert report.checked == 3 and report.have_mismatches() == False
+    assert AccountDatabaseAdapter.reconcile_balances(incremental=True, workers=1).checked == 0
+
+
+# Testa a conciliação com as chaves gravadas em bytes
+def test_account_repository_reconcile_balances_binary(binary_connection_string: str):
+    account_ids = make_history(binary_connection_string)
+    account_repository = AccountRepository(connection_string=binary_connection_string)
+    assert [row[0] for row in account_repository.reconcile_balances(first_id=account_ids[0], last_id=account_ids[3])] == account_ids[:4]
+    assert all(row[1] == row[2] for row in account_repository.reconcile_balances())
+    assert account_repository.select_marked_ids()[1] == account_ids
+
@@ -0,0 +1,39 @@
+import pytest
+
+from infra import DBConnectionHandler, DatabaseSettings, EngineRegistry, UserRepository, AccountRepository
+
+
+# Testa se todos os repositórios compartilham a mesma engine
+def test_engine_registry_shared_engine(connection_string: str):
+    user_repository = UserRepository(connection_string=connection_string)
+    account_repository = AccountRepository(connection_string=connection_string)
+    assert user_repository.db.get_engine() is account_repository.db.get_engine()
+    assert connection_string in EngineRegistry.pool_status()
+
+
+# Testa se contextos aninhados reutilizam a sessão da thread
+def test_engine_registry_nested_session(connection_string: str):
+    db = DBConnectionHandler(connection_string=connection_string)
+    with db:
+        outer_session = db.session
+        with DBConnectionHandler(connection_string=connection_string) as inner:
+            assert inner.session is outer_session
+        assert db.session is outer_session
+    assert db.session is not outer_session
+
+
+# Testa se o perfil de performance é aplicado nas conexões SQLite
+def test_engine_registry_sqlite_performance_profile(tmp_path):
+    settings = DatabaseSettings(connection_string=f"sqlite:///{tmp_path / 'profile.db'}", sqlite_profile="performance", sqlite_busy_timeout=1234)
+    engine = EngineRegistry.get_engine(settings)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 1234
+        assert connection.exec_driver_sql("PRAGMA temp_store").scalar() == 2
+
+
+# Testa o erro de perfil SQLite desconhecido
+def test_engine_registry_unknown_sqlite_profile():
+    with pytest.raises(ValueError):
+        DatabaseSettings(sqlite_profile="TESTE PERFIL")
@@ -0,0 +1,315 @@
+import pytest
+import datetime
+
+from sqlalchemy import create_engine
+
+from infra import Base, DBConnectionHandler, Migrator
+from infra.migrations import Migration, require_columns
+from infra.migrations.versions import MIGRATIONS, TRANSACTION_INDEXES, ROLLUP_REBUILD
+from infra.repository.utils import content_hash
+
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+@pytest.fixture
+def engine(connection_string: str):
+    return DBConnectionHandler(connection_string=connection_string).get_engine()
+
+
+def query_plan(engine, sql: str, params: tuple = ()) -> str:
+    with engine.connect() as connection:
+        return " | ".join(row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def index_names(engine) -> set:
+    with engine.connect() as connection:
+        return {row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'transactions'")}
+
+
+# Testa se um banco novo já fica na ultima versão
+def test_migrator_fresh_database(engine):
+    assert Migrator(engine).current_version() == LATEST_VERSION
+    assert Migrator(engine).pending() == []
+    assert set(TRANSACTION_INDEXES).issubset(index_names(engine))
+
+
+# Testa se um banco criado antes dos indices recebe eles pela migração
+def test_migrator_upgrade_existing_database(engine):
+    with engine.begin() as connection:
+        for name in index_names(engine):
+            if name.startswith("ix_"):
+                connection.exec_driver_sql(f"DROP INDEX {name}")
+        connection.exec_driver_sql("PRAGMA user_version = 0")
+    assert not any(name.startswith("ix_") for name in index_names(engine))
+    
+    assert Migrator(engine).upgrade() == LATEST_VERSION
+    assert set(TRANSACTION_INDEXES) | {"ix_transactions_unpaid_date"} <= index_names(engine)
+    # Rodar de novo não faz nada
+    assert Migrator(engine).upgrade() == LATEST_VERSION
+
+
+# Testa se tabelas no formato antigo (colunas 'transaction_id', 'created_by', ...) não quebram a migração
+# e se a versão não é gravada enquanto as migrações não puderem ser aplicadas
+def test_migrator_legacy_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE transactions (transaction_id VARCHAR(64) PRIMARY KEY, date DATETIME, created_by VARCHAR(64))")
+    migrator = Migrator(engine)
+    assert migrator.upgrade() == 0
+    assert migrator.skipped[0].version == 1 and "account_id_destination" in migrator.skipped[1]
+    assert index_names(engine) == {"sqlite_autoindex_transactions_1"}
+    assert len(migrator.pending()) == len(MIGRATIONS)
+    
+    # Depois que a tabela fica no formato esperado as migrações são aplicadas normalmente
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE transactions")
+    Base.metadata.create_all(engine)
+    assert migrator.upgrade() == LATEST_VERSION
+    assert migrator.skipped is None
+    assert set(TRANSACTION_INDEXES).issubset(index_names(engine))
+    engine.dispose()
+
+
+# Testa se uma migração que não encontra as colunas esperadas desfaz o que fez e para o 'upgrade' nela
+def test_migrator_skipped_migration(engine):
+    applied = []
+    def first(connection):
+        applied.append(1)
+    def second(connection):
+        connection.exec_driver_sql("CREATE TABLE migration_probe (id INTEGER)")
+        require_columns(connection, "transactions", ["id", "missing_column"])
+    def third(connection):
+        applied.append(3)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("PRAGMA user_version = 0")
+    migrator = Migrator(engine, migrations=[Migration(1, "primeira", first), Migration(2, "segunda", second), Migration(3, "terceira", third)])
+    assert migrator.upgrade() == 1
+    assert applied == [1]
+    assert migrator.skipped[0].version == 2 and "missing_column" in migrator.skipped[1]
+    assert [migration.version for migration in migrator.pending()] == [2, 3]
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE name = 'migration_probe'").scalar() is None
+
+
+@pytest.mark.parametrize("sql, params, index", [
+    ("SELECT * FROM transactions WHERE user_id = ? ORDER BY date DESC, id DESC", ("a",), "ix_transactions_user_id_date"),
+    ("SELECT * FROM transactions WHERE user_id = ? AND date >= ? AND date < ?", ("a", "2024-01-01", "2024-02-01"), "ix_transactions_user_id_date"),
+    ("SELECT * FROM transactions WHERE account_id_destination = ? AND date >= ?", ("a", "2024-01-01"), "ix_transactions_account_id_destination_date"),
+    ("SELECT * FROM transactions WHERE account_id_origin = ? ORDER BY date", ("a",), "ix_transactions_account_id_origin_date"),
+    ("SELECT * FROM transactions WHERE category_id = ? AND date < ?", ("a", "2024-01-01"), "ix_transactions_category_id_date"),
+    ("SELECT * FROM transactions WHERE paid = 0 AND date < ? ORDER BY date", ("2024-01-01",), "ix_transactions_unpaid_date"),
+])
+# Testa se as consultas por usuario, conta, categoria e pendentes usam os indices em vez de varrer a tabela
+def test_transaction_query_plans(engine, sql: str, params: tuple, index: str):
+    plan = query_plan(engine, sql, params)
+    assert f"USING INDEX {index}" in plan
+    assert "SCAN transactions" not in plan
+
+
+# Testa se a migração para centavos converte os valores e mantem rowid, indices e dados das outras colunas
+def test_migrator_amounts_to_cents(engine):
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE transactions")
+        connection.exec_driver_sql(
+            "CREATE TABLE transactions (id VARCHAR(64) NOT NULL, date DATETIME NOT NULL, description VARCHAR(255) NOT NULL, "
+            "amount FLOAT NOT NULL, transaction_type VARCHAR(64) NOT NULL, paid BOOLEAN NOT NULL, ignore BOOLEAN NOT NULL, "
+            "visible BOOLEAN NOT NULL, category_id VARCHAR(64) NOT NULL, tag_id VARCHAR(64) NOT NULL, account_id_origin VARCHAR(64), "
+            "account_id_destination VARCHAR(64) NOT NULL, created_at DATETIME NOT NULL, user_id VARCHAR(64) NOT NULL, PRIMARY KEY (id))"
+        )
+        connection.exec_driver_sql("CREATE INDEX ix_transactions_user_id_date ON transactions (user_id, date)")
+        for rowid, amount in [(3, 0.29), (10, 1234.5), (11, 100.0)]:
+            connection.exec_driver_sql(
+                "INSERT INTO transactions (rowid, id, date, description, amount, transaction_type, paid, ignore, visible, category_id, tag_id, account_id_destination, created_at, user_id) "
+                "VALUES (?, ?, '2024-01-01 00:00:00', 'TESTER', ?, 'despesa', 1, 0, 1, 'c', 't', 'a', '2024-01-01 00:00:00', 'u')",
+                (rowid, f"id{rowid}", amount)
+            )
+        connection.exec_driver_sql("PRAGMA user_version = 1")
+    
+    assert Migrator(engine).upgrade() == LATEST_VERSION
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql("SELECT rowid, id, amount, typeof(amount) FROM transactions ORDER BY rowid").fetchall()
+        column_type = next(row[2] for row in connection.exec_driver_sql("PRAGMA table_info(transactions)") if row[1] == "amount")
+    assert rows == [(3, "id3", 29, "integer"), (10, "id10", 123450, "integer"), (11, "id11", 10000, "integer")]
+    assert column_type == "INTEGER"
+    assert "ix_transactions_user_id_date" in index_names(engine)
+
+
+# Testa se a migração dos checkpoints carrega o historico já gravado e cria os triggers
+def test_migrator_balance_checkpoints(engine):
+    account_id = "a" * 32
+    with engine.begin() as connection:
+        for name in ("tr_transactions_checkpoints_insert", "tr_transactions_checkpoints_delete", "tr_transactions_checkpoints_update"):
+            connection.exec_driver_sql(f"DROP TRIGGER {name}")
+        for index, (date, amount, transaction_type, paid) in enumerate([
+                ("2024-01-10 00:00:00.000000", 1000, "renda", 1),
+                ("2024-01-20 00:00:00.000000", 300, "despesa", 1),
+                ("2024-02-05 00:00:00.000000", 500, "renda", 0),
+                ("2024-03-01 00:00:00.000000", 200, "ajuste", 1)]):
+            connection.exec_driver_sql(
+                "INSERT INTO transactions (id, date, description, amount, transaction_type, paid, ignore, visible, category_id, tag_id, "
+                "account_id_origin, account_id_destination, created_at, user_id) VALUES (?, ?, '', ?, ?, ?, 0, 1, 'c', 't', NULL, ?, ?, 'u')",
+                (str(index), date, amount, transaction_type, paid, account_id, date)
+            )
+        connection.exec_driver_sql("PRAGMA user_version = 2")
+    
+    assert Migrator(engine).upgrade() == LATEST_VERSION
+    with engine.begin() as connection:
+        assert connection.exec_driver_sql("SELECT month, delta FROM accounts_balance_checkpoints ORDER BY month").fetchall() == [("2024-01", 700), ("2024-03", 200)]
+        connection.exec_driver_sql("UPDATE transactions SET paid = 1 WHERE id = '2'")
+        connection.exec_driver_sql("DELETE FROM transactions WHERE id = '3'")
+        assert connection.exec_driver_sql("SELECT month, delta FROM accounts_balance_checkpoints ORDER BY month").fetchall() == [("2024-01", 700), ("2024-02", 500), ("2024-03", 0)]
+
+
+
+# Testa se a migração do rollup carrega o historico já gravado e os triggers passam a manter a tabela
+def test_migrator_transaction_rollups(engine):
+    with engine.begin() as connection:
+        for name in ("tr_transactions_rollups_insert", "tr_transactions_rollups_delete", "tr_transactions_rollups_update"):
+            connection.exec_driver_sql(f"DROP TRIGGER {name}")
+        connection.exec_driver_sql("DROP TABLE transactions_rollups")
+        for index, (date, amount, paid, ignore) in enumerate([
+                ("2024-01-10 00:00:00.000000", 1000, 1, 0),
+                ("2024-01-20 00:00:00.000000", 300, 0, 0),
+                ("2024-01-25 00:00:00.000000", 900, 1, 1),
+                ("2024-02-05 00:00:00.000000", 500, 1, 0)]):
+            connection.exec_driver_sql(
+                "INSERT INTO transactions (id, date, description, amount, transaction_type, paid, ignore, visible, category_id, tag_id, "
+                "account_id_origin, account_id_destination, created_at, user_id) VALUES (?, ?, '', ?, 'despesa', ?, ?, 1, 'c', 't', NULL, 'a', ?, 'u')",
+                (str(index), date, amount, paid, ignore, date)
+            )
+        connection.exec_driver_sql("PRAGMA user_version = 5")
+    
+    assert Migrator(engine).upgrade() == LATEST_VERSION
+    rollups = "SELECT month, amount, count, paid_amount, paid_count FROM transactions_rollups ORDER BY month"
+    with engine.begin() as connection:
+        assert connection.exec_driver_sql(rollups).fetchall() == [("2024-01", 1300, 2, 1000, 1), ("2024-02", 500, 1, 500, 1)]
+        connection.exec_driver_sql("UPDATE transactions SET date = '2024-02-20 00:00:00.000000', paid = 1 WHERE id = '1'")
+        connection.exec_driver_sql("DELETE FROM transactions WHERE id = '3'")
+        assert connection.exec_driver_sql(rollups).fetchall() == [("2024-01", 1000, 1, 1000, 1), ("2024-02", 300, 1, 300, 1)]
+
+
+# Testa se a migração do hash de conteudo preenche as transações já gravadas com o mesmo hash dos repositórios
+def test_migrator_content_hash(engine):
+    date = datetime.datetime(2024, 1, 10, 8, 30)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_transactions_content_hash")
+        connection.exec_driver_sql(
+            "INSERT INTO transactions (id, date, description, amount, transaction_type, paid, ignore, visible, category_id, tag_id, "
+            "account_id_origin, account_id_destination, created_at, user_id) VALUES ('1', ?, 'MERCADO', 1000, 'despesa', 1, 0, 1, 'c', 't', NULL, ?, ?, 'u')",
+            (str(date), "a" * 32, str(date))
+        )
+        connection.exec_driver_sql("PRAGMA user_version = 6")
+    
+    assert Migrator(engine).upgrade() == LATEST_VERSION
+    assert "ix_transactions_content_hash" in index_names(engine)
+    with engine.connect() as connection:
+        stored = connection.exec_driver_sql("SELECT content_hash FROM transactions WHERE id = '1'").scalar()
+    assert stored == content_hash(date, 1000, "MERCADO", "a" * 32)
+
+
+# Testa se a migração da busca de texto completo indexa as descrições já gravadas e usa o indice FTS5
+def test_migrator_transaction_search(engine):
+    with engine.begin() as connection:
+        for name in ("tr_transactions_fts_insert", "tr_transactions_fts_delete", "tr_transactions_fts_update"):
+            connection.exec_driver_sql(f"DROP TRIGGER {name}")
+        connection.exec_driver_sql("DROP TABLE transactions_fts")
+        connection.exec_driver_sql(
+            "INSERT INTO transactions (id, date, description, amount, transaction_type, paid, ignore, visible, category_id, tag_id, "
+            "account_id_origin, account_id_destination, created_at, user_id) VALUES ('1', '2024-01-10', 'Farmácia Central', 1000, 'despesa', 1, 0, 1, 'c', 't', NULL, 'a', '2024-01-10', 'u')"
+        )
+        connection.exec_driver_sql("PRAGMA user_version = 7")
+    
+    assert Migrator(engine).upgrade() == LATEST_VERSION
+    search = "SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?"
+    assert "VIRTUAL TABLE INDEX" in query_plan(engine, search, ("farmacia",))
+    with engine.begin() as connection:
+        assert len(connection.exec_driver_sql(search, ("farmacia",)).fetchall()) == 1
+        connection.exec_driver_sql("UPDATE transactions SET description = 'Drogaria' WHERE id = '1'")
+        assert connection.exec_driver_sql(search, ("farmacia",)).fetchall() == []
+        assert len(connection.exec_driver_sql(search, ("drogaria",)).fetchall()) == 1
+
+
+# Testa se bancos já migrados recebem os triggers de update com as condições 'WHEN'
+def test_migrator_update_triggers(engine):
+    trigger_sql = "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'tr_transactions_report_update'"
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TRIGGER tr_transactions_report_update")
+        connection.exec_driver_sql(
+            "CREATE TRIGGER tr_transactions_report_update AFTER UPDATE OF date ON transactions BEGIN\n"
+            "INSERT INTO transactions_report_versions (user_id, month, version) VALUES (NEW.user_id, '', 1) "
+            "ON CONFLICT (user_id, month) DO UPDATE SET version = version + 1;\nEND"
+        )
+        connection.exec_driver_sql("PRAGMA user_version = 8")
+        assert "WHEN" not in connection.exec_driver_sql(trigger_sql).scalar()
+    
+    assert Migrator(engine).upgrade() == LATEST_VERSION
+    with engine.connect() as connection:
+        assert "WHEN OLD.date IS NOT NEW.date" in connection.exec_driver_sql(trigger_sql).scalar()
+
+
+def no_op_update(connection, id: str) -> None:
+    # Reenvia todas as colunas com o mesmo valor, como faz o 'update' do adapter
+    columns = [row[1] for row in connection.exec_driver_sql("PRAGMA table_info(transactions)") if row[1] != "id"]
+    connection.exec_driver_sql(f"UPDATE transactions SET {', '.join(f'{column} = {column}' for column in columns)} WHERE id = ?", (id,))
+
+
+def insert_transaction(connection, id: str, date: str = "2024-01-10 00:00:00.000000", amount: int = 1000) -> None:
+    connection.exec_driver_sql(
+        "INSERT INTO transactions (id, date, description, amount, transaction_type, paid, ignore, visible, category_id, tag_id, "
+        "account_id_origin, account_id_destination, created_at, user_id) VALUES (?, ?, 'TESTER', ?, 'renda', 1, 0, 1, 'c', 't', NULL, 'a', ?, 'u')",
+        (id, date, amount, date)
+    )
+
+
+# Testa se um update que não muda as colunas dos checkpoints não regrava os checkpoints
+def test_balance_checkpoints_no_op_update(engine):
+    with engine.begin() as connection:
+        insert_transaction(connection, "1")
+        connection.exec_driver_sql("DELETE FROM accounts_balance_checkpoints")
+        no_op_update(connection, "1")
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM accounts_balance_checkpoints").scalar() == 0
+        connection.exec_driver_sql("UPDATE transactions SET amount = 1500 WHERE id = '1'")
+        assert connection.exec_driver_sql("SELECT month, delta FROM accounts_balance_checkpoints").fetchall() == [("2024-01", 500)]
+
+
+# Testa se updates que não mudam transações nem saldos não marcam as contas para a conciliação
+def test_reconciliation_marks_no_op_update(engine):
+    with engine.begin() as connection:
+        insert_transaction(connection, "1")
+        connection.exec_driver_sql(
+            "INSERT INTO accounts (id, name, description, tag_id, balance, created_at, user_id) "
+            "VALUES ('b', 'TESTER', NULL, NULL, 100, '2024-01-01 00:00:00.000000', 'u')"
+        )
+        connection.exec_driver_sql("DELETE FROM accounts_reconciliation_marks")
+        no_op_update(connection, "1")
+        connection.exec_driver_sql("UPDATE accounts SET balance = balance, name = 'RENAMED' WHERE id = 'b'")
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM accounts_reconciliation_marks").scalar() == 0
+        connection.exec_driver_sql("UPDATE accounts SET balance = 200 WHERE id = 'b'")
+        connection.exec_driver_sql("UPDATE transactions SET paid = 0 WHERE id = '1'")
+        assert {row[0] for row in connection.exec_driver_sql("SELECT account_id FROM accounts_reconciliation_marks")} == {"a", "b"}
+
+
+# Testa se um update que não muda as colunas do rollup não regrava o grupo da transação
+def test_transaction_rollups_no_op_update(engine):
+    with engine.begin() as connection:
+        insert_transaction(connection, "1")
+        connection.exec_driver_sql("DELETE FROM transactions_rollups")
+        no_op_update(connection, "1")
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM transactions_rollups").scalar() == 0
+        connection.exec_driver_sql(ROLLUP_REBUILD)
+        connection.exec_driver_sql("UPDATE transactions SET amount = 1500 WHERE id = '1'")
+        assert connection.exec_driver_sql("SELECT month, amount, count FROM transactions_rollups").fetchall() == [("2024-01", 1500, 1)]
+
+
+# Testa se um update que reenvia os mesmos valores não dispara nenhum trigger, inclusive o do indice de busca
+def test_transaction_triggers_no_op_update(engine):
+    with engine.begin() as connection:
+        insert_transaction(connection, "1")
+        before = connection.exec_driver_sql("SELECT total_changes()").scalar()
+        no_op_update(connection, "1")
+        # 'total_changes' conta também as linhas gravadas pelos triggers
+        assert connection.exec_driver_sql("SELECT total_changes()").scalar() - before == 1
+        connection.exec_driver_sql("UPDATE transactions SET description = 'QUEIJO' WHERE id = '1'")
+        assert connection.exec_driver_sql("SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH 'queijo'").fetchall() != []
+        assert connection.exec_driver_sql("SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH 'tester'").fetchall() == []
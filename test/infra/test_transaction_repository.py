@@ -0,0 +1,567 @@
+import io
+import pytest
+import uuid
+import random
+import numpy as np
+import datetime
+
+from decimal import Decimal
+from sqlalchemy import text, event
+
+from infra import TransactionRepository, TransactionCategoryRepository, TransactionTagRepository
+from infra.repository import utils as repository_utils
+from infra.repository.utils import content_hash
+from src.financial.database_adapter import TransactionDatabaseAdapter
+from src.financial.enums import SeriesFrequencies, StatementFormats, ExportFormats
+from src.financial.handlers import TransactionHandler, StatementImportHandler, TransactionExportHandler, CategoryRuleHandler
+from src.financial.models import TransactionModel, TransactionQueryModel, TransactionTypes, CategoryRuleModel
+from src.financial.exceptions.database_adapter_errors.transaction_db_adapter_error import UnexpectedArgumentTypeError
+from src.financial.exceptions.handler_errors import statement_import_handler_error
+
+
+def make_row(**kwargs) -> dict:
+    row = {
+        "id": uuid.uuid4().hex,
+        "date": datetime.datetime(2024, 3, 10, 12, 0),
+        "description": "TESTER DESCRIPTION",
+        "amount": 10000,
+        "transaction_type": "despesa",
+        "paid": True,
+        "ignore": False,
+        "visible": True,
+        "category_id": uuid.uuid4().hex,
+        "tag_id": uuid.uuid4().hex,
+        "account_id_origin": None,
+        "account_id_destination": uuid.uuid4().hex,
+        "created_at": datetime.datetime.now(),
+        "user_id": uuid.uuid4().hex,
+    }
+    row.update(kwargs)
+    return row
+
+
+@pytest.fixture
+def transaction_repository(connection_string: str):
+    return TransactionRepository(connection_string=connection_string)
+
+
+# Testa se a inserção em lote ignora ids repetidos no banco e no proprio lote
+def test_transaction_repository_insert_many(transaction_repository: TransactionRepository):
+    first, second = make_row(), make_row()
+    assert transaction_repository.insert_many([first]) == [True]
+    assert transaction_repository.insert_many([first, second, second]) == [False, True, False]
+    assert len(transaction_repository.select()) == 2
+    assert transaction_repository.insert_many([]) == []
+
+
+# Testa se a atualização devolve a linha atualizada e None para ids inexistentes
+def test_transaction_repository_update_returning(transaction_repository: TransactionRepository):
+    row = make_row()
+    transaction_repository.insert_many([row])
+    updated = transaction_repository.update(id=row["id"], description="TESTER UPDATED", paid=False)
+    assert updated.id == row["id"]
+    assert updated.description == "TESTER UPDATED"
+    assert updated.paid is False
+    assert updated.amount == row["amount"]
+    assert transaction_repository.update(id=uuid.uuid4().hex, description="TESTER UPDATED") is None
+
+
+# Testa se a paginação por chave percorre todas as linhas do usuario sem repetir nem pular nenhuma
+def test_transaction_repository_select_page_keyset(transaction_repository: TransactionRepository):
+    user_id = uuid.uuid4().hex
+    start = datetime.datetime(2024, 1, 1)
+    # Datas repetidas garantem que o desempate pelo id é usado
+    rows = [make_row(user_id=user_id, date=start + datetime.timedelta(days=index // 3)) for index in range(25)]
+    transaction_repository.insert_many(rows + [make_row() for _ in range(5)])
+    
+    seen = []
+    after = None
+    while True:
+        page = transaction_repository.select_page(user_id=user_id, after=after, limit=10)
+        if not page:
+            break
+        seen.extend(page)
+        after = (page[-1].date, page[-1].id)
+    
+    expected = sorted(rows, key=lambda row: (row["date"], row["id"]), reverse=True)
+    assert [transaction.id for transaction in seen] == [row["id"] for row in expected]
+
+
+# Testa se os filtros são aplicados no banco
+def test_transaction_repository_select_page_filters(transaction_repository: TransactionRepository):
+    user_id = uuid.uuid4().hex
+    transaction_repository.insert_many([
+        make_row(user_id=user_id, amount=5000, transaction_type="renda"),
+        make_row(user_id=user_id, amount=15000, transaction_type="despesa", paid=False),
+        make_row(user_id=user_id, amount=25000, transaction_type="despesa", date=datetime.datetime(2024, 5, 1)),
+        make_row(amount=15000, transaction_type="despesa"),
+    ])
+    assert len(transaction_repository.select_page(user_id=user_id)) == 3
+    assert len(transaction_repository.select_page(user_id=user_id, transaction_type="despesa")) == 2
+    assert len(transaction_repository.select_page(user_id=user_id, min_amount=10000, max_amount=20000)) == 1
+    assert len(transaction_repository.select_page(user_id=user_id, paid=False)) == 1
+    assert len(transaction_repository.select_page(user_id=user_id, start_date=datetime.datetime(2024, 4, 1))) == 1
+    assert len(transaction_repository.select_page(min_amount=15000, max_amount=15000)) == 2
+
+
+# Testa se o adaptador devolve o cursor da proxima pagina e para na ultima
+def test_transaction_db_adapter_query_pages(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    user_id = uuid.uuid4()
+    transaction_repository.insert_many([make_row(user_id=user_id.hex, date=datetime.datetime(2024, 1, day)) for day in range(1, 6)])
+    
+    query = TransactionQueryModel(user_id=user_id, limit=2, descending=False)
+    days = []
+    while query is not None:
+        page = TransactionDatabaseAdapter.query(query)
+        days.extend(transaction.date.day for transaction in page.transactions)
+        query = page.next_query(query)
+    assert days == [1, 2, 3, 4, 5]
+
+
+# Testa se a iteração em blocos entrega todas as linhas, mesmo com commits de outros repositórios no meio
+def test_transaction_repository_iter_all(transaction_repository: TransactionRepository):
+    rows = [make_row() for _ in range(2500)]
+    transaction_repository.insert_many(rows)
+    seen = set()
+    for index, transaction in enumerate(transaction_repository.iter_all(batch_size=500)):
+        seen.add(transaction.id)
+        if index == 1000:
+            transaction_repository.update(id=rows[0]["id"], description="TESTER UPDATED")
+    assert seen == {row["id"] for row in rows}
+
+
+# Testa se o adaptador converte os registros em modelos sob demanda
+def test_transaction_db_adapter_iter_all(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    transaction_repository.insert_many([make_row() for _ in range(30)])
+    transactions = TransactionDatabaseAdapter.iter_all(batch_size=7)
+    assert isinstance(next(transactions), TransactionModel)
+    assert sum(1 for _ in transactions) == 29
+    with pytest.raises(UnexpectedArgumentTypeError):
+        TransactionDatabaseAdapter.iter_all(batch_size=0)
+
+
+# Testa se as somas por conta e categoria são exatas e ignoram transações marcadas como 'ignore'
+def test_transaction_repository_sums(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    user_id, account_id, category_id = uuid.uuid4().hex, uuid.uuid4().hex, uuid.uuid4().hex
+    # 0.10 somado mil vezes em Float não dá exatamente 100.00
+    rows = [make_row(user_id=user_id, account_id_destination=account_id, category_id=category_id, amount=10) for _ in range(1000)]
+    rows.append(make_row(user_id=user_id, account_id_destination=account_id, category_id=category_id, amount=99999, ignore=True))
+    rows.append(make_row(user_id=user_id, account_id_destination=account_id, category_id=category_id, amount=500, transaction_type="renda"))
+    transaction_repository.insert_many(rows)
+    
+    assert transaction_repository.sum_by_account(user_id=user_id) == {account_id: 10500}
+    assert transaction_repository.sum_by_category(user_id=user_id, transaction_type="despesa") == {category_id: 10000}
+    
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    assert TransactionDatabaseAdapter.sum_by_category(user_id=uuid.UUID(user_id), transaction_type=TransactionTypes.EXPENSE) == {uuid.UUID(category_id): Decimal("100.00")}
+
+
+def replay_balance(rows: list, account_id: str, at: datetime.datetime) -> int:
+    # Saldo calculado transação por transação, usado como referencia para os checkpoints
+    balance = 0
+    for row in rows:
+        if not row["paid"] or row["ignore"] or row["date"] >= at:
+            continue
+        if row["account_id_destination"] == account_id:
+            balance += -row["amount"] if row["transaction_type"] == "despesa" else row["amount"]
+        if row["account_id_origin"] == account_id and row["transaction_type"] == "transferência":
+            balance -= row["amount"]
+    return balance
+
+
+# Testa se o saldo em uma data bate com o replay do historico depois de inserções, alterações e remoções
+def test_transaction_repository_balance_at(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    rng = random.Random(7)
+    accounts = [uuid.uuid4().hex for _ in range(3)]
+    rows = []
+    for _ in range(300):
+        transaction_type = rng.choice(["despesa", "renda", "transferência", "ajuste"])
+        rows.append(make_row(
+            date=datetime.datetime(2023, 1, 1) + datetime.timedelta(hours=rng.randrange(0, 24 * 500)),
+            amount=rng.randrange(1, 100_000),
+            transaction_type=transaction_type,
+            paid=rng.random() > 0.2,
+            ignore=rng.random() < 0.1,
+            account_id_origin=rng.choice(accounts) if transaction_type == "transferência" else None,
+            account_id_destination=rng.choice(accounts),
+        ))
+    transaction_repository.insert_many(rows)
+    
+    # Alterações mudam o mês, o valor, o tipo e o status de parte das transações
+    for row in rows[:40]:
+        row["date"] = row["date"] - datetime.timedelta(days=45)
+        row["amount"] = row["amount"] + 1
+        row["paid"] = not row["paid"]
+        transaction_repository.update(id=row["id"], date=row["date"], amount=row["amount"], paid=row["paid"])
+    for row in rows[40:50]:
+        row["transaction_type"] = "renda" if row["transaction_type"] == "despesa" else "despesa"
+        transaction_repository.update(id=row["id"], transaction_type=row["transaction_type"])
+    for row in rows[50:70]:
+        transaction_repository.delete(id=row["id"])
+    rows = rows[:50] + rows[70:]
+    
+    for at in [datetime.datetime(2022, 12, 1), datetime.datetime(2023, 6, 1), datetime.datetime(2023, 7, 15, 8, 30), datetime.datetime(2025, 1, 1)]:
+        for account_id in accounts:
+            assert transaction_repository.balance_at(account_id=account_id, at=at) == replay_balance(rows, account_id, at)
+    
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    at = datetime.datetime(2024, 2, 10)
+    assert TransactionDatabaseAdapter.balance_at(account_id=uuid.UUID(accounts[0]), at=at) == Decimal(replay_balance(rows, accounts[0], at)).scaleb(-2)
+    with pytest.raises(UnexpectedArgumentTypeError):
+        TransactionDatabaseAdapter.balance_at(account_id=accounts[0], at=at)
+
+
+@pytest.mark.parametrize("frequency, step", [
+    (SeriesFrequencies.DAY, lambda date: date + datetime.timedelta(days=1)),
+    (SeriesFrequencies.WEEK, lambda date: date + datetime.timedelta(days=7)),
+    (SeriesFrequencies.MONTH, lambda date: datetime.datetime(date.year + date.month // 12, date.month % 12 + 1, 1)),
+])
+# Testa se o saldo no fim de cada periodo da serie bate com o 'balance_at' no inicio do periodo seguinte
+def test_transaction_db_adapter_balance_series(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch, frequency, step):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    rng = random.Random(11)
+    accounts = [uuid.uuid4().hex for _ in range(3)]
+    rows = []
+    for _ in range(400):
+        transaction_type = rng.choice(["despesa", "renda", "transferência", "ajuste"])
+        rows.append(make_row(
+            date=datetime.datetime(2023, 11, 1) + datetime.timedelta(minutes=rng.randrange(0, 60 * 24 * 200)),
+            amount=rng.randrange(1, 100_000),
+            transaction_type=transaction_type,
+            paid=rng.random() > 0.2,
+            account_id_origin=rng.choice(accounts) if transaction_type == "transferência" else None,
+            account_id_destination=rng.choice(accounts),
+        ))
+    transaction_repository.insert_many(rows)
+    
+    start_date, end_date = datetime.datetime(2024, 1, 10), datetime.datetime(2024, 4, 20)
+    series = TransactionDatabaseAdapter.balance_series(frequency=frequency, account_ids=[uuid.UUID(account_id) for account_id in accounts] + [uuid.uuid4()], start_date=start_date, end_date=end_date)
+    assert series.balances.shape == (4, len(series.periods))
+    assert series.balances.dtype == np.int64
+    assert not series.balances[3].any()
+    for column, period in enumerate(series.periods.astype(datetime.datetime)):
+        period_end = min(step(datetime.datetime.combine(period, datetime.time())), end_date)
+        for row, account_id in enumerate(accounts):
+            assert series.balances[row, column] == replay_balance(rows, account_id, period_end)
+    assert series.get_balance(uuid.UUID(accounts[0]), -1) == Decimal(replay_balance(rows, accounts[0], end_date)).scaleb(-2)
+    
+    # Sem filtros a serie cobre todas as contas do primeiro ao ultimo dia com movimento
+    everything = TransactionDatabaseAdapter.balance_series(frequency=frequency)
+    assert sorted(everything.account_ids) == sorted(uuid.UUID(account_id) for account_id in accounts)
+    assert everything.periods[0] <= np.datetime64(min(row["date"] for row in rows).date())
+    with pytest.raises(UnexpectedArgumentTypeError):
+        TransactionDatabaseAdapter.balance_series(frequency="dia")
+
+
+
+# Testa se o relatorio agrupa por mês, tipo, categoria e marcação com os nomes e respeita 'ignore' e 'visible'
+def test_transaction_db_adapter_category_report(connection_string: str, transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    user_id = uuid.uuid4().hex
+    category_id, tag_id, unknown_tag_id = uuid.uuid4().hex, uuid.uuid4().hex, uuid.uuid4().hex
+    TransactionCategoryRepository(connection_string=connection_string).insert(id=category_id, name="MERCADO", created_at=datetime.datetime.now(), user_id=user_id)
+    TransactionTagRepository(connection_string=connection_string).insert(id=tag_id, name="CASA", created_at=datetime.datetime.now(), user_id=user_id)
+    transaction_repository.insert_many([
+        make_row(user_id=user_id, category_id=category_id, tag_id=tag_id, amount=1000, date=datetime.datetime(2024, 1, 5)),
+        make_row(user_id=user_id, category_id=category_id, tag_id=tag_id, amount=250, date=datetime.datetime(2024, 1, 20), paid=False),
+        make_row(user_id=user_id, category_id=category_id, tag_id=tag_id, amount=700, date=datetime.datetime(2024, 2, 1), transaction_type="renda"),
+        make_row(user_id=user_id, category_id=category_id, tag_id=unknown_tag_id, amount=300, date=datetime.datetime(2024, 2, 2)),
+        make_row(user_id=user_id, category_id=category_id, amount=999, date=datetime.datetime(2024, 1, 6), ignore=True),
+        make_row(user_id=user_id, category_id=category_id, amount=999, date=datetime.datetime(2024, 1, 7), visible=False),
+        make_row(user_id=user_id, category_id=category_id, amount=999, date=datetime.datetime(2024, 1, 8), transaction_type="transferência"),
+        make_row(category_id=category_id, amount=999, date=datetime.datetime(2024, 1, 9)),
+    ])
+    
+    report = TransactionDatabaseAdapter.category_report(user_id=uuid.UUID(user_id))
+    assert [(row.month, row.transaction_type, row.category_name, row.tag_name, row.total, row.count) for row in report.rows] == [
+        ("2024-01", TransactionTypes.EXPENSE, "MERCADO", "CASA", Decimal("12.50"), 2),
+        ("2024-02", TransactionTypes.EXPENSE, "MERCADO", None, Decimal("3.00"), 1),
+        ("2024-02", TransactionTypes.INCOME, "MERCADO", "CASA", Decimal("7.00"), 1),
+    ]
+    assert report.totals_by_month(TransactionTypes.EXPENSE) == {"2024-01": Decimal("12.50"), "2024-02": Decimal("3.00")}
+    assert report.totals_by_category(TransactionTypes.INCOME) == {uuid.UUID(category_id): Decimal("7.00")}
+    
+    paid_report = TransactionDatabaseAdapter.category_report(user_id=uuid.UUID(user_id), start_date=datetime.datetime(2024, 1, 1), end_date=datetime.datetime(2024, 2, 1), paid=True)
+    assert [(row.month, row.total, row.count) for row in paid_report.rows] == [("2024-01", Decimal("10.00"), 1)]
+    with pytest.raises(UnexpectedArgumentTypeError):
+        TransactionDatabaseAdapter.category_report(user_id=user_id)
+
+
+# Testa se as versões dos relatorios só mudam nos meses alterados e quando os nomes mudam
+def test_transaction_db_adapter_report_versions(connection_string: str, transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    user_id = uuid.uuid4().hex
+    start_date, end_date = datetime.datetime(2024, 1, 1), datetime.datetime(2024, 3, 1)
+    versions = lambda: TransactionDatabaseAdapter.report_versions(user_id=uuid.UUID(user_id), start_date=start_date, end_date=end_date)
+    
+    row = make_row(user_id=user_id, date=datetime.datetime(2024, 1, 10))
+    transaction_repository.insert_many([row])
+    before = versions()
+    assert set(before) == {"2024-01"}
+    # Alterações fora do periodo, de outro usuario ou em colunas que não entram no relatorio não mudam as versões
+    transaction_repository.insert_many([make_row(user_id=user_id, date=datetime.datetime(2024, 3, 1)), make_row(date=datetime.datetime(2024, 1, 10))])
+    transaction_repository.update(id=row["id"], description="TESTER UPDATED")
+    assert versions() == before
+    # Um update que reenvia os mesmos valores (como faz o adapter) também não muda as versões
+    transaction_repository.update(id=row["id"], **{key: value for key, value in row.items() if key != "id"})
+    assert versions() == before
+    # Mover a transação de mês muda os dois meses
+    transaction_repository.update(id=row["id"], date=datetime.datetime(2024, 2, 10))
+    after = versions()
+    assert after["2024-01"] == before["2024-01"] + 1 and after["2024-02"] == 1
+    # Renomear uma categoria muda a versão dos nomes
+    categories = TransactionCategoryRepository(connection_string=connection_string)
+    category_id = uuid.uuid4().hex
+    categories.insert(id=category_id, name="MERCADO", created_at=datetime.datetime.now(), user_id=user_id)
+    names_version = versions()[""]
+    categories.update(id=category_id, name="MERCADO")
+    assert versions()[""] == names_version
+    categories.update(id=category_id, name="FEIRA")
+    assert versions()[""] > names_version
+
+
+def rollup_rows(transaction_repository: TransactionRepository) -> list:
+    with transaction_repository.db as db:
+        return db.session.execute(text(
+            "SELECT user_id, account_id, category_id, month, transaction_type, amount, count, paid_amount, paid_count "
+            "FROM transactions_rollups ORDER BY user_id, account_id, category_id, month, transaction_type"
+        )).fetchall()
+
+
+# Testa se os triggers mantem o rollup igual a um recalculo completo depois de inserções, alterações e remoções
+def test_transaction_repository_rollups_maintained(transaction_repository: TransactionRepository):
+    rng = random.Random(19)
+    user_id = uuid.uuid4().hex
+    accounts = [uuid.uuid4().hex for _ in range(3)]
+    categories = [uuid.uuid4().hex for _ in range(3)]
+    rows = [
+        make_row(
+            user_id=user_id,
+            date=datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=rng.randrange(0, 24 * 120)),
+            amount=rng.randrange(1, 100_000),
+            transaction_type=rng.choice(["despesa", "renda", "transferência", "ajuste"]),
+            paid=rng.random() > 0.3,
+            ignore=rng.random() < 0.1,
+            category_id=rng.choice(categories),
+            account_id_destination=rng.choice(accounts),
+        )
+        for _ in range(200)
+    ]
+    transaction_repository.insert_many(rows)
+    for row in rng.sample(rows, 60):
+        transaction_repository.update(
+            id=row["id"],
+            amount=rng.randrange(1, 100_000),
+            date=datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=rng.randrange(0, 24 * 120)),
+            category_id=rng.choice(categories),
+            paid=rng.random() > 0.5,
+        )
+    for row in rng.sample(rows, 30):
+        transaction_repository.delete(id=row["id"])
+    maintained = rollup_rows(transaction_repository)
+    
+    assert transaction_repository.rebuild_rollups() == len(maintained)
+    assert rollup_rows(transaction_repository) == maintained
+    # Grupos que ficaram vazios são removidos
+    assert all(row.count > 0 for row in maintained)
+    
+    # Somas em meses inteiros vêm do rollup e batem com a soma direta nas transações
+    start_date, end_date = datetime.datetime(2024, 2, 1), datetime.datetime(2024, 4, 1)
+    for paid in (None, True, False):
+        from_rollup = transaction_repository.sum_by_account(user_id=user_id, paid=paid, start_date=start_date, end_date=end_date)
+        scanned = transaction_repository.sum_by_account(user_id=user_id, paid=paid, start_date=start_date, end_date=end_date - datetime.timedelta(microseconds=1))
+        assert from_rollup == scanned
+    assert transaction_repository.sum_by_category(user_id=user_id, transaction_type="despesa") == \
+        transaction_repository.sum_by_category(user_id=user_id, transaction_type="despesa", end_date=datetime.datetime(2030, 1, 2))
+
+
+# Testa a leitura do rollup pelo adapter com filtros de conta e categoria
+def test_transaction_db_adapter_rollups(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    user_id, account_id, category_id = uuid.uuid4().hex, uuid.uuid4().hex, uuid.uuid4().hex
+    transaction_repository.insert_many([
+        make_row(user_id=user_id, account_id_destination=account_id, category_id=category_id, amount=1000, date=datetime.datetime(2024, 1, 5)),
+        make_row(user_id=user_id, account_id_destination=account_id, category_id=category_id, amount=250, date=datetime.datetime(2024, 1, 20), paid=False),
+        make_row(user_id=user_id, account_id_destination=account_id, amount=700, date=datetime.datetime(2024, 2, 1)),
+    ])
+    rollups = TransactionDatabaseAdapter.rollups(user_id=uuid.UUID(user_id), end_date=datetime.datetime(2024, 2, 1))
+    assert [(rollup.month, rollup.amount, rollup.count, rollup.paid_amount, rollup.paid_count) for rollup in rollups] == [("2024-01", Decimal("12.50"), 2, Decimal("10.00"), 1)]
+    assert rollups[0].pending_amount() == Decimal("2.50")
+    assert len(TransactionDatabaseAdapter.rollups(user_id=uuid.UUID(user_id), account_ids=[uuid.UUID(account_id)])) == 2
+    assert len(TransactionDatabaseAdapter.rollups(user_id=uuid.UUID(user_id), category_ids=[uuid.UUID(category_id)])) == 1
+    with pytest.raises(UnexpectedArgumentTypeError):
+        TransactionDatabaseAdapter.rollups(user_id=uuid.UUID(user_id), account_ids=account_id)
+
+
+# Testa se a inserção deduplicada descarta linhas com o mesmo conteudo no banco e no proprio lote
+def test_transaction_repository_insert_many_deduplicated(transaction_repository: TransactionRepository):
+    account_id = uuid.uuid4().hex
+    existing = make_row(account_id_destination=account_id, description="PADARIA  Central", date=datetime.datetime(2024, 3, 10, 8, 0))
+    transaction_repository.insert_many([existing])
+    assert transaction_repository.select_from_id(id=existing["id"]).content_hash is not None
+    
+    rows = [
+        # Mesmo dia, valor, conta e descrição (ignorando caixa e espaços) da transação já gravada
+        make_row(account_id_destination=account_id, description="padaria central", date=datetime.datetime(2024, 3, 10, 18, 0)),
+        make_row(account_id_destination=account_id, description="PADARIA CENTRAL", date=datetime.datetime(2024, 3, 11)),
+        make_row(account_id_destination=account_id, description="PADARIA CENTRAL", date=datetime.datetime(2024, 3, 11)),
+        make_row(account_id_destination=uuid.uuid4().hex, description="PADARIA CENTRAL", date=datetime.datetime(2024, 3, 10)),
+    ]
+    assert transaction_repository.insert_many_deduplicated(rows) == [False, True, False, True]
+    assert transaction_repository.insert_many_deduplicated(rows) == [False, False, False, False]
+    assert len(transaction_repository.select()) == 3
+
+
+# Testa se o hash acompanha as alterações dos campos que fazem parte dele
+def test_transaction_repository_update_content_hash(transaction_repository: TransactionRepository):
+    row = make_row()
+    transaction_repository.insert_many([row])
+    original = transaction_repository.select_from_id(id=row["id"]).content_hash
+    transaction_repository.update(id=row["id"], paid=False)
+    assert transaction_repository.select_from_id(id=row["id"]).content_hash == original
+    transaction_repository.update(id=row["id"], amount=row["amount"] + 1)
+    assert transaction_repository.select_from_id(id=row["id"]).content_hash != original
+    assert transaction_repository.insert_many_deduplicated([make_row(account_id_destination=row["account_id_destination"], amount=row["amount"] + 1)]) == [False]
+
+
+# Testa se o update com todos os campos (como o do adapter) grava o hash no mesmo UPDATE, sem um segundo comando
+def test_transaction_repository_update_single_statement(transaction_repository: TransactionRepository):
+    row = make_row()
+    transaction_repository.insert_many([row])
+    engine = transaction_repository.db.get_engine()
+    updates = []
+    listener = lambda conn, cursor, statement, *args: updates.append(statement) if statement.lstrip().upper().startswith("UPDATE") else None
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        changed = {**row, "description": "TESTER CHANGED", "amount": row["amount"] + 1}
+        changed.pop("id")
+        data = transaction_repository.update(id=row["id"], **changed)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(updates) == 1
+    expected = content_hash(row["date"], row["amount"] + 1, "TESTER CHANGED", row["account_id_destination"])
+    assert data.content_hash == expected
+    assert transaction_repository.select_from_id(id=row["id"]).content_hash == expected
+
+
+# Testa a importação de um extrato pelo adapter real, reimportar o mesmo arquivo não grava nada
+def test_statement_import_with_db_adapter(connection_string: str, transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    ids = {"account_id": uuid.uuid4(), "user_id": uuid.uuid4(), "category_id": uuid.uuid4(), "tag_id": uuid.uuid4()}
+    statement = "date,amount,description\n" + "\n".join(f"2024-01-{day % 28 + 1:02d},{(-1) ** day * day}.25,COMPRA {day}" for day in range(1, 101))
+    handler = StatementImportHandler(transaction_handler=TransactionHandler(database=TransactionDatabaseAdapter))
+    report = handler.import_file(io.StringIO(statement), StatementFormats.CSV, batch_size=30, **ids)
+    assert (report.lines, report.inserted, report.duplicates) == (100, 100, 0)
+    assert transaction_repository.sum_by_account(user_id=ids["user_id"].hex) == {ids["account_id"].hex: sum(day * 100 + 25 for day in range(1, 101))}
+    again = handler.import_file(io.StringIO(statement), StatementFormats.CSV, batch_size=30, **ids)
+    assert (again.inserted, again.duplicates) == (0, 100)
+    assert len(transaction_repository.select()) == 100
+
+
+# Testa se a transação sem tag é recusada antes de chegar no banco, que não aceita 'tag_id' nulo
+def test_statement_import_without_tag_with_db_adapter(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    ids = {"account_id": uuid.uuid4(), "user_id": uuid.uuid4(), "category_id": uuid.uuid4()}
+    handler = StatementImportHandler(transaction_handler=TransactionHandler(database=TransactionDatabaseAdapter))
+    with pytest.raises(statement_import_handler_error.UnexpectedArgumentTypeError, match="Tipo inesperado do argumento 'tag_id'"):
+        handler.import_file(io.StringIO("date,amount,description\n2024-01-05,-12.50,PADARIA\n"), StatementFormats.CSV, tag_id=None, **ids)
+    transaction = TransactionModel(description="TESTER", amount=Decimal("1.00"), transaction_type=TransactionTypes.EXPENSE,
+                                   category_id=ids["category_id"], account_id_destination=ids["account_id"], user_id=ids["user_id"])
+    for write in (TransactionDatabaseAdapter.insert, lambda transaction: TransactionDatabaseAdapter.import_many([transaction])):
+        with pytest.raises(UnexpectedArgumentTypeError, match="Tipo inesperado do atributo 'tag_id'"):
+            write(transaction)
+    assert transaction_repository.select() == []
+
+
+# Testa a exportação pelo cursor do banco com filtro de usuario e periodo
+def test_transaction_export_with_db_adapter(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch, tmp_path):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    user_id = uuid.uuid4().hex
+    rows = [make_row(user_id=user_id, amount=index + 1, date=datetime.datetime(2024, 1, 1) + datetime.timedelta(days=index)) for index in range(120)]
+    rows += [make_row(amount=999) for _ in range(10)]
+    transaction_repository.insert_many(rows)
+    
+    handler = TransactionExportHandler(database=TransactionDatabaseAdapter)
+    report = handler.export(tmp_path / "export.npz", ExportFormats.NPZ, user_id=uuid.UUID(user_id),
+        start_date=datetime.datetime(2024, 2, 1), end_date=datetime.datetime(2024, 3, 1), batch_size=8)
+    assert report.rows == 29
+    with np.load(tmp_path / "export.npz") as data:
+        assert sorted(data["amount"].tolist()) == list(range(32, 61))
+    
+    file = io.StringIO()
+    assert handler.export(file, ExportFormats.JSONL, batch_size=16).rows == 130
+
+
+# Testa a recategorização em lote pelas regras, com o rollup acompanhando pelos triggers
+def test_category_rule_recategorize_with_db_adapter(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    user_id, food = uuid.uuid4(), uuid.uuid4()
+    rows = [make_row(user_id=user_id.hex, description=description) for description in ("MERCADO EXTRA", "Padaria Pão Quente", "CINEMA", "mercado livre")]
+    transaction_repository.insert_many(rows)
+    
+    handler = CategoryRuleHandler(transaction_handler=TransactionHandler(database=TransactionDatabaseAdapter), rules=[
+        CategoryRuleModel(user_id=user_id, category_id=food, keywords=["mercado", "padaria"], max_amount=Decimal("100.00")),
+    ])
+    assert handler.recategorize(user_id, batch_size=2) == 3
+    categories = {row["description"]: transaction_repository.select_from_id(id=row["id"]).category_id for row in rows}
+    assert categories == {"MERCADO EXTRA": food.hex, "Padaria Pão Quente": food.hex, "CINEMA": rows[2]["category_id"], "mercado livre": food.hex}
+    assert transaction_repository.sum_by_category(user_id=user_id.hex, start_date=datetime.datetime(2024, 3, 1), end_date=datetime.datetime(2024, 4, 1))[food.hex] == 30000
+    with pytest.raises(UnexpectedArgumentTypeError):
+        TransactionDatabaseAdapter.update_categories({rows[0]["id"]: food})
+
+
+# Testa a busca de texto completo mantida pelos triggers, com relevancia, paginação e filtro por usuario
+def test_transaction_db_adapter_search(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    user_id = uuid.uuid4()
+    descriptions = ["Padaria Pão Quente", "PADARIA", "mercado padaria pao de queijo", "CINEMA", "padoca"]
+    rows = [make_row(user_id=user_id.hex, description=description) for description in descriptions]
+    transaction_repository.insert_many(rows + [make_row(description="padaria")])
+    handler = TransactionHandler(database=TransactionDatabaseAdapter)
+    
+    # Sem diferenciar maiusculas e acentos, todas as palavras precisam aparecer
+    page = handler.search_transactions(user_id, "pão")
+    assert sorted(transaction.description for transaction in page.transactions) == ["Padaria Pão Quente", "mercado padaria pao de queijo"]
+    # Prefixos e a descrição mais curta com o termo é a mais relevante
+    page = handler.search_transactions(user_id, "PADAR", limit=2)
+    assert page.transactions[0].description == "PADARIA" and page.ranks == sorted(page.ranks) and page.have_next()
+    next_page = handler.search_transactions(user_id, "PADAR", limit=2, cursor=page.next_cursor)
+    assert not next_page.have_next()
+    assert {transaction.description for transaction in page.transactions + next_page.transactions} == set(descriptions[:3])
+    # Caracteres de operadores do FTS5 são ignorados
+    assert handler.search_transactions(user_id, '"queijo" (*:').transactions[0].description == descriptions[2]
+    assert handler.search_transactions(user_id, "***").transactions == []
+    
+    # Os triggers acompanham as alterações e remoções
+    handler.change_description(uuid.UUID(rows[3]["id"]), "padaria do cinema")
+    handler.delete_transaction(uuid.UUID(rows[1]["id"]))
+    assert {transaction.description for transaction in handler.search_transactions(user_id, "padaria").transactions} == {"Padaria Pão Quente", "mercado padaria pao de queijo", "padaria do cinema"}
+    assert handler.search_transactions(user_id, "cinema").transactions[0].description == "padaria do cinema"
+    handler.rebuild_search_index()
+    assert len(handler.search_transactions(user_id, "padaria").transactions) == 3
+    with pytest.raises(UnexpectedArgumentTypeError):
+        handler.search_transactions(user_id, "padaria", cursor="invalido")
+
+
+# Testa a busca em lote por ids: uma consulta IN por bloco respeitando o limite de variaveis do SQLite
+def test_transaction_repository_select_from_ids(transaction_repository: TransactionRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", transaction_repository)
+    monkeypatch.setattr(repository_utils, "SQLITE_MAX_VARIABLES", 10)
+    rows = [make_row() for _ in range(15)]
+    transaction_repository.insert_many(rows)
+    ids = [row["id"] for row in rows] + [uuid.uuid4().hex] + [rows[0]["id"]]
+    engine = transaction_repository.db.get_engine()
+    statements = []
+    listener = lambda connection, cursor, statement, parameters, context, executemany: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        data = transaction_repository.select_from_ids(ids=ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert sorted(transaction.id for transaction in data) == sorted(row["id"] for row in rows)
+    assert len([statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]) == 2
+    
+    models = TransactionDatabaseAdapter.get_many(ids=[uuid.UUID(rows[2]["id"]), uuid.uuid4(), uuid.UUID(rows[1]["id"])])
+    assert [id.hex for id in models] == [rows[2]["id"], rows[1]["id"]]
@@ -0,0 +1,243 @@
+import pytest
+import uuid
+import datetime
+
+from decimal import Decimal
+from sqlalchemy import event
+
+from infra import Base, UnitOfWork, AccountRepository, UserRepository, TransactionRepository, DBConnectionHandler
+from src.financial.database_adapter import AccountDatabaseAdapter, TransactionDatabaseAdapter
+from src.financial.handlers import AccountHandler, TransactionHandler, PostingHandler
+from src.financial.models import AccountModel, TransactionModel, TransactionTypes
+from src.financial.exceptions.database_adapter_errors.account_db_adapter_error import AccountNotFoundError
+from src.financial.exceptions.handler_errors import posting_handler_error
+
+
+def make_account_row(**kwargs) -> dict:
+    row = {
+        "id": uuid.uuid4().hex,
+        "name": "TESTER ACCOUNT",
+        "description": None,
+        "tag_id": None,
+        "balance": 0,
+        "created_at": datetime.datetime.now(),
+        "user_id": uuid.uuid4().hex,
+    }
+    row.update(kwargs)
+    return row
+
+
+@pytest.fixture
+def account_repository(connection_string: str):
+    return AccountRepository(connection_string=connection_string)
+
+
+@pytest.fixture
+def handlers(connection_string: str, account_repository: AccountRepository, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(AccountDatabaseAdapter, "_db", account_repository)
+    monkeypatch.setattr(TransactionDatabaseAdapter, "_db", TransactionRepository(connection_string=connection_string))
+    account_handler = AccountHandler(database=AccountDatabaseAdapter)
+    transaction_handler = TransactionHandler(database=TransactionDatabaseAdapter)
+    account = AccountModel(name="TESTER ACCOUNT", user_id=uuid.uuid4(), balance=Decimal("100.00"))
+    account_handler.create_account(account)
+    return account_handler, transaction_handler, account
+
+
+def make_transaction(account: AccountModel, amount: str, account_id_destination: uuid.UUID = None) -> TransactionModel:
+    return TransactionModel(
+        date=datetime.datetime(2024, 1, 1),
+        description="TESTER",
+        amount=Decimal(amount),
+        transaction_type=TransactionTypes.INCOME,
+        category_id=uuid.uuid4(),
+        tag_id=uuid.uuid4(),
+        account_id_destination=account_id_destination or account.id,
+        user_id=account.user_id
+    )
+
+
+# Testa se varios repositórios gravam em uma unica transação com um unico commit
+def test_unit_of_work_single_commit(connection_string: str, account_repository: AccountRepository):
+    rows = [make_account_row(balance=100), make_account_row(balance=100)]
+    account_repository.insert_many(rows)
+    engine = account_repository.db.get_engine()
+    commits = []
+    listener = lambda connection: commits.append(connection)
+    event.listen(engine, "commit", listener)
+    try:
+        with UnitOfWork(connection_string=connection_string) as unit_of_work:
+            assert UnitOfWork.current(connection_string=connection_string) is unit_of_work
+            account_repository.add_to_balance(id=rows[0]["id"], delta=-30)
+            account_repository.add_to_balance(id=rows[1]["id"], delta=30)
+            assert account_repository.select_from_id(id=rows[0]["id"]).balance == 70
+            # Outra conexão ainda não enxerga as alterações
+            with engine.connect() as connection:
+                assert connection.exec_driver_sql("SELECT balance FROM accounts WHERE id = ?", (rows[0]["id"],)).scalar() == 100
+    finally:
+        event.remove(engine, "commit", listener)
+    assert len(commits) == 1
+    assert UnitOfWork.current(connection_string=connection_string) is None
+    assert account_repository.select_from_id(id=rows[0]["id"]).balance == 70
+    assert account_repository.select_from_id(id=rows[1]["id"]).balance == 130
+
+
+# Testa se um erro no meio desfaz tudo e chama os callbacks de rollback
+def test_unit_of_work_rollback(connection_string: str, account_repository: AccountRepository):
+    row = make_account_row(balance=100)
+    account_repository.insert_many([row])
+    rollbacks = []
+    with pytest.raises(ValueError):
+        with UnitOfWork(connection_string=connection_string) as unit_of_work:
+            unit_of_work.on_rollback(lambda: rollbacks.append(True))
+            account_repository.add_to_balance(id=row["id"], delta=50)
+            UserRepository(connection_string=connection_string).insert(id=uuid.uuid4().hex, nickname="TESTER USER", created_at=datetime.datetime.now())
+            raise ValueError("falha no meio da operação")
+    assert rollbacks == [True]
+    assert account_repository.select_from_id(id=row["id"]).balance == 100
+    assert UserRepository(connection_string=connection_string).select() == []
+
+
+# Testa se o savepoint desfaz só a parte que falhou
+def test_unit_of_work_savepoint(connection_string: str, account_repository: AccountRepository):
+    rows = [make_account_row(balance=0) for _ in range(3)]
+    account_repository.insert_many(rows)
+    with UnitOfWork(connection_string=connection_string) as unit_of_work:
+        for index, row in enumerate(rows):
+            try:
+                with unit_of_work.savepoint():
+                    account_repository.add_to_balance(id=row["id"], delta=10)
+                    if index == 1:
+                        raise ValueError("falha em um item do lote")
+            except ValueError:
+                pass
+        # Unidades aninhadas também viram savepoints
+        with pytest.raises(ValueError):
+            with UnitOfWork(connection_string=connection_string):
+                account_repository.add_to_balance(id=rows[0]["id"], delta=10)
+                raise ValueError("falha na unidade aninhada")
+        # O tudo ou nada do repositório desfaz só o proprio savepoint
+        assert account_repository.add_to_balances({rows[2]["id"]: 5, uuid.uuid4().hex: 5}) is None
+    assert [account_repository.select_from_id(id=row["id"]).balance for row in rows] == [10, 0, 10]
+
+
+# Testa o erro ao abrir a unidade de trabalho dentro de um contexto de conexão
+def test_unit_of_work_inside_connection_context(connection_string: str, account_repository: AccountRepository):
+    with account_repository.db:
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(connection_string=connection_string):
+                pass
+    with UnitOfWork(connection_string=connection_string):
+        pass
+
+
+# Testa se o rollback da unidade de trabalho descarta o que os handlers já tinham colocado no cache
+def test_unit_of_work_rollback_handler_caches(connection_string: str, handlers):
+    account_handler, transaction_handler, account = handlers
+    transaction = make_transaction(account, "50.00")
+    with pytest.raises(ValueError):
+        with UnitOfWork(connection_string=connection_string):
+            transaction_handler.create_transaction(transaction)
+            account_handler.apply_balance_deltas({account.id: Decimal("50.00")})
+            assert transaction_handler.get_transaction(id=transaction.id) is transaction
+            assert account_handler.get_account(id=account.id).balance == Decimal("150.00")
+            raise ValueError("falha no meio da operação")
+    assert transaction_handler.get_transaction(id=transaction.id) is None
+    assert transaction_handler.get_all_transactions() == []
+    assert transaction_handler.get_transactions_by_account(account_id=account.id) == []
+    assert account_handler.get_account(id=account.id).balance == Decimal("100.00")
+    assert [account.balance for account in account_handler.get_all_accounts()] == [Decimal("100.00")]
+    # Fora de uma unidade de trabalho nada é registrado e o cache segue sendo usado
+    transaction_handler.create_transaction(transaction)
+    assert transaction_handler.get_all_transactions() == [transaction]
+
+
+# Testa se o rollback de um savepoint ou de uma unidade aninhada descarta do cache só o que foi desfeito
+def test_unit_of_work_savepoint_handler_caches(connection_string: str, handlers):
+    account_handler, transaction_handler, account = handlers
+    kept, savepoint, nested = [make_transaction(account, amount) for amount in ("1.00", "2.00", "3.00")]
+    with UnitOfWork(connection_string=connection_string) as unit_of_work:
+        transaction_handler.create_transaction(kept)
+        with pytest.raises(ValueError):
+            with unit_of_work.savepoint():
+                transaction_handler.create_transaction(savepoint)
+                account_handler.apply_balance_deltas({account.id: Decimal("2.00")})
+                raise ValueError("falha no savepoint")
+        assert transaction_handler.get_transaction(id=savepoint.id) is None
+        assert account_handler.get_account(id=account.id).balance == Decimal("100.00")
+        with pytest.raises(ValueError):
+            with TransactionDatabaseAdapter.unit_of_work():
+                transaction_handler.create_transaction(nested)
+                raise ValueError("falha na unidade aninhada")
+        assert transaction_handler.get_transaction(id=nested.id) is None
+        assert [transaction.id for transaction in transaction_handler.get_transactions_by_account(account_id=account.id)] == [kept.id]
+    assert [transaction.id for transaction in transaction_handler.get_all_transactions()] == [kept.id]
+
+
+# Testa se os callbacks de um savepoint confirmado ainda rodam quando a unidade de trabalho é desfeita
+def test_unit_of_work_savepoint_callbacks(connection_string: str):
+    calls = []
+    callback = lambda: calls.append(True)
+    with pytest.raises(ValueError):
+        with UnitOfWork(connection_string=connection_string) as unit_of_work:
+            unit_of_work.on_rollback(callback)
+            with pytest.raises(ValueError):
+                with unit_of_work.savepoint():
+                    # O mesmo callback registrado antes do savepoint também vale para o que foi feito dentro dele
+                    unit_of_work.on_rollback(callback)
+                    raise ValueError("falha no savepoint")
+            assert calls == [True]
+            with unit_of_work.savepoint():
+                unit_of_work.on_rollback(callback)
+            assert calls == [True]
+            raise ValueError("falha na unidade de trabalho")
+    assert calls == [True, True]
+
+
+# Testa se a inserção das transações e os saldos são gravados juntos ou não são gravados
+def test_posting_handler_record_transactions(handlers):
+    account_handler, transaction_handler, account = handlers
+    posting_handler = PostingHandler(account_handler=account_handler, transaction_handler=transaction_handler)
+    transactions = [make_transaction(account, "10.00"), make_transaction(account, "5.00", account_id_destination=uuid.uuid4())]
+    with pytest.raises(AccountNotFoundError):
+        posting_handler.record_transactions(transactions)
+    assert transaction_handler.get_all_transactions() == []
+    assert account_handler.get_account(id=account.id).balance == Decimal("100.00")
+    transactions = [make_transaction(account, "10.00"), make_transaction(account, "5.00")]
+    assert posting_handler.record_transactions(iter(transactions)) == {account.id: Decimal("115.00")}
+    assert {transaction.id for transaction in transaction_handler.get_all_transactions()} == {transaction.id for transaction in transactions}
+    # Transações repetidas não são inseridas de novo e não mexem no saldo
+    assert posting_handler.record_transactions(transactions) == dict()
+    assert account_handler.get_account(id=account.id).balance == Decimal("115.00")
+
+
+# Testa se uma falha no meio do lote desfaz as linhas já inseridas e não deixa nada no cache
+def test_posting_handler_record_transactions_partial_failure(handlers, monkeypatch: pytest.MonkeyPatch):
+    account_handler, transaction_handler, account = handlers
+    posting_handler = PostingHandler(account_handler=account_handler, transaction_handler=transaction_handler)
+    repository = TransactionDatabaseAdapter._db
+    insert_many = repository.insert_many
+    def failing_insert_many(rows):
+        # A primeira metade do lote chega ao banco antes da falha
+        insert_many(rows[:len(rows) // 2])
+        raise RuntimeError("falha no meio do lote")
+    monkeypatch.setattr(repository, "insert_many", failing_insert_many)
+    transactions = [make_transaction(account, "1.00") for _ in range(4)]
+    with pytest.raises(RuntimeError):
+        posting_handler.record_transactions(transactions)
+    monkeypatch.setattr(repository, "insert_many", insert_many)
+    assert repository.select() == []
+    assert transaction_handler.get_all_transactions() == []
+    assert account_handler.get_account(id=account.id).balance == Decimal("100.00")
+
+
+# Testa o erro quando as contas e as transações estão em bancos diferentes
+def test_posting_handler_record_transactions_database_mismatch(tmp_path, handlers, monkeypatch: pytest.MonkeyPatch):
+    _, transaction_handler, _ = handlers
+    connection_string = f"sqlite:///{tmp_path / 'accounts.db'}"
+    with DBConnectionHandler(connection_string=connection_string) as db:
+        Base.metadata.create_all(db.get_engine())
+    monkeypatch.setattr(AccountDatabaseAdapter, "_db", AccountRepository(connection_string=connection_string))
+    posting_handler = PostingHandler(account_handler=AccountHandler(database=AccountDatabaseAdapter), transaction_handler=transaction_handler)
+    with pytest.raises(posting_handler_error.DatabaseMismatchError):
+        posting_handler.record_transactions([])
+    assert transaction_handler.get_all_transactions() == []
@@ -0,0 +1,52 @@
+import uuid
+import datetime
+
+from infra import TransactionRepository, DBConnectionHandler, DatabaseSettings, EngineRegistry, Migrator
+from test.infra.test_transaction_repository import make_row
+
+
+def storage_types(engine) -> set:
+    with engine.connect() as connection:
+        return {row[0] for row in connection.exec_driver_sql("SELECT DISTINCT typeof(id) || '/' || typeof(user_id) FROM transactions")}
+
+
+# Testa se o repositório funciona igual com as chaves gravadas em bytes
+def test_binary_uuid_repository_roundtrip(binary_connection_string: str):
+    repository = TransactionRepository(connection_string=binary_connection_string)
+    user_id = uuid.uuid4().hex
+    rows = [make_row(user_id=user_id) for _ in range(5)]
+    assert repository.insert_many(rows + rows[:1]) == [True] * 5 + [False]
+    assert storage_types(repository.db.get_engine()) == {"blob/blob"}
+    
+    assert repository.select_from_id(id=rows[0]["id"]).user_id == user_id
+    assert repository.update(id=rows[1]["id"], description="TESTER UPDATED").description == "TESTER UPDATED"
+    assert repository.sum_by_account(user_id=user_id) == {row["account_id_destination"]: row["amount"] for row in rows}
+    
+    first_page = repository.select_page(user_id=user_id, limit=3)
+    second_page = repository.select_page(user_id=user_id, limit=3, after=(first_page[-1].date, first_page[-1].id))
+    assert {transaction.id for transaction in first_page + second_page} == {row["id"] for row in rows}
+
+
+# Testa se um banco existente é convertido de hex para bytes e de volta sem perder dados
+def test_uuid_storage_conversion(connection_string: str):
+    repository = TransactionRepository(connection_string=connection_string)
+    rows = [make_row(account_id_origin=None), make_row(account_id_origin=uuid.uuid4().hex)]
+    repository.insert_many(rows)
+    database = DBConnectionHandler(connection_string=connection_string).get_connection_string()
+    
+    for storage, expected in [("binary", "blob/blob"), ("hex", "text/text")]:
+        EngineRegistry.dispose_all()
+        engine = EngineRegistry.get_engine(DatabaseSettings(connection_string=database, uuid_storage=storage))
+        Migrator(engine).upgrade()
+        assert storage_types(engine) == {expected}
+        converted = {transaction.id: transaction for transaction in TransactionRepository(connection_string=database).select()}
+        for row in rows:
+            assert converted[row["id"]].account_id_origin == row["account_id_origin"]
+            assert converted[row["id"]].category_id == row["category_id"]
+            # Os checkpoints são convertidos junto e os triggers continuam gravando no formato novo
+            assert TransactionRepository(connection_string=database).balance_at(account_id=row["account_id_destination"], at=datetime.datetime(2025, 1, 1)) == -row["amount"]
+        extra = make_row(date=datetime.datetime(2024, 1, 5), account_id_destination=rows[0]["account_id_destination"], transaction_type="renda", amount=7)
+        TransactionRepository(connection_string=database).insert_many([extra])
+        rows[0]["amount"] -= 7
+        assert TransactionRepository(connection_string=database).balance_at(account_id=rows[0]["account_id_destination"], at=datetime.datetime(2025, 1, 1)) == -rows[0]["amount"]
+    EngineRegistry.dispose_all()